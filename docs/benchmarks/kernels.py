@@ -0,0 +1,124 @@
+"""
+NumPy and Numba backends of the fused kernels of `stats.kernels`.
+
+Each kernel is first run with both backends on the same data and the results
+are checked to be equal (exactly for the counts, within a relative tolerance
+for the floating point sums and densities), then both backends are timed.
+The data has nulls, so the null handling is checked too. The Numba kernels
+are compiled before timing.
+
+Numba is optional, without it only the NumPy backend is timed:
+
+    python docs/benchmarks/kernels.py --rows 10000000 --repeat 5
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "dshelper"))
+
+from stats import kernels  # noqa: E402
+
+FINE_BINS = 3200
+GRID_CELLS = 10
+
+
+def make_cases(rows, rng):
+    """Kernel calls of the benchmark, name -> function of the backend"""
+
+    values = rng.normal(size=rows)
+    values[rng.random(rows) < 0.05] = np.nan  # 5% nulls
+    minimum, maximum = np.nanmin(values), np.nanmax(values)
+
+    codes_x = rng.integers(-1, GRID_CELLS, size=rows)  # -1 for the left out rows
+    codes_y = rng.integers(0, GRID_CELLS, size=rows)
+    weights = rng.exponential(size=rows)
+    weights[rng.random(rows) < 0.05] = np.nan
+
+    # The density estimate of the pair plot is drawn from one hue at a time
+    kde_values = values[: max(rows // 10, 2)]
+
+    return {
+        "Value range": lambda use_numba: kernels.value_range(
+            values, use_numba=use_numba
+        ),
+        "Histogram ({} bins)".format(FINE_BINS): lambda use_numba: kernels.histogram_1d(
+            values, FINE_BINS, minimum, maximum, use_numba=use_numba
+        ),
+        "Grid counts": lambda use_numba: kernels.grid_counts(
+            codes_x, codes_y, GRID_CELLS, GRID_CELLS, use_numba=use_numba
+        ),
+        "Grid sums": lambda use_numba: kernels.grid_counts(
+            codes_x, codes_y, GRID_CELLS, GRID_CELLS, weights, use_numba=use_numba
+        ),
+        "Binned KDE": lambda use_numba: kernels.binned_kde(
+            kde_values, use_numba=use_numba
+        ),
+    }
+
+
+def assert_equal(name, expected, result):
+    """Results of both backends, arrays (or tuples of them) and numbers"""
+
+    for expected_item, item in zip(expected, result):
+        if expected_item is None:
+            assert item is None, name
+            continue
+
+        expected_item, item = np.asarray(expected_item), np.asarray(item)
+        if expected_item.dtype.kind in "iu":
+            assert np.array_equal(expected_item, item), name
+        else:
+            assert np.allclose(expected_item, item, rtol=1e-9, equal_nan=True), name
+
+
+def time_kernel(kernel, use_numba, repeat):
+    """Median milliseconds of a kernel call"""
+
+    kernel(use_numba)  # compiles the Numba kernel
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        kernel(use_numba)
+        timings.append(time.perf_counter() - start)
+
+    return 1000 * np.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    cases = make_cases(args.rows, np.random.default_rng(0))
+
+    if not kernels.HAS_NUMBA:
+        print("Numba is not installed, timing the NumPy backend only\n")
+        print("{:<24}{:>12}".format("Kernel", "NumPy (ms)"))
+        for name, kernel in cases.items():
+            print("{:<24}{:>12.1f}".format(name, time_kernel(kernel, False, args.repeat)))
+        return
+
+    for name, kernel in cases.items():
+        assert_equal(name, kernel(False), kernel(True))
+    print("Both backends give the same results\n")
+
+    print("{:<24}{:>12}{:>12}{:>10}".format("Kernel", "NumPy (ms)", "Numba (ms)", "speedup"))
+    for name, kernel in cases.items():
+        numpy_ms = time_kernel(kernel, False, args.repeat)
+        numba_ms = time_kernel(kernel, True, args.repeat)
+
+        print(
+            "{:<24}{:>12.1f}{:>12.1f}{:>9.1f}x".format(
+                name, numpy_ms, numba_ms, numpy_ms / numba_ms
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
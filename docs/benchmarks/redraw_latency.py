@@ -0,0 +1,231 @@
+"""
+Redraw latency of the plot panels, before and after the in-place artist
+updates.
+
+"before" replays what the panels did on each drop-down selection: clear the
+axes and rebuild every artist (and the colour bar of the heat map). "after"
+pushes the new data into the artists kept by a `PlotState` and blits over
+the cached background when the axes did not change.
+
+The figures are rendered off-screen with the Agg canvas, so the script runs
+without wxPython:
+
+    python docs/benchmarks/redraw_latency.py --rows 100000 --repeat 20
+"""
+
+import argparse
+import importlib.util
+import os
+import time
+
+import numpy as np
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+PLOT_STATE_PATH = os.path.join(
+    os.path.dirname(__file__), "..", "..", "dshelper", "plots", "plot_state.py"
+)
+
+
+def load_plot_state():
+    # dshelper.plots imports wx, load the module on its own
+    spec = importlib.util.spec_from_file_location("plot_state", PLOT_STATE_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    return module
+
+
+def make_canvas():
+    figure = Figure(figsize=(8, 6), dpi=100)
+    axes = figure.add_subplot(111)
+
+    return FigureCanvasAgg(figure), axes
+
+
+def time_redraws(redraw, selections, repeat):
+    """Median milliseconds of a redraw, cycling through the selections"""
+
+    redraw(selections[0])  # first draw builds the artists
+    timings = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        redraw(selections[i % len(selections)])
+        timings.append(time.perf_counter() - start)
+
+    return 1000 * np.median(timings)
+
+
+def hist_before(canvas, axes):
+    def redraw(selection):
+        counts, edges = selection
+        axes.clear()
+        axes.hist(edges[:-1], bins=edges, weights=counts, color="C0")
+        axes.set_title("Histogram Plot")
+        axes.set_ylabel("Value Count")
+        canvas.draw()
+
+    return redraw
+
+
+def hist_after(canvas, axes, plot_state):
+    state = plot_state.PlotState(canvas, axes)
+    state.set_labels(title="Histogram Plot", ylabel="Value Count")
+
+    def redraw(selection):
+        counts, edges = selection
+        bars = state.get("bars")
+        if bars is None:
+            bars = state.add("bars", plot_state.make_bars(axes))
+        bars.set_verts(plot_state.bar_vertices(edges[:-1], edges[1:], counts))
+        axes.set_xlim(edges[0], edges[-1])
+        axes.set_ylim(0, counts.max() * 1.05)
+        state.draw()
+
+    return redraw
+
+
+def scatter_before(canvas, axes):
+    def redraw(selection):
+        x, y = selection
+        axes.clear()
+        axes.plot(x, y, "o")
+        axes.set_title("Scatter Plot")
+        canvas.draw()
+
+    return redraw
+
+
+def scatter_after(canvas, axes, plot_state):
+    state = plot_state.PlotState(canvas, axes)
+    state.set_labels(title="Scatter Plot")
+
+    def redraw(selection):
+        x, y = selection
+        points = state.get("points")
+        if points is None:
+            (points,) = axes.plot(x, y, "o")
+            state.add("points", points)
+        else:
+            points.set_data(x, y)
+        axes.relim()
+        axes.autoscale_view()
+        state.draw()
+
+    return redraw
+
+
+def heat_before(canvas, axes):
+    figure = axes.figure
+    color_bar = {}
+
+    def redraw(selection):
+        x, y = selection
+        if color_bar:
+            color_bar.pop("bar").remove()
+        axes.clear()
+        hist, xbins, ybins, image = axes.hist2d(x, y, cmap="Wistia", cmin=1)
+        for i in range(len(xbins) - 1):
+            for j in range(len(ybins) - 1):
+                if not np.isnan(hist[i, j]):
+                    axes.text(
+                        (xbins[i] + xbins[i + 1]) / 2,
+                        (ybins[j] + ybins[j + 1]) / 2,
+                        hist[i, j],
+                        ha="center",
+                        va="center",
+                    )
+        axes.set_title("Heat Map Plot")
+        color_bar["bar"] = figure.colorbar(image, ax=axes)
+        canvas.draw()
+
+    return redraw
+
+
+def heat_after(canvas, axes, plot_state):
+    figure = axes.figure
+    state = plot_state.PlotState(canvas, axes)
+    state.set_labels(title="Heat Map Plot")
+    color_bar = {}
+
+    def redraw(selection):
+        x, y = selection
+        hist, xbins, ybins = np.histogram2d(x, y, bins=10)
+        hist = np.ma.masked_less(hist, 1)
+        extent = (xbins[0], xbins[-1], ybins[0], ybins[-1])
+
+        image = state.get("image")
+        if image is None:
+            image = state.add(
+                "image",
+                axes.imshow(
+                    hist.T, cmap="Wistia", origin="lower", extent=extent, aspect="auto"
+                ),
+            )
+            texts = state.add(
+                "annotations",
+                [axes.text(0, 0, "", ha="center", va="center") for _ in range(hist.size)],
+            )
+            color_bar["bar"] = figure.colorbar(image, ax=axes)
+        else:
+            image.set_data(hist.T)
+            image.set_extent(extent)
+            texts = state.get("annotations")
+        image.autoscale()
+        color_bar["bar"].update_normal(image)
+        axes.set_xlim(xbins[0], xbins[-1])
+        axes.set_ylim(ybins[0], ybins[-1])
+
+        empty = np.ma.getmaskarray(hist)
+        x_middle = (xbins[:-1] + xbins[1:]) / 2
+        y_middle = (ybins[:-1] + ybins[1:]) / 2
+        for text, (i, j) in zip(texts, np.ndindex(hist.shape)):
+            text.set_position((x_middle[i], y_middle[j]))
+            text.set_text("" if empty[i, j] else "{:g}".format(hist.data[i, j]))
+
+        state.draw(extra=tuple(image.get_clim()))
+
+    return redraw
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--bins", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    plot_state = load_plot_state()
+    rng = np.random.default_rng(0)
+    columns = [rng.normal(size=args.rows), rng.exponential(size=args.rows)]
+
+    hist_selections = [np.histogram(column, bins=args.bins) for column in columns]
+    pair_selections = [(columns[0], columns[1]), (columns[1], columns[0])]
+    # Same column selected again: the axes does not change, the data is blitted
+    same_selection = [hist_selections[0]]
+
+    cases = [
+        ("Histogram", hist_before, hist_after, hist_selections),
+        ("Histogram (same axes)", hist_before, hist_after, same_selection),
+        ("Scatter", scatter_before, scatter_after, pair_selections),
+        ("Heat map", heat_before, heat_after, pair_selections),
+    ]
+
+    print("{:<24}{:>12}{:>12}{:>10}".format("Plot", "before (ms)", "after (ms)", "speedup"))
+    for name, before, after, selections in cases:
+        canvas, axes = make_canvas()
+        before_ms = time_redraws(before(canvas, axes), selections, args.repeat)
+
+        canvas, axes = make_canvas()
+        after_ms = time_redraws(after(canvas, axes, plot_state), selections, args.repeat)
+
+        print(
+            "{:<24}{:>12.1f}{:>12.1f}{:>9.1f}x".format(
+                name, before_ms, after_ms, before_ms / after_ms
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
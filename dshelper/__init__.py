@@ -9,8 +9,9 @@ License: MIT (see LICENSE for details)
 """
 
 from .main_gui import dshelp  # noqa
+from .viewer import DataViewer  # noqa
 
 
 __version__ = "0.1.0"
 
-__all__ = ["dshelp"]
+__all__ = ["dshelp", "DataViewer"]
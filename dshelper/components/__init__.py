@@ -2,3 +2,4 @@ from .status_bar import MyStatusBar  # noqa
 from .selection import create_bitmap_dropdown_menu  # noqa
 from .splash import show_splash  # noqa
 from .log import LogPanel  # noqa
+from .activity import ActivityFilter  # noqa
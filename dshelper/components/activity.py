@@ -0,0 +1,35 @@
+import wx
+
+# User input pausing the background work
+USER_EVENTS = frozenset(
+    (
+        wx.wxEVT_LEFT_DOWN,
+        wx.wxEVT_RIGHT_DOWN,
+        wx.wxEVT_MIDDLE_DOWN,
+        wx.wxEVT_MOUSEWHEEL,
+        wx.wxEVT_KEY_DOWN,
+    )
+)
+
+
+class ActivityFilter(wx.EventFilter):
+    """
+    Application wide event filter noticing the user input (clicks, wheel
+    and keys), e.g. to pause the background precomputation while the user
+    interacts. Install with `wx.EvtHandler.AddFilter(filter)`.
+
+    Args:
+        on_activity --> callable: called on every user input
+    Returns: None
+    """
+
+    def __init__(self, on_activity):
+        wx.EventFilter.__init__(self)
+        self.on_activity = on_activity
+
+    def FilterEvent(self, event):
+        if event.GetEventType() in USER_EVENTS:
+            self.on_activity()
+
+        # The event is processed as usual
+        return self.Event_Skip
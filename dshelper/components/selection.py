@@ -4,14 +4,30 @@ from pathlib import Path
 import wx
 from wx.adv import BitmapComboBox
 
+try:
+    # local import
+    from stats import get_profile
+except (ModuleNotFoundError, ImportError):
+    # Package import
+    from dshelper.stats import get_profile
+
+# Columns with up to this many distinct values get a number icon
+MAX_ICON_DISTINCT = 9
+
 
 def create_bitmap_dropdown_menu(panel, available_columns, df):
     dropdown_menu = BitmapComboBox(panel, style=wx.CB_READONLY)
+
+    # Only small distinct counts matter, the scans stop past the limit
+    distinct_counts = get_profile(df).bounded_distinct(
+        list(available_columns), MAX_ICON_DISTINCT
+    )
+
     for column in available_columns:
-        n_distinct = df[column].nunique()
+        n_distinct = distinct_counts[column]
 
         path = Path(__file__).parent.parent.absolute()
-        if n_distinct <= 9:
+        if n_distinct <= MAX_ICON_DISTINCT:
             filename = os.path.join(path, "media", f"{n_distinct}.png")
         else:
             filename = os.path.join(path, "media", "forest.png")
@@ -4,6 +4,13 @@ import wx
 
 from pubsub import pub
 
+# Sampling modes offered in the status bar, label -> kind of sample
+SAMPLING_CHOICES = {
+    "Full data": None,
+    "Reservoir sample": "reservoir",
+    "Stratified sample": "stratified",
+}
+
 
 class MyStatusBar(wx.StatusBar):
     """
@@ -17,8 +24,8 @@ class MyStatusBar(wx.StatusBar):
     def __init__(self, parent, memory_usage):
         wx.StatusBar.__init__(self, parent)
 
-        self.SetFieldsCount(6)
-        self.SetStatusWidths([80, 120, 200, -1, 200, 200])
+        self.SetFieldsCount(10)
+        self.SetStatusWidths([80, 120, 220, 160, 180, 300, 120, -1, 200, 200])
         self.sizeChanged = False
         self.Bind(wx.EVT_SIZE, self.OnSize)
         self.Bind(wx.EVT_IDLE, self.OnIdle)
@@ -26,9 +33,14 @@ class MyStatusBar(wx.StatusBar):
         # Text fields with initial content
         self.SetStatusText("some text", 0)
         self.SetStatusText("some text", 1)
+        self.set_duplicates(None)
         self.memory = wx.StaticText(self, -1, f" Memory Usage: {memory_usage}")
         self.memory.SetForegroundColour("blue")
 
+        # Progress of the statistics precomputed in the background
+        self.precompute = wx.Gauge(self, -1, range=1, style=wx.GA_HORIZONTAL)
+        self.set_progress(0, 0)
+
         self.log_info = wx.StaticText(
             self,
             -1,
@@ -38,6 +50,15 @@ class MyStatusBar(wx.StatusBar):
             )
         )
 
+        # Sampling mode shared by all the plots, the plot shown can be
+        # computed again on the full data
+        self.sampling = wx.Choice(self, -1, choices=list(SAMPLING_CHOICES))
+        self.sampling.SetSelection(0)
+        self.sampling.Bind(wx.EVT_CHOICE, self.sampling_selected)
+        self.refine = wx.Button(self, -1, "Compute on Full Data")
+        self.refine.Bind(wx.EVT_BUTTON, self.refine_plot)
+        self.refine.Disable()
+
         # Field for buttons
         self.hide_show_bottom = wx.ToggleButton(self, -1, "Hide Bottom Panel")
         self.hide_show_side = wx.ToggleButton(self, -1, "Hide Right Panel")
@@ -69,6 +90,76 @@ class MyStatusBar(wx.StatusBar):
 
         self.log_info.SetLabel(log_message.rstrip().split("\n")[-1])
 
+    def set_memory_usage(self, memory_usage, details=None):
+        """
+        Updates the memory usage field.
+
+        Args:
+            memory_usage --> string: formatted memory usage, e.g. "1.20 MB"
+            details --> string: breakdown shown as the tooltip of the field
+        Returns: None
+        """
+
+        self.memory.SetLabel(f" Memory Usage: {memory_usage}")
+        if details is not None:
+            self.memory.SetToolTip(details)
+
+    def set_duplicates(self, summary):
+        """
+        Updates the duplicates field.
+
+        Args:
+            summary --> DuplicateSummary: the duplicated rows and columns,
+                None when not computed (for the current data)
+        Returns: None
+        """
+
+        if summary is None:
+            self.SetStatusText(" Duplicates: -", 2)
+        else:
+            self.SetStatusText(
+                " Duplicates: {} rows, {} columns".format(
+                    summary.n_rows, summary.n_columns
+                ),
+                2,
+            )
+
+    def set_progress(self, done, total):
+        """
+        Updates the progress of the background precomputation.
+
+        Args:
+            done --> int: number of finished tasks
+            total --> int: number of tasks
+        Returns: None
+        """
+
+        self.precompute.SetRange(max(total, 1))
+        self.precompute.SetValue(min(done, max(total, 1)))
+        if done < total:
+            tooltip = "Precomputing statistics: {} of {} done".format(done, total)
+        else:
+            tooltip = "Statistics precomputed"
+        self.precompute.SetToolTip(tooltip)
+
+    def sampling_selected(self, event):
+        """
+        Function responses to selecting the sampling mode, the plots are
+        drawn from the sample (or the full data) from now on.
+        """
+
+        kind = SAMPLING_CHOICES[self.sampling.GetStringSelection()]
+        self.refine.Enable(kind is not None)
+        pub.sendMessage("SAMPLING_CHANGED", kind=kind)
+
+    def refine_plot(self, event):
+        """
+        Function responses to the "Compute on Full Data" button, the plot
+        shown is computed again from all the rows in the background.
+        """
+
+        pub.sendMessage("REFINE_PLOT")
+
     def OnSize(self, evt):
         evt.Skip()
         self.Reposition()  # for normal size events
@@ -85,26 +176,44 @@ class MyStatusBar(wx.StatusBar):
     def Reposition(self):
         """Reposition for widgets inside status bar"""
 
+        # Choice (sampling mode)
+        rect_sampling = self.GetFieldRect(3)
+        rect_sampling.x += 1
+        rect_sampling.y += 1
+        self.sampling.SetRect(rect_sampling)
+
+        # Button (compute on full data)
+        rect_refine = self.GetFieldRect(4)
+        rect_refine.x += 1
+        rect_refine.y += 1
+        self.refine.SetRect(rect_refine)
+
         # Static text (memory usage)
-        rect_memory = self.GetFieldRect(2)
+        rect_memory = self.GetFieldRect(5)
         rect_memory.x += 1
         rect_memory.y += 1
         self.memory.SetRect(rect_memory)
 
+        # Gauge (precomputation progress)
+        rect_precompute = self.GetFieldRect(6)
+        rect_precompute.x += 1
+        rect_precompute.y += 1
+        self.precompute.SetRect(rect_precompute)
+
         # Static text (log info)
-        rect_log = self.GetFieldRect(3)
+        rect_log = self.GetFieldRect(7)
         rect_log.x += 1
         rect_log.y += 1
         self.log_info.SetRect(rect_log)
 
         # Button (hide show bottom panel)
-        rect_hide_show_bottom = self.GetFieldRect(4)
+        rect_hide_show_bottom = self.GetFieldRect(8)
         rect_hide_show_bottom.x += 1
         rect_hide_show_bottom.y += 1
         self.hide_show_bottom.SetRect(rect_hide_show_bottom)
 
         # Button (hide show side panel)
-        rect_hide_show_side = self.GetFieldRect(5)
+        rect_hide_show_side = self.GetFieldRect(9)
         rect_hide_show_side.x += 1
         rect_hide_show_side.y += 1
         self.hide_show_side.SetRect(rect_hide_show_side)
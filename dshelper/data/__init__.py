@@ -4,4 +4,7 @@ from .data_panel import (  # noqa
     ColumnSelectionPanel,
 )
 
+from .memory_panel import MemoryPanel  # noqa
+from .column_layout import ColumnLayout  # noqa
+from .projection import ColumnProjection, resolve_frame  # noqa
 from .utils import reduce_mem_usage  # noqa
@@ -0,0 +1,152 @@
+"""
+Column layout model of the column selection panel.
+
+The model keeps the display order of the columns as a permutation array and
+the enabled/hidden state as a boolean array, both indexed by the original
+column position. Toggling a column is O(1), and hiding or showing columns
+by dtype, name pattern or null ratio is one vectorized update, no matter
+how many columns the dataframe has.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class ColumnLayout:
+    """
+    Display order and enabled state of the columns of a dataframe.
+
+    Args:
+        columns --> list: column headers in the original order
+        dtypes --> list: dtype of each column
+        null_ratios --> list: ratio of null values of each column
+    Returns: None
+    """
+
+    def __init__(self, columns, dtypes=None, null_ratios=None):
+        self.names = np.empty(len(columns), dtype=object)
+        self.names[:] = list(columns)
+        n_columns = len(self.names)
+
+        if dtypes is None:
+            dtypes = [""] * n_columns
+        if null_ratios is None:
+            null_ratios = np.zeros(n_columns)
+
+        self.dtypes = np.empty(n_columns, dtype=object)
+        self.dtypes[:] = [str(dtype) for dtype in dtypes]
+        self.null_ratios = np.asarray(null_ratios, dtype=np.float64)
+
+        self.order = np.arange(n_columns)  # display position -> original index
+        self.enabled = np.ones(n_columns, dtype=bool)  # by original index
+
+    def __len__(self):
+        return len(self.names)
+
+    def original_index(self, position):
+        """Original index of the column at a display position"""
+
+        return self.order[position]
+
+    def column_at(self, position):
+        """Column header at a display position"""
+
+        return self.names[self.order[position]]
+
+    def is_enabled_at(self, position):
+        """Whether the column at a display position is enabled"""
+
+        return bool(self.enabled[self.order[position]])
+
+    def toggle_at(self, position):
+        """
+        Enable/disable the column at a display position.
+
+        Args:
+            position --> int: display position
+        Returns:
+            enabled --> bool: the new state of the column
+        """
+
+        index = self.order[position]
+        self.enabled[index] = not self.enabled[index]
+
+        return bool(self.enabled[index])
+
+    def enabled_columns(self):
+        """
+        Get the enabled columns in display order.
+
+        Returns:
+            columns --> list: column headers
+        """
+
+        order = self.order[self.enabled[self.order]]
+
+        return self.names[order].tolist()
+
+    @property
+    def n_enabled(self):
+        return int(self.enabled.sum())
+
+    def move(self, old_position, new_position):
+        """
+        Move a column to a new display position.
+
+        Args:
+            old_position --> int: display position before the move
+            new_position --> int: display position after the move
+        Returns: None
+        """
+
+        index = self.order[old_position]
+        order = np.delete(self.order, old_position)
+        self.order = np.insert(order, new_position, index)
+
+    def select(self, dtype=None, pattern=None, min_null_ratio=None):
+        """
+        Select the columns matching all the given criteria.
+
+        Args:
+            dtype --> string: dtype name (e.g. "float64", "object"), None for any
+            pattern --> string: regular expression searched in the column
+                headers (case insensitive), None for any
+            min_null_ratio --> float: minimum ratio of nulls, None for any
+        Returns:
+            mask --> numpy array: boolean mask by original index
+        Raises:
+            re.error for invalid patterns
+        """
+
+        mask = np.ones(len(self.names), dtype=bool)
+
+        if dtype:
+            mask &= self.dtypes == dtype
+        if pattern:
+            names = pd.Series(self.names).astype(str)
+            mask &= names.str.contains(pattern, case=False, regex=True).to_numpy()
+        if min_null_ratio is not None:
+            mask &= self.null_ratios >= min_null_ratio
+
+        return mask
+
+    def set_enabled(self, mask, enabled=True):
+        """
+        Enable or disable all the columns of a mask in one update.
+
+        Args:
+            mask --> numpy array: boolean mask by original index
+            enabled --> bool: the new state
+        Returns:
+            changed --> int: number of columns that changed state
+        """
+
+        changed = int((self.enabled[mask] != enabled).sum())
+        self.enabled[mask] = enabled
+
+        return changed
+
+    def dtype_names(self):
+        """Distinct dtype names, for the bulk selection menu"""
+
+        return sorted(set(self.dtypes))
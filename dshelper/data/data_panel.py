@@ -10,6 +10,9 @@ License: MIT (see LICENSE for details)
 """
 
 
+import re
+import threading
+
 import pandas as pd
 
 import wx
@@ -17,12 +20,32 @@ import wx.grid
 import wx.lib.mixins.listctrl
 from pubsub import pub
 
+try:
+    # local import
+    from stats import KLLSketch, get_profile, EXACT_ROW_THRESHOLD
+except (ModuleNotFoundError, ImportError):
+    # Package import
+    from dshelper.stats import KLLSketch, get_profile, EXACT_ROW_THRESHOLD
+
+from .column_layout import ColumnLayout
+from .projection import ColumnProjection
+from .table_view import TableView
+
 
 GRID_TABLE_CONSTRUCTOR = wx.grid.GridTableBase
 
 EVEN_ROW_COLOUR = "#CCE6FF"
 ODD_ROW_COLOUR = "#F0F8FF"
 GRID_LINE_COLOUR = "#D3D3D3"
+ENABLED_COLUMN_COLOUR = "#D5F5E3"
+DISABLED_COLUMN_COLOUR = "#FCF3CF"
+
+# Auto sizing the rows walks every row of the table, above this number of
+# rows only the column labels are used for sizing
+AUTOSIZE_ROW_LIMIT = 10_000
+
+# Milliseconds to gather the scroll events before sending the visible columns
+VISIBLE_COLUMNS_DELAY = 200
 
 
 class DataTable(GRID_TABLE_CONSTRUCTOR):
@@ -30,11 +53,13 @@ class DataTable(GRID_TABLE_CONSTRUCTOR):
     A grid table to show dataframe
 
     Args:
-        data --> pandas dataframe: the df to be shown
+        data --> pandas dataframe or ColumnProjection: the df to be shown
+        rows --> numpy array: row positions to be shown (i.e. sorted and/or
+            filtered rows), None to show all the rows in order
     Returns: None
     """
 
-    def __init__(self, data=None):
+    def __init__(self, data=None, rows=None):
         GRID_TABLE_CONSTRUCTOR.__init__(self)
 
         self.INIT_ROWS = 40
@@ -49,6 +74,15 @@ class DataTable(GRID_TABLE_CONSTRUCTOR):
         else:
             self.data = data
 
+        # Values are read from the base df through the column positions of
+        # the projection, so hidden/re-ordered columns are never copied
+        self.data = ColumnProjection.from_frame(self.data)
+        self.rows = rows
+
+        # Size of the grid, for the notifications of ResetView
+        self.currentRows = self.GetNumberRows()
+        self.currentColumns = self.GetNumberCols()
+
         self.odd = wx.grid.GridCellAttr()
         self.odd.SetBackgroundColour(ODD_ROW_COLOUR)
         self.odd.SetFont(wx.Font(10, wx.SWISS, wx.NORMAL, wx.NORMAL))
@@ -57,16 +91,20 @@ class DataTable(GRID_TABLE_CONSTRUCTOR):
         self.even.SetFont(wx.Font(10, wx.SWISS, wx.NORMAL, wx.NORMAL))
 
     def GetNumberRows(self):
-        return self.data.shape[0]
+        if self.rows is None:
+            return self.data.shape[0]
+        return len(self.rows)
 
     def GetNumberCols(self):
-        return self.data.shape[1]
+        return len(self.data.columns)
 
     def GetValue(self, row, col):
         # if col == 0:
         # # Display index as a column
         #     return self.data.index[row]
-        return self.data.iloc[row, col]
+        return self.data.base.iloc[
+            self._get_row_position(row), self.data.positions[col]
+        ]
 
     def SetValue(self, row, col, value):
         # self.data.iloc[row, col-1] = value
@@ -82,7 +120,13 @@ class DataTable(GRID_TABLE_CONSTRUCTOR):
         return str(self.data.columns[col])
 
     def GetRowLabelValue(self, row):
-        return str(self.data.index[row])
+        return str(self.data.index[self._get_row_position(row)])
+
+    def _get_row_position(self, row):
+        # Map the grid row to the dataframe row through the sort/filter view
+        if self.rows is None:
+            return row
+        return self.rows[row]
 
     def GetTypeName(self, row, col):
         return wx.grid.GRID_VALUE_STRING
@@ -99,7 +143,8 @@ class DataTable(GRID_TABLE_CONSTRUCTOR):
 
     def ResetView(self):
         """Trim/extend the control's rows and update all values"""
-        self.getGrid().BeginBatch()
+        grid = self.GetView()
+        grid.BeginBatch()
         for current, new, delmsg, addmsg in [
             (
                 self.currentRows,
@@ -118,12 +163,14 @@ class DataTable(GRID_TABLE_CONSTRUCTOR):
                 msg = wx.grid.GridTableMessage(
                     self, delmsg, new, current - new  # position
                 )
-                self.getGrid().ProcessTableMessage(msg)
+                grid.ProcessTableMessage(msg)
             elif new > current:
                 msg = wx.grid.GridTableMessage(self, addmsg, new - current)
-                self.getGrid().ProcessTableMessage(msg)
+                grid.ProcessTableMessage(msg)
+        self.currentRows = self.GetNumberRows()
+        self.currentColumns = self.GetNumberCols()
         self.UpdateValues()
-        self.getGrid().EndBatch()
+        grid.EndBatch()
 
         # The scroll bars aren't resized (at least on windows)
         # Jiggling the size of the window rescales the scrollbars
@@ -135,7 +182,7 @@ class DataTable(GRID_TABLE_CONSTRUCTOR):
     def UpdateValues(self):
         """Update all displayed values"""
         msg = wx.grid.GridTableMessage(self, wx.grid.GRIDTABLE_REQUEST_VIEW_GET_VALUES)
-        self.getGrid().ProcessTableMessage(msg)
+        self.GetView().ProcessTableMessage(msg)
 
 
 class DataTablePanel(wx.Panel):
@@ -154,14 +201,15 @@ class DataTablePanel(wx.Panel):
         self.parent = parent
 
         # Set grid for displaying dataframe as table
-        self.df = df
-        self.original_df = df.copy()
+        # The displayed columns are a projection of the original df
+        self.original_df = df
+        self.df = ColumnProjection(self.original_df)
         table = DataTable(self.df)
         self.grid.SetTable(table, takeOwnership=True)
         self.grid.SetGridLineColour(GRID_LINE_COLOUR)
 
         # Setup row/column size and alignment
-        self.grid.AutoSize()
+        autosize_grid(self.grid)
         self.grid.EnableDragGridSize(False)
         self.grid.SetRowLabelSize(wx.grid.GRID_AUTOSIZE)
         self.grid.SetDefaultCellAlignment(wx.ALIGN_CENTRE, wx.ALIGN_CENTRE)
@@ -171,11 +219,68 @@ class DataTablePanel(wx.Panel):
         self.grid.EnableDragColMove()
         self.Bind(wx.grid.EVT_GRID_COL_MOVE, self.OnColMove)
 
+        # Sorting (click on the column header) and filtering, the rows are
+        # mapped through cached permutations instead of copying the df
+        self.table_view = TableView(self.original_df)
+        self.view_lock = threading.Lock()
+        self.grid.Bind(wx.grid.EVT_GRID_COL_SORT, self.OnColSort)
+
+        # The columns scrolled into view are precomputed first
+        self.visible_pending = False
+        self.grid.Bind(wx.EVT_SCROLLWIN, self.OnScroll)
+        self.grid.Bind(wx.EVT_SIZE, self.OnScroll)
+
+        self.filter_text = wx.TextCtrl(self, style=wx.TE_PROCESS_ENTER)
+        self.filter_text.SetHint("Filter rows, e.g. Age > 30 and Sex == 'male'")
+        self.filter_text.Bind(wx.EVT_TEXT_ENTER, self.OnFilter)
+        self.reset_view_button = wx.Button(self, label="Reset View")
+        self.reset_view_button.Bind(wx.EVT_BUTTON, self.OnResetView)
+
+        filter_sizer = wx.BoxSizer(wx.HORIZONTAL)
+        filter_sizer.Add(self.filter_text, 1, wx.ALL | wx.EXPAND, 2)
+        filter_sizer.Add(self.reset_view_button, 0, wx.ALL, 2)
+
         self.sizer = wx.BoxSizer(wx.VERTICAL)
+        self.sizer.Add(filter_sizer, 0, wx.EXPAND)
         self.sizer.Add(self.grid, 1, wx.ALL | wx.EXPAND)
         self.SetSizer(self.sizer)
 
         pub.subscribe(self._update_data, "UPDATE_DF")
+        pub.subscribe(self._append_rows, "ROWS_APPENDED")
+
+    def OnScroll(self, evt):
+        """
+        Function responds to scrolling or resizing the grid, the visible
+        columns are sent once the scrolling settles.
+        """
+
+        evt.Skip()
+        if not self.visible_pending:
+            self.visible_pending = True
+            wx.CallLater(VISIBLE_COLUMNS_DELAY, self._send_visible_columns)
+
+    def visible_columns(self):
+        """
+        Get the headers of the columns visible in the grid.
+
+        Returns:
+            columns --> list: headers of the visible columns
+        """
+
+        x, _ = self.grid.CalcUnscrolledPosition(0, 0)
+        width = self.grid.GetGridWindow().GetClientSize().GetWidth()
+        first = self.grid.XToCol(x)
+        last = self.grid.XToCol(x + width - 1)
+        if first == wx.NOT_FOUND:
+            return []
+        if last == wx.NOT_FOUND:
+            last = self.grid.GetNumberCols() - 1
+
+        return list(self.df.columns[first:last + 1])
+
+    def _send_visible_columns(self):
+        self.visible_pending = False
+        pub.sendMessage("COLUMNS_VISIBLE", columns=self.visible_columns())
 
     def OnColMove(self, evt):
         """
@@ -225,8 +330,8 @@ class DataTablePanel(wx.Panel):
                 cols.insert(newPos, cols[oldPos])
                 cols.pop(oldPos + 1)
 
-            # Reset the df with new column position
-            df = self.df.reindex(columns=cols)
+            # Reset the df with new column position (no data is copied)
+            df = self.df.reorder(cols)
 
             pub.sendMessage(
                 "UPDATE_COLUMNS",
@@ -243,16 +348,17 @@ class DataTablePanel(wx.Panel):
         Updates the displayed dataframe with new locations of columns.
 
         Args:
-            df --> pandas dataframe: df with different column order to be displayed
+            df --> ColumnProjection: projection with the columns to be displayed
         Returns: None
         """
 
-        self.df = df
+        self.df = ColumnProjection.from_frame(df)
 
-        table = DataTable(self.df)
+        table = DataTable(self.df, rows=self.table_view.rows)
         self.grid.SetTable(table, takeOwnership=True)
+        self._set_sorting_indicator()
         self.grid.Refresh()
-        self.grid.AutoSize()
+        autosize_grid(self.grid)
 
         # Disable column re-ordering if some columns are hidden
         if self.df.shape[1] < self.original_df.shape[1]:
@@ -260,6 +366,131 @@ class DataTablePanel(wx.Panel):
         else:
             self.grid.EnableDragColMove()
 
+    def _append_rows(self, df, n_rows):
+        """
+        Shows rows appended to the data. Without sorting/filtering the new
+        rows are appended to the grid, otherwise the view is updated in the
+        background.
+
+        Args:
+            df --> pandas dataframe: the data with the new rows
+            n_rows --> int: number of new rows (at the end of df)
+        Returns: None
+        """
+
+        self.original_df = df
+        self.df = ColumnProjection(df, self.df.columns)
+
+        if self.table_view.sort_column is None and not self.table_view.expression:
+            self.table_view.append(df, n_rows)
+            table = self.grid.GetTable()
+            table.data = self.df
+            table.ResetView()
+        else:
+            self._update_view(
+                self.table_view.append,
+                (df, n_rows),
+                "Updating the sorted/filtered rows with {} new rows".format(n_rows),
+            )
+
+    def OnColSort(self, evt):
+        """
+        Function responds to clicking on the column header, sorts the rows
+        by the column (ascending first, descending on the second click).
+        """
+
+        column = self.df.columns[evt.GetCol()]
+        ascending = not (
+            self.table_view.sort_column == column and self.table_view.ascending
+        )
+
+        # The indicator is set once the rows are sorted
+        evt.Veto()
+
+        self._update_view(
+            self.table_view.sort,
+            (column, ascending),
+            "Sorting by column '{}' ({})".format(
+                column, "ascending" if ascending else "descending"
+            ),
+        )
+
+    def OnFilter(self, evt):
+        """
+        Function responds to pressing enter in the filter box.
+        """
+
+        expression = self.filter_text.GetValue()
+        self._update_view(
+            self.table_view.filter,
+            (expression,),
+            "Filtering rows with: {}".format(expression or "(none)"),
+        )
+
+    def OnResetView(self, evt):
+        """
+        Function responds to the reset button, restores the original rows.
+        """
+
+        def _reset():
+            self.table_view.filter("")
+            return self.table_view.sort(None)
+
+        self.filter_text.SetValue("")
+        self._update_view(_reset, (), "Restoring the original rows")
+
+    def _update_view(self, func, args, log_message):
+        """
+        Computes the new rows of the view in a worker thread, so the GUI
+        stays responsive while a big column is sorted for the first time.
+
+        Args:
+            func --> callable: the TableView function to call
+            args --> tuple: arguments of the function
+            log_message --> string: the message to log
+        Returns: None
+        """
+
+        pub.sendMessage("LOG_MESSAGE", log_message="\n" + log_message)
+        threading.Thread(
+            target=self._compute_view, args=(func, args), daemon=True
+        ).start()
+
+    def _compute_view(self, func, args):
+        with self.view_lock:
+            try:
+                func(*args)
+            except (SyntaxError, NameError, KeyError, ValueError, TypeError) as e:
+                _log_message = "Filter failed due to error:\n--> {}".format(e)
+                wx.CallAfter(pub.sendMessage, "LOG_MESSAGE", log_message=_log_message)
+                return
+
+        wx.CallAfter(self._show_view)
+
+    def _show_view(self):
+        """
+        Displays the sorted/filtered rows.
+        """
+
+        table = DataTable(self.df, rows=self.table_view.rows)
+        self.grid.SetTable(table, takeOwnership=True)
+        self._set_sorting_indicator()
+        self.grid.ForceRefresh()
+
+        _log_message = "Showing {} of {} rows".format(
+            table.GetNumberRows(), self.df.shape[0]
+        )
+        pub.sendMessage("LOG_MESSAGE", log_message=_log_message)
+
+    def _set_sorting_indicator(self):
+        column = self.table_view.sort_column
+        if column is not None and column in self.df.columns:
+            self.grid.SetSortingColumn(
+                self.df.columns.index(column), self.table_view.ascending
+            )
+        else:
+            self.grid.UnsetSortingColumn()
+
 
 class DataDescribePanel(wx.Panel):
     """
@@ -275,9 +506,11 @@ class DataDescribePanel(wx.Panel):
         self.grid = wx.grid.Grid(self)
 
         self.parent = parent
+        self.data = df
 
-        # Set grid for displaying df.describe as table
-        self.df = df.describe()
+        # Set grid for displaying df.describe as table, the statistics are
+        # computed in the background so the panel shows up right away
+        self.df = pd.DataFrame({"describe": ["Computing statistics ..."]})
         table = DataTable(self.df)
         self.grid.SetTable(table, takeOwnership=True)
         self.grid.SetGridLineColour(GRID_LINE_COLOUR)
@@ -288,31 +521,163 @@ class DataDescribePanel(wx.Panel):
         self.grid.SetRowLabelSize(wx.grid.GRID_AUTOSIZE)
         self.grid.SetDefaultCellAlignment(wx.ALIGN_CENTRE, wx.ALIGN_CENTRE)
 
+        # Huge frames are described with quantile sketches by default,
+        # the exact statistics are one click away
+        self.exact_checkbox = wx.CheckBox(self, label="Exact statistics")
+        self.exact_checkbox.SetValue(self.data.shape[0] <= EXACT_ROW_THRESHOLD)
+        self.exact_checkbox.Bind(wx.EVT_CHECKBOX, self.exact_selected)
+
         self.sizer = wx.BoxSizer(wx.VERTICAL)
+        self.sizer.Add(self.exact_checkbox, 0, wx.ALL, 2)
         self.sizer.Add(self.grid, 1, wx.ALL | wx.EXPAND)
         self.SetSizer(self.sizer)
 
+        self.compute_describe()
+
+        pub.subscribe(self._append_rows, "ROWS_APPENDED")
+
+    def _append_rows(self, df, n_rows):
+        """
+        Re-computes the statistics with rows appended to the data, the
+        approximate statistics are updated from the new rows only.
+        """
+
+        self.data = df
+        self.compute_describe()
+
+    def exact_selected(self, event):
+        """
+        Responds to the exact statistics checkbox, re-computes the statistics
+        """
+
+        self.compute_describe()
+
+    def compute_describe(self):
+        """
+        Starts computing the descriptive statistics in a worker thread.
+        """
+
+        exact = self.exact_checkbox.GetValue()
+        self.exact_checkbox.Disable()
+
+        threading.Thread(
+            target=self._compute_describe, args=(exact,), daemon=True
+        ).start()
+
+    def _compute_describe(self, exact):
+        describe_df = get_profile(self.data).get_describe(exact)
+        wx.CallAfter(self._update_describe, describe_df, exact)
+
+    def _update_describe(self, describe_df, exact):
+        """
+        Displays the computed statistics.
+
+        Args:
+            describe_df --> pandas dataframe: the output of describe()
+            exact --> bool: whether the statistics are exact
+        Returns: None
+        """
+
+        self.df = describe_df
+        table = DataTable(self.df)
+        self.grid.SetTable(table, takeOwnership=True)
+        self.grid.AutoSize()
+        self.grid.ForceRefresh()
+        self.exact_checkbox.Enable()
+
+        if not exact:
+            _log_message = (
+                "\nStatistics approximated with quantile sketches, "
+                "percentile rank error < {:.2%}".format(KLLSketch().rank_error())
+            )
+            pub.sendMessage("LOG_MESSAGE", log_message=_log_message)
+
+
+def autosize_grid(grid):
+    """
+    Auto size the grid, only by the column labels for huge tables since
+    sizing by the content walks every row.
+
+    Args:
+        grid --> wx.grid.Grid: the grid to be sized
+    Returns: None
+    """
+
+    if grid.GetNumberRows() <= AUTOSIZE_ROW_LIMIT:
+        grid.AutoSize()
+    else:
+        for col in range(grid.GetNumberCols()):
+            grid.AutoSizeColLabelSize(col)
+
 
 class ColumnSelectionList(wx.ListCtrl, wx.lib.mixins.listctrl.ListCtrlAutoWidthMixin):
     """
-    A listCtrl object to enable auto-with for all columns.
+    A virtual listCtrl object to enable auto-with for all columns.
+    The items are not stored in the control, the text and colour of each
+    visible row is read from the column layout model when it is drawn.
+
+    Args:
+        rows --> list: row content (tuple of strings) by original column index
+        layout --> ColumnLayout: display order and state of the columns
+    Returns: None
     """
 
-    def __init__(self, parent, *args, **kw):
-        wx.ListCtrl.__init__(self, parent, wx.ID_ANY, style=wx.LC_REPORT)
+    def __init__(self, parent, rows, layout):
+        wx.ListCtrl.__init__(
+            self, parent, wx.ID_ANY, style=wx.LC_REPORT | wx.LC_VIRTUAL
+        )
         wx.lib.mixins.listctrl.ListCtrlAutoWidthMixin.__init__(self)
 
-    #     self.Bind(wx.EVT_LIST_ITEM_SELECTED, self.left_click)
-    #     # self.Bind(wx.EVT_LIST_BEGIN_DRAG, self.left_drag)
+        self.rows = rows
+        self.layout = layout
+
+        self.enabled_attr = wx.ItemAttr()
+        self.enabled_attr.SetBackgroundColour(ENABLED_COLUMN_COLOUR)
+        self.disabled_attr = wx.ItemAttr()
+        self.disabled_attr.SetBackgroundColour(DISABLED_COLUMN_COLOUR)
+
+    def OnGetItemText(self, item, col):
+        return self.rows[self.layout.original_index(item)][col]
+
+    def OnGetItemAttr(self, item):
+        if self.layout.is_enabled_at(item):
+            return self.enabled_attr
+        return self.disabled_attr
+
+
+def column_statistics(df, counts):
+    """
+    Format the rows of the column selection panel.
+
+    Args:
+        df --> pandas dataframe: pandas dataframe
+        counts --> dict: null and distinct counts, see
+            `DataProfile.get_column_counts()`
+    Returns:
+        rows --> list: (name, type, non null, null, non null %, unique) text
+            tuples, one per column
+        null_ratios --> numpy array: ratio of null values of each column
+    """
+
+    n_rows = max(counts["rows"], 1)
+    null_count = counts["null"]
+    non_null_count = counts["rows"] - null_count
 
-    # def left_click(self, event):
-    #     item = event.GetItem()
-    #     print("Item selected:", item.GetText())
-    #     event.skip()
+    rows = []
+    for num, column_types in enumerate(df.dtypes):
+        distinct = counts["distinct"][num]
+        rows.append(
+            (
+                str(df.columns[num]),
+                str(column_types),
+                str(non_null_count[num]),
+                str(null_count[num]),
+                "{:.2%}".format(non_null_count[num] / n_rows),
+                "~{}".format(distinct) if counts["approximate"][num] else str(distinct),
+            )
+        )
 
-    # def left_drag(self, event):
-    #     print("left mouse drag")
-    #     pass
+    return rows, null_count / n_rows
 
 
 class ColumnSelectionPanel(wx.Panel):
@@ -328,29 +693,22 @@ class ColumnSelectionPanel(wx.Panel):
         wx.Panel.__init__(self, parent, id, style=wx.BORDER_SUNKEN)
 
         self.df = df
-        self.original_df = df.copy()
-        self.enabled_columns = list(self.df.columns)
-        self.original_columns = list(self.df.columns)
-
-        rows = []
-        non_null_count = self.df.notnull().sum()
-        null_count = self.df.isnull().sum()
-        non_null_percentage = non_null_count / self.df.shape[0]
-        for num, column_types in enumerate(self.df.dtypes):
-            rows.append(
-                (
-                    self.df.columns[num],
-                    str(column_types),
-                    str(non_null_count[num]),
-                    str(null_count[num]),
-                    "{:.2%}".format(non_null_percentage[num]),
-                    str(self.df[self.df.columns[num]].nunique()),
-                )
-            )
+        self.original_df = df
+
+        rows, null_ratios = column_statistics(
+            self.df, get_profile(self.df).get_column_counts()
+        )
 
         self.rows = rows
 
-        self.column_list = ColumnSelectionList(self)
+        # Display order and enabled state of the columns
+        self.layout = ColumnLayout(
+            list(self.df.columns),
+            dtypes=list(self.df.dtypes),
+            null_ratios=null_ratios,
+        )
+
+        self.column_list = ColumnSelectionList(self, self.rows, self.layout)
 
         self.column_list.InsertColumn(0, "Name")
         self.column_list.InsertColumn(1, "Type")
@@ -358,176 +716,213 @@ class ColumnSelectionPanel(wx.Panel):
         self.column_list.InsertColumn(3, "Null")
         self.column_list.InsertColumn(4, "Non Null %")
         self.column_list.InsertColumn(5, "Distinct Values")
+        self.column_list.SetItemCount(len(self.layout))
 
-        idx = 0
-        for position in range(len(rows)):
-            self._set_row_content(self.rows, idx, position)
-            idx += 1
+        # Bulk hide/show of the columns matching all the criteria
+        self.bulk_dtype = wx.Choice(
+            self, choices=["All types"] + self.layout.dtype_names()
+        )
+        self.bulk_dtype.SetSelection(0)
+        self.bulk_pattern = wx.TextCtrl(self)
+        self.bulk_pattern.SetHint("Name pattern")
+        self.bulk_null = wx.SpinCtrlDouble(
+            self, min=0, max=100, initial=0, inc=5, style=wx.SP_ARROW_KEYS
+        )
+        self.bulk_null.SetToolTip("Minimum null %")
+        self.bulk_hide = wx.Button(self, label="Hide", style=wx.BU_EXACTFIT)
+        self.bulk_show = wx.Button(self, label="Show", style=wx.BU_EXACTFIT)
+        self.bulk_hide.Bind(wx.EVT_BUTTON, lambda event: self.bulk_update(False))
+        self.bulk_show.Bind(wx.EVT_BUTTON, lambda event: self.bulk_update(True))
+        self.duplicates_button = wx.Button(
+            self, label="Find Duplicates", style=wx.BU_EXACTFIT
+        )
+        self.duplicates_button.SetToolTip("Duplicated rows and identical columns")
+        self.duplicates_button.Bind(wx.EVT_BUTTON, self.find_duplicates)
 
-        # Set the background color of the table
-        row_num = self.column_list.GetItemCount()
-        for index in range(row_num):
-            self.column_list.SetItemBackgroundColour(index, "#D5F5E3")
+        bulk_sizer = wx.BoxSizer(wx.HORIZONTAL)
+        bulk_sizer.Add(self.bulk_dtype, 0, wx.ALL | wx.ALIGN_CENTER, 2)
+        bulk_sizer.Add(self.bulk_pattern, 1, wx.ALL | wx.ALIGN_CENTER, 2)
+        bulk_sizer.Add(self.bulk_null, 0, wx.ALL | wx.ALIGN_CENTER, 2)
+        bulk_sizer.Add(self.bulk_hide, 0, wx.ALL | wx.ALIGN_CENTER, 2)
+        bulk_sizer.Add(self.bulk_show, 0, wx.ALL | wx.ALIGN_CENTER, 2)
+        bulk_sizer.Add(self.duplicates_button, 0, wx.ALL | wx.ALIGN_CENTER, 2)
 
         sizer = wx.BoxSizer(wx.VERTICAL)
+        sizer.Add(bulk_sizer, 0, wx.EXPAND)
         sizer.Add(self.column_list, 1, wx.ALL | wx.EXPAND)
         self.SetSizer(sizer)
 
         self.Bind(wx.EVT_LIST_ITEM_SELECTED, self.left_click)
 
         pub.subscribe(self._update_column, "UPDATE_COLUMNS")
+        pub.subscribe(self._append_rows, "ROWS_APPENDED")
 
-    def left_click(self, event):
+    def _append_rows(self, df, n_rows):
         """
-        Responds to button left click on the row to select or deselect a column
+        Updates the null and distinct counts with rows appended to the data.
+
+        Args:
+            df --> pandas dataframe: the data with the new rows
+            n_rows --> int: number of new rows (at the end of df)
+        Returns: None
         """
 
-        item = event.GetItem()
-        column_name = item.GetText()
+        self.df = df
+        self.original_df = df
 
-        background_color = self.column_list.GetItemBackgroundColour(
-            event.GetIndex()
-        ).GetAsString(wx.C2S_HTML_SYNTAX)
-        if background_color == "#D5F5E3":
-            self.column_list.SetItemBackgroundColour(event.GetIndex(), "#FCF3CF")
+        self.rows, self.layout.null_ratios = column_statistics(
+            self.df, get_profile(self.df).get_column_counts()
+        )
+        self.column_list.rows = self.rows
+        self.column_list.Refresh()
 
-            # Update dataframe
-            self.enabled_columns.remove(column_name)
-            _updated_df = self.df[self.enabled_columns]
-            pub.sendMessage("UPDATE_DF", df=_updated_df)
+    @property
+    def enabled_columns(self):
+        return self.layout.enabled_columns()
 
-            # log action
-            _log_message = "\nColumn disabled: {}".format(column_name)
-            pub.sendMessage("LOG_MESSAGE", log_message=_log_message)
+    def find_duplicates(self, event):
+        """
+        Responds to the duplicates button, the rows and columns of the data
+        are hashed in a worker thread.
+        """
 
-            # Update displayed columns
-            pub.sendMessage(
-                "UPDATE_DISPLAYED_COLUMNS", available_columns=self.enabled_columns
-            )
-        else:
-            self.column_list.SetItemBackgroundColour(event.GetIndex(), "#D5F5E3")
+        self.duplicates_button.Disable()
+        pub.sendMessage("LOG_MESSAGE", log_message="\nLooking for duplicates ...")
 
-            # Update dataframe
-            # column_index = self.original_columns.index(column_name)
-            column_index, index_found = self.get_insert_index(column_name)
-            if index_found:
-                self.enabled_columns.insert(column_index, column_name)
-            else:
-                self.enabled_columns.append(column_name)
-            _updated_df = self.original_df[self.enabled_columns]
-            pub.sendMessage("UPDATE_DF", df=_updated_df)
+        threading.Thread(
+            target=self._find_duplicates, args=(self.original_df,), daemon=True
+        ).start()
 
-            # log action
-            _log_message = "\nColumn enabled: {}".format(column_name)
+    def _find_duplicates(self, df):
+        profile = get_profile(df)
+        version = profile.version
+        try:
+            summary = profile.get_duplicates()
+        except (ValueError, TypeError, MemoryError) as e:
+            _log_message = "\nFinding duplicates failed due to error:\n--> {}".format(e)
+            wx.CallAfter(pub.sendMessage, "LOG_MESSAGE", log_message=_log_message)
+            wx.CallAfter(self.duplicates_button.Enable)
+            return
+
+        wx.CallAfter(self._duplicates_found, summary, profile, version)
+
+    def _duplicates_found(self, summary, profile, version):
+        """
+        Reports the duplicated rows and columns in the log and the status bar.
+        The result is dropped when rows were appended while hashing.
+
+        Args:
+            summary --> DuplicateSummary: the duplicated rows and columns
+            profile --> DataProfile: profile of the data that was hashed
+            version --> int: version of the profile when the data was hashed
+        Returns: None
+        """
+
+        self.duplicates_button.Enable()
+
+        if profile is not get_profile(self.original_df) or profile.version != version:
+            _log_message = "\nThe data changed while looking for duplicates, try again"
             pub.sendMessage("LOG_MESSAGE", log_message=_log_message)
+            return
 
-            # Update displayed columns
-            pub.sendMessage(
-                "UPDATE_DISPLAYED_COLUMNS", available_columns=self.enabled_columns
+        _log_message = "\nDuplicated rows: {} ({} distinct rows repeated)".format(
+            summary.n_rows, summary.n_groups
+        )
+        for group in summary.column_groups:
+            _log_message += "\nIdentical columns: {}".format(
+                " = ".join(str(column) for column in group)
             )
+        pub.sendMessage("LOG_MESSAGE", log_message=_log_message)
+        pub.sendMessage("DUPLICATES_FOUND", summary=summary, version=version)
 
-        self.column_list.Select(event.GetIndex(), on=0)  # De-select row
-
-    def get_insert_index(self, column_name):
+    def left_click(self, event):
+        """
+        Responds to button left click on the row to select or deselect a column
         """
-        Function to get the inset index for any given column name
 
-        Args:
-            column_name --> string: the column name in df
-        Returns:
-            column_index --> int: the index where the column is inserted
-            index_found --> bool: a flag shows whether the index is found
-        """
-
-        _column_index = self.original_columns.index(column_name)
-        index_found = False
-        if _column_index == 0:
-            # case for the beginning position
-            column_index = _column_index
-            index_found = True
-        elif _column_index == len(self.original_columns) - 1:
-            # case for the ending position
-            column_index = _column_index
-            index_found = True
+        position = event.GetIndex()
+        column_name = self.layout.column_at(position)
+
+        if self.layout.toggle_at(position):
+            _log_message = "\nColumn enabled: {}".format(column_name)
         else:
-            # Always search from the leftward
-            while _column_index > 0:
-                _column_index -= 1
-                previous_column = self.original_columns[_column_index]
-                # print("c-column:",column_name, "index:", _column_index, "p-column:", previous_column)
-                if previous_column in self.enabled_columns:
-                    column_index = self.enabled_columns.index(previous_column) + 1
-                    index_found = True
-                    # print("insert index:", column_index)
-                    break
-
-            if not index_found:
-                # case when all the left columns are hidden
-                column_index = 0
-                index_found = True
-
-        return column_index, index_found
-
-    def _set_row_content(self, row, idx, position):
-        index = self.column_list.InsertItem(idx, row[position][0])
-        for pos in range(1, len(row[position])):
-            self.column_list.SetItem(index, pos, row[position][pos])
-
-        return index
+            _log_message = "\nColumn disabled: {}".format(column_name)
 
-    def _update_column(self, columns, old_position, new_position):
+        self._publish_columns()
+        pub.sendMessage("LOG_MESSAGE", log_message=_log_message)
+
+        self.column_list.RefreshItem(position)
+        self.column_list.Select(position, on=0)  # De-select row
+
+    def bulk_update(self, enabled):
         """
-        An internal helper function to update the column positions for
-        drag-and-drop action.
+        Hides/shows all the columns matching the bulk selection criteria
+        in a single update.
 
         Args:
-            columns --> list: pandas df column header list
-            old_position --> int: original column position before dragging
-            new_position --> int: new column position after dropping
+            enabled --> bool: True to show the columns, False to hide them
         Returns: None
         """
 
-        if columns == self.original_df.shape[1]:
-            # case for re-arrangement without hidden columns
+        dtype = None
+        if self.bulk_dtype.GetSelection() > 0:
+            dtype = self.bulk_dtype.GetStringSelection()
+        pattern = self.bulk_pattern.GetValue().strip() or None
+        min_null_ratio = self.bulk_null.GetValue() / 100 or None
 
-            # Add to new position
-            if old_position != new_position:
-                # Delete from old position
-                self.column_list.DeleteItem(old_position)
+        try:
+            mask = self.layout.select(dtype, pattern, min_null_ratio)
+        except re.error as e:
+            _log_message = "\nInvalid column name pattern:\n--> {}".format(e)
+            pub.sendMessage("LOG_MESSAGE", log_message=_log_message)
+            return
 
-                if old_position < new_position:
-                    idx = new_position - 1
-                elif old_position > new_position:
-                    idx = new_position
+        changed = self.layout.set_enabled(mask, enabled)
+        if changed:
+            self._publish_columns()
+            self.column_list.Refresh()
 
-                index = self._set_row_content(self.rows, idx, old_position)
+        _log_message = "\n{} {} columns".format(
+            "Enabled" if enabled else "Disabled", changed
+        )
+        pub.sendMessage("LOG_MESSAGE", log_message=_log_message)
 
-                # Set inserted row background color
-                self.column_list.SetItemBackgroundColour(index, "#D5F5E3")
+    def _publish_columns(self):
+        """
+        Sends the enabled columns to the other panels.
+        """
 
-                # Update rows
-                moved_row = self.rows.pop(old_position)
-                self.rows.insert(idx, moved_row)
+        enabled_columns = self.layout.enabled_columns()
 
-                # Update df columns info
-                moved_column = self.enabled_columns.pop(old_position)
-                self.enabled_columns.insert(idx, moved_column)
+        # Update dataframe
+        _updated_df = ColumnProjection(self.original_df, enabled_columns)
+        pub.sendMessage("UPDATE_DF", df=_updated_df)
 
-                # Update original columns info
-                moved_column = self.original_columns.pop(old_position)
-                self.original_columns.insert(idx, moved_column)
+        # Update displayed columns
+        pub.sendMessage("UPDATE_DISPLAYED_COLUMNS", available_columns=enabled_columns)
 
-                # Update df
-                self.df = self.df[self.enabled_columns]
-        else:
-            # case for re-arrangement with hidden columns
+    def _update_column(self, columns, old_position, new_position):
+        """
+        An internal helper function to update the column positions for
+        drag-and-drop action.
+
+        Args:
+            columns --> list: pandas df column header list
+            old_position --> int: original column position before dragging
+            new_position --> int: new column position after dropping
+        Returns: None
+        """
 
-            # # Set the background color of the table
-            # row_num = self.column_list.GetItemCount()
-            # for index in range(row_num):
-            #     self.column_list.SetItemBackgroundColour(index, "#D5F5E3")
+        if columns == len(self.layout) and old_position != new_position:
+            # case for re-arrangement without hidden columns
+            # (re-arrangement is disabled when some columns are hidden)
+            if old_position < new_position:
+                idx = new_position - 1
+            else:
+                idx = new_position
 
-            pass
+            self.layout.move(old_position, idx)
+            self.column_list.Refresh()
 
 
 if __name__ == "__main__":
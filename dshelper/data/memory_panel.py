@@ -0,0 +1,155 @@
+"""
+Memory breakdown panel: where the memory of the data and of the computed
+statistics goes.
+"""
+
+import threading
+
+import numpy as np
+
+import wx
+from pubsub import pub
+
+try:
+    # local import
+    from stats import format_memory, get_profile
+except (ModuleNotFoundError, ImportError):
+    # Package import
+    from dshelper.stats import format_memory, get_profile
+
+
+class MemoryList(wx.ListCtrl):
+    """
+    Virtual list of the memory rows, only the visible rows are rendered.
+
+    Args:
+        rows --> list: (name, type, memory, share) text tuples
+    Returns: None
+    """
+
+    def __init__(self, parent):
+        wx.ListCtrl.__init__(
+            self, parent, -1, style=wx.LC_REPORT | wx.LC_VIRTUAL | wx.LC_HRULES
+        )
+
+        self.rows = []
+
+        self.InsertColumn(0, "Name")
+        self.InsertColumn(1, "Type")
+        self.InsertColumn(2, "Memory")
+        self.InsertColumn(3, "Share")
+        self.SetColumnWidth(0, 160)
+
+    def set_rows(self, rows):
+        self.rows = rows
+        self.SetItemCount(len(rows))
+        self.Refresh()
+
+    def OnGetItemText(self, item, col):
+        return self.rows[item][col]
+
+
+class MemoryPanel(wx.Panel):
+    """
+    A panel shows the memory of each column, of the index and of the cached
+    statistics, largest first. Object columns are estimated from a sample of
+    their values unless the exact option is checked.
+
+    Args:
+        df --> pandas dataframe: pandas dataframe
+    Returns: None
+    """
+
+    def __init__(self, parent, id, df=None):
+        wx.Panel.__init__(self, parent, id, style=wx.BORDER_SUNKEN)
+
+        self.df = df
+        self.shown_columns = set(df.columns)
+        self.computing = False
+        self.refresh_pending = False
+
+        self.exact_checkbox = wx.CheckBox(self, label="Exact (slow for text columns)")
+        self.exact_checkbox.Bind(wx.EVT_CHECKBOX, lambda event: self.refresh())
+        self.total_text = wx.StaticText(self, label="")
+        self.memory_list = MemoryList(self)
+
+        sizer = wx.BoxSizer(wx.VERTICAL)
+        sizer.Add(self.exact_checkbox, 0, wx.ALL, 2)
+        sizer.Add(self.total_text, 0, wx.ALL, 2)
+        sizer.Add(self.memory_list, 1, wx.ALL | wx.EXPAND)
+        self.SetSizer(sizer)
+
+        self.refresh()
+
+        pub.subscribe(self._update_data, "UPDATE_DF")
+        pub.subscribe(self._append_rows, "ROWS_APPENDED")
+        pub.subscribe(self.refresh, "MEMORY_CHANGED")
+
+    def _update_data(self, df):
+        self.shown_columns = set(df.columns)
+        self.refresh()
+
+    def _append_rows(self, df, n_rows):
+        self.df = df
+        self.refresh()
+
+    def refresh(self):
+        """
+        Re-computes the breakdown in a worker thread (the memory of each
+        column is cached, only new columns and the exact option take time).
+        """
+
+        if self.computing:
+            self.refresh_pending = True
+            return
+
+        self.computing = True
+        threading.Thread(
+            target=self._compute, args=(self.df, self.exact_checkbox.GetValue()), daemon=True
+        ).start()
+
+    def _compute(self, df, exact):
+        profile = get_profile(df)
+        columns = profile.memory_usage(exact=exact)
+        cache = profile.cache_memory()
+        index = profile.index_memory(exact=exact)
+
+        total = int(columns.sum()) + index + int(cache.sum())
+        rows = [("Index", str(df.index.dtype), index)]
+        rows += [
+            (
+                "{}{}".format(column, "" if column in self.shown_columns else " (hidden)"),
+                str(dtype),
+                memory,
+            )
+            for column, dtype, memory in zip(columns.index, df.dtypes, columns.values)
+        ]
+        rows += [("[cache] {}".format(kind), "", memory) for kind, memory in cache.items()]
+
+        order = np.argsort([-row[2] for row in rows], kind="stable")
+        rows = [
+            (
+                rows[i][0],
+                rows[i][1],
+                format_memory(rows[i][2]),
+                "{:.1%}".format(rows[i][2] / total) if total else "",
+            )
+            for i in order
+        ]
+
+        summary = "Data {} + index {} + cached statistics {}{}".format(
+            format_memory(int(columns.sum())),
+            format_memory(index),
+            format_memory(int(cache.sum())),
+            "" if exact else " (text columns estimated)",
+        )
+        wx.CallAfter(self._show, rows, summary)
+
+    def _show(self, rows, summary):
+        self.computing = False
+        self.memory_list.set_rows(rows)
+        self.total_text.SetLabel(summary)
+
+        if self.refresh_pending:
+            self.refresh_pending = False
+            self.refresh()
@@ -0,0 +1,123 @@
+"""
+Lazy column projection of a dataframe.
+
+Hiding, showing or re-ordering columns only changes the list of column
+headers, the data stays in the base dataframe and is never copied. Panels
+read values through the projection, or resolve it into a real dataframe
+when they really need one.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class ColumnProjection:
+    """
+    A base dataframe and an ordered list of its columns.
+
+    Args:
+        base --> pandas dataframe: the full dataframe
+        columns --> list: column headers of the projection, in display order
+    Returns: None
+    """
+
+    def __init__(self, base, columns=None):
+        self.base = base
+        self.columns = list(base.columns if columns is None else columns)
+
+        self._positions = None if columns is not None else np.arange(base.shape[1])
+        self._resolved = None
+
+    @classmethod
+    def from_frame(cls, df):
+        """
+        Wrap a dataframe (or return a projection as is).
+
+        Args:
+            df --> pandas dataframe or ColumnProjection
+        Returns:
+            projection --> ColumnProjection: projection of all the columns
+        """
+
+        if isinstance(df, ColumnProjection):
+            return df
+
+        return cls(df)
+
+    @property
+    def shape(self):
+        return self.base.shape[0], len(self.columns)
+
+    @property
+    def index(self):
+        return self.base.index
+
+    @property
+    def positions(self):
+        """Positions of the projected columns in the base dataframe"""
+
+        if self._positions is None:
+            self._positions = self.base.columns.get_indexer(self.columns)
+            if (self._positions < 0).any():
+                missing = np.asarray(self.columns, dtype=object)[self._positions < 0]
+                raise KeyError("Columns not in the dataframe: {}".format(list(missing)))
+
+        return self._positions
+
+    def __len__(self):
+        return self.base.shape[0]
+
+    def __getitem__(self, column):
+        """Get one column (no copy)"""
+
+        return self.base[column]
+
+    def reorder(self, columns):
+        """
+        Get a projection of the same base with another column list.
+
+        Args:
+            columns --> list: column headers, in display order
+        Returns:
+            projection --> ColumnProjection: the new projection
+        """
+
+        return ColumnProjection(self.base, columns)
+
+    def resolve(self):
+        """
+        Materialize the projection into a dataframe. This copies the
+        projected columns (once), only use it when a real df is needed.
+
+        Returns:
+            df --> pandas dataframe: the projected dataframe
+        """
+
+        if self._resolved is None:
+            if self.columns == list(self.base.columns):
+                self._resolved = self.base
+            else:
+                self._resolved = self.base[self.columns]
+
+        return self._resolved
+
+    def __repr__(self):
+        return "ColumnProjection({} rows, {} of {} columns)".format(
+            self.base.shape[0], len(self.columns), self.base.shape[1]
+        )
+
+
+def resolve_frame(df):
+    """
+    Get a dataframe from a dataframe or a column projection.
+
+    Args:
+        df --> pandas dataframe or ColumnProjection
+    Returns:
+        df --> pandas dataframe
+    """
+
+    if isinstance(df, pd.DataFrame):
+        return df
+
+    return df.resolve()
@@ -0,0 +1,247 @@
+"""
+Row view (sorting and filtering) for the raw data grid.
+
+The dataframe is never copied or re-ordered. Instead the grid maps each of
+its rows through an array of row positions, built from a cached argsort
+permutation of the sorted column and a boolean mask of the filter.
+"""
+
+import threading
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_numeric_dtype, is_bool_dtype
+
+
+# Key of the nulls of a categorical column, after every category
+NULL_CODE = np.iinfo(np.int64).max
+
+
+def sort_keys(series, ascending=True):
+    """
+    Get the keys ordering the rows of a column, the nulls sort last.
+
+    Args:
+        series --> pandas series: the column to be sorted
+        ascending --> bool: sort order, the keys of the descending order
+            are the reversed (negated) keys of the ascending order
+    Returns:
+        keys --> numpy array: float values (NaN for null) of numeric columns,
+            int64 codes of the sorted categories (NULL_CODE for null) of
+            the others
+        valid --> numpy array: whether each row is not null
+    """
+
+    if is_numeric_dtype(series) or is_bool_dtype(series):
+        keys = series.to_numpy(dtype=np.float64, na_value=np.nan)
+        # numpy puts NaN at the end of a sort, in both orders
+        valid = ~np.isnan(keys)
+        if not ascending:
+            keys = -keys
+        return keys, valid
+
+    try:
+        codes, _ = pd.factorize(series, sort=True)
+    except TypeError:
+        # Mixed types, sort by their text
+        codes, _ = pd.factorize(series.astype(str).where(series.notnull()), sort=True)
+    valid = codes >= 0
+    keys = codes.astype(np.int64)
+    if not ascending:
+        keys = -keys
+    keys[~valid] = NULL_CODE
+
+    return keys, valid
+
+
+def argsort_column(series, ascending=True):
+    """
+    Get the argsort permutation of a column, nulls at the end. The sort is
+    stable in both orders, tied rows keep their order.
+
+    Args:
+        series --> pandas series: the column to be sorted
+        ascending --> bool: sort order
+    Returns:
+        permutation --> numpy array: row positions in sorted order
+        n_valid --> int: number of non-null rows (at the front)
+    """
+
+    keys, valid = sort_keys(series, ascending)
+
+    return np.argsort(keys, kind="stable"), int(valid.sum())
+
+
+def merge_rows(permutation, n_valid, keys, valid, start):
+    """
+    Merge rows appended to a column into its sorted permutation: the new
+    rows are sorted and inserted with a binary search, O(n + m log m).
+
+    Args:
+        permutation --> numpy array: sorted permutation of the first rows
+        n_valid --> int: number of non-null rows of the permutation
+        keys --> numpy array: `sort_keys` of the column with the new rows
+        valid --> numpy array: whether each row is not null (`sort_keys`)
+        start --> int: position of the first new row
+    Returns:
+        permutation --> numpy array: sorted permutation of all the rows,
+            None when the keys of the first rows changed their order (e.g.
+            the new rows made a column of mixed types)
+        n_valid --> int: number of non-null rows (at the front)
+    """
+
+    old_valid = permutation[:n_valid]
+    old_keys = keys[old_valid]
+    if len(old_keys) > 1 and (old_keys[1:] < old_keys[:-1]).any():
+        return None, n_valid
+
+    order = np.argsort(keys[start:], kind="stable") + start
+    n_new = int(valid[start:].sum())
+
+    # Tied new rows go after the old ones, as in a stable sort
+    insertion = np.searchsorted(old_keys, keys[order[:n_new]], side="right")
+    merged = np.insert(old_valid, insertion, order[:n_new])
+
+    return (
+        np.concatenate([merged, permutation[n_valid:], order[n_new:]]),
+        n_valid + n_new,
+    )
+
+
+class TableView:
+    """
+    Sorting and filtering state of the raw data grid.
+
+    Args:
+        df --> pandas dataframe: the full dataframe (all the columns)
+    Returns: None
+    """
+
+    def __init__(self, df):
+        self.df = df
+
+        self.sort_column = None
+        self.ascending = True
+        self.expression = ""
+
+        self._permutations = {}  # (column, ascending) -> (permutation, n_valid)
+        self._mask = None
+        self._lock = threading.Lock()
+
+        self.rows = None  # None for the original rows in the original order
+
+    def _get_permutation(self, column, ascending):
+        key = (column, ascending)
+        with self._lock:
+            cached = self._permutations.get(key)
+        if cached is None:
+            cached = argsort_column(self.df[column], ascending)
+            with self._lock:
+                self._permutations[key] = cached
+
+        return cached
+
+    def sort(self, column, ascending=True):
+        """
+        Sort the view by a column, None to restore the original order.
+
+        Args:
+            column --> string: column header
+            ascending --> bool: sort order, nulls are always at the end
+        Returns:
+            rows --> numpy array: the row positions of the view
+        """
+
+        self.sort_column = column
+        self.ascending = ascending
+
+        return self._update_rows()
+
+    def filter(self, expression):
+        """
+        Filter the view with a pandas expression, e.g. "Age > 30 and Sex == 'male'".
+        Column names with spaces are quoted with backticks.
+
+        Args:
+            expression --> string: the filter expression, empty for all rows
+        Returns:
+            rows --> numpy array: the row positions of the view
+        Raises:
+            any error raised by `pd.DataFrame.eval` for invalid expressions
+        """
+
+        expression = expression.strip()
+        if expression:
+            mask = self.df.eval(expression)
+            if isinstance(mask, pd.Series):
+                mask = mask.to_numpy(dtype=bool, na_value=False)
+            mask = np.asarray(mask, dtype=bool)
+            if mask.shape != (len(self.df),):
+                raise ValueError(
+                    "Filter '{}' is not a row condition".format(expression)
+                )
+            self._mask = mask
+        else:
+            self._mask = None
+
+        self.expression = expression
+
+        return self._update_rows()
+
+    def _update_rows(self):
+        if self.sort_column is None:
+            if self._mask is None:
+                rows = None
+            else:
+                rows = np.flatnonzero(self._mask)
+        else:
+            permutation, _ = self._get_permutation(self.sort_column, self.ascending)
+            if self._mask is not None:
+                permutation = permutation[self._mask[permutation]]
+            rows = permutation
+
+        self.rows = rows
+
+        return rows
+
+    def append(self, df, n_rows):
+        """
+        Extend the view with rows appended to the data. The filter is only
+        evaluated on the new rows, and the new rows are merged into the
+        permutation of the sorted column (the other permutations are
+        dropped, they are sorted again when needed).
+
+        Args:
+            df --> pandas dataframe: the data with the new rows
+            n_rows --> int: number of new rows (at the end of df)
+        Returns:
+            rows --> numpy array: the row positions of the view
+        """
+
+        self.df = df
+        with self._lock:
+            permutations, self._permutations = self._permutations, {}
+
+        key = (self.sort_column, self.ascending)
+        if key in permutations and self.sort_column in df.columns:
+            keys, valid = sort_keys(df[self.sort_column], self.ascending)
+            permutation, n_valid = permutations[key]
+            merged = merge_rows(permutation, n_valid, keys, valid, len(df) - n_rows)
+            if merged[0] is not None:
+                with self._lock:
+                    self._permutations[key] = merged
+
+        if self._mask is not None:
+            mask = df.iloc[len(df) - n_rows:].eval(self.expression)
+            if isinstance(mask, pd.Series):
+                mask = mask.to_numpy(dtype=bool, na_value=False)
+            mask = np.broadcast_to(np.asarray(mask, dtype=bool), (n_rows,))
+            self._mask = np.concatenate([self._mask, mask])
+
+        return self._update_rows()
+
+    def clear(self):
+        """Drop the cached permutations"""
+
+        with self._lock:
+            self._permutations.clear()
@@ -19,24 +19,56 @@ from pubsub import pub
 try:
     # Local import
     from data import (
-        DataTablePanel, DataDescribePanel, ColumnSelectionPanel, reduce_mem_usage
+        DataTablePanel,
+        DataDescribePanel,
+        ColumnSelectionPanel,
+        MemoryPanel,
+        reduce_mem_usage,
     )
-    from plots import PlotPanel
-    from components import MyStatusBar, show_splash, LogPanel
+    from plots import DEFAULT_MAX_BYTES, PlotPanel, RenderCache
+    from components import ActivityFilter, MyStatusBar, show_splash, LogPanel
     from datasets import fetch_titanic
+    from stats import (
+        PrecomputeScheduler,
+        ProfileCache,
+        format_memory,
+        get_profile,
+        release_profile,
+    )
+    from viewer import DataViewer
 except (ModuleNotFoundError, ImportError):
     # Package import
     from dshelper.data import (
-        DataTablePanel, DataDescribePanel, ColumnSelectionPanel, reduce_mem_usage
+        DataTablePanel,
+        DataDescribePanel,
+        ColumnSelectionPanel,
+        MemoryPanel,
+        reduce_mem_usage,
+    )
+    from dshelper.plots import DEFAULT_MAX_BYTES, PlotPanel, RenderCache
+    from dshelper.components import (
+        ActivityFilter, MyStatusBar, show_splash, LogPanel
     )
-    from dshelper.plots import PlotPanel
-    from dshelper.components import MyStatusBar, show_splash, LogPanel
     from dshelper.datasets import fetch_titanic
+    from dshelper.stats import (
+        PrecomputeScheduler,
+        ProfileCache,
+        format_memory,
+        get_profile,
+        release_profile,
+    )
+    from dshelper.viewer import DataViewer
 
 EVEN_ROW_COLOUR = "#CCE6FF"
 ODD_ROW_COLOUR = "#F0F8FF"
 GRID_LINE_COLOUR = "#D3D3D3"
 
+# Milliseconds to gather the memory changes before refreshing the display
+MEMORY_REFRESH_DELAY = 300
+
+# Milliseconds to gather the appended rows before adding them to the data
+APPEND_DELAY = 250
+
 
 class DFSplitterPanel(wx.Panel):
     """
@@ -46,10 +78,11 @@ class DFSplitterPanel(wx.Panel):
 
     Args:
         df --> pandas dataframe: df passed internally for inspection
+        render_cache --> RenderCache: cache of the rendered plots
     Return: None
     """
 
-    def __init__(self, parent, df=None):
+    def __init__(self, parent, df=None, render_cache=None):
         wx.Panel.__init__(self, parent)
 
         self.df = df
@@ -66,7 +99,9 @@ class DFSplitterPanel(wx.Panel):
         # each page serves a different function
         data_notebook = wx.Notebook(self.topPanel)
         self.raw_data_page = DataTablePanel(data_notebook, -1, df=self.df)
-        self.plot_page = PlotPanel(data_notebook, df=self.df)
+        self.plot_page = PlotPanel(
+            data_notebook, df=self.df, render_cache=render_cache
+        )
         self.raw_data_page.SetBackgroundColour("WHITE")
         self.plot_page.SetBackgroundColour("YELLOW")
 
@@ -118,10 +153,11 @@ class SideSplitterPanel(wx.Panel):
 
     Args:
         df --> pandas dataframe: df passed internally for inspection
+        render_cache --> RenderCache: cache of the rendered plots
     Return: None
     """
 
-    def __init__(self, parent, df=None):
+    def __init__(self, parent, df=None, render_cache=None):
         wx.Panel.__init__(self, parent)
 
         self.df = df
@@ -129,7 +165,9 @@ class SideSplitterPanel(wx.Panel):
         self.splitter = wx.SplitterWindow(
             self, style=wx.SP_NOBORDER | wx.SP_3DSASH | wx.SP_LIVE_UPDATE
         )
-        self.leftPanel = DFSplitterPanel(self.splitter, df=self.df)
+        self.leftPanel = DFSplitterPanel(
+            self.splitter, df=self.df, render_cache=render_cache
+        )
         self.rightPanel = wx.Panel(self.splitter)
         self.leftPanel.SetBackgroundColour("YELLOW GREEN")
         self.rightPanel.SetBackgroundColour("SLATE BLUE")
@@ -142,10 +180,12 @@ class SideSplitterPanel(wx.Panel):
             data_notebook, -1, df=self.df
         )
         self.log_page = LogPanel(data_notebook, -1)
+        self.memory_page = MemoryPanel(data_notebook, -1, df=self.df)
 
         # Add pages into the notebook for display
         data_notebook.AddPage(self.column_page, "Column")
         data_notebook.AddPage(self.log_page, "Log")
+        data_notebook.AddPage(self.memory_page, "Memory")
 
         # Put the notebook in a sizer in the panel for layout
         sizer = wx.BoxSizer()
@@ -182,13 +222,19 @@ class MainFrame(wx.Frame):
 
     Args:
         df --> pandas dataframe: the df that you would like to inspect
+        plot_cache_mb --> float: memory budget of the rendered plots (MB)
     Return: None
     """
 
-    def __init__(self, df, with_demo=False, reduce_mam=False, app=None):
+    def __init__(
+        self, df, with_demo=False, reduce_mam=False, app=None, cache=None,
+        plot_cache_mb=None,
+    ):
         wx.Frame.__init__(self, None, -1, title="Data Science Helper")
 
         self.app = app
+        self.profile_cache = get_profile_cache(cache)
+        self.render_cache = RenderCache(get_plot_cache_bytes(plot_cache_mb))
 
         if df is not None:
             self.df = prepare_df(df, reduce_mam)
@@ -201,23 +247,41 @@ class MainFrame(wx.Frame):
             self.df = get_empty_df()
 
         rows, cols = self.df.shape
-        _memory_use = self.df.memory_usage(deep=True).sum() / 1024
-        # Note that this would be equivalent to df.info(memory_usage='deep')
+        self.shown_columns = list(self.df.columns)
+        self.memory_refresh_pending = False
+        self.pending_rows = []  # chunks appended and not added to the data yet
 
-        if _memory_use > 1024:
-            memory_usage = "{:.2f} MB".format(_memory_use / 1024)
-        else:
-            memory_usage = "{:.2f} KB".format(_memory_use)
+        # Restore the statistics computed when the same data was opened before
+        if self.profile_cache is not None:
+            self.profile_cache.restore(get_profile(self.df))
 
         # set custom status bar
-        self.status_bar = MyStatusBar(self, memory_usage)
+        self.status_bar = MyStatusBar(self, "")
         self.SetStatusBar(self.status_bar)
+        self.refresh_memory()
+
+        # Follow the memory of the statistics computed by the panels
+        get_profile(self.df).listeners.append(self.memory_changed)
 
-        self.main_splitter = SideSplitterPanel(self, df=self.df)
+        self.main_splitter = SideSplitterPanel(
+            self, df=self.df, render_cache=self.render_cache
+        )
 
         self.status_bar.SetStatusText(" Rows: {}".format(rows), 0)
         self.status_bar.SetStatusText(" Columns: {}".format(cols), 1)
 
+        # Value counts, histograms, describe() and correlations are computed
+        # in the background while the user is idle, any input pauses them
+        self.visible_columns = []
+        self.precompute = PrecomputeScheduler(
+            get_profile(self.df),
+            on_progress=self.precompute_progress,
+            on_error=self.precompute_failed,
+        )
+        self.activity_filter = ActivityFilter(self.precompute.touch)
+        wx.EvtHandler.AddFilter(self.activity_filter)
+        self.schedule_precompute()
+
         self.Refresh()
         self.Show()
         self.Maximize(True)
@@ -225,25 +289,228 @@ class MainFrame(wx.Frame):
         self.Bind(wx.EVT_CLOSE, self.OnCloseWindow)
 
         pub.subscribe(self.update_column_stat, "UPDATE_DF")
+        pub.subscribe(self.append, "APPEND_ROWS")
+        pub.subscribe(self.refresh_memory, "MEMORY_CHANGED")
+        pub.subscribe(self.duplicates_found, "DUPLICATES_FOUND")
+        pub.subscribe(self.columns_visible, "COLUMNS_VISIBLE")
+
+    def append(self, rows):
+        """
+        Appends rows to the displayed data, e.g. new records of a growing
+        log. The statistics are updated from the new rows only and every
+        panel is notified through the "ROWS_APPENDED" topic.
+        Can be called from any thread.
+
+        Copying the data to add rows is O(N), so the chunks appended in a
+        burst are gathered (APPEND_DELAY) and added to the data at once.
+
+        Args:
+            rows --> pandas dataframe, dict of columns or list of records:
+                the new rows, with (a subset of) the columns of the data
+        Returns: None
+        """
+
+        if not wx.IsMainThread():
+            wx.CallAfter(self.append, rows)
+            return
+
+        try:
+            chunk = prepare_chunk(self.df, rows)
+        except (ValueError, TypeError, KeyError) as e:
+            _log_message = "\nAppending rows failed due to error:\n--> {}".format(e)
+            pub.sendMessage("LOG_MESSAGE", log_message=_log_message)
+            return
+
+        if not len(chunk):
+            return
+
+        self.pending_rows.append(chunk)
+        if len(self.pending_rows) == 1:
+            wx.CallLater(APPEND_DELAY, self._add_pending_rows)
+
+    def _add_pending_rows(self):
+        """Adds the gathered chunks to the data, with a single copy of it"""
+
+        chunks, self.pending_rows = self.pending_rows, []
+        if not chunks:
+            # The data was released meanwhile
+            return
+
+        ignore_index = isinstance(self.df.index, pd.RangeIndex)
+        chunk = chunks[0]
+        if len(chunks) > 1:
+            chunk = pd.concat(chunks, ignore_index=ignore_index)
+
+        df = pd.concat([self.df, chunk], ignore_index=ignore_index)
+        get_profile(self.df).append(chunk, df)
+        self.df = df
+
+        self.status_bar.SetStatusText(" Rows: {}".format(df.shape[0]), 0)
+        self.status_bar.set_duplicates(None)  # computed for the previous rows
+        self.schedule_precompute()
+
+        pub.sendMessage("ROWS_APPENDED", df=df, n_rows=len(chunk))
+        _log_message = "\nAppended {} rows".format(len(chunk))
+        pub.sendMessage("LOG_MESSAGE", log_message=_log_message)
+
+    def duplicates_found(self, summary, version):
+        """
+        Shows the duplicates in the status bar, unless they were computed
+        for an earlier version of the data (before rows were appended).
+
+        Args:
+            summary --> DuplicateSummary: the duplicated rows and columns
+            version --> int: version of the data profile they were computed for
+        Returns: None
+        """
+
+        if version == get_profile(self.df).version:
+            self.status_bar.set_duplicates(summary)
 
     def update_column_stat(self, df):
         """
         Function to update the dataframe column statistics in the status bar.
 
         Args:
-            df --> pandas dataframe: pass internally to examine the number of cols
+            df --> ColumnProjection: pass internally to examine the number of cols
         Returns: None
         """
 
         cols = df.shape[1]
         self.status_bar.SetStatusText(" Columns: {}".format(cols), 1)
 
+        self.shown_columns = list(df.columns)
+        self.refresh_memory()
+        self.schedule_precompute()
+
+    def schedule_precompute(self):
+        """
+        (Re)starts the background precomputation: the columns visible in the
+        grid first, then the shown columns and the hidden ones.
+        """
+
+        shown = set(self.shown_columns)
+        self.precompute.schedule(
+            self.shown_columns,
+            hidden=[column for column in self.df.columns if column not in shown],
+            visible=[column for column in self.visible_columns if column in shown],
+        )
+
+    def columns_visible(self, columns):
+        """
+        Moves the precomputation of the columns scrolled into view in the
+        grid to the front.
+
+        Args:
+            columns --> list: headers of the visible columns
+        Returns: None
+        """
+
+        self.visible_columns = columns
+        self.precompute.prioritize(columns)
+
+    def precompute_progress(self, done, total):
+        """Listener of the precomputation progress, called from the workers"""
+
+        wx.CallAfter(self.status_bar.set_progress, done, total)
+
+    def precompute_failed(self, log_message):
+        """Listener of the failed precomputations, called from the workers"""
+
+        wx.CallAfter(pub.sendMessage, "LOG_MESSAGE", log_message=log_message)
+
+    def memory_changed(self):
+        """
+        Listener of the data profile, called (from any thread) when
+        statistics are computed. Bursts of changes (e.g. the histograms of
+        every column) are throttled into a single "MEMORY_CHANGED" message.
+        """
+
+        if not wx.IsMainThread():
+            wx.CallAfter(self.memory_changed)
+            return
+
+        if not self.memory_refresh_pending:
+            self.memory_refresh_pending = True
+            wx.CallLater(MEMORY_REFRESH_DELAY, self._send_memory_changed)
+
+    def _send_memory_changed(self):
+        self.memory_refresh_pending = False
+        pub.sendMessage("MEMORY_CHANGED")
+
+    def refresh_memory(self):
+        """
+        Updates the memory usage in the status bar: the shown columns and the
+        index, plus the cached statistics. Object columns are estimated from
+        a sample of their values, see the "Memory" tab for the breakdown.
+        """
+
+        profile = get_profile(self.df)
+        memory = profile.memory_usage()
+        shown = int(memory[self.shown_columns].sum())
+        hidden = int(memory.sum()) - shown
+        index = profile.index_memory()
+        cached = profile.cache_memory()
+
+        details = [
+            "Shown columns: {}".format(format_memory(shown)),
+            "Hidden columns: {}".format(format_memory(hidden)),
+            "Index: {}".format(format_memory(index)),
+        ] + [
+            "{}: {}".format(kind, format_memory(memory))
+            for kind, memory in cached.items() if memory
+        ]
+        self.status_bar.set_memory_usage(
+            "{} (+{} cached)".format(
+                format_memory(shown + index), format_memory(int(cached.sum()))
+            ),
+            "\n".join(details),
+        )
+
+    def release_data(self):
+        """
+        Save the computed statistics to the profile cache (when enabled) and
+        drop them from memory. The frame and its panels stop listening to the
+        messages, so they are not called once destroyed.
+        """
+
+        self.precompute.stop()
+        self.pending_rows = []
+        wx.EvtHandler.RemoveFilter(self.activity_filter)
+        pub.unsubAll(listenerFilter=self._owns_listener)
+
+        profile = get_profile(self.df)
+        if self.memory_changed in profile.listeners:
+            profile.listeners.remove(self.memory_changed)
+
+        if self.profile_cache is not None:
+            try:
+                self.profile_cache.store(profile)
+            except OSError as e:
+                _log_message = (
+                    "\nSaving the profile cache failed due to error:\n--> {}".format(e)
+                )
+                pub.sendMessage("LOG_MESSAGE", log_message=_log_message)
+        release_profile(self.df)
+
+    def _owns_listener(self, listener):
+        """Whether a pubsub listener is a method of this frame or of its panels"""
+
+        window = getattr(listener.getCallable(), "__self__", None)
+        while isinstance(window, wx.Window):
+            if window is self:
+                return True
+            window = window.GetParent()
+
+        return False
+
     def OnCloseWindow(self, event):
         """
         Event function respond to the close of the main GUI window.
         """
 
         event.Skip()
+        self.release_data()
         self.Destroy()
 
         self._fix_control_c_quit()
@@ -280,6 +547,82 @@ def get_empty_df():
     return df
 
 
+def prepare_chunk(df, rows):
+    """
+    Converts new rows into a dataframe with the columns of the data.
+
+    Args:
+        df --> pandas dataframe: the displayed data
+        rows --> pandas dataframe, dict of columns or list of records
+    Returns:
+        chunk --> pandas dataframe: the rows with the columns (and dtypes,
+            when the values can be cast) of df, missing columns are null
+    Raises:
+        KeyError for columns that are not in the data
+    """
+
+    chunk = rows if isinstance(rows, pd.DataFrame) else pd.DataFrame(rows)
+    chunk = chunk.rename(columns=lambda column: "{}".format(column))
+
+    unknown = [column for column in chunk.columns if column not in df.columns]
+    if unknown:
+        raise KeyError("Columns not in the data: {}".format(unknown))
+
+    # Same dtypes as the data, so the statistics of the new rows (e.g. the
+    # hashes of the distinct counts) match the values already counted. The
+    # categorical columns are left alone: values that are not one of the
+    # categories would become null.
+    dtypes = {
+        column: dtype for column, dtype in df.dtypes.items()
+        if not isinstance(dtype, pd.CategoricalDtype)
+    }
+
+    return chunk.reindex(columns=df.columns).astype(dtypes, errors="ignore")
+
+
+def get_profile_cache(cache):
+    """
+    Get the on-disk profile cache from the `cache` argument of dshelp.
+
+    Args:
+        cache --> None/False: no cache, True: cache in the default directory,
+            string: cache directory, or a ProfileCache
+    Returns:
+        profile_cache --> ProfileCache or None
+    """
+
+    if cache is None or cache is False:
+        return None
+    if cache is True:
+        return ProfileCache()
+    if isinstance(cache, ProfileCache):
+        return cache
+
+    return ProfileCache(directory=cache)
+
+
+def get_plot_cache_bytes(plot_cache_mb):
+    """
+    Get the memory budget of the rendered plots from the `plot_cache_mb`
+    argument of dshelp.
+
+    Args:
+        plot_cache_mb --> float: budget in MB, None for the default, 0 to
+            disable the cache
+    Returns:
+        max_bytes --> int
+    Raises:
+        ValueError for a negative budget
+    """
+
+    if plot_cache_mb is None:
+        return DEFAULT_MAX_BYTES
+    if plot_cache_mb < 0:
+        raise ValueError("plot_cache_mb must be positive, got {}".format(plot_cache_mb))
+
+    return int(plot_cache_mb * 1024 ** 2)
+
+
 def prepare_df(df, reduce_mem=False):
     """
     This function converts the df header into string format
@@ -304,18 +647,33 @@ def prepare_df(df, reduce_mem=False):
     return df
 
 
-def dshelp(df, with_demo=False, reduce_mem=False):
+def dshelp(
+    df, with_demo=False, reduce_mem=False, cache=None, background=False,
+    plot_cache_mb=None,
+):
     """
     The function to run dshelper
 
     Args:
         df --> pandas dataframe: the df that you would like to inspect
-    Returns: None
+        cache --> bool or string: keep the computed statistics on disk, so
+            reopening the same data is instant. True for the default
+            directory (~/.dshelper/cache), or the cache directory
+        background --> bool: run the GUI in a child process and return
+            right away (e.g. to keep a Jupyter kernel responsive)
+        plot_cache_mb --> float: memory budget (MB) of the rendered plots
+            kept to show a selection again instantly, 256 by default
+    Returns:
+        viewer --> DataViewer: the running viewer when background is True,
+            use `viewer.update(df)` to show another frame
     """
 
+    if background:
+        return DataViewer(df, with_demo, reduce_mem, cache, plot_cache_mb)
+
     app = wx.App(0)
     splash = show_splash()
-    MainFrame(df, with_demo, reduce_mem, app)
+    MainFrame(df, with_demo, reduce_mem, app, cache, plot_cache_mb)
     splash.Destroy()
     app.MainLoop()
 
@@ -1 +1,2 @@
 from .plot_panel import PlotPanel  # noqa
+from .render_cache import DEFAULT_MAX_BYTES, RenderCache  # noqa
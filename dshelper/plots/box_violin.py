@@ -25,6 +25,17 @@ except (ModuleNotFoundError, ImportError):
     # Package import
     from dshelper.components import create_bitmap_dropdown_menu
 
+try:
+    # local import
+    from stats import get_profile
+except (ModuleNotFoundError, ImportError):
+    # Package import
+    from dshelper.stats import get_profile
+
+from .plot_state import sample_title, swap_figure
+from .prefetch import Prefetcher, neighbour_selections, prefetch_key
+from .render_cache import RenderCache, bitmap_bytes, render_key
+
 
 class BoxViolinPanel(wx.Panel):
     """
@@ -32,15 +43,21 @@ class BoxViolinPanel(wx.Panel):
 
     Args:
         df --> pandas dataframe: passed internally for plotting
+        render_cache --> RenderCache: rendered plots shared by the panels
+        prefetcher --> Prefetcher: reads the data of the neighbouring
+            selections of the menus in the background
 
     Returns: None
     """
 
-    def __init__(self, parent, df=None):
+    def __init__(self, parent, df=None, render_cache=None, prefetcher=None):
         wx.Panel.__init__(self, parent)
 
         self.df = df
         self.available_columns = list(self.df.columns)
+        self.render_cache = render_cache if render_cache is not None else RenderCache()
+        self.prefetcher = prefetcher if prefetcher is not None else Prefetcher()
+        self.stepped_axis = 1  # Position of the last changed column menu
 
         self.splitter = wx.SplitterWindow(self, wx.ID_ANY)
         self.box_panel = wx.Panel(self.splitter, 1)
@@ -118,12 +135,129 @@ class BoxViolinPanel(wx.Panel):
         selected_column_y = self.column_y.GetStringSelection()
         selected_column_hue = self.column_hue.GetStringSelection()
 
+        menus = (self.column_x, self.column_y, self.column_hue)
+        menu = event.GetEventObject() if event is not None else None
+        if menu in menus:
+            self.stepped_axis = menus.index(menu)
+
         if selected_column_x and selected_column_y and selected_column_hue:
             self.draw_plots(
                 selected_column_x,
                 selected_column_y,
                 selected_column_hue,
             )
+            if event is not None:
+                self.prefetch_neighbours(
+                    (selected_column_x, selected_column_y, selected_column_hue)
+                )
+
+    def prefetch_neighbours(self, selection):
+        """
+        Reads the data of the selections next to the selected one in the
+        background: the column of the last changed menu is replaced by its
+        neighbours in the menu, the selections already rendered are skipped.
+        The figures are drawn on the GUI thread when a selection is shown.
+
+        Args:
+            selection --> tuple: the selected x, y and hue columns
+        Returns: None
+        """
+
+        df = self.df
+        for neighbour in neighbour_selections(
+            self.available_columns, selection, self.stepped_axis, self.prefetcher.depth
+        ):
+            if self._render_key(*neighbour) in self.render_cache:
+                continue
+            self.prefetcher.prefetch(
+                prefetch_key("box_violin", neighbour, df),
+                lambda neighbour=neighbour: BoxViolinPanel.prepare(df, neighbour),
+            )
+
+    def selection(self):
+        """The selected x, y and hue columns, None without the three columns"""
+
+        selection = (
+            self.column_x.GetStringSelection(),
+            self.column_y.GetStringSelection(),
+            self.column_hue.GetStringSelection(),
+        )
+
+        return selection if all(selection) else None
+
+    @staticmethod
+    def prepare(df, selection):
+        """
+        Reads the columns of a selection, can be called from a worker thread.
+
+        Args:
+            df --> pandas dataframe: the data to be plotted
+            selection --> tuple: the x, y and hue columns
+        Returns:
+            data --> pandas dataframe: the selected columns
+        """
+
+        # A column picked in two menus is read once
+        return df[list(dict.fromkeys(selection))]
+
+    def _draw_figures(self, data, selection, box_size, violin_size):
+        """
+        Draws the box and violin plots of a selection into new figures.
+
+        Args:
+            data --> pandas dataframe: output of `prepare`
+            selection --> tuple: the x, y and hue columns
+            box_size --> tuple: size (inches) and dpi of the box figure
+            violin_size --> tuple: size (inches) and dpi of the violin figure
+        Returns:
+            box_figure --> matplotlib figure: the box plot
+            violin_figure --> matplotlib figure: the violin plot
+            errors --> list: log messages of the plots that failed
+        """
+
+        column_x, column_y, column_hue = selection
+        box_figure = _new_figure(*box_size)
+        box_axes = box_figure.add_subplot(111)
+        violin_figure = _new_figure(*violin_size)
+        violin_axes = violin_figure.add_subplot(111)
+        errors = []
+
+        # Box plot
+        try:
+            sns.boxplot(x=column_x, y=column_y, hue=column_hue, data=data, ax=box_axes)
+        except ValueError as e:
+            errors.append("\nBox plot failed due to error:\n--> {}".format(e))
+
+        # Violin plot
+        try:
+            sns.violinplot(x=column_x, y=column_y, hue=column_hue, data=data, split=True, ax=violin_axes)
+        except ValueError as e:
+            errors.append("\nViolin plot failed due to error:\n--> {}".format(e))
+
+        # Set plot style
+        box_axes.set_title(
+            sample_title("Box Plot for {} and {}".format(column_x, column_y), self.df)
+        )
+        box_axes.set_ylabel(column_y)
+        box_axes.set_xlabel(column_x)
+
+        violin_axes.set_title(
+            sample_title(
+                "Violin Plot for {} and {}".format(column_x, column_y), self.df
+            )
+        )
+        violin_axes.set_ylabel(column_y)
+        violin_axes.set_xlabel(column_x)
+
+        return box_figure, violin_figure, errors
+
+    def _render_key(self, column_x, column_y, column_hue):
+        return render_key(
+            "box_violin",
+            (column_x, column_y, column_hue, self.violin_canvas.get_width_height()),
+            get_profile(self.df),
+            self.box_canvas,
+        )
 
     def draw_plots(self, column_x, column_y, column_hue):
         """
@@ -140,36 +274,83 @@ class BoxViolinPanel(wx.Panel):
         Returns: None
         """
 
-        # Reset plot first
-        self.box_axes.clear()
-        self.violin_axes.clear()
+        # A recently plotted selection is shown again from the render cache
+        key = self._render_key(column_x, column_y, column_hue)
+        entry = self.render_cache.get(key)
+        if entry is not None:
+            entry["box"] = self._show(self.box_canvas, self.box_toolbar, *entry["box"])
+            entry["violin"] = self._show(
+                self.violin_canvas, self.violin_toolbar, *entry["violin"]
+            )
+            self.box_figure, self.box_axes = entry["box"][0], entry["box"][0].axes[0]
+            self.violin_figure, self.violin_axes = (
+                entry["violin"][0], entry["violin"][0].axes[0]
+            )
+            return
+
+        # Seaborn builds its own artists, which cannot be updated in place,
+        # so each selection is drawn into new figures (kept by the cache),
+        # the data of a prefetched selection is ready
+        selection = (column_x, column_y, column_hue)
+        data = self.prefetcher.take(prefetch_key("box_violin", selection, self.df))
+        if data is None:
+            data = self.prepare(self.df, selection)
+        self.box_figure, self.violin_figure, errors = self._draw_figures(
+            data,
+            selection,
+            _figure_size(self.box_canvas),
+            _figure_size(self.violin_canvas),
+        )
+        self.box_axes = self.box_figure.axes[0]
+        self.violin_axes = self.violin_figure.axes[0]
 
-        # Box plot
-        try:
-            sns.boxplot(x=column_x, y=column_y, hue=column_hue, data=self.df, ax=self.box_axes)
-        except ValueError as e:
+        for _log_message in errors:
             # log Error
-            _log_message = "\nBox plot failed due to error:\n--> {}".format(e)
             pub.sendMessage("LOG_MESSAGE", log_message=_log_message)
 
-        # Violin plot
-        try:
-            sns.violinplot(x=column_x, y=column_y, hue=column_hue, data=self.df, split=True, ax=self.violin_axes)
-        except ValueError as e:
-            # log Error
-            _log_message = "\nViolin plot failed due to error:\n--> {}".format(e)
-            pub.sendMessage("LOG_MESSAGE", log_message=_log_message)
+        box = self._show(self.box_canvas, self.box_toolbar, self.box_figure)
+        violin = self._show(self.violin_canvas, self.violin_toolbar, self.violin_figure)
 
-        # Set plot style
-        self.box_axes.set_title("Box Plot for {} and {}".format(column_x, column_y))
-        self.box_axes.set_ylabel(column_y)
-        self.box_axes.set_xlabel(column_x)
-        self.box_canvas.draw()
+        if errors:
+            return
+
+        # The figures are small next to their bitmaps
+        self.render_cache.put(
+            key,
+            {"box": box, "violin": violin},
+            bitmap_bytes(self.box_canvas) + bitmap_bytes(self.violin_canvas),
+        )
+
+    @staticmethod
+    def _show(canvas, toolbar, figure, bitmap=None, view=None):
+        """
+        Puts a figure on a canvas, from its rendered bitmap when given.
+
+        Args:
+            canvas --> FigureCanvas: the canvas
+            toolbar --> NavigationToolbar: toolbar of the canvas
+            figure --> matplotlib figure: the figure to show
+            bitmap --> BufferRegion: rendered figure
+            view --> tuple: axes limits of the figure when it was rendered
+        Returns:
+            figure, bitmap, view --> the figure, its rendered bitmap and
+                axes limits
+        """
+
+        swap_figure(canvas, figure)
+        toolbar.update()  # Zoom history of the previous figure
+
+        # The figure may have been zoomed since it was rendered
+        if bitmap is None or view != _view(figure) or not canvas.supports_blit:
+            canvas.draw()
+            if not canvas.supports_blit:
+                return figure, None, None
+            bitmap = canvas.copy_from_bbox(figure.bbox)
+        else:
+            canvas.restore_region(bitmap)
+            canvas.blit()
 
-        self.violin_axes.set_title("Violin Plot for {} and {}".format(column_x, column_y))
-        self.violin_axes.set_ylabel(column_y)
-        self.violin_axes.set_xlabel(column_x)
-        self.violin_canvas.draw()
+        return figure, bitmap, _view(figure)
 
     def update_available_column(self, available_columns):
         """
@@ -188,3 +369,21 @@ class BoxViolinPanel(wx.Panel):
             self.column_x.Append(column)
             self.column_y.Append(column)
             self.column_hue.Append(column)
+
+
+def _view(figure):
+    return tuple((axes.get_xlim(), axes.get_ylim()) for axes in figure.axes)
+
+
+def _figure_size(canvas):
+    """Size (inches) and dpi of the figure on the canvas"""
+
+    current = canvas.figure
+
+    return tuple(current.get_size_inches()), current.dpi
+
+
+def _new_figure(size, dpi):
+    """A new figure of the given size"""
+
+    return Figure(figsize=size, dpi=dpi)
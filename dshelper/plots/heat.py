@@ -1,8 +1,8 @@
 import sys
+import threading
 
 import wx
 
-import pandas as pd
 import numpy as np
 
 from pubsub import pub
@@ -19,8 +19,9 @@ except ImportError:
 
 from matplotlib.backends.backend_wxagg import FigureCanvasWxAgg as FigureCanvas
 from matplotlib.backends.backend_wx import NavigationToolbar2Wx as NavigationToolbar
-from matplotlib.ticker import FuncFormatter, MaxNLocator
+from matplotlib.ticker import FixedLocator, FuncFormatter
 from matplotlib.figure import Figure
+from pandas.api.types import is_bool_dtype, is_numeric_dtype
 
 try:
     # local import
@@ -29,7 +30,50 @@ except (ModuleNotFoundError, ImportError):
     # Package import
     from dshelper.components import create_bitmap_dropdown_menu
 
-from .utils import prepare_data
+try:
+    # local import
+    from stats import (
+        LARGE_MATRIX_THRESHOLD,
+        HeatAxis,
+        aggregate_grid,
+        artifact_memory,
+        cluster_order,
+        correlation_dtype,
+        get_profile,
+        quantile_edges,
+        tick_label,
+        uniform_edges,
+    )
+except (ModuleNotFoundError, ImportError):
+    # Package import
+    from dshelper.stats import (
+        LARGE_MATRIX_THRESHOLD,
+        HeatAxis,
+        aggregate_grid,
+        artifact_memory,
+        cluster_order,
+        correlation_dtype,
+        get_profile,
+        quantile_edges,
+        tick_label,
+        uniform_edges,
+    )
+
+from .plot_state import PlotState, sample_title
+from .prefetch import Prefetcher, neighbour_selections, prefetch_key
+from .render_cache import RenderCache, bitmap_bytes, render_key
+
+# Number of bins on each axis of the heat map
+HEAT_BINS = 10
+
+# Heat maps with more cells are drawn without the count of each cell
+MAX_ANNOTATED_CELLS = 400
+
+# Binning of the numeric axes, label -> kind
+BINNINGS = {"Uniform bins": "uniform", "Quantile bins": "quantile"}
+
+# Value choice of the plain heat map, the other choices aggregate a column
+ROW_COUNT = "Row count"
 
 
 class HeatPanel(wx.Panel):
@@ -38,15 +82,21 @@ class HeatPanel(wx.Panel):
 
     Args:
         df --> pandas dataframe: passed internally for plotting
+        render_cache --> RenderCache: rendered plots shared by the panels
+        prefetcher --> Prefetcher: prepares the neighbouring pairs of the
+            menus in the background
 
     Returns: None
     """
 
-    def __init__(self, parent, df=None):
+    def __init__(self, parent, df=None, render_cache=None, prefetcher=None):
         wx.Panel.__init__(self, parent)
 
         self.df = df
         self.available_columns = list(self.df.columns)
+        self.render_cache = render_cache if render_cache is not None else RenderCache()
+        self.prefetcher = prefetcher if prefetcher is not None else Prefetcher()
+        self.stepped_axis = 1  # Position of the last changed column menu
 
         self.splitter = wx.SplitterWindow(self, wx.ID_ANY)
         self.heatmap_panel = wx.Panel(self.splitter, 1)
@@ -61,7 +111,8 @@ class HeatPanel(wx.Panel):
         self.figure = Figure()
         self.axes = self.figure.add_subplot(111)
         self.canvas = FigureCanvas(self.heatmap_panel, -1, self.figure)
-        self.color_bar = None  # Flag for color bar
+        self.color_bar = None  # Color bar of the heat map, created once
+        self.heat_state = PlotState(self.canvas, self.axes)
         self.toolbar = NavigationToolbar(self.canvas)
 
         self.correlation_figure = Figure()
@@ -72,6 +123,7 @@ class HeatPanel(wx.Panel):
         self.correlation_toolbar = NavigationToolbar(self.correlation_canvas)
         self.has_correlation_plot = False  # Flag for correlation plot
         self.correlation_color_bar = False  # Flag for correlation color bar
+        self.correlation_running = False  # Flag for background computation
 
         # Drop-down select boxes
         self.text_y_axis = wx.StaticText(self.buttonpanel, label='Y Axis:')
@@ -84,6 +136,20 @@ class HeatPanel(wx.Panel):
         )
         self.Bind(wx.EVT_COMBOBOX, self.column_selected)
 
+        # Binning of the numeric axes, and the pivot value: mean or sum of
+        # a numeric column over the cells
+        self.binning = wx.Choice(self.buttonpanel, choices=list(BINNINGS))
+        self.binning.SetSelection(0)
+        self.text_value = wx.StaticText(self.buttonpanel, label="Value:")
+        self.value_column = wx.Choice(
+            self.buttonpanel, choices=[ROW_COUNT] + self._value_columns()
+        )
+        self.value_column.SetSelection(0)
+        self.aggregation = wx.Choice(self.buttonpanel, choices=["Mean", "Sum"])
+        self.aggregation.SetSelection(0)
+        for choice in (self.binning, self.value_column, self.aggregation):
+            choice.Bind(wx.EVT_CHOICE, self.column_selected)
+
         # Create a button to display/hide correlation map
         self.correlation_button = wx.ToggleButton(
             self.buttonpanel, label="Display Correlation Map"
@@ -92,6 +158,14 @@ class HeatPanel(wx.Panel):
         self.correlation_button.SetBackgroundColour("#D5F5E3")
         self.Bind(wx.EVT_TOGGLEBUTTON, self.correlation_heatmap)
 
+        # Correlation method selection, "Association" also covers the
+        # categorical columns (Cramér's V and correlation ratio)
+        self.correlation_method = wx.Choice(
+            self.buttonpanel, choices=["Pearson", "Spearman", "Association"]
+        )
+        self.correlation_method.SetSelection(0)
+        self.correlation_method.Bind(wx.EVT_CHOICE, self.correlation_method_selected)
+
         # Heatmap layout
         canvas_sizer = wx.BoxSizer(wx.VERTICAL)
         canvas_sizer.Add(self.canvas, 1, wx.LEFT | wx.TOP | wx.GROW)
@@ -110,9 +184,14 @@ class HeatPanel(wx.Panel):
         button_sizer.Add(self.column1, 0, wx.ALL | wx.ALIGN_CENTER, 5)
         button_sizer.Add(self.text_y_axis, 0, wx.ALL | wx.ALIGN_CENTER, 5)
         button_sizer.Add(self.column2, 0, wx.ALL | wx.ALIGN_CENTER, 5)
+        button_sizer.Add(self.binning, 0, wx.ALL | wx.ALIGN_CENTER, 5)
+        button_sizer.Add(self.text_value, 0, wx.ALL | wx.ALIGN_CENTER, 5)
+        button_sizer.Add(self.value_column, 0, wx.ALL | wx.ALIGN_CENTER, 5)
+        button_sizer.Add(self.aggregation, 0, wx.ALL | wx.ALIGN_CENTER, 5)
         button_sizer.Add(
             self.correlation_button, 0, wx.EXPAND | wx.ALL, 2
         )
+        button_sizer.Add(self.correlation_method, 0, wx.ALL | wx.ALIGN_CENTER, 5)
         self.buttonpanel.SetSizer(button_sizer)
 
         # Main panel layout
@@ -124,6 +203,17 @@ class HeatPanel(wx.Panel):
 
         pub.subscribe(self.update_available_column, "UPDATE_DISPLAYED_COLUMNS")
 
+    @property
+    def correlation_engine(self):
+        # Correlations of the plotted data (the full data or a sample of it)
+        return get_profile(self.df).correlation
+
+    def _value_columns(self):
+        return [
+            column for column in self.available_columns
+            if is_numeric_dtype(self.df[column]) and not is_bool_dtype(self.df[column])
+        ]
+
     def column_selected(self, event):
         """
         Function responses to select column from dropdown menu.
@@ -133,6 +223,10 @@ class HeatPanel(wx.Panel):
         selected_column_1 = self.column1.GetStringSelection()
         selected_column_2 = self.column2.GetStringSelection()
 
+        menu = event.GetEventObject() if event is not None else None
+        if menu in (self.column1, self.column2):
+            self.stepped_axis = 0 if menu is self.column1 else 1
+
         if selected_column_1 and selected_column_2:
             self.draw_heat(
                 selected_column_1,
@@ -140,11 +234,83 @@ class HeatPanel(wx.Panel):
                 self.df[selected_column_1],
                 self.df[selected_column_2],
             )
+            if event is not None:
+                self.prefetch_neighbours(self.selection())
+
+    def prefetch_neighbours(self, selection):
+        """
+        Prepares the cells of the pairs next to the selected one in the
+        background: the column of the last changed menu is replaced by its
+        neighbours in the menu, the pairs already rendered are skipped.
+
+        Args:
+            selection --> tuple: output of `selection()`
+        Returns: None
+        """
+
+        df = self.df
+        profile = get_profile(df)
+        for neighbour in neighbour_selections(
+            self.available_columns, selection, self.stepped_axis, self.prefetcher.depth
+        ):
+            key = render_key("heat", neighbour, profile, self.canvas)
+            if key in self.render_cache:
+                continue
+            self.prefetcher.prefetch(
+                prefetch_key("heat", neighbour, df),
+                lambda neighbour=neighbour: HeatPanel.prepare(df, neighbour),
+            )
+
+    def selection(self):
+        """The selected columns and options, None without two columns"""
+
+        selected_column_1 = self.column1.GetStringSelection()
+        selected_column_2 = self.column2.GetStringSelection()
+        if not (selected_column_1 and selected_column_2):
+            return None
+
+        return (selected_column_1, selected_column_2) + self._heat_options()
+
+    @staticmethod
+    def prepare(df, selection):
+        """
+        Computes the cells of a selection, along with the crosstab, category
+        codes, sorted samples or histogram indexes they are binned with
+        (kept by the profile), can be called from a worker thread.
+
+        Args:
+            df --> pandas dataframe: the data to be plotted
+            selection --> tuple: output of `selection()`
+        Returns:
+            layout --> tuple: kind of each axis
+            bins --> tuple: output of `_heat_bins`
+        """
+
+        column1, column2, binning, value_column, how = selection
+        layout = HeatPanel._layout(df, column1, column2, binning)
+
+        return layout, HeatPanel._heat_bins(
+            df, column1, column2, layout, value_column, how
+        )
+
+    @staticmethod
+    def _layout(df, column1, column2, binning):
+        """Kind of each axis: "category", or the binning of a numeric axis"""
+
+        return tuple(
+            "category" if df[column].dtype == "object" else binning
+            for column in (column1, column2)
+        )
 
     def draw_heat(self, column1, column2, data1, data2):
         """
         Function that draws plot in the panel.
 
+        Categorical (object) axes have one bin per category (the most
+        frequent ones, see `TOP_CATEGORIES`), numeric axes have `HEAT_BINS`
+        uniform or quantile bins. Each cell shows the number of rows, or
+        the mean or sum of the selected value column (pivot).
+
         Args:
             column1 --> string: first column header
             column2 --> string: second column header
@@ -156,111 +322,302 @@ class HeatPanel(wx.Panel):
         Returns: None
         """
 
-        # Reset plot first
-        self.axes.clear()
+        binning, value_column, how = self._heat_options()
 
-        if self.color_bar:
-            self.color_bar.remove()
+        # A recently plotted pair is shown again from the render cache
+        key = render_key(
+            "heat",
+            (column1, column2, binning, value_column, how),
+            get_profile(self.df),
+            self.canvas,
+        )
+        entry = self.render_cache.get(key)
+        if entry is not None:
+            self._restore(entry)
+            return
+
+        # The image, annotations and colour bar are updated in place, the
+        # axes is only cleared when the kind of an axis changes
+        layout = self._layout(self.df, column1, column2, binning)
+        self.heat_state.use_layout(layout)
+
+        # The cells of a prefetched pair are ready
+        prepared = self.prefetcher.take(
+            prefetch_key(
+                "heat", (column1, column2, binning, value_column, how), self.df
+            )
+        )
 
         try:
-            # Check data type
-            if data1.dtype == "object":
-                new_df_1 = self.df.assign(
-                    id=(self.df[column1]).astype('category').cat.codes
-                )
-                data1 = new_df_1["id"]
-
-                # Set axis label with respect the content of the column
-                labels_x = list(pd.unique(new_df_1[column1].values))
-                label_pos_x = list(pd.unique(new_df_1["id"].values))
-
-                def format_fn_x(tick_val, tick_pos):
-                    if int(tick_val) in data1.values:
-                        return labels_x[label_pos_x.index(int(tick_val))]
-                    else:
-                        return ''
-                self.axes.xaxis.set_major_formatter(FuncFormatter(format_fn_x))
-                self.axes.xaxis.set_major_locator(MaxNLocator(integer=True))
-
-                # Fill categorical data with mode
-                data1.fillna(data1.mode(), inplace=True)
+            if prepared is not None and prepared[0] == layout:
+                hist, xbins, ybins, labels = prepared[1]
             else:
-                # Fill numerical data with median
-                data1.fillna(data1.median(), inplace=True)
-
-            if data2.dtype == "object":
-                new_df_2 = self.df.assign(
-                    id=(self.df[column2]).astype('category').cat.codes
+                hist, xbins, ybins, labels = self._heat_bins(
+                    self.df, column1, column2, layout, value_column, how
                 )
-                data2 = new_df_2["id"]
-
-                # Set axis label with respect the content of the column
-                labels_y = list(pd.unique(new_df_2[column2].values))
-                label_pos_y = list(pd.unique(new_df_2["id"].values))
-
-                def format_fn_y(tick_val, tick_pos):
-                    if int(tick_val) in data2.values:
-                        return labels_y[label_pos_y.index(int(tick_val))]
-                    else:
-                        return ''
-                self.axes.yaxis.set_major_formatter(FuncFormatter(format_fn_y))
-                self.axes.yaxis.set_major_locator(MaxNLocator(integer=True))
-
-                # Fill categorical data with mode
-                data2.fillna(data2.mode(), inplace=True)
-            else:
-                # Fill numerical data with median
-                data2.fillna(data2.median(), inplace=True)
-
-            heatmap = self.axes.hist2d(data1, data2, cmap="Wistia", cmin=1)
-
-        except ValueError as e:
+        except (ValueError, TypeError) as e:
             # log Error
             _log_message = "\nHeatmap plot failed due to error:\n--> {}".format(e)
             pub.sendMessage("LOG_MESSAGE", log_message=_log_message)
+            return
+
+        if value_column is None:
+            title = "Heat Map Plot for {} and {}".format(column1, column2)
+            number_format = "{:g}"
+        else:
+            title = "{} of {} by {} and {}".format(
+                how.capitalize(), value_column, column1, column2
+            )
+            number_format = "{:.2g}"
+        title = sample_title(title, self.df)
+
+        self._draw_image(hist, xbins, ybins)
+        self._set_category_ticks(labels)
 
         # # Adds cross marks for null values
         # self.axes.patch.set(hatch='xx', edgecolor='black')
 
-        # To-do: plot using seaborn
-        # colormap = sns.diverging_palette(220, 10, as_cmap=True)
-        # df = self.df.pivot(column1, column2)
-        # sns.heatmap(df, ax=self.axes, cmap=colormap)
-
         # Setup plot annotation
-        hist, xbins, ybins, im = heatmap[0], heatmap[1], heatmap[2], heatmap[3]
-        x_middle_offset = (xbins[1] - xbins[0]) / 2
-        y_middle_offset = (ybins[1] - ybins[0]) / 2
-        for i in range(len(xbins)-1):
-            for j in range(len(ybins)-1):
-                # Do no display nan value
-                if not np.isnan(hist[i,j]):
-                    self.axes.text(
-                        x=xbins[i]+x_middle_offset,
-                        y=ybins[j]+y_middle_offset,
-                        s=hist[i,j],
-                        color="b",
-                        ha="center",
-                        va="center",
-                    )
-                else:
-                    self.axes.text(
-                        x=xbins[i],
-                        y=ybins[j],
-                        s="",
-                        color="b",
-                        ha="center",
-                        va="center",
-                    )
+        self._draw_annotations(hist, xbins, ybins, number_format)
 
         # Set plot style
-        self.axes.set_title("Heat Map Plot for {} and {}".format(column1, column2))
-        self.axes.set_ylabel(column2)
-        self.axes.set_xlabel(column1)
+        self.heat_state.set_labels(title=title, xlabel=column1, ylabel=column2)
         # # Hide grid lines
         # self.axes.grid(False)
-        self.color_bar = self.figure.colorbar(im, ax=self.axes)
-        self.canvas.draw()
+        self.heat_state.draw(extra=self._static_state(labels))
+
+        snapshot = self.heat_state.snapshot()
+        if snapshot is not None:
+            entry = {
+                "hist": hist,
+                "xbins": xbins,
+                "ybins": ybins,
+                "layout": layout,
+                "labels": labels,
+                "titles": (title, column1, column2),
+                "format": number_format,
+                "snapshot": snapshot,
+            }
+            self.render_cache.put(
+                key,
+                entry,
+                artifact_memory((hist, xbins, ybins)) + 2 * bitmap_bytes(self.canvas),
+            )
+
+    def _heat_options(self):
+        """
+        Get the heat map options.
+
+        Returns:
+            binning --> string: "uniform" or "quantile"
+            value_column --> string: the aggregated column, None for counts
+            how --> string: "count", "sum" or "mean"
+        """
+
+        binning = BINNINGS[self.binning.GetStringSelection() or "Uniform bins"]
+        value_column = self.value_column.GetStringSelection()
+        if not value_column or value_column == ROW_COUNT:
+            return binning, None, "count"
+
+        return binning, value_column, self.aggregation.GetStringSelection().lower()
+
+    @staticmethod
+    def _heat_bins(df, column1, column2, layout, value_column, how):
+        """
+        Counts the rows (or aggregates the value column) of every (x, y)
+        cell, chunk by chunk of rows. Categorical columns are read from
+        their cached codes and their nulls are left out, the nulls of
+        numeric columns are filled with the median.
+
+        Args:
+            df --> pandas dataframe: the data to be plotted
+            column1 --> string: column of the x axis
+            column2 --> string: column of the y axis
+            layout --> tuple: kind of each axis (see `_layout`)
+            value_column --> string: the aggregated column, None for counts
+            how --> string: "count", "sum" or "mean"
+        Returns:
+            hist --> masked numpy array: value of each (x, y) cell, cells
+                without rows are masked
+            xbins --> numpy array: cell edges of the x axis
+            ybins --> numpy array: cell edges of the y axis
+            labels --> tuple: cell labels of the x and y axes (None for an
+                axis drawn at the scale of its values)
+        """
+
+        profile = get_profile(df)
+
+        if layout == ("category", "category") and value_column is None:
+            # Exact crosstab, one cell per pair of categories
+            counts, codes_x, codes_y = profile.get_crosstab(column1, column2)
+            xbins = np.arange(len(codes_x) + 1) - 0.5
+            ybins = np.arange(len(codes_y) + 1) - 0.5
+            labels = (codes_x.labels, codes_y.labels)
+
+            return np.ma.masked_less(counts, 1).astype(np.float64), xbins, ybins, labels
+
+        heat_axes = []
+        axes = ((column1, df[column1], layout[0]), (column2, df[column2], layout[1]))
+        for column, data, kind in axes:
+            if kind == "category":
+                codes = profile.category_codes.get(column)
+                heat_axes.append(HeatAxis.categorical(codes))
+            elif kind == "quantile":
+                sample = profile.sorted_samples.get(column)
+                heat_axes.append(
+                    HeatAxis.numeric(
+                        data,
+                        quantile_edges(sample, HEAT_BINS),
+                        fill=np.median(sample) if len(sample) else None,
+                        quantile=True,
+                    )
+                )
+            else:
+                index = profile.histograms.get(column)
+                heat_axes.append(
+                    HeatAxis.numeric(
+                        data,
+                        uniform_edges(index.minimum, index.maximum, HEAT_BINS),
+                        fill=data.median(),
+                    )
+                )
+
+        values = None if value_column is None else df[value_column]
+        grid, counts = aggregate_grid(
+            heat_axes[0], heat_axes[1], len(df), values=values, how=how
+        )
+        labels = (heat_axes[0].labels, heat_axes[1].labels)
+
+        # Cells without rows are not coloured
+        hist = np.ma.masked_array(grid, mask=counts < 1)
+
+        return hist, heat_axes[0].edges, heat_axes[1].edges, labels
+
+    def _set_category_ticks(self, labels):
+        """
+        Puts one tick per cell on the labelled axes (categories, quantile
+        bins), the labels are looked up by position.
+
+        Args:
+            labels --> tuple: cell labels of the x and y axes (None for an
+                axis drawn at the scale of its values)
+        Returns: None
+        """
+
+        # Cell labels of the x axis are upright so they do not overlap
+        self.axes.tick_params(axis="x", labelrotation=0 if labels[0] is None else 90)
+
+        for axis, axis_labels in zip((self.axes.xaxis, self.axes.yaxis), labels):
+            if axis_labels is None:
+                continue
+
+            def format_tick(tick_val, tick_pos, axis_labels=axis_labels):
+                return tick_label(axis_labels, tick_val)
+
+            axis.set_major_locator(FixedLocator(np.arange(len(axis_labels))))
+            axis.set_major_formatter(FuncFormatter(format_tick))
+
+    def _static_state(self, labels):
+        """State of the static part of the plot: colour limits and ticks"""
+
+        ticks = tuple(
+            None if axis_labels is None else tuple(axis_labels)
+            for axis_labels in labels
+        )
+
+        return tuple(self.color_bar.mappable.get_clim()), ticks
+
+    def _restore(self, entry):
+        """
+        Shows a cached heat map: the cells are put back into the image and
+        the rendered bitmap is blitted, nothing is read from the data.
+        """
+
+        title, xlabel, ylabel = entry["titles"]
+
+        self.heat_state.use_layout(entry["layout"])
+        self._draw_image(entry["hist"], entry["xbins"], entry["ybins"])
+        self._set_category_ticks(entry["labels"])
+        self._draw_annotations(
+            entry["hist"], entry["xbins"], entry["ybins"], entry["format"]
+        )
+        self.heat_state.set_labels(title=title, xlabel=xlabel, ylabel=ylabel)
+        self.heat_state.restore(entry["snapshot"])
+
+    def _draw_image(self, hist, xbins, ybins):
+        """
+        Puts the 2D histogram into the image (updated in place) and points
+        the colour bar to it.
+
+        Args:
+            hist --> masked numpy array: count of each (x, y) bin
+            xbins --> numpy array: bin edges of the x axis
+            ybins --> numpy array: bin edges of the y axis
+        Returns: None
+        """
+
+        extent = (xbins[0], xbins[-1], ybins[0], ybins[-1])
+
+        image = self.heat_state.get("image")
+        if image is None:
+            image = self.axes.imshow(
+                hist.T,
+                cmap="Wistia",
+                origin="lower",
+                extent=extent,
+                aspect="auto",
+                interpolation="nearest",
+            )
+            self.heat_state.add("image", image)
+        else:
+            image.set_data(hist.T)
+            image.set_extent(extent)
+        image.autoscale()
+        self.axes.set_xlim(xbins[0], xbins[-1])
+        self.axes.set_ylim(ybins[0], ybins[-1])
+
+        # The colour bar is created once and follows the image
+        if self.color_bar is None:
+            self.color_bar = self.figure.colorbar(image, ax=self.axes)
+        else:
+            self.color_bar.update_normal(image)
+
+    def _draw_annotations(self, hist, xbins, ybins, number_format="{:g}"):
+        """
+        Writes the value of each bin in its centre, the text artists are
+        re-used between redraws.
+
+        Args:
+            hist --> masked numpy array: value of each (x, y) bin
+            xbins --> numpy array: bin edges of the x axis
+            ybins --> numpy array: bin edges of the y axis
+            number_format --> string: format of the values
+        Returns: None
+        """
+
+        # Large crosstabs are not annotated, the numbers would overlap
+        n_texts = hist.size if hist.size <= MAX_ANNOTATED_CELLS else 0
+
+        texts = self.heat_state.get("annotations")
+        if texts is None or len(texts) != n_texts:
+            for text in texts or []:
+                text.remove()
+            texts = self.heat_state.add(
+                "annotations",
+                [
+                    self.axes.text(0, 0, "", color="b", ha="center", va="center")
+                    for _ in range(n_texts)
+                ],
+            )
+
+        x_middle = (xbins[:-1] + xbins[1:]) / 2
+        y_middle = (ybins[:-1] + ybins[1:]) / 2
+        empty = np.ma.getmaskarray(hist)
+        counts = np.ma.getdata(hist)
+        for text, (i, j) in zip(texts, np.ndindex(hist.shape)):
+            text.set_position((x_middle[i], y_middle[j]))
+            # Do no display empty bins
+            text.set_text("" if empty[i, j] else number_format.format(counts[i, j]))
 
     def update_available_column(self, available_columns):
         """
@@ -278,8 +635,14 @@ class HeatPanel(wx.Panel):
         for column in self.available_columns:
             self.column1.Append(column)
             self.column2.Append(column)
+        self.value_column.Set([ROW_COUNT] + self._value_columns())
+        self.value_column.SetSelection(0)
 
         self.has_correlation_plot = False
+        if self.correlation_button.GetValue() == True:
+            # Re-draw right away, the correlation engine keeps the computed
+            # columns so only a newly enabled column is computed
+            self.correlation_heatmap(None)
 
     def correlation_heatmap(self, event):
         """
@@ -292,42 +655,155 @@ class HeatPanel(wx.Panel):
             self.correlation_button.SetLabel("Hide Correlation Map")
             self.correlation_button.SetForegroundColour("orange")
 
-            if not self.has_correlation_plot:
-                # Plot correlation heatmap
-                self.correlation_axes.clear()
-                df = prepare_data(self.df[self.available_columns])
-                colormap = sns.diverging_palette(220, 10, as_cmap=True)
-
-                h = sns.heatmap(
-                    df.corr(),
-                    cmap=colormap,
-                    square=True,
-                    cbar_kws={"shrink": 0.9},
-                    ax=self.correlation_axes,
-                    annot=True,
-                    linewidths=0.1,
-                    vmax=1.0,
-                    linecolor="white",
-                    annot_kws={"fontsize": 8},
-                    cbar=False if self.correlation_color_bar else True,
-                )
-
-                # Rotate the tick labels and set their alignment.
-                h.set_xticklabels(
-                    h.get_xticklabels(),
-                    rotation=45,
-                    ha="right",
-                    rotation_mode="anchor",
+            if not self.has_correlation_plot and not self.correlation_running:
+                # Compute correlation in the background, plot when finished
+                self.correlation_running = True
+                pub.sendMessage(
+                    "LOG_MESSAGE", log_message="\nComputing correlation ..."
                 )
-                h.set_yticklabels(h.get_yticklabels(), rotation="horizontal")
-
-                self.correlation_canvas.draw()
-                self.Refresh()
-                self.has_correlation_plot = True
-                self.correlation_color_bar = True # Set to True after initial plot
+                threading.Thread(
+                    target=self._compute_correlation,
+                    args=(list(self.available_columns), self._get_correlation_method()),
+                    daemon=True,
+                ).start()
 
         if self.correlation_button.GetValue() == False:
             # Hide correlation plot
             self.splitter.Unsplit(self.correlation_panel)
             self.correlation_button.SetLabel("Display Correlation Map")
             self.correlation_button.SetForegroundColour("blue")
+
+    def correlation_method_selected(self, event):
+        """
+        Function responses to select correlation method, the correlation map
+        is re-drawn if it is displayed.
+        """
+
+        self.has_correlation_plot = False
+        if self.correlation_button.GetValue() == True:
+            self.correlation_heatmap(event)
+
+    def _get_correlation_method(self):
+        return self.correlation_method.GetStringSelection().lower()
+
+    def _compute_correlation(self, columns, method):
+        """
+        Computes the correlation matrix in a worker thread and hands the
+        result over to the GUI thread for plotting.
+
+        Args:
+            columns --> list: a list of column headers
+            method --> string: correlation method, "pearson", "spearman" or
+                "association"
+        Returns: None
+        """
+
+        if method == "association":
+            try:
+                corr = get_profile(self.df).get_association(columns)
+                order = cluster_order(corr.to_numpy())
+                corr = corr.iloc[order, order]
+            except (ValueError, MemoryError) as e:
+                corr = None
+                _log_message = "\nAssociation failed due to error:\n--> {}".format(e)
+                wx.CallAfter(pub.sendMessage, "LOG_MESSAGE", log_message=_log_message)
+
+            wx.CallAfter(self.draw_correlation, corr, columns, method)
+            return
+
+        dtype = correlation_dtype(self.df.shape[0], len(columns))
+
+        try:
+            corr = self.correlation_engine.compute(
+                self.df, columns=columns, method=method, dtype=dtype, reorder=True
+            )
+        except (ValueError, MemoryError) as e:
+            corr = None
+            _log_message = "\nCorrelation failed due to error:\n--> {}".format(e)
+            wx.CallAfter(pub.sendMessage, "LOG_MESSAGE", log_message=_log_message)
+
+        wx.CallAfter(self.draw_correlation, corr, columns, method)
+
+    def draw_correlation(self, corr, columns, method):
+        """
+        Draws the correlation matrix in the correlation panel.
+        Small matrices are annotated with seaborn, large ones are rendered
+        as a raster image.
+
+        Args:
+            corr --> pandas dataframe: correlation matrix
+            columns --> list: column headers used to compute the matrix
+            method --> string: correlation method used
+        Returns: None
+        """
+
+        self.correlation_running = False
+
+        if corr is None:
+            return
+
+        if columns != self.available_columns or method != self._get_correlation_method():
+            # Selection changed while computing, compute again
+            if self.correlation_button.GetValue() == True:
+                self.correlation_heatmap(None)
+            return
+
+        self.correlation_axes.clear()
+        colormap = sns.diverging_palette(220, 10, as_cmap=True)
+
+        if corr.shape[0] <= LARGE_MATRIX_THRESHOLD:
+            h = sns.heatmap(
+                corr,
+                cmap=colormap,
+                square=True,
+                cbar_kws={"shrink": 0.9},
+                ax=self.correlation_axes,
+                annot=True,
+                linewidths=0.1,
+                vmin=-1.0,
+                vmax=1.0,
+                linecolor="white",
+                annot_kws={"fontsize": 8},
+                cbar=False if self.correlation_color_bar else True,
+            )
+
+            # Rotate the tick labels and set their alignment.
+            h.set_xticklabels(
+                h.get_xticklabels(),
+                rotation=45,
+                ha="right",
+                rotation_mode="anchor",
+            )
+            h.set_yticklabels(h.get_yticklabels(), rotation="horizontal")
+        else:
+            # Too many cells to annotate, draw the matrix as one image
+            image = self.correlation_axes.imshow(
+                corr.to_numpy(),
+                cmap=colormap,
+                vmin=-1.0,
+                vmax=1.0,
+                interpolation="nearest",
+                aspect="equal",
+            )
+            self.correlation_axes.grid(False)
+            self.correlation_axes.set_xticks([])
+            self.correlation_axes.set_yticks([])
+            if not self.correlation_color_bar:
+                self.correlation_figure.colorbar(
+                    image, ax=self.correlation_axes, shrink=0.9
+                )
+
+        if method == "association":
+            title = "Association ({} columns)"
+        else:
+            title = method.capitalize() + " Correlation ({} columns)"
+        self.correlation_axes.set_title(
+            sample_title(title.format(corr.shape[0]), self.df)
+        )
+
+        self.correlation_canvas.draw()
+        self.Refresh()
+        self.has_correlation_plot = True
+        self.correlation_color_bar = True  # Set to True after initial plot
+
+        pub.sendMessage("LOG_MESSAGE", log_message="Correlation finished")
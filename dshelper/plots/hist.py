@@ -18,6 +18,8 @@ from matplotlib.backends.backend_wxagg import FigureCanvasWxAgg as FigureCanvas
 from matplotlib.backends.backend_wx import NavigationToolbar2Wx as NavigationToolbar
 from matplotlib.figure import Figure
 
+import numpy as np
+
 try:
     # local import
     from components import create_bitmap_dropdown_menu
@@ -25,6 +27,28 @@ except (ModuleNotFoundError, ImportError):
     # Package import
     from dshelper.components import create_bitmap_dropdown_menu
 
+from .plot_state import PlotState, bar_vertices, make_bars, sample_title
+from .prefetch import Prefetcher, neighbour_selections, prefetch_key
+
+try:
+    # local import
+    from stats import (
+        DEFAULT_BINS,
+        FINE_BINS,
+        MAX_BARS,
+        get_profile,
+        supports_histogram_index,
+    )
+except (ModuleNotFoundError, ImportError):
+    # Package import
+    from dshelper.stats import (
+        DEFAULT_BINS,
+        FINE_BINS,
+        MAX_BARS,
+        get_profile,
+        supports_histogram_index,
+    )
+
 
 class HistPanel(wx.Panel):
     """
@@ -32,19 +56,27 @@ class HistPanel(wx.Panel):
 
     Args:
         df --> pandas dataframe: passed internally for plotting
+        prefetcher --> Prefetcher: prepares the neighbouring columns of the
+            menu in the background
 
     Returns: None
     """
 
-    def __init__(self, parent, df=None):
+    def __init__(self, parent, df=None, prefetcher=None):
         wx.Panel.__init__(self, parent)
 
         self.df = df
         self.available_columns = list(self.df.columns)
+        self.prefetcher = prefetcher if prefetcher is not None else Prefetcher()
+
+        self.indexed_column = None  # Column drawn from the histogram index
+        self.zoom_callback = None
+        self.rebin_pending = False
 
         self.figure = Figure()
         self.axes = self.figure.add_subplot(111)
         self.canvas = FigureCanvas(self, -1, self.figure)
+        self.plot_state = PlotState(self.canvas, self.axes)
 
         self.toolbar = NavigationToolbar(self.canvas)
 
@@ -54,8 +86,14 @@ class HistPanel(wx.Panel):
 
         self.Bind(wx.EVT_COMBOBOX, self.column_selected)
 
+        self.text_bins = wx.StaticText(self, label="Bins:")
+        self.bin_count = wx.SpinCtrl(self, min=1, max=FINE_BINS, initial=DEFAULT_BINS)
+        self.bin_count.Bind(wx.EVT_SPINCTRL, self.column_selected)
+
         toolbar_sizer = wx.BoxSizer(wx.HORIZONTAL)
         toolbar_sizer.Add(self.dropdown_menu, 0, wx.ALL | wx.ALIGN_CENTER, 5)
+        toolbar_sizer.Add(self.text_bins, 0, wx.ALL | wx.ALIGN_CENTER, 5)
+        toolbar_sizer.Add(self.bin_count, 0, wx.ALL | wx.ALIGN_CENTER, 5)
         toolbar_sizer.Add(self.toolbar, 0, wx.ALL, 5)
 
         sizer = wx.BoxSizer(wx.VERTICAL)
@@ -66,6 +104,18 @@ class HistPanel(wx.Panel):
 
         pub.subscribe(self.update_available_column, "UPDATE_DISPLAYED_COLUMNS")
 
+    # Numeric columns are scanned once into a histogram index, the bin count
+    # and zoomed views are re-binned from the index. Categorical columns are
+    # counted into bounded top-k summaries. Both are shared through the
+    # profile of the plotted data (the full data or a sample of it).
+    @property
+    def histogram_cache(self):
+        return get_profile(self.df).histograms
+
+    @property
+    def frequency_cache(self):
+        return get_profile(self.df).frequencies
+
     def column_selected(self, event):
         """
         Function responses to select column from dropdown menu.
@@ -73,7 +123,55 @@ class HistPanel(wx.Panel):
 
         selected_column = self.dropdown_menu.GetStringSelection()
 
-        self.draw_hist(selected_column, self.df[selected_column])
+        if selected_column:
+            self.draw_hist(selected_column, self.df[selected_column])
+            if event is not None:
+                self.prefetch_neighbours((selected_column,))
+
+    def prefetch_neighbours(self, selection):
+        """
+        Prepares the columns next to the selected one in the menu in the
+        background, the next steps through the menu find them ready.
+
+        Args:
+            selection --> tuple: output of `selection()`
+        Returns: None
+        """
+
+        df = self.df
+        for neighbour in neighbour_selections(
+            self.available_columns, selection, 0, self.prefetcher.depth
+        ):
+            self.prefetcher.prefetch(
+                prefetch_key("hist", neighbour, df),
+                lambda neighbour=neighbour: HistPanel.prepare(df, neighbour),
+            )
+
+    def selection(self):
+        """The selected column as a tuple, None when nothing is selected"""
+
+        selected_column = self.dropdown_menu.GetStringSelection()
+
+        return (selected_column,) if selected_column else None
+
+    @staticmethod
+    def prepare(df, selection):
+        """
+        Computes the value counts or the histogram index a selection is
+        drawn from, can be called from a worker thread.
+
+        Args:
+            df --> pandas dataframe: the data to be plotted
+            selection --> tuple: output of `selection()`
+        Returns: None
+        """
+
+        (column,) = selection
+        profile = get_profile(df)
+        if df[column].dtype == "object":
+            profile.frequencies.get(column)
+        elif supports_histogram_index(df[column]):
+            profile.histograms.get(column)
 
     def draw_hist(self, column_name, data):
         """
@@ -88,26 +186,125 @@ class HistPanel(wx.Panel):
         Returns: None
         """
 
-        # Reset plot first
-        self.axes.clear()
+        # The bars are updated in place, the axes is only cleared when the
+        # kind of plot changes
+        if self.zoom_callback is not None:
+            self.axes.callbacks.disconnect(self.zoom_callback)
+            self.zoom_callback = None
+        self.indexed_column = None
+        tick_labels = None
+
+        bins = self.bin_count.GetValue()
+        # The counts or index are read from the profile, warm when prefetched
+        self.prefetcher.take(prefetch_key("hist", (column_name,), self.df))
 
         try:
             # Check data type
             if data.dtype == "object":
-                # Different drawing method for strings
-                value_count = data.value_counts().sort_index()
-                value_count.plot(kind="bar", ax=self.axes)
+                # Different drawing method for strings, the number of bars
+                # is capped and the rest of the values is one "Other" bar
+                summary = self.frequency_cache.get(column_name)
+                value_count = summary.top(MAX_BARS)
+
+                self.plot_state.use_layout("categorical")
+                positions = np.arange(len(value_count))
+                tick_labels = tuple("{}".format(value) for value in value_count.index)
+                self._draw_counts(value_count.to_numpy(), positions - 0.4, positions + 0.4)
+                self.axes.set_xticks(positions)
+                self.axes.set_xticklabels(tick_labels, rotation=90)
+                self.axes.set_xlim(-0.5, len(value_count) - 0.5)
+
+                if not summary.exact:
+                    _log_message = (
+                        "\nColumn '{}' has too many distinct values, counts of "
+                        "the top values are undercounted by at most {}".format(
+                            column_name, summary.max_error
+                        )
+                    )
+                    pub.sendMessage("LOG_MESSAGE", log_message=_log_message)
+            elif supports_histogram_index(data):
+                counts, edges = self.histogram_cache.get(column_name).histogram(bins)
+
+                self.plot_state.use_layout("numeric")
+                self._draw_counts(counts, edges[:-1], edges[1:])
+                self.axes.set_xlim(edges[0], max(edges[-1], edges[0] + 1e-9))
+                self.indexed_column = column_name
             else:
-                self.axes.hist(data.dropna(), bins=100)
+                # Other types (dates, ...) go through matplotlib units
+                self.plot_state.reset()
+                self.axes.hist(data.dropna(), bins=bins)
         except ValueError as e:
             # log Error
             _log_message = "\nHistogram plot failed due to error:\n--> {}".format(e)
             pub.sendMessage("LOG_MESSAGE", log_message=_log_message)
 
         # Set plot info
-        self.axes.set_title("Histogram Plot for %s" % column_name)
-        self.axes.set_ylabel("Value Count")
-        self.canvas.draw()
+        self.plot_state.set_labels(
+            title=sample_title("Histogram Plot for %s" % column_name, self.df),
+            ylabel="Value Count",
+        )
+        self.plot_state.draw(extra=tick_labels)
+
+        if self.indexed_column is not None:
+            # Refine the bins when zooming with the toolbar
+            self.zoom_callback = self.axes.callbacks.connect(
+                "xlim_changed", self.xlim_changed
+            )
+
+    def _draw_counts(self, counts, lefts, rights):
+        """
+        Puts pre-computed counts into the bars (one collection updated in
+        place) and fits the y axis.
+
+        Args:
+            counts --> numpy array: count of each bar
+            lefts --> numpy array: left edge of each bar
+            rights --> numpy array: right edge of each bar
+        Returns: None
+        """
+
+        bars = self.plot_state.get("bars")
+        if bars is None:
+            bars = self.plot_state.add("bars", make_bars(self.axes))
+
+        bars.set_verts(bar_vertices(lefts, rights, counts))
+        # Bar outlines would hide the thin bars of fine histograms
+        bars.set_linewidth(0.5 if len(counts) <= DEFAULT_BINS else 0)
+
+        top = counts.max() if len(counts) else 0
+        self.axes.set_ylim(0, top * 1.05 if top > 0 else 1)
+
+    def xlim_changed(self, axes):
+        """
+        Callback for zooming/panning, the zoomed range is re-binned from the
+        histogram index once the toolbar action is finished.
+        """
+
+        if self.indexed_column is not None and not self.rebin_pending:
+            self.rebin_pending = True
+            wx.CallAfter(self.rebin_zoomed)
+
+    def rebin_zoomed(self):
+        """
+        Re-draws the bars of the zoomed range with the full bin count.
+        """
+
+        self.rebin_pending = False
+        if self.indexed_column is None:
+            return
+
+        index = self.histogram_cache.get(self.indexed_column)
+        xlim = self.axes.get_xlim()
+        lower = max(min(xlim), index.minimum)
+        upper = min(max(xlim), index.maximum)
+        if upper <= lower:
+            return
+
+        counts, edges = index.histogram(self.bin_count.GetValue(), (lower, upper))
+
+        self._draw_counts(counts, edges[:-1], edges[1:])
+        self.axes.set_xlim(xlim, emit=False)
+        self.plot_state.draw()
 
     def update_available_column(self, available_columns):
         """
@@ -0,0 +1,243 @@
+import sys
+import threading
+
+import wx
+
+import numpy as np
+
+from pubsub import pub
+
+import matplotlib
+if "linux" not in sys.platform:
+    matplotlib.use("WXAgg")
+
+from matplotlib.backends.backend_wxagg import FigureCanvasWxAgg as FigureCanvas
+from matplotlib.backends.backend_wx import NavigationToolbar2Wx as NavigationToolbar
+from matplotlib.figure import Figure
+
+try:
+    # local import
+    from stats import co_occurrence, get_profile, missingness_matrix, null_counts
+except (ModuleNotFoundError, ImportError):
+    # Package import
+    from dshelper.stats import (
+        co_occurrence, get_profile, missingness_matrix, null_counts
+    )
+
+from .plot_state import sample_title
+
+# Column names are shown as ticks up to this number of columns
+MAX_LABELLED_COLUMNS = 40
+
+# The co-occurrence map keeps the columns with the most nulls
+MAX_CO_OCCURRENCE_COLUMNS = 100
+
+
+class MissingPanel(wx.Panel):
+    """
+    A panel displays where the values of each column are missing.
+
+    The left plot is the missingness matrix: rows are binned to the pixel
+    height of the plot and each bin is shaded by its ratio of nulls. The
+    right plot is the null co-occurrence map: the share of the nulls of a
+    column (row) that fall on rows where another column is also null.
+
+    Both are computed from the bit-packed null masks of the profile, so a
+    large dataframe costs one bit per value.
+
+    Args:
+        df --> pandas dataframe: passed internally for plotting
+
+    Returns: None
+    """
+
+    def __init__(self, parent, df=None):
+        wx.Panel.__init__(self, parent)
+
+        self.df = df
+        self.available_columns = list(self.df.columns)
+        self.loading = False  # Flag for background computation
+
+        self.figure = Figure()
+        self.canvas = FigureCanvas(self, -1, self.figure)
+        self.toolbar = NavigationToolbar(self.canvas)
+
+        self.draw_button = wx.Button(self, label="Draw")
+        self.draw_button.Bind(wx.EVT_BUTTON, self.draw_selected)
+
+        toolbar_sizer = wx.BoxSizer(wx.HORIZONTAL)
+        toolbar_sizer.Add(self.draw_button, 0, wx.ALL | wx.ALIGN_CENTER, 5)
+        toolbar_sizer.Add(self.toolbar, 0, wx.ALL, 5)
+
+        sizer = wx.BoxSizer(wx.VERTICAL)
+        sizer.Add(self.canvas, 1, wx.LEFT | wx.TOP | wx.GROW)
+        sizer.Add(toolbar_sizer)
+        self.SetSizer(sizer)
+        self.Fit()
+
+        pub.subscribe(self.update_available_column, "UPDATE_DISPLAYED_COLUMNS")
+
+    def draw_selected(self, event):
+        """
+        Function responses to the draw button, the plots are computed in a
+        background thread.
+        """
+
+        if self.loading or not self.available_columns:
+            return
+
+        self.loading = True
+        _log_message = "\nComputing the missing values of {} columns ...".format(
+            len(self.available_columns)
+        )
+        pub.sendMessage("LOG_MESSAGE", log_message=_log_message)
+
+        # One row bin per pixel of the canvas height
+        n_bins = max(self.canvas.get_width_height()[1], 1)
+        threading.Thread(
+            target=self._compute,
+            args=(self.df, list(self.available_columns), n_bins),
+            daemon=True,
+        ).start()
+
+    def selection(self):
+        """The columns of the plots, None without columns"""
+
+        return tuple(self.available_columns) or None
+
+    @staticmethod
+    def prepare(df, selection):
+        """
+        Packs the null masks of the columns (cached in the profile), can be
+        called from a worker thread.
+
+        Args:
+            df --> pandas dataframe: the data to be plotted
+            selection --> tuple: output of `selection()`
+        Returns: None
+        """
+
+        get_profile(df).packed_nulls(list(selection))
+
+    def _compute(self, df, columns, n_bins):
+        """
+        Builds the missingness matrix and the co-occurrence counts, in a
+        worker thread.
+        """
+
+        try:
+            masks = get_profile(df).packed_nulls(columns)
+            counts = null_counts(masks)
+            matrix = missingness_matrix(masks, df.shape[0], n_bins)
+
+            # Only columns with nulls co-occur, the most null ones first
+            with_nulls = np.flatnonzero(counts)
+            with_nulls = with_nulls[np.argsort(-counts[with_nulls], kind="stable")]
+            with_nulls = np.sort(with_nulls[:MAX_CO_OCCURRENCE_COLUMNS])
+            both = co_occurrence([masks[num] for num in with_nulls])
+        except (ValueError, TypeError, MemoryError) as e:
+            _log_message = "\nMissing values plot failed due to error:\n--> {}".format(e)
+            wx.CallAfter(pub.sendMessage, "LOG_MESSAGE", log_message=_log_message)
+            wx.CallAfter(self._loaded, None)
+            return
+
+        wx.CallAfter(
+            self._loaded,
+            (
+                df,
+                columns,
+                counts,
+                matrix,
+                [columns[num] for num in with_nulls],
+                both,
+            ),
+        )
+
+    def _loaded(self, result):
+        self.loading = False
+        if result is not None:
+            self.draw_missing(*result)
+
+    def draw_missing(self, df, columns, counts, matrix, null_columns, both):
+        """
+        Function that draws the missingness matrix and the co-occurrence map.
+
+        Args:
+            df --> pandas dataframe: the plotted data
+            columns --> list: headers of the columns of the matrix
+            counts --> numpy array: null count of each column
+            matrix --> numpy array: (bins, columns) null ratio of the row bins
+            null_columns --> list: headers of the columns of the co-occurrence
+            both --> numpy array: rows where both columns are null
+        Returns: None
+        """
+
+        n_rows = df.shape[0]
+        self.figure.clear()
+        matrix_axes, co_axes = self.figure.subplots(
+            1, 2, gridspec_kw={"width_ratios": [3, 2]}
+        )
+
+        matrix_axes.imshow(
+            matrix,
+            cmap="Greys",
+            vmin=0,
+            vmax=1,
+            aspect="auto",
+            interpolation="nearest",
+            extent=(-0.5, len(columns) - 0.5, n_rows, 0),
+        )
+        matrix_axes.set_title(
+            sample_title(
+                "Missing Values ({:.1%} of all values)".format(
+                    counts.sum() / max(n_rows * len(columns), 1)
+                ),
+                df,
+            )
+        )
+        matrix_axes.set_ylabel("Row")
+        matrix_axes.grid(False)
+        self._set_column_ticks(matrix_axes, columns, x_only=True)
+
+        if null_columns:
+            # Share of the nulls of the row column shared by the other column
+            conditional = both / np.diag(both)[:, None]
+            image = co_axes.imshow(
+                conditional, cmap="viridis", vmin=0, vmax=1, interpolation="nearest"
+            )
+            self.figure.colorbar(image, ax=co_axes)
+            self._set_column_ticks(co_axes, null_columns)
+        else:
+            co_axes.set_axis_off()
+        co_axes.set_title("Null Co-occurrence")
+        co_axes.grid(False)
+
+        self.canvas.draw()
+        self.Refresh()
+
+    @staticmethod
+    def _set_column_ticks(axes, columns, x_only=False):
+        if len(columns) > MAX_LABELLED_COLUMNS:
+            axes.set_xticks([])
+            if not x_only:
+                axes.set_yticks([])
+            return
+
+        ticks = np.arange(len(columns))
+        axes.set_xticks(ticks)
+        axes.set_xticklabels(columns, rotation=90)
+        if not x_only:
+            axes.set_yticks(ticks)
+            axes.set_yticklabels(columns)
+
+    def update_available_column(self, available_columns):
+        """
+        Update dataframe used for plotting.
+
+        Args:
+            available_columns --> list: a list of available column headers
+
+        Returns: None
+        """
+
+        self.available_columns = available_columns
@@ -25,8 +25,19 @@ except (ModuleNotFoundError, ImportError):
     # Package import
     from dshelper.components import create_bitmap_dropdown_menu
 
+try:
+    # local import
+    from stats import get_profile
+except (ModuleNotFoundError, ImportError):
+    # Package import
+    from dshelper.stats import get_profile
+
+from .plot_state import sample_label
 from .utils import make_pair_plot
 
+# Number of distinct colors of the default seaborn color palette
+MAX_HUE_DISTINCT = 6
+
 
 class PairPanel(wx.Panel):
     """
@@ -99,6 +110,7 @@ class PairPanel(wx.Panel):
         """
 
         make_pair_plot(self.figure, self.df, column_name, self.available_columns)
+        self.figure.suptitle(sample_label(self.df) or "")
 
         self.canvas.draw()
         self.Refresh()
@@ -117,13 +129,16 @@ class PairPanel(wx.Panel):
             hue_columns --> list: a list of column headers
         """
 
-        hue_columns = []
-        for column in self.available_columns:
-            if self.df[column].nunique() <= 6:
-                # Restrict hue selection based on distinct values in column
-                hue_columns.append(column)
+        # Restrict hue selection based on distinct values in column, the
+        # scans stop as soon as a column has too many values
+        distinct_counts = get_profile(self.df).bounded_distinct(
+            list(self.available_columns), MAX_HUE_DISTINCT
+        )
 
-        return hue_columns
+        return [
+            column for column in self.available_columns
+            if distinct_counts[column] <= MAX_HUE_DISTINCT
+        ]
 
     def update_available_column(self, available_columns):
         """
@@ -1,6 +1,8 @@
 import sys
+import threading
 
 import wx
+from pubsub import pub
 
 import matplotlib
 if 'linux' not in sys.platform:
@@ -11,53 +13,289 @@ from .heat import HeatPanel
 from .box_violin import BoxViolinPanel
 from .pair import PairPanel
 from .scatter import ScatterPanel
+from .time_series import TimeSeriesPanel
+from .missing import MissingPanel
+from .prefetch import Prefetcher, prefetch_key
+from .render_cache import RenderCache
+
+try:
+    # local import
+    from stats import get_profile
+except (ModuleNotFoundError, ImportError):
+    # Package import
+    from dshelper.stats import get_profile
 
 
 class PlotPanel(wx.Panel):
     """
     The main panel contains several plots
 
+    All the plots are drawn from the same data: the full dataframe, or one
+    sample of its rows when a sampling mode is selected in the status bar.
+    The plot shown can be computed again from the full data, in the
+    background, with the "Compute on Full Data" button.
+
     Args:
         df --> pandas dataframe: passed internally for plotting
+        render_cache --> RenderCache: cache of the rendered plots, shared by
+            the tabs (a default memory budget when None)
+        prefetcher --> Prefetcher: background worker preparing the next
+            selections of the drop-down menus, shared by the tabs
 
     Returns: None
     """
 
-    def __init__(self, parent, df=None):
+    def __init__(self, parent, df=None, render_cache=None, prefetcher=None):
         """Constructor"""
         wx.Panel.__init__(self, parent)
 
         self.df = df
+        self.render_cache = render_cache if render_cache is not None else RenderCache()
+        self.prefetcher = prefetcher if prefetcher is not None else Prefetcher()
+        self.sampling = None  # kind of sample plotted, None for the full data
+        self.plot_df = df  # the data the plots are drawn from
 
         # Create a notebook to display different kind of plot in different tabs
-        plot_notebook = wx.Notebook(self)
+        self.plot_notebook = plot_notebook = wx.Notebook(self)
         plot_notebook.SetBackgroundColour("WHITE")
-        self.hist_page = HistPanel(plot_notebook, df=self.df)
-        self.heat_page = HeatPanel(plot_notebook, df=self.df)
+        self.hist_page = HistPanel(
+            plot_notebook, df=self.df, prefetcher=self.prefetcher
+        )
+        self.heat_page = HeatPanel(
+            plot_notebook,
+            df=self.df,
+            render_cache=self.render_cache,
+            prefetcher=self.prefetcher,
+        )
         # self.distribution_page = wx.Panel(plot_notebook)
-        self.scatter_page = ScatterPanel(plot_notebook, df=self.df)
-        self.box_violin_page = BoxViolinPanel(plot_notebook, df=self.df)
+        self.scatter_page = ScatterPanel(
+            plot_notebook,
+            df=self.df,
+            render_cache=self.render_cache,
+            prefetcher=self.prefetcher,
+        )
+        self.time_series_page = TimeSeriesPanel(plot_notebook, df=self.df)
+        self.box_violin_page = BoxViolinPanel(
+            plot_notebook,
+            df=self.df,
+            render_cache=self.render_cache,
+            prefetcher=self.prefetcher,
+        )
         self.pair_page = PairPanel(plot_notebook, df=self.df)
+        self.missing_page = MissingPanel(plot_notebook, df=self.df)
 
         # Add pages into the notebook for display
         plot_notebook.AddPage(self.hist_page, "Histogram")
         plot_notebook.AddPage(self.heat_page, "Heat Map")
         # plot_notebook.AddPage(self.distribution_page, "Distribution")
         plot_notebook.AddPage(self.scatter_page, "Scatter Plot")
+        plot_notebook.AddPage(self.time_series_page, "Time Series")
         plot_notebook.AddPage(self.box_violin_page, "Box and Violin Plots")
         plot_notebook.AddPage(self.pair_page, "Pair Plots")
+        plot_notebook.AddPage(self.missing_page, "Missing Values")
+        self.pages = (
+            self.hist_page,
+            self.heat_page,
+            self.scatter_page,
+            self.time_series_page,
+            self.box_violin_page,
+            self.pair_page,
+            self.missing_page,
+        )
 
         # Put the notebook in a sizer in the panel for layout
         sizer = wx.BoxSizer()
         sizer.Add(plot_notebook, 1, wx.EXPAND | wx.SP_NOBORDER)
         self.SetSizer(sizer)
 
+        pub.subscribe(self._append_rows, "ROWS_APPENDED")
+        pub.subscribe(self.set_sampling, "SAMPLING_CHANGED")
+        pub.subscribe(self.refine_plot, "REFINE_PLOT")
+
+    def _append_rows(self, df, n_rows):
+        """
+        Points every plot to the data with the appended rows. The histogram
+        and the time series are redrawn right away, the other plots are
+        redrawn on the next selection.
+
+        Args:
+            df --> pandas dataframe: the data with the new rows
+            n_rows --> int: number of new rows (at the end of df)
+        Returns: None
+        """
+
+        self.df = df
+        # Plots rendered or prefetched from the previous data are not used
+        self.render_cache.clear()
+        self.prefetcher.clear()
+        if self.sampling is not None:
+            # The sample is extended with the new rows (see `get_sample`),
+            # the plots follow once it is ready
+            self.set_sampling(self.sampling)
+            return
+
+        self.plot_df = df
+        for page in self.pages:
+            page.df = df
+        # The correlation map is computed again when shown
+        self.heat_page.has_correlation_plot = False
+
+        self.hist_page.column_selected(None)
+        self.time_series_page.refine_zoomed()
+
+    def set_sampling(self, kind):
+        """
+        Draws the plots from a sample of the rows, or from the full data.
+        The sample is drawn in a worker thread and shared by all the plots.
+
+        Args:
+            kind --> string: "reservoir" or "stratified", None for the full
+                data
+        Returns: None
+        """
+
+        self.sampling = kind
+        if kind is None:
+            self._use_data(self.df)
+            return
+
+        _log_message = "\nSampling the rows ({}) ...".format(kind)
+        pub.sendMessage("LOG_MESSAGE", log_message=_log_message)
+        threading.Thread(
+            target=self._draw_sample, args=(self.df, kind), daemon=True
+        ).start()
+
+    def _draw_sample(self, df, kind):
+        try:
+            sampled = get_profile(df).get_sample(kind)
+        except (ValueError, TypeError, MemoryError) as e:
+            _log_message = "\nSampling failed due to error:\n--> {}".format(e)
+            wx.CallAfter(pub.sendMessage, "LOG_MESSAGE", log_message=_log_message)
+            return
+
+        wx.CallAfter(self._sampled, df, kind, sampled)
+
+    def _sampled(self, df, kind, sampled):
+        if df is not self.df or kind != self.sampling:
+            # The data or the mode changed while sampling
+            return
+
+        self._use_data(sampled)
+
+        sample = get_profile(sampled).sample
+        if sample is None:
+            _log_message = "\nAll the {} rows are plotted".format(df.shape[0])
+        else:
+            _log_message = "\nPlotting a {} ({} of {} rows)".format(
+                sample.label(), len(sample), sample.n_population
+            )
+        pub.sendMessage("LOG_MESSAGE", log_message=_log_message)
+
+    def _use_data(self, data):
+        """
+        Points every plot to the data they are drawn from, the plot shown is
+        redrawn right away and the others on their next selection.
+
+        Args:
+            data --> pandas dataframe: the full data or a sample of it
+        Returns: None
+        """
+
+        if data is self.plot_df:
+            return
+
+        self.plot_df = data
+        self.prefetcher.clear()
+        for page in self.pages:
+            page.df = data
+        # The correlation map is computed again when shown
+        self.heat_page.has_correlation_plot = False
+
+        self._redraw(self.plot_notebook.GetCurrentPage())
+
+    def _redraw(self, page):
+        """Draws the current selection of a plot again, from its data"""
+
+        if page is self.missing_page:
+            if page.figure.axes:
+                page.draw_selected(None)
+        elif page is self.pair_page:
+            if page.dropdown_menu.GetStringSelection():
+                page.column_selected(None)
+        elif page in self.pages:
+            page.column_selected(None)
+
+    def refine_plot(self):
+        """
+        Computes the plot shown again from the full data. What the plot is
+        drawn from (histogram index, value counts, crosstab, points, ...) is
+        computed in a worker thread, then the plot is drawn once from the
+        full data; the next selections are drawn from the sample again. The
+        pair plot is always drawn from the sample.
+        """
+
+        page = self.plot_notebook.GetCurrentPage()
+        if self.plot_df is self.df or page not in self.pages:
+            return
+
+        if not hasattr(page, "selection"):
+            # Its data is prepared along with the drawing, on the GUI thread
+            _log_message = (
+                "\nThe pair plot is drawn from the sample, "
+                "turn sampling off to plot the full data"
+            )
+            pub.sendMessage("LOG_MESSAGE", log_message=_log_message)
+            return
+
+        selection = page.selection()
+        if selection is None:
+            return
+
+        _log_message = "\nComputing the plot on the full data ..."
+        pub.sendMessage("LOG_MESSAGE", log_message=_log_message)
+        threading.Thread(
+            target=self._prepare_full, args=(page, self.df, selection), daemon=True
+        ).start()
+
+    def _prepare_full(self, page, df, selection):
+        try:
+            prepared = page.prepare(df, selection)
+        except (ValueError, TypeError, KeyError, MemoryError) as e:
+            _log_message = (
+                "\nComputing on the full data failed due to error:\n--> {}".format(e)
+            )
+            wx.CallAfter(pub.sendMessage, "LOG_MESSAGE", log_message=_log_message)
+            return
+
+        wx.CallAfter(self._refined, page, df, selection, prepared)
+
+    def _refined(self, page, df, selection, prepared):
+        if df is not self.df:
+            # Rows were appended meanwhile
+            return
+
+        # The panels taking prefetched data draw from the prepared one
+        panel = {
+            self.hist_page: "hist",
+            self.heat_page: "heat",
+            self.scatter_page: "scatter",
+            self.box_violin_page: "box_violin",
+        }.get(page)
+        if panel is not None and prepared is not None:
+            self.prefetcher.put(prefetch_key(panel, selection, df), prepared)
+
+        sampled = page.df
+        page.df = df
+        self._redraw(page)
+        page.df = sampled
+
+        pub.sendMessage("LOG_MESSAGE", log_message="Plotted from the full data")
+
 
 if __name__ == "__main__":
     # Test for individual panel layout
     app = wx.App(0)
     frame = wx.Frame(None, wx.ID_ANY)
-    fa = CanvasPanel(frame)
-    fa.draw2()
+    fa = PlotPanel(frame)
     frame.Show()
     app.MainLoop()
@@ -0,0 +1,284 @@
+"""
+Plot state of an axes: artists kept across redraws and updated in place.
+
+Clearing the axes and rebuilding every artist, tick and label on each
+selection is what makes the plots slow to follow the drop-down menus. A
+`PlotState` keeps the data artists of an axes (bars, points, image, ...) so
+a panel only pushes new data into them (`set_data`, `set_verts`, ...).
+
+Drawing renders the static part of the figure (axes, ticks, labels) once
+into a cached background, then draws the data artists on top and blits the
+result. When the next update leaves the static part untouched (same limits,
+labels and canvas size), only the data artists are drawn over the cached
+background.
+"""
+
+import numpy as np
+
+from matplotlib.collections import PolyCollection
+
+try:
+    # local import
+    from stats import get_profile
+except (ModuleNotFoundError, ImportError):
+    # Package import
+    from dshelper.stats import get_profile
+
+
+def bar_vertices(lefts, rights, heights):
+    """
+    Build the vertices of bars standing on y = 0.
+
+    Args:
+        lefts --> numpy array: left edge of each bar
+        rights --> numpy array: right edge of each bar
+        heights --> numpy array: height of each bar
+    Returns:
+        vertices --> numpy array: (n_bars, 4, 2) corners of each bar
+    """
+
+    lefts = np.asarray(lefts, dtype=np.float64)
+    rights = np.asarray(rights, dtype=np.float64)
+    heights = np.asarray(heights, dtype=np.float64)
+
+    vertices = np.zeros((len(lefts), 4, 2))
+    vertices[:, 0, 0] = vertices[:, 1, 0] = lefts
+    vertices[:, 2, 0] = vertices[:, 3, 0] = rights
+    vertices[:, 1, 1] = vertices[:, 2, 1] = heights
+
+    return vertices
+
+
+def make_bars(axes, color="C0"):
+    """
+    Add an (empty) bar collection to an axes, one artist for all the bars.
+
+    Args:
+        axes --> matplotlib axes
+        color --> string: face colour of the bars
+    Returns:
+        bars --> PolyCollection: update with `bars.set_verts(bar_vertices(...))`
+    """
+
+    bars = PolyCollection([], facecolors=color, edgecolors="white", linewidths=0.5)
+    axes.add_collection(bars)
+
+    return bars
+
+
+def swap_figure(canvas, figure):
+    """
+    Show another figure on a canvas (e.g. a figure kept by the render
+    cache), at the size of the canvas.
+
+    Args:
+        canvas --> FigureCanvas: the canvas
+        figure --> matplotlib figure: the figure to show
+    Returns: None
+    """
+
+    if canvas.figure is figure:
+        return
+
+    figure.set_size_inches(canvas.figure.get_size_inches(), forward=False)
+    figure.set_canvas(canvas)
+    canvas.figure = figure
+
+
+def sample_label(df):
+    """Description of the plotted sample, None when df is the full data"""
+
+    sample = get_profile(df).sample
+
+    return None if sample is None else sample.label()
+
+
+def sample_title(title, df):
+    """
+    Title of a plot, with the share of the rows shown when the plotted data
+    is a sample.
+
+    Args:
+        title --> string: title of the plot
+        df --> pandas dataframe: the plotted data
+    Returns:
+        title --> string
+    """
+
+    label = sample_label(df)
+
+    return title if label is None else "{} ({})".format(title, label)
+
+
+class PlotState:
+    """
+    Data artists of an axes, updated in place between redraws.
+
+    Args:
+        canvas --> FigureCanvas: the canvas showing the axes
+        axes --> matplotlib axes: the axes holding the artists
+    Returns: None
+    """
+
+    def __init__(self, canvas, axes):
+        self.canvas = canvas
+        self.axes = axes
+        self.figure = axes.figure
+
+        self.artists = {}  # key -> artist (or list of artists)
+        self.layout = None  # key of the kind of plot currently in the axes
+        self.background = None  # static part of the figure, without the artists
+        self.signature = None  # state of the static part of the background
+
+        self._rendering = False
+        self.canvas.mpl_connect("draw_event", self._on_draw)
+
+    def _on_draw(self, event):
+        # Any other draw (zoom, resize, ...) invalidates the background
+        if not self._rendering:
+            self.background = None
+
+    def get(self, key):
+        return self.artists.get(key)
+
+    def add(self, key, artist):
+        """Keep an artist (or a list of artists) for the next redraws"""
+
+        self.artists[key] = artist
+
+        return artist
+
+    def _iter_artists(self):
+        for artist in self.artists.values():
+            if isinstance(artist, list):
+                yield from artist
+            else:
+                yield artist
+
+    def reset(self):
+        """Clear the axes and forget the artists"""
+
+        self.axes.clear()
+        self.artists = {}
+        self.layout = None
+        self.background = None
+
+    def use_layout(self, layout):
+        """
+        Reset the axes when the kind of plot changes (e.g. categorical to
+        numeric axis), the artists are kept otherwise.
+
+        Args:
+            layout --> hashable: key of the kind of plot
+        Returns:
+            bool: whether the axes was reset
+        """
+
+        if layout == self.layout:
+            return False
+
+        self.reset()
+        self.layout = layout
+
+        return True
+
+    def set_labels(self, title=None, xlabel=None, ylabel=None):
+        """Set the title and axis labels, only when they changed"""
+
+        if title is not None and self.axes.get_title() != title:
+            self.axes.set_title(title)
+        if xlabel is not None and self.axes.get_xlabel() != xlabel:
+            self.axes.set_xlabel(xlabel)
+        if ylabel is not None and self.axes.get_ylabel() != ylabel:
+            self.axes.set_ylabel(ylabel)
+
+    def _signature(self, extra):
+        return (
+            tuple(self.axes.get_xlim()),
+            tuple(self.axes.get_ylim()),
+            self.axes.get_title(),
+            self.axes.get_xlabel(),
+            self.axes.get_ylabel(),
+            self.canvas.get_width_height(),
+            extra,
+        )
+
+    def draw(self, extra=None):
+        """
+        Draw the figure. The data artists are blitted over the cached
+        background when the static part did not change.
+
+        Args:
+            extra --> hashable: other state of the static part (e.g. tick
+                labels or colour limits), a change forces a full draw
+        Returns:
+            bool: whether the cached background was used
+        """
+
+        signature = self._signature(extra)
+        artists = list(self._iter_artists())
+
+        if not self.canvas.supports_blit:
+            self.canvas.draw()
+            return False
+
+        blitted = self.background is not None and signature == self.signature
+        if blitted:
+            self.canvas.restore_region(self.background)
+        else:
+            # Render the static part only, and keep it as the background
+            visible = [artist.get_visible() for artist in artists]
+            for artist in artists:
+                artist.set_visible(False)
+
+            self._rendering = True
+            try:
+                renderer = self.canvas.get_renderer()
+                renderer.clear()
+                self.figure.draw(renderer)
+            finally:
+                self._rendering = False
+
+            self.background = self.canvas.copy_from_bbox(self.figure.bbox)
+            self.signature = signature
+            for artist, was_visible in zip(artists, visible):
+                artist.set_visible(was_visible)
+
+        for artist in artists:
+            if artist.get_visible():
+                self.axes.draw_artist(artist)
+        self.canvas.blit()
+
+        return blitted
+
+    def snapshot(self):
+        """
+        Get the rendered figure and its background, for the render cache.
+
+        Returns:
+            snapshot --> dict or None when the canvas does not blit
+        """
+
+        if not self.canvas.supports_blit or self.background is None:
+            return None
+
+        return {
+            "image": self.canvas.copy_from_bbox(self.figure.bbox),
+            "background": self.background,
+            "signature": self.signature,
+        }
+
+    def restore(self, snapshot):
+        """
+        Show a rendered figure again. The artists, limits and labels must be
+        set back to the state of the snapshot beforehand.
+
+        Args:
+            snapshot --> dict: built by `snapshot()`
+        Returns: None
+        """
+
+        self.canvas.restore_region(snapshot["image"])
+        self.canvas.blit()
+        self.background = snapshot["background"]
+        self.signature = snapshot["signature"]
@@ -0,0 +1,255 @@
+"""
+Speculative prefetch of the next selections of the plot panels.
+
+Users step through the columns of a drop-down menu in order (arrow keys),
+so once a plot is drawn, the plot data of the neighbouring selections
+(column i-1 and i+1 of the menu that was changed) is computed by a
+background worker. When the user gets there, the panel takes the prepared
+data instead of computing it.
+
+The prefetch is bounded: `depth` neighbours on each side, and only the
+`max_entries` most recent speculations are kept (older ones not started
+yet are dropped). Hits and misses are counted per panel and the hit rate is
+reported in the log.
+"""
+
+import threading
+from collections import Counter, OrderedDict
+
+from pubsub import pub
+
+try:
+    # local import
+    from stats import get_profile
+except (ModuleNotFoundError, ImportError):
+    # Package import
+    from dshelper.stats import get_profile
+
+# Neighbours prefetched on each side of the drawn selection
+DEFAULT_DEPTH = 1
+
+# Prepared selections kept, the oldest ones are dropped
+MAX_ENTRIES = 8
+
+# Selections of a panel between two reports of its hit rate
+REPORT_INTERVAL = 20
+
+# Seconds the GUI waits for a selection being prepared, before preparing it
+# itself
+TAKE_TIMEOUT = 0.5
+
+
+def prefetch_key(panel, selection, df):
+    """
+    Build the key of a selection of a panel for the plotted data.
+
+    Args:
+        panel --> string: name of the panel
+        selection --> tuple: the selected columns (and other plot options)
+        df --> pandas dataframe: the plotted data, for its profile version
+    Returns:
+        key --> tuple
+    """
+
+    profile = get_profile(df)
+
+    return (panel, tuple(selection), id(profile), profile.version)
+
+
+def neighbour_selections(columns, selection, position, depth=DEFAULT_DEPTH):
+    """
+    Selections with the column at one position replaced by its neighbours
+    in the menu, nearest first.
+
+    Args:
+        columns --> list: the columns of the menu, in order
+        selection --> tuple: the drawn selection
+        position --> int: position of the stepped column in the selection
+        depth --> int: number of neighbours on each side
+    Returns:
+        selections --> list: the neighbouring selections
+    """
+
+    try:
+        index = columns.index(selection[position])
+    except ValueError:
+        return []
+
+    selections = []
+    for step in range(1, depth + 1):
+        for neighbour in (index + step, index - step):
+            if 0 <= neighbour < len(columns):
+                neighbour_selection = list(selection)
+                neighbour_selection[position] = columns[neighbour]
+                selections.append(tuple(neighbour_selection))
+
+    return selections
+
+
+class _Prepared:
+    """A selection being prepared by the worker"""
+
+    def __init__(self, prepare, prefetched=True):
+        self.prepare = prepare
+        self.prefetched = prefetched  # False when handed over by `put`
+        self.done = threading.Event()
+        self.started = False
+        self.result = None
+
+
+class Prefetcher:
+    """
+    Background worker preparing the plot data of likely next selections,
+    shared by the plot panels.
+
+    Args:
+        depth --> int: neighbours prefetched on each side of a selection
+        max_entries --> int: prepared selections kept
+        take_timeout --> float: seconds `take` waits for a selection being
+            prepared
+    Returns: None
+    """
+
+    def __init__(
+        self, depth=DEFAULT_DEPTH, max_entries=MAX_ENTRIES, take_timeout=TAKE_TIMEOUT
+    ):
+        self.depth = depth
+        self.max_entries = max_entries
+        self.take_timeout = take_timeout
+        self.hits = Counter()  # panel -> selections found prepared
+        self.misses = Counter()  # panel -> selections computed on request
+
+        self._entries = OrderedDict()  # key -> _Prepared
+        self._condition = threading.Condition()
+        self._worker = None
+
+    def prefetch(self, key, prepare):
+        """
+        Prepare a selection in the background.
+
+        Args:
+            key --> tuple: key built by `prefetch_key`
+            prepare --> callable: computes the plot data of the selection
+                (called in the worker thread, must not touch the widgets)
+        Returns: None
+        """
+
+        with self._condition:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return
+
+            self._entries[key] = _Prepared(prepare)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._condition.notify()
+
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._work, daemon=True)
+            self._worker.start()
+
+    def put(self, key, result):
+        """
+        Hand over plot data prepared elsewhere (e.g. computed on the full
+        data in a worker thread), taken by the next draw of the selection.
+        It is not counted as a prefetch hit.
+
+        Args:
+            key --> tuple: key built by `prefetch_key`
+            result --> the output of `prepare` for the selection
+        Returns: None
+        """
+
+        entry = _Prepared(None, prefetched=False)
+        entry.started = True
+        entry.result = result
+        entry.done.set()
+
+        with self._condition:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def take(self, key):
+        """
+        Get the prepared plot data of a selection, waiting for it (up to
+        `take_timeout` seconds) when it is being prepared. Counts a hit or a
+        miss for the panel. Call from the GUI thread.
+
+        Args:
+            key --> tuple: key built by `prefetch_key`
+        Returns:
+            result --> the output of `prepare`, None when the selection was
+                not prefetched, failed or is still being prepared (the caller
+                prepares it)
+        """
+
+        with self._condition:
+            entry = self._entries.pop(key, None)
+
+        panel = key[0]
+        if (
+            entry is None
+            or not entry.started
+            or not entry.done.wait(self.take_timeout)
+        ):
+            # Not prefetched, not reached by the worker yet, or too slow
+            self.misses[panel] += 1
+            self._report(panel)
+            return None
+
+        if entry.prefetched:
+            self.hits[panel] += 1
+            self._report(panel)
+
+        return entry.result
+
+    def hit_rate(self, panel):
+        """Share of the selections of a panel found prepared, None before any"""
+
+        total = self.hits[panel] + self.misses[panel]
+
+        return self.hits[panel] / total if total else None
+
+    def clear(self):
+        """Drop the prepared selections (e.g. the data changed)"""
+
+        with self._condition:
+            self._entries.clear()
+
+    def _next(self):
+        with self._condition:
+            while True:
+                for entry in self._entries.values():
+                    if not entry.started:
+                        entry.started = True
+                        return entry
+                self._condition.wait()
+
+    def _work(self):
+        while True:
+            entry = self._next()
+            try:
+                entry.result = self._prepare(entry)
+            finally:
+                # `take` never waits for a selection the worker left
+                entry.done.set()
+
+    @staticmethod
+    def _prepare(entry):
+        try:
+            return entry.prepare()
+        except Exception:
+            # Computed again (and reported) when the selection is drawn
+            return None
+
+    def _report(self, panel):
+        total = self.hits[panel] + self.misses[panel]
+        if total % REPORT_INTERVAL:
+            return
+
+        _log_message = "\nPrefetch hit rate of the {} plot: {:.0%} ({} of {})".format(
+            panel.replace("_", " "), self.hit_rate(panel), self.hits[panel], total
+        )
+        pub.sendMessage("LOG_MESSAGE", log_message=_log_message)
@@ -0,0 +1,138 @@
+"""
+LRU cache of rendered plots.
+
+An entry holds what a panel needs to show a selection again without reading
+the data: the computed plot data (points, bin counts, figures) and the
+rendered bitmap of the canvas. Entries are keyed by the panel, the selected
+columns, the version of the data and the size of the canvas, and the least
+recently used entries are dropped once the memory budget is exceeded.
+"""
+
+from collections import OrderedDict
+
+try:
+    # local import
+    from stats import artifact_memory
+except (ModuleNotFoundError, ImportError):
+    # Package import
+    from dshelper.stats import artifact_memory
+
+DEFAULT_MAX_BYTES = 256 * 1024 ** 2
+
+# Bytes per pixel of the rendered (RGBA) bitmaps
+PIXEL_BYTES = 4
+
+
+def bitmap_bytes(canvas):
+    """Memory of a rendered bitmap of the canvas"""
+
+    width, height = canvas.get_width_height()
+
+    return width * height * PIXEL_BYTES
+
+
+def render_key(panel, columns, profile, canvas):
+    """
+    Build the key of a rendered selection.
+
+    Args:
+        panel --> string: name of the panel
+        columns --> tuple: the selected columns (and other plot options)
+        profile --> DataProfile: profile of the plotted data, for its version
+        canvas --> FigureCanvas: the canvas, for its size
+    Returns:
+        key --> tuple
+    """
+
+    return (panel, tuple(columns), id(profile), profile.version, canvas.get_width_height())
+
+
+class RenderCache:
+    """
+    Rendered plots kept within a memory budget, least recently used first out.
+
+    Args:
+        max_bytes --> int: memory budget of the cache
+    Returns: None
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+
+        self._entries = OrderedDict()  # key -> (entry, bytes)
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        # Not counted as a hit or a miss, nor marked as used
+        return key in self._entries
+
+    def get(self, key):
+        """
+        Get the entry of a key and mark it as recently used.
+
+        Args:
+            key --> tuple: key built by `render_key`
+        Returns:
+            entry --> dict or None when not cached
+        """
+
+        item = self._entries.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._entries.move_to_end(key)
+
+        return item[0]
+
+    def put(self, key, entry, nbytes=None):
+        """
+        Store an entry, dropping the least recently used entries when over
+        the budget. An entry larger than the whole budget is not stored.
+
+        Args:
+            key --> tuple: key built by `render_key`
+            entry --> dict: plot data and rendered bitmaps
+            nbytes --> int: memory of the entry, estimated from its arrays
+                when None (bitmaps must be accounted by the caller)
+        Returns: None
+        """
+
+        if nbytes is None:
+            nbytes = artifact_memory(entry)
+
+        self.pop(key)
+        if nbytes > self.max_bytes:
+            return
+
+        self._entries[key] = (entry, nbytes)
+        self.nbytes += nbytes
+        self.evict()
+
+    def pop(self, key):
+        item = self._entries.pop(key, None)
+        if item is not None:
+            self.nbytes -= item[1]
+
+    def evict(self):
+        """Drop the least recently used entries until within the budget"""
+
+        while self.nbytes > self.max_bytes and self._entries:
+            _, (_, nbytes) = self._entries.popitem(last=False)
+            self.nbytes -= nbytes
+
+    def resize(self, max_bytes):
+        """Change the memory budget"""
+
+        self.max_bytes = max_bytes
+        self.evict()
+
+    def clear(self):
+        self._entries.clear()
+        self.nbytes = 0
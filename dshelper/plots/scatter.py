@@ -2,6 +2,8 @@ import sys
 
 import wx
 
+import numpy as np
+
 from pubsub import pub
 
 import matplotlib
@@ -17,6 +19,7 @@ except ImportError:
 from matplotlib.backends.backend_wxagg import FigureCanvasWxAgg as FigureCanvas
 from matplotlib.backends.backend_wx import NavigationToolbar2Wx as NavigationToolbar
 from matplotlib.figure import Figure
+from pandas.api.types import is_bool_dtype, is_numeric_dtype
 
 try:
     # local import
@@ -25,6 +28,17 @@ except (ModuleNotFoundError, ImportError):
     # Package import
     from dshelper.components import create_bitmap_dropdown_menu
 
+try:
+    # local import
+    from stats import get_profile
+except (ModuleNotFoundError, ImportError):
+    # Package import
+    from dshelper.stats import get_profile
+
+from .plot_state import PlotState, sample_title
+from .prefetch import Prefetcher, neighbour_selections, prefetch_key
+from .render_cache import RenderCache, bitmap_bytes, render_key
+
 
 class ScatterPanel(wx.Panel):
     """
@@ -32,19 +46,26 @@ class ScatterPanel(wx.Panel):
 
     Args:
         df --> pandas dataframe: passed internally for plotting
+        render_cache --> RenderCache: rendered plots shared by the panels
+        prefetcher --> Prefetcher: prepares the neighbouring pairs of the
+            menus in the background
 
     Returns: None
     """
 
-    def __init__(self, parent, df=None):
+    def __init__(self, parent, df=None, render_cache=None, prefetcher=None):
         wx.Panel.__init__(self, parent)
 
         self.df = df
         self.available_columns = list(self.df.columns)
+        self.render_cache = render_cache if render_cache is not None else RenderCache()
+        self.prefetcher = prefetcher if prefetcher is not None else Prefetcher()
+        self.stepped_axis = 1  # Position of the last changed column menu
 
         self.figure = Figure()
         self.axes = self.figure.add_subplot(111)
         self.canvas = FigureCanvas(self, -1, self.figure)
+        self.plot_state = PlotState(self.canvas, self.axes)
 
         self.toolbar = NavigationToolbar(self.canvas)
 
@@ -83,6 +104,10 @@ class ScatterPanel(wx.Panel):
         selected_column_x = self.column_x.GetStringSelection()
         selected_column_y = self.column_y.GetStringSelection()
 
+        menu = event.GetEventObject() if event is not None else None
+        if menu in (self.column_x, self.column_y):
+            self.stepped_axis = 0 if menu is self.column_x else 1
+
         if selected_column_x and selected_column_y:
             self.draw_scatter(
                 selected_column_x,
@@ -90,6 +115,68 @@ class ScatterPanel(wx.Panel):
                 self.df[selected_column_x],
                 self.df[selected_column_y],
             )
+            if event is not None:
+                self.prefetch_neighbours((selected_column_x, selected_column_y))
+
+    def prefetch_neighbours(self, selection):
+        """
+        Prepares the points of the pairs next to the selected one in the
+        background: the column of the last changed menu is replaced by its
+        neighbours in the menu. Only the numeric pairs not rendered yet are
+        prefetched.
+
+        Args:
+            selection --> tuple: the selected x and y columns
+        Returns: None
+        """
+
+        df = self.df
+        profile = get_profile(df)
+        for neighbour in neighbour_selections(
+            self.available_columns, selection, self.stepped_axis, self.prefetcher.depth
+        ):
+            if not all(_is_numeric(df[column]) for column in neighbour):
+                continue
+            key = render_key("scatter", neighbour, profile, self.canvas)
+            if key in self.render_cache:
+                continue
+            self.prefetcher.prefetch(
+                prefetch_key("scatter", neighbour, df),
+                lambda neighbour=neighbour: ScatterPanel.prepare(df, neighbour),
+            )
+
+    def selection(self):
+        """The selected x and y columns, None without both"""
+
+        selected_column_x = self.column_x.GetStringSelection()
+        selected_column_y = self.column_y.GetStringSelection()
+        if not (selected_column_x and selected_column_y):
+            return None
+
+        return selected_column_x, selected_column_y
+
+    @staticmethod
+    def prepare(df, selection):
+        """
+        Reads the points of a numeric pair, can be called from a worker
+        thread.
+
+        Args:
+            df --> pandas dataframe: the data to be plotted
+            selection --> tuple: the x and y columns
+        Returns:
+            points --> tuple: float64 x and y values (NaN for null), None
+                for a pair with a non-numeric column
+        """
+
+        column_x, column_y = selection
+        if not (_is_numeric(df[column_x]) and _is_numeric(df[column_y])):
+            return None
+
+        return (
+            df[column_x].to_numpy(dtype=np.float64, na_value=np.nan),
+            df[column_y].to_numpy(dtype=np.float64, na_value=np.nan),
+        )
 
     def draw_scatter(self, column_x, column_y, data_x, data_y):
         """
@@ -106,21 +193,98 @@ class ScatterPanel(wx.Panel):
         Returns: None
         """
 
-        # Reset plot first
-        self.axes.clear()
+        # A recently plotted pair is shown again from the render cache
+        key = render_key(
+            "scatter", (column_x, column_y), get_profile(self.df), self.canvas
+        )
+        entry = self.render_cache.get(key)
+        if entry is not None:
+            self._restore(entry, column_x, column_y)
+            return
+
+        # Numeric points are moved in place, other types (strings, dates)
+        # go through the units of matplotlib and need a fresh axes
+        if _is_numeric(data_x) and _is_numeric(data_y):
+            self.plot_state.use_layout("numeric")
+            # The points of a prefetched pair are ready
+            prepared = self.prefetcher.take(
+                prefetch_key("scatter", (column_x, column_y), self.df)
+            )
+            if prepared is not None:
+                data_x, data_y = prepared
+            else:
+                data_x, data_y = self.prepare(self.df, (column_x, column_y))
+        else:
+            self.plot_state.reset()
 
         try:
-            self.axes.plot(data_x, data_y, "o")
+            points = self.plot_state.get("points")
+            if points is None:
+                (points,) = self.axes.plot(data_x, data_y, "o")
+                self.plot_state.add("points", points)
+            else:
+                points.set_data(data_x, data_y)
+            self.axes.relim()
+            self.axes.autoscale_view()
         except ValueError as e:
             # log action
             _log_message = "\nScatter plot failed due to error:\n--> {}".format(e)
             pub.sendMessage("LOG_MESSAGE", log_message=_log_message)
+            key = None
 
         # Set plot style
-        self.axes.set_title("Scatter Plot for {} and {}".format(column_x, column_y))
-        self.axes.set_ylabel(column_y)
-        self.axes.set_xlabel(column_x)
-        self.canvas.draw()
+        self.plot_state.set_labels(
+            title=sample_title(
+                "Scatter Plot for {} and {}".format(column_x, column_y), self.df
+            ),
+            xlabel=column_x,
+            ylabel=column_y,
+        )
+        self.plot_state.draw()
+
+        snapshot = self.plot_state.snapshot()
+        if key is not None and snapshot is not None and self.plot_state.layout == "numeric":
+            entry = {
+                "x": data_x,
+                "y": data_y,
+                "xlim": self.axes.get_xlim(),
+                "ylim": self.axes.get_ylim(),
+                "snapshot": snapshot,
+            }
+            self.render_cache.put(
+                key,
+                entry,
+                # The points are usually views of the data, only their own
+                # size is accounted (the data is kept alive anyway)
+                np.asarray(data_x).nbytes
+                + np.asarray(data_y).nbytes
+                + 2 * bitmap_bytes(self.canvas),
+            )
+
+    def _restore(self, entry, column_x, column_y):
+        """
+        Shows a cached scatter plot: the points and limits are put back and
+        the rendered bitmap is blitted, nothing is read from the data.
+        """
+
+        self.plot_state.use_layout("numeric")
+        points = self.plot_state.get("points")
+        if points is None:
+            (points,) = self.axes.plot(entry["x"], entry["y"], "o")
+            self.plot_state.add("points", points)
+        else:
+            points.set_data(entry["x"], entry["y"])
+
+        self.axes.set_xlim(entry["xlim"])
+        self.axes.set_ylim(entry["ylim"])
+        self.plot_state.set_labels(
+            title=sample_title(
+                "Scatter Plot for {} and {}".format(column_x, column_y), self.df
+            ),
+            xlabel=column_x,
+            ylabel=column_y,
+        )
+        self.plot_state.restore(entry["snapshot"])
 
     def update_available_column(self, available_columns):
         """
@@ -138,3 +302,7 @@ class ScatterPanel(wx.Panel):
         for column in self.available_columns:
             self.column_x.Append(column)
             self.column_y.Append(column)
+
+
+def _is_numeric(series):
+    return is_numeric_dtype(series) and not is_bool_dtype(series)
@@ -0,0 +1,338 @@
+import sys
+import threading
+
+import wx
+
+import numpy as np
+import pandas as pd
+
+from pubsub import pub
+
+import matplotlib
+if 'linux' not in sys.platform:
+    matplotlib.use("WXAgg")
+
+try:
+    import seaborn
+    seaborn.set()
+except ImportError:
+    pass
+
+import matplotlib.dates as mdates
+from matplotlib.backends.backend_wxagg import FigureCanvasWxAgg as FigureCanvas
+from matplotlib.backends.backend_wx import NavigationToolbar2Wx as NavigationToolbar
+from matplotlib.figure import Figure
+from pandas.api.types import is_bool_dtype, is_numeric_dtype
+
+try:
+    # local import
+    from components import create_bitmap_dropdown_menu
+    from stats import RESAMPLE_FUNCTIONS, get_profile, is_datetime_column, lttb, resample
+except (ModuleNotFoundError, ImportError):
+    # Package import
+    from dshelper.components import create_bitmap_dropdown_menu
+    from dshelper.stats import (
+        RESAMPLE_FUNCTIONS, get_profile, is_datetime_column, lttb, resample
+    )
+
+from .plot_state import sample_title
+
+# Resampling rules offered in the drop-down, label -> pandas offset alias
+RESAMPLE_RULES = {
+    "No resampling": None,
+    "1 second": "1s",
+    "1 minute": "1min",
+    "1 hour": "1h",
+    "1 day": "1D",
+    "1 week": "7D",
+}
+
+# Minimum number of points kept by the downsampling
+MIN_POINTS = 200
+
+
+def _to_datetime(nanoseconds):
+    return np.asarray(nanoseconds, dtype=np.int64).view("datetime64[ns]")
+
+
+def _to_nanoseconds(date_number):
+    """Matplotlib date number (axis limit) to int64 nanoseconds"""
+
+    date = mdates.num2date(date_number).replace(tzinfo=None)
+    return pd.Timestamp(date).value
+
+
+class TimeSeriesPanel(wx.Panel):
+    """
+    A panel displays a numeric column over a date column as a line.
+
+    The date column is sorted once into a time index. The points of the
+    visible time window are resampled (optional) and downsampled with LTTB
+    to about one point per pixel, zooming re-reads the full resolution
+    points of the zoomed window.
+
+    Args:
+        df --> pandas dataframe: passed internally for plotting
+
+    Returns: None
+    """
+
+    def __init__(self, parent, df=None):
+        wx.Panel.__init__(self, parent)
+
+        self.df = df
+        self.available_columns = list(self.df.columns)
+
+        # Current series: (df, time column, value column, index, sorted values)
+        self.series = None
+        self.loading = False  # Flag for background sorting
+        self.zoom_callback = None
+        self.refine_pending = False
+        self.line = None
+
+        self.figure = Figure()
+        self.axes = self.figure.add_subplot(111)
+        self.canvas = FigureCanvas(self, -1, self.figure)
+        self.toolbar = NavigationToolbar(self.canvas)
+
+        # Drop-down select boxes
+        self.text_time = wx.StaticText(self, label="Time:")
+        self.text_value = wx.StaticText(self, label="Value:")
+        self.time_column = create_bitmap_dropdown_menu(
+            self, self._time_columns(self.available_columns), self.df
+        )
+        self.value_column = create_bitmap_dropdown_menu(
+            self, self._value_columns(self.available_columns), self.df
+        )
+        self.Bind(wx.EVT_COMBOBOX, self.column_selected)
+
+        self.text_resample = wx.StaticText(self, label="Resample:")
+        self.resample_rule = wx.Choice(self, choices=list(RESAMPLE_RULES))
+        self.resample_rule.SetSelection(0)
+        self.resample_how = wx.Choice(self, choices=list(RESAMPLE_FUNCTIONS))
+        self.resample_how.SetSelection(0)
+        self.resample_rule.Bind(wx.EVT_CHOICE, self.resample_selected)
+        self.resample_how.Bind(wx.EVT_CHOICE, self.resample_selected)
+
+        button_sizer = wx.BoxSizer(wx.HORIZONTAL)
+        button_sizer.Add(self.text_time, 0, wx.ALL | wx.ALIGN_CENTER, 5)
+        button_sizer.Add(self.time_column, 0, wx.ALL | wx.ALIGN_CENTER, 5)
+        button_sizer.Add(self.text_value, 0, wx.ALL | wx.ALIGN_CENTER, 5)
+        button_sizer.Add(self.value_column, 0, wx.ALL | wx.ALIGN_CENTER, 5)
+        button_sizer.Add(self.text_resample, 0, wx.ALL | wx.ALIGN_CENTER, 5)
+        button_sizer.Add(self.resample_rule, 0, wx.ALL | wx.ALIGN_CENTER, 5)
+        button_sizer.Add(self.resample_how, 0, wx.ALL | wx.ALIGN_CENTER, 5)
+        button_sizer.Add(self.toolbar, 0, wx.ALL, 5)
+
+        sizer = wx.BoxSizer(wx.VERTICAL)
+        sizer.Add(self.canvas, 1, wx.LEFT | wx.TOP | wx.GROW)
+        sizer.Add(button_sizer)
+        self.SetSizer(sizer)
+        self.Fit()
+
+        pub.subscribe(self.update_available_column, "UPDATE_DISPLAYED_COLUMNS")
+
+    def _time_columns(self, columns):
+        return [column for column in columns if is_datetime_column(self.df[column])]
+
+    def _value_columns(self, columns):
+        return [
+            column for column in columns
+            if is_numeric_dtype(self.df[column]) and not is_bool_dtype(self.df[column])
+        ]
+
+    def column_selected(self, event):
+        """
+        Function responses to select column from dropdown menu.
+        It only triggers plot when both columns are selected from the dropdown menu
+        """
+
+        time_column = self.time_column.GetStringSelection()
+        value_column = self.value_column.GetStringSelection()
+
+        if time_column and value_column and not self.loading:
+            self.loading = True
+            _log_message = "\nSorting '{}' for the time series plot ...".format(
+                time_column
+            )
+            pub.sendMessage("LOG_MESSAGE", log_message=_log_message)
+            threading.Thread(
+                target=self._load_series,
+                args=(self.df, time_column, value_column),
+                daemon=True,
+            ).start()
+
+    def selection(self):
+        """The selected time and value columns, None without both"""
+
+        time_column = self.time_column.GetStringSelection()
+        value_column = self.value_column.GetStringSelection()
+
+        return (time_column, value_column) if time_column and value_column else None
+
+    @staticmethod
+    def prepare(df, selection):
+        """
+        Sorts the time column of a selection (cached in the profile), can be
+        called from a worker thread.
+
+        Args:
+            df --> pandas dataframe: the data to be plotted
+            selection --> tuple: output of `selection()`
+        Returns: None
+        """
+
+        get_profile(df).time_indexes.get(selection[0])
+
+    def _load_series(self, df, time_column, value_column):
+        """
+        Sorts the date column (cached in the profile) and the values in
+        time order, in a worker thread.
+        """
+
+        try:
+            index = get_profile(df).time_indexes.get(time_column)
+            values = df[value_column].to_numpy(dtype=np.float64, na_value=np.nan)
+            values = values[index.order]
+        except (ValueError, TypeError) as e:
+            _log_message = "\nTime series plot failed due to error:\n--> {}".format(e)
+            wx.CallAfter(pub.sendMessage, "LOG_MESSAGE", log_message=_log_message)
+            wx.CallAfter(self._loaded, None)
+            return
+
+        wx.CallAfter(self._loaded, (df, time_column, value_column, index, values))
+
+    def _loaded(self, series):
+        self.loading = False
+        if series is not None:
+            self.series = series
+            self.draw_series()
+
+    def resample_selected(self, event):
+        """
+        Function responses to changing the resampling rule or function.
+        """
+
+        if self.series is not None:
+            self.draw_series()
+
+    def draw_series(self):
+        """
+        Function that draws the full time range of the current series.
+        """
+
+        df, time_column, value_column, index, _ = self.series
+
+        # Reset plot first
+        if self.zoom_callback is not None:
+            self.axes.callbacks.disconnect(self.zoom_callback)
+            self.zoom_callback = None
+        self.axes.clear()
+        (self.line,) = self.axes.plot([], [], linewidth=1)
+
+        if len(index):
+            start, stop = index.times[0], index.times[-1]
+            self._update_line(start, stop)
+            self.axes.set_xlim(
+                mdates.date2num(_to_datetime([start, max(stop, start + 1)]))
+            )
+            self.axes.relim()
+            self.axes.autoscale_view(scalex=False)
+        self.axes.xaxis_date()
+        self.figure.autofmt_xdate()
+
+        # Set plot info
+        self.axes.set_title(
+            sample_title("Time Series Plot for {}".format(value_column), df)
+        )
+        self.axes.set_xlabel(time_column)
+        self.axes.set_ylabel(value_column)
+        self.canvas.draw()
+
+        # Re-read the full resolution points when zooming with the toolbar
+        self.zoom_callback = self.axes.callbacks.connect(
+            "xlim_changed", self.xlim_changed
+        )
+
+    def _update_line(self, start, stop):
+        """
+        Puts the points of a time window on the line.
+
+        Args:
+            start --> int: first nanosecond of the window
+            stop --> int: last nanosecond of the window
+        Returns: None
+        """
+
+        _, _, _, index, values = self.series
+
+        lower, upper = index.window(start, stop)
+        times = index.times[lower:upper]
+        window = values[lower:upper]
+
+        rule = RESAMPLE_RULES[self.resample_rule.GetStringSelection()]
+        if rule is not None:
+            times, window = resample(
+                times,
+                window,
+                pd.Timedelta(rule).value,
+                self.resample_how.GetStringSelection(),
+            )
+        else:
+            valid = ~np.isnan(window)
+            times, window = times[valid], window[valid]
+
+        # About one point per pixel of the axes
+        budget = max(int(self.axes.bbox.width), MIN_POINTS)
+        keep = lttb(times, window, budget)
+
+        self.line.set_data(mdates.date2num(_to_datetime(times[keep])), window[keep])
+
+        _log_message = "Showing {} of {} points".format(len(keep), upper - lower)
+        pub.sendMessage("LOG_MESSAGE", log_message=_log_message)
+
+    def xlim_changed(self, axes):
+        """
+        Callback for zooming/panning, the visible window is re-read once the
+        toolbar action is finished.
+        """
+
+        if self.series is not None and not self.refine_pending:
+            self.refine_pending = True
+            wx.CallAfter(self.refine_zoomed)
+
+    def refine_zoomed(self):
+        """
+        Re-draws the line of the zoomed window from the full resolution data.
+        """
+
+        self.refine_pending = False
+        if self.series is None or self.line is None:
+            return
+
+        if self.series[0] is not self.df:
+            # Rows were appended, the series is sorted again
+            self.column_selected(None)
+            return
+
+        lower, upper = sorted(self.axes.get_xlim())
+        self._update_line(_to_nanoseconds(lower), _to_nanoseconds(upper))
+        self.canvas.draw_idle()
+
+    def update_available_column(self, available_columns):
+        """
+        Update dataframe used for plotting.
+
+        Args:
+            available_columns --> list: a list of available column headers
+
+        Returns: None
+        """
+
+        self.available_columns = available_columns
+        self.time_column.Clear()
+        self.value_column.Clear()
+        for column in self._time_columns(self.available_columns):
+            self.time_column.Append(column)
+        for column in self._value_columns(self.available_columns):
+            self.value_column.Append(column)
@@ -1,5 +1,6 @@
 import sys
 
+import numpy as np
 import pandas as pd
 from pubsub import pub
 from sklearn.preprocessing import LabelEncoder
@@ -16,6 +17,13 @@ except ImportError:
 
 import wx
 
+try:
+    # local import
+    from stats import binned_kde
+except (ModuleNotFoundError, ImportError):
+    # Package import
+    from dshelper.stats import binned_kde
+
 
 def prepare_data(df):
     """
@@ -103,6 +111,28 @@ def prepare_data(df):
     return df
 
 
+def draw_kde(axes, data, color):
+    """
+    Draws the shaded density of a column, estimated from the values binned
+    on the plotted grid (one pass over the data).
+
+    Args:
+        axes --> matplotlib axes: the axes to draw in
+        data --> 1D dataframe: the values
+        color --> string: colour of the curve
+    Returns: None
+    """
+
+    values = data.to_numpy(dtype=np.float64, na_value=np.nan)
+    grid, density = binned_kde(values)
+    if not len(grid):
+        # Fewer than two distinct values, there is no density to draw
+        return
+
+    axes.fill_between(grid, density, color=color, alpha=0.25, linewidth=0)
+    axes.plot(grid, density, color=color)
+
+
 def make_pair_plot(figure, df, column_name, available_columns):
     legend_labels = df[column_name].unique()
     legend_title = column_name
@@ -166,12 +196,10 @@ def make_pair_plot(figure, df, column_name, available_columns):
                 else:
                     # Diagonal locations, distribution plot
                     for num, value in enumerate(hue_values):
-                        sns.kdeplot(
+                        draw_kde(
+                            axes[y, x],
                             df[x_labels[x]][df[column_name] == value],
-                            ax=axes[y, x],
-                            color=legend_color[num],
-                            legend=False,
-                            shade=True,
+                            legend_color[num],
                         )
 
                         wx.Yield()
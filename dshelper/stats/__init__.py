@@ -0,0 +1,75 @@
+from .association import (  # noqa
+    AssociationEngine,
+    MAX_CATEGORIES,
+    cramers_v,
+    correlation_ratio,
+)
+from .correlation import (  # noqa
+    CorrelationEngine,
+    LARGE_MATRIX_THRESHOLD,
+    cluster_order,
+    correlation_dtype,
+    select_correlation_columns,
+)
+from .crosstab import CategoryCodes, TOP_CATEGORIES, crosstab, tick_label  # noqa
+from .describe import (  # noqa
+    EXACT_ROW_THRESHOLD,
+    KLLSketch,
+    approximate_describe,
+    describe,
+)
+from .frequency import (  # noqa
+    MAX_BARS,
+    FrequencySummary,
+    top_frequencies,
+)
+from .histogram import (  # noqa
+    DEFAULT_BINS,
+    FINE_BINS,
+    HistogramIndex,
+    supports_histogram_index,
+)
+from .kernels import (  # noqa
+    HAS_NUMBA,
+    binned_kde,
+    grid_counts,
+    histogram_1d,
+    kernel_values,
+    null_count,
+    value_range,
+)
+from .binning import (  # noqa
+    AGGREGATIONS,
+    HeatAxis,
+    aggregate_grid,
+    quantile_edges,
+    uniform_edges,
+)
+from .cardinality import bounded_nunique  # noqa
+from .duplicates import DuplicateSummary, find_duplicates  # noqa
+from .utils import ColumnCache  # noqa
+from .memory import artifact_memory, column_memory, format_memory  # noqa
+from .missing import (  # noqa
+    co_occurrence,
+    missingness_matrix,
+    null_counts,
+    pack_nulls,
+    popcount,
+)
+from .scheduler import PrecomputeScheduler  # noqa
+from .sampling import (  # noqa
+    DEFAULT_SAMPLE_SIZE,
+    SAMPLING_KINDS,
+    Sample,
+    draw_sample,
+    extend_sample,
+)
+from .profile import DataProfile, get_profile, release_profile  # noqa
+from .profile_cache import ProfileCache, fingerprint  # noqa
+from .timeseries import (  # noqa
+    RESAMPLE_FUNCTIONS,
+    TimeIndex,
+    is_datetime_column,
+    lttb,
+    resample,
+)
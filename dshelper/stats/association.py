@@ -0,0 +1,315 @@
+"""
+Association matrix of categorical and numeric columns.
+
+`df.corr()` only covers numeric columns. The association matrix measures
+every pair of columns on the scale it supports:
+
+- categorical x categorical: Cramér's V of their contingency table
+- categorical x numeric: correlation ratio (eta) of the numeric column
+  grouped by the categories
+- numeric x numeric: Pearson correlation (from the correlation engine)
+
+Categorical columns are factorized once into integer codes (nulls get the
+last code). The contingency tables of one column against a block of other
+columns are counted with a single `np.bincount` of `code_a * k_b + code_b`
+(the codes of the block are offset so their tables lie side by side), over
+chunks of rows. The pairs are computed in parallel and kept, so enabling a
+column only computes its own pairs.
+"""
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import (
+    is_bool_dtype, is_datetime64_any_dtype, is_numeric_dtype, is_timedelta64_dtype
+)
+
+from .cardinality import bounded_nunique
+from .correlation import CorrelationEngine
+from .utils import iter_chunks, parallel_map
+
+
+# Categorical columns with more distinct values are left out of the matrix
+MAX_CATEGORIES = 1000
+
+# Columns counted against one column in a single bincount
+CODE_BLOCK = 16
+
+# Rows counted at a time, bounds the (rows x block) temporary index
+ROW_CHUNK = 1 << 18
+
+
+def is_categorical_column(series):
+    """Whether a column is measured by its categories (object, category, bool)"""
+
+    if is_datetime64_any_dtype(series) or is_timedelta64_dtype(series):
+        return False
+
+    return is_bool_dtype(series) or not is_numeric_dtype(series)
+
+
+def encode_categories(series, max_categories=MAX_CATEGORIES):
+    """
+    Factorize a categorical column into integer codes.
+
+    Args:
+        series --> pandas series: the column
+        max_categories --> int: columns with more distinct values are skipped
+    Returns:
+        codes --> numpy array: int32 code of each row, nulls get the code
+            `n_categories`
+        n_categories --> int: number of distinct (non-null) values
+        (None, 0) is returned for columns with too many categories
+    """
+
+    if bounded_nunique(series, max_categories) > max_categories:
+        return None, 0
+
+    codes, uniques = pd.factorize(series)
+    n_categories = len(uniques)
+    codes = codes.astype(np.int32)
+    codes[codes < 0] = n_categories
+
+    return codes, n_categories
+
+
+def contingency_tables(codes, n_categories, others, row_chunk=ROW_CHUNK):
+    """
+    Count the contingency tables of a column against other columns, with one
+    bincount per chunk of rows.
+
+    Args:
+        codes --> numpy array: codes of the column (see `encode_categories`)
+        n_categories --> int: number of categories of the column
+        others --> list: (codes, n_categories) of the other columns
+        row_chunk --> int: number of rows counted at a time
+    Returns:
+        tables --> list: (n_categories + 1, k + 1) counts against each other
+            column, the last row and column count the nulls
+    """
+
+    widths = np.array([k + 1 for _, k in others], dtype=np.int64)
+    offsets = np.concatenate([[0], np.cumsum(widths)[:-1]])
+    total = int(widths.sum())
+
+    counts = np.zeros((n_categories + 1) * total, dtype=np.int64)
+    index = np.empty((len(others), min(row_chunk, len(codes))), dtype=np.int64)
+    for start, stop in iter_chunks(len(codes), row_chunk):
+        # One row of the index per other column, the order of the counted
+        # values does not matter
+        chunk = index[:, :stop - start]
+        for row, ((other, _), offset) in enumerate(zip(others, offsets)):
+            np.add(other[start:stop], offset, out=chunk[row])
+        chunk += codes[start:stop].astype(np.int64) * total
+        counts += np.bincount(chunk.ravel(), minlength=counts.size)
+
+    counts = counts.reshape(n_categories + 1, total)
+
+    return [
+        counts[:, offset:offset + width] for offset, width in zip(offsets, widths)
+    ]
+
+
+def cramers_v(table):
+    """
+    Cramér's V of a contingency table, the nulls (last row and column) are
+    left out.
+
+    Args:
+        table --> numpy array: counts from `contingency_tables`
+    Returns:
+        v --> float: between 0 (independent) and 1, NaN when a column has
+            fewer than two categories
+    """
+
+    table = table[:-1, :-1]
+    table = table[table.sum(axis=1) > 0][:, table.sum(axis=0) > 0]
+    n = table.sum()
+    dof = min(table.shape) - 1
+    if n == 0 or dof < 1:
+        return np.nan
+
+    expected = np.outer(table.sum(axis=1), table.sum(axis=0)) / n
+    chi2 = ((table - expected) ** 2 / expected).sum()
+
+    return float(min(np.sqrt(chi2 / n / dof), 1.0))
+
+
+def correlation_ratio(codes, n_categories, values):
+    """
+    Correlation ratio (eta) of a numeric column grouped by categories.
+
+    Args:
+        codes --> numpy array: codes of the categorical column
+        n_categories --> int: number of categories
+        values --> numpy array: float values of the numeric column, NaN for null
+    Returns:
+        eta --> float: between 0 and 1, NaN when the values are constant
+    """
+
+    valid = (codes < n_categories) & ~np.isnan(values)
+    codes = codes[valid]
+    values = values[valid]
+    if not len(values):
+        return np.nan
+
+    values = values - values.mean()
+    counts = np.bincount(codes, minlength=n_categories)
+    sums = np.bincount(codes, weights=values, minlength=n_categories)
+
+    total = np.dot(values, values)
+    if total <= 0:
+        return np.nan
+
+    filled = counts > 0
+    between = (sums[filled] ** 2 / counts[filled]).sum()
+
+    return float(min(np.sqrt(between / total), 1.0))
+
+
+class AssociationEngine:
+    """
+    Computes and caches the association of column pairs of a dataframe.
+
+    Args:
+        max_categories --> int: categorical columns with more distinct
+            values are left out
+        max_workers --> int: upper limit of the worker threads
+        on_change --> callable: called when new pairs are computed
+    Returns: None
+    """
+
+    def __init__(self, max_categories=MAX_CATEGORIES, max_workers=None, on_change=None):
+        self.max_categories = max_categories
+        self.max_workers = max_workers
+        self.on_change = on_change
+
+        self._codes = {}  # categorical column -> (codes, n_categories)
+        self._pairs = {}  # (column, column) -> association, both orders
+
+    def _encode(self, df, columns):
+        missing = [column for column in columns if column not in self._codes]
+        encoded = parallel_map(
+            lambda column: encode_categories(df[column], self.max_categories),
+            missing,
+            self.max_workers,
+        )
+        self._codes.update(zip(missing, encoded))
+
+    def compute(self, df, columns=None, correlation=None):
+        """
+        Get the association matrix of the selected columns. Only the pairs
+        that have not been computed before are computed.
+
+        Args:
+            df --> pandas dataframe: the data to be examined
+            columns --> list: column headers to use, None for all columns
+            correlation --> CorrelationEngine: computes (and caches) the
+                numeric pairs, a new engine when None
+        Returns:
+            matrix --> pandas dataframe: associations of the usable columns
+                (categorical columns with too many values, date columns
+                and the like are left out)
+        """
+
+        if columns is None:
+            columns = list(df.columns)
+
+        categorical = [column for column in columns if is_categorical_column(df[column])]
+        self._encode(df, categorical)
+        categorical = [
+            column for column in categorical if self._codes[column][0] is not None
+        ]
+        numeric = [
+            column for column in columns
+            if column not in categorical
+            and is_numeric_dtype(df[column])
+            and not is_categorical_column(df[column])
+        ]
+        usable = [
+            column for column in columns if column in categorical or column in numeric
+        ]
+
+        tasks = []
+        for num, column in enumerate(categorical):
+            # Each categorical pair once, in blocks of partners
+            partners = [
+                other for other in categorical[num + 1:]
+                if (column, other) not in self._pairs
+            ]
+            for start, stop in iter_chunks(len(partners), CODE_BLOCK):
+                tasks.append(("tables", column, partners[start:stop]))
+            tasks.extend(
+                ("ratio", column, other) for other in numeric
+                if (column, other) not in self._pairs
+            )
+
+        results = parallel_map(
+            lambda task: self._compute_task(df, task), tasks, self.max_workers
+        )
+        changed = bool(tasks)
+        for pairs in results:
+            for (first, second), value in pairs:
+                self._pairs[(first, second)] = self._pairs[(second, first)] = value
+
+        if len(numeric) > 1 and any(
+            (first, second) not in self._pairs
+            for num, first in enumerate(numeric) for second in numeric[num + 1:]
+        ):
+            if correlation is None:
+                correlation = CorrelationEngine(max_workers=self.max_workers)
+            corr = correlation.compute(df, columns=numeric, method="pearson")
+            for first in numeric:
+                for second in numeric:
+                    if first != second:
+                        self._pairs[(first, second)] = corr.at[first, second]
+            changed = True
+
+        if changed and self.on_change is not None:
+            self.on_change()
+
+        matrix = np.ones((len(usable), len(usable)))
+        for i, first in enumerate(usable):
+            for j, second in enumerate(usable):
+                if i != j:
+                    matrix[i, j] = self._pairs[(first, second)]
+
+        return pd.DataFrame(matrix, index=usable, columns=usable)
+
+    def _compute_task(self, df, task):
+        kind, column, other = task
+        codes, n_categories = self._codes[column]
+
+        if kind == "ratio":
+            values = df[other].to_numpy(dtype=np.float64, na_value=np.nan)
+            return [((column, other), correlation_ratio(codes, n_categories, values))]
+
+        tables = contingency_tables(
+            codes, n_categories, [self._codes[partner] for partner in other]
+        )
+
+        return [
+            ((column, partner), cramers_v(table)) for partner, table in zip(other, tables)
+        ]
+
+    def clear(self, columns=None):
+        """
+        Drop the cached codes and pairs.
+
+        Args:
+            columns --> list: only drop what involves these columns, None
+                for everything
+        Returns: None
+        """
+
+        if columns is None:
+            self._codes.clear()
+            self._pairs.clear()
+            return
+
+        columns = set(columns)
+        for column in columns:
+            self._codes.pop(column, None)
+        self._pairs = {
+            pair: value for pair, value in self._pairs.items()
+            if pair[0] not in columns and pair[1] not in columns
+        }
@@ -0,0 +1,243 @@
+"""
+Heat map grids: binned axes and aggregation of a value over two keys.
+
+Each axis of a heat map maps the rows of a column to integer cell codes:
+
+- categorical columns use their (cached) category codes
+- numeric columns are cut into uniform bins, or into quantile bins whose
+  edges come from a cached sorted sample of the column, so skewed data is
+  spread over all the cells instead of collapsing into one
+
+The grid counts the rows of each cell, or aggregates a third numeric
+column (sum or mean) over the two keys. The two codes are combined into one
+key `code_x * n_y + code_y` and grouped in one pass (`grid_counts`), chunk
+by chunk of rows in parallel, so only a chunk of codes is held in memory at
+a time.
+"""
+
+import numpy as np
+
+from .kernels import grid_counts, kernel_values
+from .utils import iter_chunks, parallel_map
+
+
+# Non-null values kept in the sorted sample of a column
+QUANTILE_SAMPLE_SIZE = 100_000
+
+DEFAULT_CHUNK_SIZE = 1_000_000
+
+AGGREGATIONS = ("count", "sum", "mean")
+
+
+def sorted_sample(series, size=QUANTILE_SAMPLE_SIZE, seed=0):
+    """
+    Draw a sorted random sample of the non-null values of a column.
+
+    Args:
+        series --> pandas series: numeric column
+        size --> int: number of rows sampled (all the rows when fewer)
+        seed --> int: seed of the random generator
+    Returns:
+        sample --> numpy array: sorted float64 values
+    """
+
+    if len(series) > size:
+        rng = np.random.default_rng(seed)
+        positions = np.sort(rng.choice(len(series), size, replace=False))
+        series = series.iloc[positions]
+
+    values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+    values = values[~np.isnan(values)]
+    values.sort()
+
+    return values
+
+
+def uniform_edges(minimum, maximum, bins):
+    """Edges of `bins` equal bins over a range (widened when empty)"""
+
+    if minimum == maximum:
+        minimum, maximum = minimum - 0.5, maximum + 0.5
+
+    return np.linspace(minimum, maximum, bins + 1)
+
+
+def quantile_edges(sample, bins):
+    """
+    Edges of bins holding about the same number of rows.
+
+    Args:
+        sample --> numpy array: sorted sample of the column
+        bins --> int: number of bins wanted
+    Returns:
+        edges --> numpy array: increasing edges, repeated quantiles (ties)
+            are merged so there can be fewer bins
+    """
+
+    if not len(sample):
+        return uniform_edges(0.0, 1.0, 1)
+
+    edges = np.unique(np.quantile(sample, np.linspace(0, 1, bins + 1)))
+    if len(edges) < 2:
+        return uniform_edges(edges[0], edges[0], 1)
+
+    return edges
+
+
+def bin_codes(values, edges):
+    """
+    Bin values by their edges. The outer bins are open ended (the edges of
+    a sample do not cover every value).
+
+    Args:
+        values --> numpy array: float values, NaN for null
+        edges --> numpy array: increasing bin edges
+    Returns:
+        codes --> numpy array: int64 bin of each value, -1 for null
+    """
+
+    codes = np.searchsorted(edges[1:-1], values, side="right").astype(np.int64)
+    codes[np.isnan(values)] = -1
+
+    return codes
+
+
+class HeatAxis:
+    """
+    Cells of one axis of a heat map.
+
+    Args:
+        n_cells --> int: number of cells
+        encode --> callable: (start, stop) -> int codes of the rows of the
+            chunk, -1 for rows left out
+        edges --> numpy array: cell edges on the plot
+        labels --> list: label of each cell, None for a numeric axis drawn
+            at the scale of its values
+    Returns: None
+    """
+
+    def __init__(self, n_cells, encode, edges, labels=None):
+        self.n_cells = n_cells
+        self.encode = encode
+        self.edges = edges
+        self.labels = labels
+
+    @classmethod
+    def categorical(cls, codes):
+        """
+        Axis with one cell per category.
+
+        Args:
+            codes --> CategoryCodes: the codes of the column
+        Returns:
+            axis --> HeatAxis
+        """
+
+        return cls(
+            len(codes),
+            lambda start, stop: codes.codes[start:stop],
+            np.arange(len(codes) + 1) - 0.5,
+            codes.labels,
+        )
+
+    @classmethod
+    def numeric(cls, series, edges, fill=None, quantile=False):
+        """
+        Axis binning a numeric column.
+
+        Args:
+            series --> pandas series: numeric column
+            edges --> numpy array: bin edges (`uniform_edges` or
+                `quantile_edges`)
+            fill --> float: value of the null rows, None to leave them out
+            quantile --> bool: the bins are unequal, the cells are drawn
+                with the same size and labelled with their range
+        Returns:
+            axis --> HeatAxis
+        """
+
+        def encode(start, stop):
+            values = series.iloc[start:stop]
+            values = values.to_numpy(dtype=np.float64, na_value=np.nan)
+            if fill is not None:
+                values = np.where(np.isnan(values), fill, values)
+            return bin_codes(values, edges)
+
+        n_cells = len(edges) - 1
+        if not quantile:
+            return cls(n_cells, encode, edges)
+
+        labels = [
+            "{:.3g} - {:.3g}".format(low, high)
+            for low, high in zip(edges[:-1], edges[1:])
+        ]
+
+        return cls(n_cells, encode, np.arange(n_cells + 1) - 0.5, labels)
+
+
+def aggregate_grid(
+    x_axis,
+    y_axis,
+    n_rows,
+    values=None,
+    how="count",
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    max_workers=None,
+):
+    """
+    Count the rows of each cell, or aggregate a column over the cells.
+
+    Args:
+        x_axis --> HeatAxis: cells of the x axis
+        y_axis --> HeatAxis: cells of the y axis
+        n_rows --> int: number of rows of the data
+        values --> pandas series: numeric column aggregated (sum or mean)
+        how --> string: "count", "sum" or "mean"
+        chunk_size --> int: number of rows grouped at a time
+        max_workers --> int: upper limit of the worker threads
+    Returns:
+        grid --> numpy array: (x cells, y cells) aggregate, NaN for cells
+            without rows (except counts)
+        counts --> numpy array: (x cells, y cells) rows in each cell (rows
+            with a null value are not counted when aggregating)
+    """
+
+    if how not in AGGREGATIONS:
+        raise ValueError("how must be one of {}, got '{}'".format(AGGREGATIONS, how))
+
+    n_cells = x_axis.n_cells * y_axis.n_cells
+
+    def _group(bounds):
+        start, stop = bounds
+        codes_x = x_axis.encode(start, stop)
+        codes_y = y_axis.encode(start, stop)
+
+        weights = None
+        if how != "count":
+            weights = kernel_values(values.iloc[start:stop])
+
+        return grid_counts(
+            codes_x, codes_y, x_axis.n_cells, y_axis.n_cells, weights=weights
+        )
+
+    groups = parallel_map(_group, iter_chunks(n_rows, chunk_size), max_workers)
+
+    counts = np.zeros(n_cells, dtype=np.int64)
+    sums = np.zeros(n_cells)
+    for chunk_counts, chunk_sums in groups:
+        counts += chunk_counts
+        if chunk_sums is not None:
+            sums += chunk_sums
+
+    shape = (x_axis.n_cells, y_axis.n_cells)
+    counts = counts.reshape(shape)
+    if how == "count":
+        return counts.astype(np.float64), counts
+
+    grid = sums.reshape(shape)
+    if how == "mean":
+        with np.errstate(invalid="ignore", divide="ignore"):
+            grid = grid / counts
+    grid[counts == 0] = np.nan
+
+    return grid, counts
@@ -0,0 +1,50 @@
+"""
+Bounded distinct counts.
+
+The drop-down menus only need to know whether a column has a handful of
+distinct values (the icons go up to 9, hue columns up to 6). `nunique()`
+hashes every row to answer that, even for an ID column with millions of
+distinct values. `bounded_nunique` scans the column in growing chunks,
+takes the unique values of each chunk and stops as soon as more distinct
+values than the limit have been seen, so high-cardinality columns are
+classified from their first rows.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Rows of the first chunk, the chunks double up to MAX_CHUNK_ROWS
+FIRST_CHUNK_ROWS = 1024
+MAX_CHUNK_ROWS = 1 << 20
+
+
+def bounded_nunique(series, limit):
+    """
+    Count the distinct (non-null) values of a column, up to a limit.
+
+    Args:
+        series --> pandas series: the column to be examined
+        limit --> int: the largest count of interest
+    Returns:
+        count --> int: the distinct count when it is at most `limit`,
+            `limit + 1` otherwise (the scan stopped early)
+    """
+
+    seen = set()
+    start = 0
+    chunk_rows = FIRST_CHUNK_ROWS
+
+    while start < len(series):
+        uniques = pd.unique(series.iloc[start:start + chunk_rows])
+        uniques = uniques[~np.asarray(pd.isna(uniques), dtype=bool)]
+        if len(uniques) > limit:
+            return limit + 1
+
+        seen.update(uniques.tolist())
+        if len(seen) > limit:
+            return limit + 1
+
+        start += chunk_rows
+        chunk_rows = min(chunk_rows * 2, MAX_CHUNK_ROWS)
+
+    return len(seen)
@@ -0,0 +1,597 @@
+"""
+Blocked correlation engine used by the correlation heat map.
+
+The correlation matrix is computed with matrix products over blocks of
+columns, so the heavy lifting is done by BLAS and the blocks are spread
+over a pool of threads. Missing values are handled pairwise (the same as
+pandas `df.corr()`), using the null masks of the columns instead of
+dropping rows for every pair.
+
+The engine keeps the means and norms of the columns together with the
+pairwise correlations it has computed, so enabling one more column only
+computes one new row of the matrix (O(n*k)), streaming the other columns
+from the data block by block, and disabling a column only drops it from
+the view. The memory of a state is O(k*k), whatever the number of rows.
+The columns are added by one thread at a time (the heat map and the
+background precomputation share the engine of a profile).
+"""
+
+import threading
+import warnings
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import (
+    is_bool_dtype, is_datetime64_any_dtype, is_numeric_dtype, is_timedelta64_dtype
+)
+
+from .utils import parallel_map
+
+
+# Above this number of columns the matrix is drawn as an image without
+# annotation, since the numbers are not readable anyway
+LARGE_MATRIX_THRESHOLD = 30
+
+# Use float32 for the correlation when the frame has more cells than this
+FLOAT32_CELL_THRESHOLD = 50_000_000
+
+CORRELATION_METHODS = ("pearson", "spearman")
+
+
+def encode_column(series, dtype=np.float64):
+    """
+    Convert one dataframe column into a float vector for correlation.
+
+    Categorical columns are encoded with sorted integer codes (the same as
+    `LabelEncoder` in `prepare_data`) and named with the `_code` suffix.
+    Missing values are kept as NaN instead of being filled.
+
+    Args:
+        series --> pandas series: the column to be encoded
+        dtype --> numpy dtype: float dtype of the returned vector
+    Returns:
+        name --> string: the header used in the correlation matrix
+        values --> numpy array: 1D float array
+        (None, None) is returned for columns that can not be used
+    """
+
+    if is_datetime64_any_dtype(series) or is_timedelta64_dtype(series):
+        return None, None
+
+    if is_numeric_dtype(series) or is_bool_dtype(series):
+        return series.name, series.to_numpy(dtype=dtype, na_value=np.nan)
+
+    try:
+        codes, _ = pd.factorize(series, sort=True)
+    except TypeError:
+        # Mixed types can not be sorted, same as prepare_data
+        return None, None
+
+    values = codes.astype(dtype)
+    values[codes < 0] = np.nan
+
+    return "{}_code".format(series.name), values
+
+
+def correlation_dtype(n_rows, n_columns):
+    """Float dtype of the correlation of a frame, float32 for huge frames"""
+
+    if n_rows * n_columns > FLOAT32_CELL_THRESHOLD:
+        return np.float32
+
+    return np.float64
+
+
+def select_correlation_columns(df, columns=None, dtype=np.float64):
+    """
+    Select the numeric columns and encode the categorical columns of a
+    dataframe into one float matrix for correlation.
+
+    Args:
+        df --> pandas dataframe: the data to be examined
+        columns --> list: column headers to use, None for all columns
+        dtype --> numpy dtype: float dtype of the returned matrix
+    Returns:
+        names --> list: column headers of the matrix
+        values --> numpy array: 2D array with one column per selected column
+    """
+
+    if columns is None:
+        columns = list(df.columns)
+
+    names = []
+    arrays = []
+    for column in columns:
+        name, values = encode_column(df[column], dtype)
+        if values is not None:
+            names.append(name)
+            arrays.append(values)
+
+    if arrays:
+        values = np.column_stack(arrays)
+    else:
+        values = np.empty((len(df), 0), dtype=dtype)
+
+    return names, values
+
+
+def rank_columns(values, max_workers=None):
+    """
+    Rank every column of a matrix (average rank for ties), keeping NaN.
+
+    Note:
+        With missing values, each column is ranked once over its own
+        non-null values instead of being re-ranked for every pair like
+        pandas does. This is what makes the blocked Spearman fast, and the
+        difference is negligible unless the null patterns are very different.
+
+    Args:
+        values --> numpy array: 2D array to be ranked column-wise
+        max_workers --> int: upper limit of the worker threads
+    Returns:
+        ranks --> numpy array: 2D array of ranks with the same dtype
+    """
+
+    ranks = np.empty_like(values)
+
+    def _rank(column):
+        ranks[:, column] = pd.Series(values[:, column]).rank().to_numpy()
+
+    parallel_map(_rank, range(values.shape[1]), max_workers)
+
+    return ranks
+
+
+def _column_blocks(length, block_size):
+    return [
+        slice(start, min(start + block_size, length))
+        for start in range(0, length, block_size)
+    ]
+
+
+def _column_means(values):
+    """Mean of each column ignoring nulls, 0 for all-null columns"""
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        return np.nan_to_num(np.nanmean(values, axis=0))
+
+
+def _center(values, means):
+    """Center columns by the given means, nulls become 0"""
+
+    mask = ~np.isnan(values)
+    centered = np.where(mask, values - means.astype(values.dtype), 0)
+
+    return centered, mask
+
+
+def _cross_block(
+    left, left_mask, right, right_mask, left_norms=None, right_norms=None
+):
+    """
+    Pairwise complete Pearson correlation between the columns of two
+    centered blocks. The norms of the columns are computed when not given.
+    """
+
+    if left_mask.all() and right_mask.all():
+        # Fast path without missing values, correlation is a plain gram matrix
+        with np.errstate(divide="ignore", invalid="ignore"):
+            if left_norms is None:
+                left_norms = np.sqrt((left * left).sum(axis=0))
+            if right_norms is None:
+                right_norms = np.sqrt((right * right).sum(axis=0))
+            block = (left.T @ right) / np.outer(left_norms, right_norms)
+        if left.shape[0] < 2:
+            block[:] = np.nan
+        return block
+
+    left_weights = left_mask.astype(left.dtype)
+    right_weights = right_mask.astype(right.dtype)
+
+    count = left_weights.T @ right_weights
+    sum_x = left.T @ right_weights
+    sum_y = left_weights.T @ right
+    sum_xx = (left * left).T @ right_weights
+    sum_yy = left_weights.T @ (right * right)
+    sum_xy = left.T @ right
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = sum_xy - sum_x * sum_y / count
+        var_x = sum_xx - sum_x * sum_x / count
+        var_y = sum_yy - sum_y * sum_y / count
+        block = cov / np.sqrt(var_x * var_y)
+    block[count < 2] = np.nan
+
+    return block
+
+
+def blocked_pearson(values, block_size=64, max_workers=None):
+    """
+    Pearson correlation of all column pairs of a matrix with pairwise
+    complete observations.
+
+    Args:
+        values --> numpy array: 2D float array (rows x columns), NaN for null
+        block_size --> int: number of columns in each block
+        max_workers --> int: upper limit of the worker threads
+    Returns:
+        corr --> numpy array: k x k correlation matrix
+    """
+
+    n_columns = values.shape[1]
+    corr = np.full((n_columns, n_columns), np.nan, dtype=values.dtype)
+    if n_columns == 0:
+        return corr
+
+    # Shifting by the column mean does not change the correlation but
+    # avoids catastrophic cancellation in the sums (important for float32)
+    centered, mask = _center(values, _column_means(values))
+
+    blocks = _column_blocks(n_columns, block_size)
+    tasks = [
+        (a, b) for i, a in enumerate(blocks) for b in blocks[i:]
+    ]
+
+    def _block(task):
+        a, b = task
+        block = _cross_block(centered[:, a], mask[:, a], centered[:, b], mask[:, b])
+        corr[a, b] = block
+        corr[b, a] = block.T
+
+    parallel_map(_block, tasks, max_workers)
+
+    # Guard against rounding errors, and the diagonal is exactly 1
+    np.clip(corr, -1, 1, out=corr)
+    np.fill_diagonal(corr, np.where(np.isnan(np.diag(corr)), np.nan, 1))
+
+    return corr
+
+
+def cluster_order(corr):
+    """
+    Get an order of the columns that puts correlated columns next to each
+    other.
+
+    Hierarchical clustering (average linkage on 1 - |corr|) is used when
+    scipy is installed, otherwise the columns are sorted along the leading
+    eigenvector of the correlation matrix.
+
+    Args:
+        corr --> numpy array: k x k correlation matrix
+    Returns:
+        order --> numpy array: the new positions of the columns
+    """
+
+    n_columns = corr.shape[0]
+    if n_columns < 3:
+        return np.arange(n_columns)
+
+    filled = np.nan_to_num(np.asarray(corr, dtype=np.float64))
+
+    try:
+        from scipy.cluster.hierarchy import leaves_list, linkage
+        from scipy.spatial.distance import squareform
+    except ImportError:
+        _, vectors = np.linalg.eigh(filled)
+        return np.argsort(vectors[:, -1])
+
+    distance = 1 - np.abs(filled)
+    distance = (distance + distance.T) / 2
+    np.fill_diagonal(distance, 0)
+    condensed = squareform(np.clip(distance, 0, None), checks=False)
+
+    return leaves_list(linkage(condensed, method="average"))
+
+
+class CorrelationState:
+    """
+    Correlations computed so far for one dataframe, method and dtype.
+
+    Every computed column keeps a slot in the matrix, together with its
+    mean and norm (around the mean) of the encoded (ranked for Spearman)
+    values. Only these moments and the k x k matrix are kept: a new column
+    computes its cross products with the computed columns, which are read
+    again from the data one block of columns at a time, so the memory does
+    not grow with the number of rows.
+
+    Args:
+        method --> string: "pearson" or "spearman"
+        dtype --> numpy dtype: float dtype of the computation
+    Returns: None
+    """
+
+    def __init__(self, method="pearson", dtype=np.float64):
+        self.method = method
+        self.dtype = np.dtype(dtype)
+
+        self.names = []  # headers in the matrix, e.g. "Sex_code"
+        self.position = {}  # df column header -> slot, None when not usable
+        self.means = np.empty(0)
+        self.norms = np.empty(0)  # sqrt of the sum of squares around the mean
+        self.matrix = np.empty((0, 0), dtype=self.dtype)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, column):
+        return column in self.position
+
+    def _reserve(self, size):
+        """Grow the matrix and the moments (doubling the capacity) to hold `size`"""
+
+        n_columns = len(self.names)
+        capacity = self.matrix.shape[0]
+        if size <= capacity:
+            return
+
+        capacity = max(size, 2 * capacity)
+        matrix = np.full((capacity, capacity), np.nan, dtype=self.dtype)
+        matrix[:n_columns, :n_columns] = self.matrix[:n_columns, :n_columns]
+        self.matrix = matrix
+
+        for attribute in ("means", "norms"):
+            values = np.zeros(capacity)
+            values[:n_columns] = getattr(self, attribute)[:n_columns]
+            setattr(self, attribute, values)
+
+    def _load(self, df, columns, max_workers):
+        """Encode (and rank for Spearman) the given df columns"""
+
+        names, values = select_correlation_columns(df, columns, self.dtype)
+        if self.method == "spearman":
+            values = rank_columns(values, max_workers)
+
+        return names, values
+
+    def add_columns(self, df, columns, block_size=64, max_workers=None):
+        """
+        Compute the correlation rows of new columns against all the columns
+        already in the state and against each other, `block_size` new
+        columns at a time.
+
+        Args:
+            df --> pandas dataframe: the data to be examined
+            columns --> list: df column headers not yet in the state
+            block_size --> int: number of columns in each block
+            max_workers --> int: upper limit of the worker threads
+        Returns: None
+        """
+
+        columns = [column for column in columns if column not in self.position]
+        for start in range(0, len(columns), block_size):
+            self._add_block(
+                df, columns[start:start + block_size], block_size, max_workers
+            )
+
+    def _add_block(self, df, columns, block_size, max_workers):
+        """Add a block of new columns, the state is unchanged until the end"""
+
+        usable = []
+        new_names = []
+        new_values = []
+        for column in columns:
+            name, values = encode_column(df[column], self.dtype)
+            if values is None:
+                self.position[column] = None
+            else:
+                usable.append(column)
+                new_names.append(name)
+                new_values.append(values)
+
+        if not usable:
+            return
+
+        new_values = np.column_stack(new_values)
+        if self.method == "spearman":
+            new_values = rank_columns(new_values, max_workers)
+
+        new_means = _column_means(new_values)
+        centered, mask = _center(new_values, new_means)
+        del new_values
+        new_norms = np.sqrt((centered * centered).sum(axis=0))
+
+        start = len(self.names)
+        stop = start + len(usable)
+        self._reserve(stop)
+
+        # The computed columns are read again from the data, one block at a
+        # time, only their cross products with the new columns are computed
+        headers = {slot: column for column, slot in self.position.items()}
+
+        def _block(block):
+            _, values = self._load(
+                df, [headers[slot] for slot in range(block.start, block.stop)], 1
+            )
+            left, left_mask = _center(values, self.means[block])
+            del values
+            cross = _cross_block(
+                left, left_mask, centered, mask, self.norms[block], new_norms
+            )
+            np.clip(cross, -1, 1, out=cross)
+            self.matrix[block, start:stop] = cross
+            self.matrix[start:stop, block] = cross.T
+
+        parallel_map(_block, _column_blocks(start, block_size), max_workers)
+
+        cross = _cross_block(centered, mask, centered, mask, new_norms, new_norms)
+        np.clip(cross, -1, 1, out=cross)
+        # The diagonal is exactly 1 (NaN for constant or all-null columns)
+        diagonal = np.arange(len(usable))
+        cross[diagonal, diagonal] = np.where(
+            np.isnan(cross[diagonal, diagonal]), np.nan, 1
+        )
+        self.matrix[start:stop, start:stop] = cross
+
+        self.means[start:stop] = new_means
+        self.norms[start:stop] = new_norms
+        for offset, (column, name) in enumerate(zip(usable, new_names)):
+            self.position[column] = start + offset
+            self.names.append(name)
+
+    def view(self, columns):
+        """
+        Get the correlation matrix of the given columns.
+        Disabled columns are simply left out of the view.
+
+        Args:
+            columns --> list: df column headers, all computed already
+        Returns:
+            corr --> pandas dataframe: the correlation matrix
+        """
+
+        slots = [
+            self.position[column] for column in columns
+            if self.position.get(column) is not None
+        ]
+        names = [self.names[slot] for slot in slots]
+        matrix = self.matrix[np.ix_(slots, slots)]
+
+        return pd.DataFrame(matrix, index=names, columns=names)
+
+
+class CorrelationEngine:
+    """
+    Computes and caches correlation matrices of a dataframe.
+
+    Args:
+        block_size --> int: number of columns computed in each block
+        max_workers --> int: upper limit of the worker threads
+        cache_size --> int: number of correlation states kept in the cache
+        on_change --> callable: called when new columns are computed
+    Returns: None
+    """
+
+    def __init__(self, block_size=64, max_workers=None, cache_size=4, on_change=None):
+        self.block_size = block_size
+        self.max_workers = max_workers
+        self.cache_size = cache_size
+        self.on_change = on_change
+
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()  # guards the cache
+        self._compute_lock = threading.Lock()  # one thread adds columns at a time
+
+    def get_state(self, df, method="pearson", dtype=np.float64):
+        """
+        Get (or create) the correlation state of a dataframe.
+
+        Args:
+            df --> pandas dataframe: the data to be examined
+            method --> string: "pearson" or "spearman"
+            dtype --> numpy dtype: float dtype of the computation
+        Returns:
+            state --> CorrelationState: the cached state
+        """
+
+        if method not in CORRELATION_METHODS:
+            raise ValueError(
+                "method must be one of {}, got '{}'".format(CORRELATION_METHODS, method)
+            )
+
+        key = (id(df), df.shape[0], method, np.dtype(dtype).str)
+        with self._lock:
+            state = self._lookup(key, df)
+            if state is None:
+                state = CorrelationState(method, dtype)
+                self._store(key, df, state)
+
+        return state
+
+    def _lookup(self, key, df):
+        """
+        Cached state of a key, None when missing or when the key belongs to
+        a frame that has been garbage collected (its id() is reused).
+        """
+
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+
+        ref, state = entry
+        if ref() is not df:
+            del self._cache[key]
+            return None
+
+        self._cache.move_to_end(key)
+        return state
+
+    def _store(self, key, df, state):
+        self._cache[key] = (weakref.ref(df), state)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def compute(self, df, columns=None, method="pearson", dtype=np.float64, reorder=False):
+        """
+        Get the correlation matrix of the selected columns. Only the columns
+        that have not been computed before are computed.
+
+        Args:
+            df --> pandas dataframe: the data to be examined
+            columns --> list: column headers to use, None for all columns
+            method --> string: "pearson" or "spearman"
+            dtype --> numpy dtype: np.float64, or np.float32 for half the
+                memory and faster products on big frames
+            reorder --> bool: cluster correlated columns next to each other
+        Returns:
+            corr --> pandas dataframe: the correlation matrix
+        """
+
+        if columns is None:
+            columns = list(df.columns)
+
+        state = self.get_state(df, method, dtype)
+        with self._compute_lock:
+            missing = [column for column in columns if column not in state]
+            if missing:
+                state.add_columns(df, missing, self.block_size, self.max_workers)
+            corr = state.view(columns)
+
+        if missing and self.on_change is not None:
+            self.on_change()
+
+        if reorder:
+            order = cluster_order(corr.to_numpy())
+            corr = corr.iloc[order, order]
+
+        return corr
+
+    def export_states(self, df):
+        """
+        Get the cached states of a dataframe, for persisting.
+
+        Args:
+            df --> pandas dataframe: the data the states were computed from
+        Returns:
+            states --> dict: (method, dtype string) -> CorrelationState
+        """
+
+        with self._lock:
+            return {
+                (method, dtype): state
+                for (df_id, n_rows, method, dtype), (ref, state) in self._cache.items()
+                if ref() is df and n_rows == df.shape[0]
+            }
+
+    def import_states(self, df, states):
+        """
+        Cache states computed earlier for the same data.
+
+        Args:
+            df --> pandas dataframe: the data the states were computed from
+            states --> dict: output of `export_states()`
+        Returns: None
+        """
+
+        with self._lock:
+            for (method, dtype), state in states.items():
+                self._store((id(df), df.shape[0], method, dtype), df, state)
+
+    def clear(self):
+        """Drop all the cached correlations"""
+
+        with self._lock:
+            self._cache.clear()
@@ -0,0 +1,109 @@
+"""
+Exact crosstab of two categorical columns.
+
+Each column is factorized once into integer codes, truncated to its
+`top_k` most frequent values (the rest share one "Other" code). The
+crosstab is a single `np.bincount` of `code_x * k_y + code_y`, so every
+category keeps its own cell instead of being merged into histogram bins,
+and the labels of the codes are kept in arrays for the tick formatting.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Categories shown on a crosstab axis, the others are grouped
+TOP_CATEGORIES = 30
+
+
+class CategoryCodes:
+    """
+    Integer codes of a categorical column, truncated to the most frequent
+    values.
+
+    Args:
+        codes --> numpy array: int32 code of each row, -1 for null
+        labels --> numpy array: label of each code (object), the last one
+            is "Other" when the column was truncated
+        counts --> numpy array: number of rows of each code
+    Returns: None
+    """
+
+    def __init__(self, codes, labels, counts):
+        self.codes = codes
+        self.labels = labels
+        self.counts = counts
+
+    def __len__(self):
+        return len(self.labels)
+
+    @classmethod
+    def from_series(cls, series, top_k=TOP_CATEGORIES):
+        """
+        Factorize a column and keep its `top_k` most frequent values.
+
+        Args:
+            series --> pandas series: the column
+            top_k --> int: number of categories kept
+        Returns:
+            codes --> CategoryCodes: the codes of the column
+        """
+
+        codes, uniques = pd.factorize(series)
+        counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+        labels = np.asarray(uniques, dtype=object)
+
+        if len(uniques) > top_k:
+            # Most frequent first, "Other" gets the last code
+            order = np.argsort(-counts, kind="stable")
+            mapping = np.full(len(uniques) + 1, top_k, dtype=np.int64)
+            mapping[order[:top_k]] = np.arange(top_k)
+            mapping[-1] = -1  # nulls (code -1) stay null
+            codes = mapping[codes]
+            labels = np.append(
+                labels[order[:top_k]], "Other ({})".format(len(uniques) - top_k)
+            )
+            counts = np.append(counts[order[:top_k]], counts[order[top_k:]].sum())
+
+        return cls(codes.astype(np.int32), labels, counts)
+
+    def label(self, position):
+        """Label of a tick position, empty between or outside the codes"""
+
+        return tick_label(self.labels, position)
+
+
+def tick_label(labels, position):
+    """
+    Label of a tick position on an axis with one cell per label (categories,
+    quantile bins).
+
+    Args:
+        labels --> sequence: label of each cell
+        position --> float: tick position, the cell index
+    Returns:
+        label --> string: empty between or outside the cells
+    """
+
+    index = int(round(position))
+    if index != position or not 0 <= index < len(labels):
+        return ""
+
+    return str(labels[index])
+
+
+def crosstab(codes_x, codes_y):
+    """
+    Count the rows of every pair of categories, nulls are left out.
+
+    Args:
+        codes_x --> CategoryCodes: codes of the first column
+        codes_y --> CategoryCodes: codes of the second column
+    Returns:
+        counts --> numpy array: (len(codes_x), len(codes_y)) row counts
+    """
+
+    valid = (codes_x.codes >= 0) & (codes_y.codes >= 0)
+    index = codes_x.codes[valid].astype(np.int64) * len(codes_y) + codes_y.codes[valid]
+    counts = np.bincount(index, minlength=len(codes_x) * len(codes_y))
+
+    return counts.reshape(len(codes_x), len(codes_y))
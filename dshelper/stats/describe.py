@@ -0,0 +1,395 @@
+"""
+Approximate `df.describe()` for huge frames.
+
+Every numeric column is split into chunks of rows. Each chunk is read once
+to get its count, mean, sum of squared deviations, min, max and a KLL
+quantile sketch. The chunks are processed in parallel and the partial
+results are merged. A chunk is sampled before it enters its sketch (one
+value of every group of consecutive values, see `KLLSketch.update`), so only
+a bounded number of values is ever sorted and the cost of a chunk is the
+single pass of its moments. The merged sketches only hold a few hundred
+items, and the column as a whole is never held in memory at once.
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+from .utils import iter_chunks, parallel_map
+
+
+# Frames with more rows than this are described approximately by default
+EXACT_ROW_THRESHOLD = 1_000_000
+
+DEFAULT_CHUNK_SIZE = 1_000_000
+
+DESCRIBE_PERCENTILES = (0.25, 0.5, 0.75)
+
+# Larger batches of values are sampled before entering a sketch, down to
+# between SKETCH_SAMPLE_SIZE and twice as many values
+SKETCH_SAMPLE_SIZE = 2 ** 15
+
+
+class KLLSketch:
+    """
+    A mergeable quantile sketch (Karnin, Lang and Liberty, 2016).
+
+    Items are kept in levels of compactors, an item at level h stands for
+    2**h original values. When a level is over its capacity it is sorted
+    and every other item (random offset) is promoted to the next level.
+
+    The rank error of a quantile is below `rank_error()` times the number
+    of values with 99% confidence, about 1.3% for the default k=200,
+    independent of the number of values. A large batch is sampled first
+    (see `update`), which adds less than 1% to the rank error.
+
+    Args:
+        k --> int: capacity of the top level, larger is more accurate
+        seed --> int: seed of the random compaction offsets
+    Returns: None
+    """
+
+    def __init__(self, k=200, seed=None):
+        self.k = k
+        self.n = 0
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def rank_error(self):
+        """
+        Normalized rank error of the sketch (99% confidence), using the
+        empirical bound of the reference KLL implementation.
+        """
+
+        return 2.296 / self.k ** 0.9723
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(int(math.ceil(self.k * (2 / 3) ** depth)), 2)
+
+    def update(self, values):
+        """
+        Add a batch of values to the sketch, NaN are ignored.
+
+        A batch larger than `sample_size` is split into groups of 2**h
+        consecutive values and one random value of each group enters the
+        sketch at level h (standing for the 2**h values, an unbiased rank
+        estimate), so at most 2 * `sample_size` values are sorted whatever
+        the size of the batch.
+
+        Args:
+            values --> numpy array: 1D array of values
+        Returns: None
+        """
+
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+
+        self.n += len(values)
+
+        level = max(int(math.log2(len(values) / SKETCH_SAMPLE_SIZE)), 0)
+        if level:
+            group = 2 ** level
+            n_groups = len(values) // group
+            picks = self._rng.integers(group, size=n_groups)
+            sampled = values[:n_groups * group].reshape(n_groups, group)
+            while len(self.levels) <= level:
+                self.levels.append(np.empty(0))
+            self.levels[level] = np.concatenate(
+                [self.levels[level], sampled[np.arange(n_groups), picks]]
+            )
+            # The values after the last group enter as they are
+            values = values[n_groups * group:]
+
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def merge(self, other):
+        """
+        Merge another sketch into this sketch.
+
+        Args:
+            other --> KLLSketch: the sketch to be merged
+        Returns:
+            self --> KLLSketch: the merged sketch
+        """
+
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+
+        self.n += other.n
+        self._compress()
+
+        return self
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+
+                items = np.sort(items)
+                # Keep one item at this level when the count is odd
+                leftover = items[:len(items) % 2]
+                items = items[len(items) % 2:]
+
+                offset = self._rng.integers(2)
+                self.levels[level + 1] = np.concatenate(
+                    [self.levels[level + 1], items[offset::2]]
+                )
+                self.levels[level] = leftover
+            level += 1
+
+    def quantiles(self, fractions):
+        """
+        Get the approximate quantiles of the values in the sketch.
+
+        Args:
+            fractions --> list: quantiles to compute, between 0 and 1
+        Returns:
+            values --> numpy array: the quantile values (NaN when empty)
+        """
+
+        fractions = np.asarray(fractions, dtype=np.float64)
+        if self.n == 0:
+            return np.full(len(fractions), np.nan)
+
+        items = np.concatenate(self.levels)
+        weights = np.concatenate(
+            [
+                np.full(len(items), 2.0 ** level)
+                for level, items in enumerate(self.levels)
+            ]
+        )
+        order = np.argsort(items, kind="mergesort")
+        items = items[order]
+        cumulative = np.cumsum(weights[order])
+
+        # Rank of each quantile, the same convention as numpy's "linear"
+        ranks = fractions * (cumulative[-1] - 1) + 1
+        positions = np.searchsorted(cumulative, ranks, side="left")
+
+        return items[np.clip(positions, 0, len(items) - 1)]
+
+
+class ColumnSummary:
+    """
+    Mergeable summary statistics of one column (or a chunk of a column).
+
+    Args:
+        values --> numpy array: 1D float array, NaN for null
+        k --> int: accuracy parameter of the quantile sketch
+        seed --> int: seed of the quantile sketch
+    Returns: None
+    """
+
+    def __init__(self, values=None, k=200, seed=None):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0  # sum of squared deviations from the mean
+        self.min = np.nan
+        self.max = np.nan
+        self.sketch = KLLSketch(k, seed)
+
+        if values is not None:
+            self.update(values)
+
+    def update(self, values):
+        """
+        Add a chunk of values to the summary.
+
+        Args:
+            values --> numpy array: 1D float array, NaN for null
+        Returns: None
+        """
+
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+
+        mean = values.mean()
+        self._merge_moments(
+            len(values), mean, ((values - mean) ** 2).sum(), values.min(), values.max()
+        )
+        self.sketch.update(values)
+
+    def merge(self, other):
+        """
+        Merge the summary of another chunk into this summary.
+
+        Args:
+            other --> ColumnSummary: the summary to be merged
+        Returns:
+            self --> ColumnSummary: the merged summary
+        """
+
+        self._merge_moments(other.count, other.mean, other.m2, other.min, other.max)
+        self.sketch.merge(other.sketch)
+
+        return self
+
+    def _merge_moments(self, count, mean, m2, minimum, maximum):
+        # Parallel variance combination (Chan et al.)
+        if count == 0:
+            return
+
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta ** 2 * self.count * count / total
+        self.count = total
+        self.min = np.fmin(self.min, minimum)
+        self.max = np.fmax(self.max, maximum)
+
+    def to_series(self, percentiles=DESCRIBE_PERCENTILES, name=None):
+        """
+        Output the summary in the format of `pd.Series.describe()`.
+
+        Args:
+            percentiles --> list: percentiles to output
+            name --> string: name of the series
+        Returns:
+            summary --> pandas series: the describe() statistics
+        """
+
+        std = np.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else np.nan
+        mean = self.mean if self.count else np.nan
+        labels = ["{:g}%".format(100 * p) for p in percentiles]
+
+        return pd.Series(
+            [self.count, mean, std, self.min]
+            + list(self.sketch.quantiles(percentiles))
+            + [self.max],
+            index=["count", "mean", "std", "min"] + labels + ["max"],
+            name=name,
+        )
+
+
+def summarize_columns(
+    df, chunk_size=DEFAULT_CHUNK_SIZE, k=200, max_workers=None, seed=0
+):
+    """
+    Summarize the numeric columns in one pass over chunks of rows. The
+    summaries are mergeable, the summaries of new rows of the same columns
+    can be merged into them.
+
+    Args:
+        df --> pandas dataframe: the data to be summarized
+        chunk_size --> int: number of rows in each chunk
+        k --> int: accuracy parameter of the quantile sketch
+        max_workers --> int: upper limit of the worker threads
+        seed --> int: seed of the quantile sketches
+    Returns:
+        summaries --> dict: numeric column header -> ColumnSummary
+    """
+
+    numeric = df.select_dtypes(include="number")
+
+    chunks = list(iter_chunks(len(numeric), chunk_size)) or [(0, 0)]
+    tasks = [
+        (column, start, stop)
+        for column in range(numeric.shape[1])
+        for start, stop in chunks
+    ]
+
+    def _summarize(task):
+        column, start, stop = task
+        values = numeric.iloc[start:stop, column].to_numpy(
+            dtype=np.float64, na_value=np.nan
+        )
+        return ColumnSummary(values, k=k, seed=seed + start)
+
+    partials = parallel_map(_summarize, tasks, max_workers)
+
+    summaries = {}
+    for column in range(numeric.shape[1]):
+        column_partials = partials[column * len(chunks):(column + 1) * len(chunks)]
+        summary = column_partials[0]
+        for partial in column_partials[1:]:
+            summary.merge(partial)
+        summaries[numeric.columns[column]] = summary
+
+    return summaries
+
+
+def summaries_to_describe(summaries, percentiles=DESCRIBE_PERCENTILES):
+    """
+    Output column summaries in the format of `df.describe()`.
+
+    Args:
+        summaries --> dict: column header -> ColumnSummary
+        percentiles --> list: percentiles to output
+    Returns:
+        describe --> pandas dataframe: same layout as df.describe()
+    """
+
+    return pd.concat(
+        [
+            summary.to_series(percentiles, name=column)
+            for column, summary in summaries.items()
+        ],
+        axis=1,
+    )
+
+
+def approximate_describe(
+    df,
+    percentiles=DESCRIBE_PERCENTILES,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    k=200,
+    max_workers=None,
+    seed=0,
+):
+    """
+    Approximate `df.describe()` of the numeric columns in one pass over
+    chunks of rows. count, mean, std, min and max are exact (up to rounding),
+    the percentiles have a rank error below `KLLSketch(k).rank_error()`.
+
+    Args:
+        df --> pandas dataframe: the data to be described
+        percentiles --> list: percentiles to output
+        chunk_size --> int: number of rows in each chunk
+        k --> int: accuracy parameter of the quantile sketch
+        max_workers --> int: upper limit of the worker threads
+        seed --> int: seed of the quantile sketches
+    Returns:
+        describe --> pandas dataframe: same layout as df.describe()
+    """
+
+    summaries = summarize_columns(df, chunk_size, k, max_workers, seed)
+    if not summaries:
+        # Nothing to approximate, pandas describes the object columns
+        return df.describe()
+
+    return summaries_to_describe(summaries, percentiles)
+
+
+def describe(df, exact=None, **kwargs):
+    """
+    Describe a dataframe, exactly for small frames and approximately for
+    huge frames.
+
+    Args:
+        df --> pandas dataframe: the data to be described
+        exact --> bool: force the exact (True) or approximate (False)
+            statistics, None to decide by the number of rows
+        kwargs: passed to approximate_describe
+    Returns:
+        describe --> pandas dataframe: same layout as df.describe()
+    """
+
+    if exact is None:
+        exact = len(df) <= EXACT_ROW_THRESHOLD
+
+    if exact:
+        return df.describe()
+
+    return approximate_describe(df, **kwargs)
@@ -0,0 +1,158 @@
+"""
+Mergeable distinct count sketch.
+
+The sketch keeps the exact set of value hashes while the column has at most
+`EXACT_LIMIT` distinct values, so low-cardinality columns are counted
+exactly. Beyond that it switches to a HyperLogLog estimate (relative error
+about 1.04 / sqrt(2 ** precision), 0.8% by default). Sketches of chunks are
+merged, so a column that grows is only hashed for its new rows.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+EXACT_LIMIT = 4096
+
+DEFAULT_PRECISION = 14
+
+
+def hash_values(series):
+    """
+    Hash the non-null values of a column.
+
+    Args:
+        series --> pandas series: the column to be hashed
+    Returns:
+        hashes --> numpy array: uint64 hash of each non-null value
+    """
+
+    series = series.dropna()
+    try:
+        return pd.util.hash_pandas_object(series, index=False).to_numpy()
+    except TypeError:
+        # Unhashable values (e.g. lists), hash their text
+        return pd.util.hash_pandas_object(series.astype(str), index=False).to_numpy()
+
+
+def _leading_zeros(values, bits):
+    """Number of leading zeros of each value within the lowest `bits` bits (<= 53)"""
+
+    # frexp gives the bit length, exact as the values fit in the float mantissa
+    _, bit_length = np.frexp(values.astype(np.float64))
+
+    return (bits - bit_length).astype(np.uint8)
+
+
+class DistinctSketch:
+    """
+    Distinct count of a column, exact for low cardinalities.
+
+    Args:
+        precision --> int: number of HyperLogLog index bits (11 to 18)
+    Returns: None
+    """
+
+    def __init__(self, precision=DEFAULT_PRECISION):
+        self.precision = precision
+        self.hashes = np.empty(0, dtype=np.uint64)  # exact mode
+        self.registers = None  # HyperLogLog mode
+
+    @classmethod
+    def from_series(cls, series, precision=DEFAULT_PRECISION):
+        """
+        Build the sketch of a column.
+
+        Args:
+            series --> pandas series: the column to be counted
+            precision --> int: number of HyperLogLog index bits
+        Returns:
+            sketch --> DistinctSketch: the sketch
+        """
+
+        sketch = cls(precision)
+        sketch.update(series)
+
+        return sketch
+
+    @property
+    def exact(self):
+        return self.registers is None
+
+    def _to_registers(self, hashes):
+        """Add hashes to the HyperLogLog registers"""
+
+        if self.registers is None:
+            self.registers = np.zeros(2 ** self.precision, dtype=np.uint8)
+
+        bits = 64 - self.precision
+        index = (hashes >> np.uint64(bits)).astype(np.int64)
+        rest = hashes & np.uint64((1 << bits) - 1)
+        rank = _leading_zeros(rest, bits) + 1
+        np.maximum.at(self.registers, index, rank)
+
+    def _add_hashes(self, hashes):
+        if self.registers is None:
+            hashes = np.union1d(self.hashes, hashes)
+            if len(hashes) <= EXACT_LIMIT:
+                self.hashes = hashes
+                return
+            self.hashes = np.empty(0, dtype=np.uint64)
+
+        self._to_registers(np.unique(hashes))
+
+    def update(self, series):
+        """
+        Add the values of a column (or a new chunk of it).
+
+        Args:
+            series --> pandas series: the values to be added
+        Returns:
+            self --> DistinctSketch: the updated sketch
+        """
+
+        self._add_hashes(hash_values(series))
+
+        return self
+
+    def merge(self, other):
+        """
+        Merge the sketch of another chunk into this sketch.
+
+        Args:
+            other --> DistinctSketch: sketch with the same precision
+        Returns:
+            self --> DistinctSketch: the merged sketch
+        """
+
+        if other.registers is None:
+            self._add_hashes(other.hashes)
+        else:
+            if self.registers is None:
+                self._to_registers(self.hashes)
+                self.hashes = np.empty(0, dtype=np.uint64)
+            np.maximum(self.registers, other.registers, out=self.registers)
+
+        return self
+
+    def estimate(self):
+        """
+        Get the distinct count.
+
+        Returns:
+            count --> int: exact count in exact mode, estimate otherwise
+        """
+
+        if self.registers is None:
+            return len(self.hashes)
+
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+
+        empty = int((self.registers == 0).sum())
+        if estimate <= 2.5 * m and empty:
+            # Small range correction (linear counting)
+            estimate = m * np.log(m / empty)
+
+        return int(round(estimate))
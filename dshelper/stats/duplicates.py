@@ -0,0 +1,174 @@
+"""
+Duplicated rows and duplicated columns.
+
+Rows are hashed chunk by chunk with `pd.util.hash_pandas_object` (one
+uint64 per row, the chunks in parallel). The hashes are counted with a hash
+table (`duplicated` of a uint64 series, 8 bytes per row) and only the rows
+whose hash occurs more than once are compared exactly, so a hash collision
+never counts two different rows as duplicates.
+
+Columns are fingerprinted by a digest of their row hashes. Columns sharing
+a fingerprint are compared value by value to confirm they are identical.
+"""
+
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from .utils import iter_chunks, parallel_map
+
+
+DEFAULT_CHUNK_SIZE = 1_000_000
+
+
+class DuplicateSummary:
+    """
+    Duplicated rows and columns of a dataframe.
+
+    Args:
+        n_rows --> int: number of rows repeating an earlier row
+        n_groups --> int: number of distinct rows occurring more than once
+        column_groups --> list: lists of the headers of identical columns
+    Returns: None
+    """
+
+    def __init__(self, n_rows, n_groups, column_groups):
+        self.n_rows = n_rows
+        self.n_groups = n_groups
+        self.column_groups = column_groups
+
+    @property
+    def n_columns(self):
+        """Number of columns repeating an earlier column"""
+
+        return sum(len(group) - 1 for group in self.column_groups)
+
+
+def row_hashes(df, chunk_size=DEFAULT_CHUNK_SIZE, max_workers=None):
+    """
+    Hash every row of a dataframe (the index is ignored).
+
+    Args:
+        df --> pandas dataframe: the data
+        chunk_size --> int: number of rows hashed at a time
+        max_workers --> int: upper limit of the worker threads
+    Returns:
+        hashes --> numpy array: uint64 hash of each row
+    """
+
+    if not df.shape[1]:
+        return np.zeros(df.shape[0], dtype=np.uint64)
+
+    hashes = parallel_map(
+        lambda bounds: pd.util.hash_pandas_object(
+            df.iloc[bounds[0]:bounds[1]], index=False
+        ).to_numpy(),
+        iter_chunks(df.shape[0], chunk_size),
+        max_workers,
+    )
+
+    return np.concatenate(hashes) if hashes else np.zeros(0, dtype=np.uint64)
+
+
+def duplicate_rows(df, chunk_size=DEFAULT_CHUNK_SIZE, max_workers=None):
+    """
+    Count the duplicated rows of a dataframe.
+
+    Args:
+        df --> pandas dataframe: the data
+        chunk_size --> int: number of rows hashed at a time
+        max_workers --> int: upper limit of the worker threads
+    Returns:
+        n_rows --> int: rows repeating an earlier row (`df.duplicated().sum()`)
+        n_groups --> int: distinct rows occurring more than once
+    """
+
+    hashes = row_hashes(df, chunk_size, max_workers)
+
+    # Rows sharing their hash with another row are the only candidates
+    candidates = np.flatnonzero(pd.Series(hashes).duplicated(keep=False).to_numpy())
+    if not len(candidates):
+        return 0, 0
+
+    # Exact comparison of the candidates, only true duplicates remain
+    rows = df.iloc[candidates]
+    repeated = rows.duplicated(keep="first").to_numpy()
+    occurring = rows.duplicated(keep=False).to_numpy()
+
+    return int(repeated.sum()), int((occurring & ~repeated).sum())
+
+
+def column_fingerprint(series, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Digest the row hashes of a column, identical columns have the same
+    fingerprint.
+
+    Args:
+        series --> pandas series: the column
+        chunk_size --> int: number of rows hashed at a time
+    Returns:
+        fingerprint --> bytes: 16 bytes digest
+    """
+
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(series.dtype).encode())
+    for start, stop in iter_chunks(len(series), chunk_size):
+        hashes = pd.util.hash_pandas_object(series.iloc[start:stop], index=False)
+        digest.update(hashes.to_numpy().tobytes())
+
+    return digest.digest()
+
+
+def duplicate_columns(df, chunk_size=DEFAULT_CHUNK_SIZE, max_workers=None):
+    """
+    Find the groups of identical columns (same dtype and values).
+
+    Args:
+        df --> pandas dataframe: the data
+        chunk_size --> int: number of rows hashed at a time
+        max_workers --> int: upper limit of the worker threads
+    Returns:
+        groups --> list: lists of the headers of identical columns, in the
+            order of the data
+    """
+
+    fingerprints = parallel_map(
+        lambda position: column_fingerprint(df.iloc[:, position], chunk_size),
+        range(df.shape[1]),
+        max_workers,
+    )
+
+    candidates = {}
+    for position, fingerprint in enumerate(fingerprints):
+        candidates.setdefault(fingerprint, []).append(position)
+
+    groups = []
+    for positions in candidates.values():
+        # Confirm the columns sharing a fingerprint are equal
+        while len(positions) > 1:
+            first = df.iloc[:, positions[0]]
+            same = [p for p in positions if df.iloc[:, p].equals(first)]
+            if len(same) > 1:
+                groups.append(same)
+            positions = [p for p in positions if p not in same]
+
+    return [[df.columns[p] for p in group] for group in sorted(groups)]
+
+
+def find_duplicates(df, chunk_size=DEFAULT_CHUNK_SIZE, max_workers=None):
+    """
+    Find the duplicated rows and columns of a dataframe.
+
+    Args:
+        df --> pandas dataframe: the data
+        chunk_size --> int: number of rows hashed at a time
+        max_workers --> int: upper limit of the worker threads
+    Returns:
+        summary --> DuplicateSummary: the duplicated rows and columns
+    """
+
+    n_rows, n_groups = duplicate_rows(df, chunk_size, max_workers)
+    column_groups = duplicate_columns(df, chunk_size, max_workers)
+
+    return DuplicateSummary(n_rows, n_groups, column_groups)
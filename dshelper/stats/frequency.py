@@ -0,0 +1,169 @@
+"""
+Top-k value counts for categorical (object) columns.
+
+The column is counted chunk by chunk with a hash count (`value_counts`).
+Every partial count is truncated to the `capacity` most frequent values,
+so the memory stays bounded on ID-like columns with millions of distinct
+values. The truncated counts are merged the same way (a mergeable
+Misra-Gries / Space-Saving summary): the count of a value is exact when the
+column has at most `capacity` distinct values, otherwise it is undercounted
+by at most `max_error`.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .utils import iter_chunks, parallel_map
+
+
+DEFAULT_CAPACITY = 10_000
+
+DEFAULT_CHUNK_SIZE = 1_000_000
+
+# Maximum number of bars in a categorical histogram, the rest is one "Other" bar
+MAX_BARS = 50
+
+
+class FrequencySummary:
+    """
+    Bounded summary of the value counts of a column.
+
+    Args:
+        counts --> pandas series: counts of the kept values
+        total --> int: number of non-null values in the column
+        n_null --> int: number of null values in the column
+        max_error --> int: upper bound of the undercount of any value
+        exact --> bool: whether every distinct value is kept
+    Returns: None
+    """
+
+    def __init__(self, counts, total, n_null=0, max_error=0, exact=True):
+        self.counts = counts
+        self.total = total
+        self.n_null = n_null
+        self.max_error = max_error
+        self.exact = exact
+
+    @classmethod
+    def from_counts(cls, counts, capacity=DEFAULT_CAPACITY, n_null=0):
+        """
+        Build a summary from exact value counts, truncated to the capacity.
+
+        Args:
+            counts --> pandas series: value counts of a column (or chunk)
+            capacity --> int: maximum number of values kept
+            n_null --> int: number of null values
+        Returns:
+            summary --> FrequencySummary: the summary
+        """
+
+        counts = counts[counts > 0]
+        total = int(counts.sum())
+
+        return cls(counts, total, n_null).truncate(capacity)
+
+    def truncate(self, capacity):
+        """
+        Keep the `capacity` most frequent values, the largest dropped count
+        is added to the error bound.
+
+        Args:
+            capacity --> int: maximum number of values kept
+        Returns:
+            self --> FrequencySummary: the truncated summary
+        """
+
+        if len(self.counts) > capacity:
+            counts = self.counts.sort_values(ascending=False, kind="mergesort")
+            self.max_error += int(counts.iloc[capacity])
+            self.counts = counts.iloc[:capacity]
+            self.exact = False
+
+        return self
+
+    def merge(self, other, capacity=DEFAULT_CAPACITY):
+        """
+        Merge the summary of another chunk into this summary.
+
+        Args:
+            other --> FrequencySummary: the summary to be merged
+            capacity --> int: maximum number of values kept
+        Returns:
+            self --> FrequencySummary: the merged summary
+        """
+
+        self.counts = self.counts.add(other.counts, fill_value=0).astype(np.int64)
+        self.total += other.total
+        self.n_null += other.n_null
+        self.max_error += other.max_error
+        self.exact = self.exact and other.exact
+
+        return self.truncate(capacity)
+
+    def top(self, k=MAX_BARS):
+        """
+        Get the k most frequent values and an "Other" bucket for the rest.
+
+        When all the values fit in k bars they are sorted by value (the same
+        as `value_counts().sort_index()`), otherwise by count.
+
+        Args:
+            k --> int: maximum number of bars
+        Returns:
+            counts --> pandas series: counts to be plotted
+        """
+
+        if self.exact and len(self.counts) <= k:
+            try:
+                return self.counts.sort_index()
+            except TypeError:
+                # Mixed types can not be sorted
+                return self.counts
+
+        counts = self.counts.sort_values(ascending=False, kind="mergesort")
+        top = counts.iloc[:k]
+        other = self.total - int(top.sum())
+
+        if other > 0:
+            if self.exact:
+                label = "Other ({} values)".format(len(counts) - len(top))
+            else:
+                label = "Other"
+            top = pd.concat([top, pd.Series([other], index=[label])])
+
+        return top
+
+
+def top_frequencies(
+    series, capacity=DEFAULT_CAPACITY, chunk_size=DEFAULT_CHUNK_SIZE, max_workers=None
+):
+    """
+    Count the values of a column in parallel chunks into a bounded summary.
+
+    Args:
+        series --> pandas series: the column to be counted
+        capacity --> int: maximum number of values kept
+        chunk_size --> int: number of rows in each chunk
+        max_workers --> int: upper limit of the worker threads
+    Returns:
+        summary --> FrequencySummary: the value count summary
+    """
+
+    chunks = list(iter_chunks(len(series), chunk_size))
+    if not chunks:
+        return FrequencySummary(pd.Series([], dtype=np.int64), 0)
+
+    def _count(chunk):
+        values = series.iloc[chunk[0]:chunk[1]]
+        counts = values.value_counts(dropna=True, sort=False)
+        return FrequencySummary.from_counts(
+            counts, capacity, n_null=int(values.isnull().sum())
+        )
+
+    partials = parallel_map(_count, chunks, max_workers)
+
+    summary = partials[0]
+    for partial in partials[1:]:
+        summary.merge(partial, capacity)
+
+    return summary
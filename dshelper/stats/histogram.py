@@ -0,0 +1,184 @@
+"""
+Histogram index (pyramid) for numeric columns.
+
+A column is scanned once, in parallel chunks of rows, into a fine histogram
+of `FINE_BINS` bins (one fused pass for the range and the nulls, one for
+the counts, see `kernels`). Coarser histograms are the sums of adjacent
+fine bins and any other bin count or zoomed range is rebinned from the fine
+counts, so re-selecting a column, changing the bin count or zooming never
+touches the data again.
+
+The range of the index is the range of the finite values, infinite values
+are counted in the outer bins.
+"""
+
+import numpy as np
+from pandas.api.types import is_bool_dtype, is_numeric_dtype
+
+from .kernels import histogram_1d, kernel_values, value_range
+
+
+# Bin count of the histogram plot, a level of the pyramid so it is exact
+DEFAULT_BINS = 100
+
+# Number of bins of the finest level, the default bin count times a power of
+# 2 so every level of the pyramid is the sum of pairs of bins of the level
+# below, down to the default bin count
+FINE_BINS = DEFAULT_BINS * 2 ** 5
+
+DEFAULT_CHUNK_SIZE = 1_000_000
+
+
+def supports_histogram_index(series):
+    """
+    Whether a column can be indexed (numeric or boolean).
+
+    Args:
+        series --> pandas series: the column to be examined
+    Returns:
+        bool
+    """
+
+    return is_numeric_dtype(series) or is_bool_dtype(series)
+
+
+class HistogramIndex:
+    """
+    Fine-grained histogram of one numeric column with a pyramid of coarser
+    levels.
+
+    Args:
+        counts --> numpy array: counts of the FINE_BINS fine bins
+        minimum --> float: lower edge of the first fine bin
+        maximum --> float: upper edge of the last fine bin
+        n_null --> int: number of null values in the column
+    Returns: None
+    """
+
+    def __init__(self, counts, minimum, maximum, n_null=0):
+        self.counts = counts
+        self.minimum = minimum
+        self.maximum = maximum
+        self.n_null = n_null
+
+        self.edges = np.linspace(minimum, maximum, len(counts) + 1)
+        self._build_levels()
+
+    def _build_levels(self):
+        counts = self.counts
+        self._cumulative = np.concatenate([[0], np.cumsum(counts)])
+
+        # Pyramid, level i has len(counts) / 2**i bins
+        self.levels = [counts]
+        while len(self.levels[-1]) > 1 and len(self.levels[-1]) % 2 == 0:
+            self.levels.append(self.levels[-1].reshape(-1, 2).sum(axis=1))
+
+    @classmethod
+    def from_series(
+        cls, series, fine_bins=FINE_BINS, chunk_size=DEFAULT_CHUNK_SIZE, max_workers=None
+    ):
+        """
+        Build the index of a column, chunk by chunk in parallel.
+
+        Args:
+            series --> pandas series: numeric column
+            fine_bins --> int: number of fine bins
+            chunk_size --> int: number of rows in each chunk
+            max_workers --> int: upper limit of the worker threads
+        Returns:
+            index --> HistogramIndex: the histogram index
+        """
+
+        values = kernel_values(series)
+
+        # First pass for the range
+        minimum, maximum, n_null = value_range(
+            values, chunk_size=chunk_size, max_workers=max_workers
+        )
+
+        if np.isnan(minimum):
+            # No finite value (all null, infinite or empty), the infinite
+            # values are counted in the outer bins of a unit range
+            minimum, maximum = 0.0, 1.0
+        elif minimum == maximum:
+            # Constant column, center the value in a unit range
+            minimum, maximum = minimum - 0.5, maximum + 0.5
+
+        # Second pass for the counts, the max goes in the last bin
+        counts = histogram_1d(
+            values,
+            fine_bins,
+            minimum,
+            maximum,
+            chunk_size=chunk_size,
+            max_workers=max_workers,
+        )[0]
+
+        return cls(counts, minimum, maximum, n_null=n_null)
+
+    def update(self, series):
+        """
+        Add the values of new rows of the column to the index. The fine bins
+        are fixed, so new values outside the indexed range can not be added.
+
+        Args:
+            series --> pandas series: the new rows of the column
+        Returns:
+            updated --> bool: False when the values are out of range, the
+                index is unchanged and has to be rebuilt from the full column
+        """
+
+        values = kernel_values(series)
+
+        # One pass for the counts, the nulls and the range of the new values
+        counts, n_null, low, high = histogram_1d(
+            values, len(self.counts), self.minimum, self.maximum
+        )
+
+        if n_null < len(values):
+            if self.counts.sum() == 0:
+                # Index of an all null column, there is no range yet
+                return False
+            if low < self.minimum or high > self.maximum:
+                return False
+
+            self.counts = self.counts + counts
+            self._build_levels()
+
+        self.n_null += n_null
+
+        return True
+
+    def histogram(self, bins=DEFAULT_BINS, value_range=None):
+        """
+        Get a histogram from the index without reading the data.
+
+        When the bin count matches a level of the pyramid over the full range,
+        the counts are exact. Otherwise the fine counts are rebinned assuming
+        the values are uniform inside each fine bin.
+
+        Args:
+            bins --> int: number of bins
+            value_range --> tuple: (lower, upper) range, None for the full range
+        Returns:
+            counts --> numpy array: count of each bin
+            edges --> numpy array: bin edges (bins + 1)
+        """
+
+        if value_range is None:
+            for level in self.levels:
+                if len(level) == bins:
+                    return level, np.linspace(self.minimum, self.maximum, bins + 1)
+            value_range = (self.minimum, self.maximum)
+
+        lower, upper = value_range
+        edges = np.linspace(lower, upper, bins + 1)
+        cumulative = np.interp(edges, self.edges, self._cumulative)
+
+        return np.diff(cumulative), edges
+
+    @property
+    def resolution(self):
+        """Width of a fine bin"""
+
+        return (self.maximum - self.minimum) / len(self.counts)
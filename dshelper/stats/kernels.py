@@ -0,0 +1,473 @@
+"""
+Fused numeric kernels, compiled with Numba when it is installed.
+
+The NumPy versions of the numeric hot paths make several passes over the
+data (e.g. `nanmin`, `nanmax`, `isnan`, then the bin of each value and a
+`bincount`), each pass allocating a temporary array as large as the chunk.
+The kernels read every value once:
+
+- `value_range`: minimum, maximum (of the finite values) and number of
+  nulls of a column
+- `histogram_1d`: counts of uniform bins over a known range, along with the
+  nulls and the observed range (so an appended chunk is checked against the
+  range of an index in the same pass), infinite values go in the outer bins
+- `grid_counts`: rows (and sums of a value) of every cell of a 2D grid from
+  the cell codes of the two axes
+- `binned_kde`: Gaussian kernel density estimate from linearly binned
+  values, convolved on a fixed grid
+
+With Numba, each kernel splits the rows into one chunk per worker, runs the
+chunks in parallel (`prange`) with their own partial counts and adds them
+up. Without it, the NumPy versions give the same results (up to the order
+of floating point sums), so Numba stays an optional dependency. Every
+function takes `use_numba` to pick a backend (None for Numba when it is
+installed), docs/benchmarks/kernels.py compares the two.
+
+The kernels read integer and float arrays as they are (Numba compiles a
+version per dtype), so the integer columns are not copied to float64
+first; `kernel_values` gets the values of a column.
+"""
+
+import threading
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+from .utils import get_worker_count, iter_chunks, parallel_map
+
+HAS_NUMBA = numba is not None
+
+# Grid points of the density estimate, and bandwidths added on each side of
+# the values (as seaborn's kdeplot)
+KDE_GRID_SIZE = 200
+KDE_CUT = 3
+
+# The Gaussian kernel is cut at this many bandwidths
+KDE_TRUNCATE = 4
+
+DEFAULT_CHUNK_SIZE = 1_000_000
+
+# Parallel Numba kernels are not re-entrant with the default threading layer,
+# the calls from the worker threads of the package are queued (each call
+# already uses all the cores)
+_NUMBA_LOCK = threading.Lock()
+
+
+def _use_numba(use_numba):
+    if use_numba is None:
+        return HAS_NUMBA
+    if use_numba and not HAS_NUMBA:
+        raise ImportError("use_numba requires numba to be installed")
+
+    return use_numba
+
+
+def _n_chunks(length, max_workers):
+    return max(min(get_worker_count(max_workers), numba.get_num_threads(), length), 1)
+
+
+def _as_values(values):
+    """Integer and float arrays as they are (contiguous), others as float64"""
+
+    values = np.asarray(values)
+    if values.dtype.kind in "iuf":
+        return np.ascontiguousarray(values)
+
+    return np.ascontiguousarray(values, dtype=np.float64)
+
+
+def kernel_values(series):
+    """
+    Values of a column as read by the kernels, without a copy for integer
+    and float columns (numpy dtypes).
+
+    Args:
+        series --> pandas series: numeric or boolean column
+    Returns:
+        values --> numpy array: integer or float values, NaN for null
+    """
+
+    dtype = series.dtype
+    if isinstance(dtype, np.dtype) and dtype.kind in "iuf":
+        return series.to_numpy()
+
+    # Booleans and nullable types, whose nulls become NaN
+    return series.to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+if HAS_NUMBA:
+
+    @numba.njit(parallel=True, nogil=True, cache=True)
+    def _value_range_numba(values, n_chunks):
+        n = len(values)
+        size = (n + n_chunks - 1) // n_chunks
+        minima = np.full(n_chunks, np.inf)
+        maxima = np.full(n_chunks, -np.inf)
+        nulls = np.zeros(n_chunks, dtype=np.int64)
+
+        for chunk in numba.prange(n_chunks):
+            low, high, n_null = np.inf, -np.inf, 0
+            for i in range(chunk * size, min((chunk + 1) * size, n)):
+                value = values[i]
+                if np.isnan(value):
+                    n_null += 1
+                elif not np.isinf(value):
+                    low = min(low, value)
+                    high = max(high, value)
+            minima[chunk], maxima[chunk], nulls[chunk] = low, high, n_null
+
+        return minima.min(), maxima.max(), nulls.sum()
+
+    @numba.njit(parallel=True, nogil=True, cache=True)
+    def _histogram_numba(values, bins, minimum, scale, n_chunks):
+        n = len(values)
+        size = (n + n_chunks - 1) // n_chunks
+        counts = np.zeros((n_chunks, bins), dtype=np.int64)
+        minima = np.full(n_chunks, np.inf)
+        maxima = np.full(n_chunks, -np.inf)
+        nulls = np.zeros(n_chunks, dtype=np.int64)
+
+        for chunk in numba.prange(n_chunks):
+            low, high, n_null = np.inf, -np.inf, 0
+            for i in range(chunk * size, min((chunk + 1) * size, n)):
+                value = values[i]
+                if np.isnan(value):
+                    n_null += 1
+                    continue
+                if not np.isinf(value):
+                    low = min(low, value)
+                    high = max(high, value)
+
+                # Values out of the range go in the outer bins
+                position = (value - minimum) * scale
+                if position < 0:
+                    counts[chunk, 0] += 1
+                elif position >= bins - 1:
+                    counts[chunk, bins - 1] += 1
+                else:
+                    counts[chunk, int(position)] += 1
+            minima[chunk], maxima[chunk], nulls[chunk] = low, high, n_null
+
+        return counts.sum(axis=0), nulls.sum(), minima.min(), maxima.max()
+
+    @numba.njit(parallel=True, nogil=True, cache=True)
+    def _grid_numba(codes_x, codes_y, n_y, n_cells, weights, weighted, n_chunks):
+        n = len(codes_x)
+        size = (n + n_chunks - 1) // n_chunks
+        counts = np.zeros((n_chunks, n_cells), dtype=np.int64)
+        sums = np.zeros((n_chunks, n_cells if weighted else 0))
+
+        for chunk in numba.prange(n_chunks):
+            for i in range(chunk * size, min((chunk + 1) * size, n)):
+                x, y = codes_x[i], codes_y[i]
+                if x < 0 or y < 0:
+                    continue
+                if weighted and np.isnan(weights[i]):
+                    continue
+                key = x * n_y + y
+                counts[chunk, key] += 1
+                if weighted:
+                    sums[chunk, key] += weights[i]
+
+        return counts.sum(axis=0), sums.sum(axis=0)
+
+    @numba.njit(parallel=True, nogil=True, cache=True)
+    def _linear_bins_numba(values, start, step, size, n_chunks):
+        n = len(values)
+        chunk_size = (n + n_chunks - 1) // n_chunks
+        weights = np.zeros((n_chunks, size))
+
+        for chunk in numba.prange(n_chunks):
+            for i in range(chunk * chunk_size, min((chunk + 1) * chunk_size, n)):
+                value = values[i]
+                if np.isnan(value):
+                    continue
+                position = (value - start) / step
+                index = min(max(int(np.floor(position)), 0), size - 2)
+                fraction = position - index
+                weights[chunk, index] += 1 - fraction
+                weights[chunk, index + 1] += fraction
+
+        return weights.sum(axis=0)
+
+    @numba.njit(parallel=True, nogil=True, cache=True)
+    def _convolve_numba(weights, kernel):
+        size = len(weights)
+        radius = len(kernel) // 2
+        output = np.zeros(size)
+
+        for j in numba.prange(size):
+            total = 0.0
+            for k in range(max(j - radius, 0), min(j + radius + 1, size)):
+                total += weights[k] * kernel[j - k + radius]
+            output[j] = total
+
+        return output
+
+
+def value_range(
+    values, use_numba=None, chunk_size=DEFAULT_CHUNK_SIZE, max_workers=None
+):
+    """
+    Minimum and maximum of the finite values and number of nulls of a
+    column, in one pass. Infinite values are neither null nor in the range.
+
+    Args:
+        values --> numpy array: integer or float values, NaN for null
+        use_numba --> bool: backend, None for Numba when it is installed
+        chunk_size --> int: number of rows in each chunk (NumPy backend)
+        max_workers --> int: upper limit of the worker threads
+    Returns:
+        minimum --> float: NaN when no value is finite
+        maximum --> float: NaN when no value is finite
+        n_null --> int: number of null values
+    """
+
+    values = _as_values(values)
+
+    if _use_numba(use_numba):
+        with _NUMBA_LOCK:
+            minimum, maximum, n_null = _value_range_numba(
+                values, _n_chunks(len(values), max_workers)
+            )
+    else:
+
+        def _scan(chunk):
+            chunk_values = values[chunk[0]:chunk[1]]
+            n_null = int(np.isnan(chunk_values).sum())
+            finite = chunk_values[np.isfinite(chunk_values)]
+            if not len(finite):
+                return np.inf, -np.inf, n_null
+            return finite.min(), finite.max(), n_null
+
+        scans = parallel_map(_scan, iter_chunks(len(values), chunk_size), max_workers)
+        minimum = min([scan[0] for scan in scans], default=np.inf)
+        maximum = max([scan[1] for scan in scans], default=-np.inf)
+        n_null = sum(scan[2] for scan in scans)
+
+    if minimum > maximum:
+        # No finite value
+        return np.nan, np.nan, int(n_null)
+
+    return float(minimum), float(maximum), int(n_null)
+
+
+def histogram_1d(
+    values,
+    bins,
+    minimum,
+    maximum,
+    use_numba=None,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    max_workers=None,
+):
+    """
+    Count the values in uniform bins over a range, in one pass. Values out
+    of the range (and infinite values) are counted in the first or last bin.
+
+    Args:
+        values --> numpy array: float values, NaN for null
+        bins --> int: number of bins
+        minimum --> float: lower edge of the first bin
+        maximum --> float: upper edge of the last bin (greater than minimum)
+        use_numba --> bool: backend, None for Numba when it is installed
+        chunk_size --> int: number of rows in each chunk (NumPy backend)
+        max_workers --> int: upper limit of the worker threads
+    Returns:
+        counts --> numpy array: int64 count of each bin
+        n_null --> int: number of null values
+        low --> float: smallest finite value, NaN when there is none
+        high --> float: largest finite value, NaN when there is none
+    """
+
+    values = _as_values(values)
+    scale = bins / (maximum - minimum)
+
+    if _use_numba(use_numba):
+        with _NUMBA_LOCK:
+            counts, n_null, low, high = _histogram_numba(
+                values, bins, minimum, scale, _n_chunks(len(values), max_workers)
+            )
+    else:
+
+        def _count(chunk):
+            chunk_values = values[chunk[0]:chunk[1]]
+            valid = chunk_values[~np.isnan(chunk_values)]
+            # In float64 as the Numba kernel, whatever the dtype of the values
+            positions = np.subtract(valid, minimum, dtype=np.float64)
+            positions *= scale
+            np.clip(positions, 0, bins - 1, out=positions)
+            counts = np.bincount(positions.astype(np.int64), minlength=bins)
+            n_null = len(chunk_values) - len(valid)
+            finite = valid[np.isfinite(valid)]
+            if not len(finite):
+                return counts, n_null, np.inf, -np.inf
+            return counts, n_null, finite.min(), finite.max()
+
+        chunks = iter_chunks(len(values), chunk_size)
+        partials = parallel_map(_count, chunks, max_workers)
+        counts = np.zeros(bins, dtype=np.int64)
+        for partial in partials:
+            counts += partial[0]
+        n_null = sum(partial[1] for partial in partials)
+        low = min([partial[2] for partial in partials], default=np.inf)
+        high = max([partial[3] for partial in partials], default=-np.inf)
+
+    if low > high:
+        # No finite value
+        low, high = np.nan, np.nan
+
+    return counts, int(n_null), float(low), float(high)
+
+
+def grid_counts(codes_x, codes_y, n_x, n_y, weights=None, use_numba=None):
+    """
+    Count the rows of every cell of a 2D grid, and sum a value over them,
+    from the cell codes of the two axes (one key per cell, one pass).
+
+    Args:
+        codes_x --> numpy array: integer cell of each row on the x axis, -1
+            for rows left out
+        codes_y --> numpy array: integer cell of each row on the y axis, -1
+            for rows left out
+        n_x --> int: number of cells of the x axis
+        n_y --> int: number of cells of the y axis
+        weights --> numpy array: value of each row summed over the
+            cells (rows with a NaN value are left out), None to only count
+        use_numba --> bool: backend, None for Numba when it is installed
+    Returns:
+        counts --> numpy array: int64 rows of each cell, flat (x * n_y + y)
+        sums --> numpy array: sum of the weights of each cell, flat (None
+            without weights)
+    """
+
+    n_cells = n_x * n_y
+
+    if _use_numba(use_numba):
+        weighted = weights is not None
+        weights = _as_values(weights) if weighted else np.zeros(0)
+        with _NUMBA_LOCK:
+            counts, sums = _grid_numba(
+                np.ascontiguousarray(codes_x),
+                np.ascontiguousarray(codes_y),
+                n_y,
+                n_cells,
+                weights,
+                weighted,
+                _n_chunks(len(codes_x), None),
+            )
+
+        return counts, sums if weighted else None
+
+    valid = (codes_x >= 0) & (codes_y >= 0)
+    if weights is not None:
+        valid &= ~np.isnan(weights)
+        weights = weights[valid]
+
+    # One key per pair of cells, grouped by a single bincount
+    keys = codes_x[valid].astype(np.int64) * n_y + codes_y[valid]
+    counts = np.bincount(keys, minlength=n_cells)
+    if weights is None:
+        return counts, None
+
+    return counts, np.bincount(keys, weights=weights, minlength=n_cells)
+
+
+def kde_bandwidth(values):
+    """
+    Bandwidth of the density estimate (Scott's rule, as scipy's
+    gaussian_kde), 0 with fewer than two distinct values.
+
+    Args:
+        values --> numpy array: float values without nulls
+    Returns:
+        bandwidth --> float
+    """
+
+    if len(values) < 2:
+        return 0.0
+
+    return float(np.std(values, ddof=1) * len(values) ** (-1 / 5))
+
+
+def binned_kde(
+    values,
+    grid_size=KDE_GRID_SIZE,
+    bandwidth=None,
+    cut=KDE_CUT,
+    use_numba=None,
+):
+    """
+    Gaussian kernel density estimate on a grid. The values are linearly
+    binned onto the grid points (one pass over the data), and the binned
+    weights are convolved with the kernel, so the cost does not grow with
+    the product of the number of values and grid points.
+
+    Args:
+        values --> numpy array: integer or float values, NaN for null
+        grid_size --> int: number of grid points
+        bandwidth --> float: standard deviation of the kernel, None for
+            Scott's rule
+        cut --> float: bandwidths added to the range of the values on each
+            side of the grid
+        use_numba --> bool: backend, None for Numba when it is installed
+    Returns:
+        grid --> numpy array: the grid points, empty when the density can
+            not be estimated (fewer than two distinct values)
+        density --> numpy array: the density at each grid point
+    """
+
+    values = _as_values(values)
+    valid = values[~np.isnan(values)]
+    if bandwidth is None:
+        bandwidth = kde_bandwidth(valid)
+    if not len(valid) or not bandwidth > 0 or grid_size < 2:
+        return np.zeros(0), np.zeros(0)
+
+    grid = np.linspace(
+        valid.min() - cut * bandwidth, valid.max() + cut * bandwidth, grid_size
+    )
+    step = grid[1] - grid[0]
+
+    radius = min(int(np.ceil(KDE_TRUNCATE * bandwidth / step)), grid_size - 1)
+    offsets = np.arange(-radius, radius + 1) * step
+    kernel = np.exp(-0.5 * (offsets / bandwidth) ** 2)
+
+    if _use_numba(use_numba):
+        with _NUMBA_LOCK:
+            weights = _linear_bins_numba(
+                valid, grid[0], step, grid_size, _n_chunks(len(valid), None)
+            )
+            density = _convolve_numba(weights, kernel)
+    else:
+        positions = (valid - grid[0]) / step
+        index = np.clip(np.floor(positions).astype(np.int64), 0, grid_size - 2)
+        fraction = positions - index
+        weights = np.bincount(index, weights=1 - fraction, minlength=grid_size)
+        weights += np.bincount(index + 1, weights=fraction, minlength=grid_size)
+        density = np.convolve(weights, kernel)[radius:radius + grid_size]
+
+    return grid, density / (len(valid) * bandwidth * np.sqrt(2 * np.pi))
+
+
+def null_count(series, use_numba=None):
+    """
+    Number of nulls of a column. Float columns are counted by the fused
+    scan, the other types by pandas.
+
+    Args:
+        series --> pandas series: the column
+        use_numba --> bool: backend, None for Numba when it is installed
+    Returns:
+        n_null --> int
+    """
+
+    is_float = isinstance(series.dtype, np.dtype) and series.dtype.kind == "f"
+    if not is_float or not _use_numba(use_numba):
+        return int(series.isna().sum())
+
+    return value_range(series.to_numpy(), use_numba=True)[2]
@@ -0,0 +1,133 @@
+"""
+Memory accounting of dataframes and computed artifacts.
+
+`df.memory_usage(deep=True)` measures every python object of the object
+columns, which takes a while on big frames. Object columns are estimated
+from a random sample of their values instead (exact on request); the other
+columns are measured from their buffers.
+"""
+
+import sys
+
+import numpy as np
+import pandas as pd
+
+
+DEFAULT_SAMPLE_SIZE = 10_000
+
+POINTER_BYTES = np.dtype(object).itemsize
+
+
+def _object_memory(values, exact=False, sample_size=DEFAULT_SAMPLE_SIZE, seed=0):
+    """Deep memory of an object array: the pointers and the objects"""
+
+    n = len(values)
+    if exact or n <= sample_size:
+        return n * POINTER_BYTES + sum(sys.getsizeof(value) for value in values)
+
+    positions = np.random.default_rng(seed).choice(n, sample_size, replace=False)
+    average = np.mean([sys.getsizeof(values[position]) for position in positions])
+
+    return n * POINTER_BYTES + int(average * n)
+
+
+def column_memory(series, exact=False, sample_size=DEFAULT_SAMPLE_SIZE, seed=0):
+    """
+    Get the deep memory of a column, sampled for object columns.
+
+    Args:
+        series --> pandas series: the column to be measured
+        exact --> bool: measure every object of object columns
+        sample_size --> int: number of objects sampled
+        seed --> int: seed of the sample
+    Returns:
+        memory --> int: bytes used by the values (without the index)
+    """
+
+    if series.dtype == object:
+        return _object_memory(series.to_numpy(), exact, sample_size, seed)
+
+    # Buffers (and categories/strings of extension arrays)
+    return int(series.memory_usage(index=False, deep=True))
+
+
+def index_memory(index, exact=False, sample_size=DEFAULT_SAMPLE_SIZE, seed=0):
+    """
+    Get the deep memory of an index, sampled for object indexes.
+
+    Args:
+        index --> pandas index: the index to be measured
+        exact --> bool: measure every object of an object index
+        sample_size --> int: number of objects sampled
+        seed --> int: seed of the sample
+    Returns:
+        memory --> int: bytes used by the index
+    """
+
+    if index.dtype == object and not isinstance(index, pd.MultiIndex):
+        return _object_memory(index.to_numpy(), exact, sample_size, seed)
+
+    return int(index.memory_usage(deep=True))
+
+
+def artifact_memory(artifact, _seen=None):
+    """
+    Estimate the memory of a computed artifact (histogram index, value
+    counts, correlation state, ...) from its numpy/pandas buffers.
+
+    Args:
+        artifact --> any object
+    Returns:
+        memory --> int: bytes used by the artifact
+    """
+
+    seen = set() if _seen is None else _seen
+    if id(artifact) in seen:
+        return 0
+    seen.add(id(artifact))
+
+    if isinstance(artifact, np.ndarray):
+        # A view keeps its whole base alive, counted once for all its views
+        base = artifact
+        while isinstance(base.base, np.ndarray):
+            base = base.base
+        if base is not artifact:
+            if id(base) in seen:
+                return 0
+            seen.add(id(base))
+        return base.nbytes
+    if isinstance(artifact, (pd.Series, pd.DataFrame)):
+        return int(np.sum(artifact.memory_usage(index=True, deep=False)))
+    if isinstance(artifact, pd.Index):
+        return int(artifact.memory_usage())
+    if isinstance(artifact, dict):
+        return sys.getsizeof(artifact) + sum(
+            artifact_memory(value, seen) for value in artifact.values()
+        )
+    if isinstance(artifact, (list, tuple, set)):
+        return sys.getsizeof(artifact) + sum(
+            artifact_memory(value, seen) for value in artifact
+        )
+    if hasattr(artifact, "__dict__"):
+        return sys.getsizeof(artifact) + artifact_memory(vars(artifact), seen)
+
+    return sys.getsizeof(artifact)
+
+
+def format_memory(memory_bytes):
+    """
+    Format a memory size.
+
+    Args:
+        memory_bytes --> int: number of bytes
+    Returns:
+        text --> string: e.g. "12.30 MB"
+    """
+
+    memory_use = memory_bytes / 1024
+    if memory_use > 1024 ** 2:
+        return "{:.2f} GB".format(memory_use / 1024 ** 2)
+    if memory_use > 1024:
+        return "{:.2f} MB".format(memory_use / 1024)
+
+    return "{:.2f} KB".format(memory_use)
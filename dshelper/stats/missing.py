@@ -0,0 +1,152 @@
+"""
+Bit-packed null masks: missingness matrix and null co-occurrence.
+
+The null mask of a column is packed with `np.packbits` into one bit per
+row (12.5 MB for 100M rows). The missingness matrix sums the bits of row
+bins (one bin per pixel of the plot) with a popcount lookup of the packed
+bytes, and the co-occurrence of nulls between columns is the popcount of
+the AND of their packed masks, computed over blocks of 64-bit words.
+"""
+
+import numpy as np
+
+from .utils import iter_chunks, parallel_map
+
+
+# Rows checked for nulls at a time when packing (a multiple of 64)
+PACK_CHUNK_ROWS = 1 << 23
+
+# 64-bit words of every column processed together for the co-occurrence
+WORD_BLOCK = 1 << 14
+
+# Number of set bits of every byte value
+_BYTE_POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(
+    axis=1
+).astype(np.uint8)
+
+
+def popcount(words):
+    """
+    Count the set bits of each element of an unsigned integer array.
+
+    Args:
+        words --> numpy array: uint8 or uint64 values
+    Returns:
+        counts --> numpy array: set bits of each value
+    """
+
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words)
+
+    # numpy < 2.0: count the bits of each byte
+    counts = _BYTE_POPCOUNT[words.view(np.uint8)]
+    if words.dtype.itemsize == 1:
+        return counts
+
+    return counts.reshape(words.shape + (words.dtype.itemsize,)).sum(axis=-1)
+
+
+def pack_nulls(series):
+    """
+    Pack the null mask of a column into bits.
+
+    Args:
+        series --> pandas series: the column
+    Returns:
+        packed --> numpy array: uint8 bits (first row in the lowest bit),
+            zero padded to a multiple of 8 bytes so it can be read as uint64
+    """
+
+    n_rows = len(series)
+    n_bytes = -(-n_rows // 64) * 8
+    packed = np.zeros(n_bytes, dtype=np.uint8)
+
+    # The nulls are checked in chunks to bound the temporary boolean mask
+    for start, stop in iter_chunks(n_rows, PACK_CHUNK_ROWS):
+        mask = series.iloc[start:stop].isna().to_numpy()
+        bits = np.packbits(mask, bitorder="little")
+        packed[start // 8:start // 8 + len(bits)] = bits
+
+    return packed
+
+
+def null_counts(masks):
+    """Number of nulls of each packed mask"""
+
+    return np.array(
+        [int(popcount(mask.view(np.uint64)).sum(dtype=np.int64)) for mask in masks],
+        dtype=np.int64,
+    )
+
+
+def missingness_matrix(masks, n_rows, n_bins):
+    """
+    Get the null ratio of row bins of each column.
+
+    Args:
+        masks --> list: packed null masks (see `pack_nulls`)
+        n_rows --> int: number of rows
+        n_bins --> int: number of row bins (e.g. the pixel height of the plot)
+    Returns:
+        ratios --> numpy array: (n_bins, n_columns) null ratio of each bin,
+            bins hold whole bytes (8 rows) unless there are fewer rows
+    """
+
+    n_used = -(-n_rows // 8)
+    n_bins = max(min(n_bins, n_rows), 1)
+
+    if n_bins > n_used:
+        # Fewer rows than bins of whole bytes: one bin per row
+        ratios = np.zeros((n_rows, len(masks)))
+        for num, mask in enumerate(masks):
+            ratios[:, num] = np.unpackbits(mask[:n_used], count=n_rows, bitorder="little")
+
+        return ratios
+
+    starts = np.linspace(0, n_used, n_bins + 1).astype(np.int64)
+    rows = np.minimum(starts[1:] * 8, n_rows) - starts[:-1] * 8
+
+    ratios = np.empty((n_bins, len(masks)))
+    for num, mask in enumerate(masks):
+        byte_counts = _BYTE_POPCOUNT[mask[:n_used]]
+        ratios[:, num] = np.add.reduceat(byte_counts, starts[:-1], dtype=np.int64) / rows
+
+    return ratios
+
+
+def co_occurrence(masks, max_workers=None):
+    """
+    Count the rows where two columns are both null, for every pair.
+
+    Args:
+        masks --> list: packed null masks (see `pack_nulls`)
+        max_workers --> int: upper limit of the worker threads
+    Returns:
+        counts --> numpy array: (n_columns, n_columns) symmetric counts, the
+            diagonal holds the null count of each column
+    """
+
+    n_columns = len(masks)
+    if not n_columns:
+        return np.zeros((0, 0), dtype=np.int64)
+
+    words = [mask.view(np.uint64) for mask in masks]
+    n_words = len(words[0])
+
+    def _block(bounds):
+        start, stop = bounds
+        block = np.stack([column[start:stop] for column in words])
+        counts = np.zeros((n_columns, n_columns), dtype=np.int64)
+        for num in range(n_columns):
+            both = popcount(block[num] & block[num:])
+            counts[num, num:] = both.sum(axis=1, dtype=np.int64)
+
+        return counts
+
+    counts = sum(parallel_map(_block, iter_chunks(n_words, WORD_BLOCK), max_workers))
+    if isinstance(counts, int):
+        # No rows
+        counts = np.zeros((n_columns, n_columns), dtype=np.int64)
+
+    # Mirror the upper triangle
+    return np.triu(counts) + np.triu(counts, 1).T
@@ -0,0 +1,645 @@
+"""
+Computed artifacts (profile) of a dataframe, shared by all the panels.
+
+Every panel showing the same dataframe gets the same `DataProfile` from
+`get_profile(df)`, so a histogram, value count, describe() or correlation
+computed once (by a panel, a background worker or loaded from the on-disk
+cache) is reused everywhere.
+
+When rows are appended to the data, `DataProfile.append` updates the null
+and distinct counts, value counts, histograms and approximate describe()
+statistics from the new rows only.
+
+The bit-packed null masks of the columns (one bit per row) are kept for the
+missingness matrix.
+
+The row samples of the data (see `sampling`) are kept as dataframes with
+their own profile, which knows it profiles a sample.
+
+The profile also accounts the memory of the data (per column, sampled for
+object columns) and of its own caches, and calls its listeners whenever an
+artifact is added, so the memory display can follow.
+"""
+
+import threading
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from .association import AssociationEngine
+from .correlation import CorrelationEngine
+from .binning import sorted_sample
+from .cardinality import bounded_nunique
+from .crosstab import CategoryCodes, crosstab
+from .describe import describe, summarize_columns, summaries_to_describe
+from .distinct import DistinctSketch
+from .duplicates import find_duplicates
+from .frequency import top_frequencies
+from .histogram import HistogramIndex
+from .kernels import null_count
+from .memory import artifact_memory, column_memory, index_memory
+from .missing import pack_nulls
+from .sampling import DEFAULT_SAMPLE_SIZE, draw_sample, extend_sample
+from .timeseries import TimeIndex
+from .utils import ColumnCache, parallel_map
+
+
+class DataProfile:
+    """
+    Caches of the computed artifacts of one dataframe.
+
+    Args:
+        df --> pandas dataframe: the data being examined
+    Returns: None
+    """
+
+    def __init__(self, df):
+        self.df = df
+        self.listeners = []  # called (from any thread) when artifacts are added
+
+        added = self._artifact_added
+        self.histograms = ColumnCache(df, HistogramIndex.from_series, on_add=added)
+        self.frequencies = ColumnCache(df, top_frequencies, on_add=added)
+        self.correlation = CorrelationEngine(on_change=self.notify)
+        # not persisted
+        self.association = AssociationEngine(on_change=self.notify)
+        self.distincts = ColumnCache(df, DistinctSketch.from_series, on_add=added)
+        # not persisted
+        self.time_indexes = ColumnCache(df, TimeIndex.from_series, on_add=added)
+        self.null_masks = ColumnCache(df, pack_nulls, on_add=added)
+        self.category_codes = ColumnCache(df, CategoryCodes.from_series, on_add=added)
+        self.crosstabs = {}  # (column, column) -> crosstab of their categories
+        self.sorted_samples = ColumnCache(df, sorted_sample, on_add=added)
+        self.describe = {}  # exact (bool) -> describe() dataframe
+        self.summaries = None  # column -> ColumnSummary of the approximate describe()
+        self.column_counts = None  # null and distinct counts of each column
+        self.cardinalities = {}  # column -> (bounded distinct count, limit)
+        self.duplicates = None  # DuplicateSummary of the rows and columns
+        self.samples = {}  # (kind, size, seed) -> sampled dataframe
+        self.appended_samples = {}  # (kind, size, seed) -> Sample before an append
+        self.sample = None  # Sample, when the data is a sample of other data
+
+        self.fingerprint = None  # set when loaded from the on-disk cache
+        self.version = 0  # incremented whenever the data changes
+
+        # Memory of the data: estimated (object columns sampled) and exact
+        self.column_memory = ColumnCache(df, column_memory)
+        self.exact_column_memory = ColumnCache(df, partial(column_memory, exact=True))
+        self._index_memory = {}  # exact (bool) -> bytes
+
+    def _artifact_added(self, column):
+        self.notify()
+
+    def notify(self):
+        """Call the listeners, an artifact was added"""
+
+        for listener in list(self.listeners):
+            listener()
+
+    def invalidate(self, columns):
+        """
+        Drop everything computed from columns changed in place (e.g.
+        downcast to a smaller dtype), it is rebuilt on the next request.
+
+        Args:
+            columns --> list: headers of the changed columns
+        Returns: None
+        """
+
+        # First, so the artifacts being built are not kept (see `append`)
+        self.version += 1
+        for cache in (
+            self.histograms,
+            self.frequencies,
+            self.distincts,
+            self.time_indexes,
+            self.null_masks,
+            self.category_codes,
+            self.sorted_samples,
+            self.column_memory,
+            self.exact_column_memory,
+        ):
+            for column in columns:
+                cache.pop(column)
+
+        for column in columns:
+            self.cardinalities.pop(column, None)
+        self.crosstabs = {
+            pair: counts for pair, counts in self.crosstabs.items()
+            if pair[0] not in columns and pair[1] not in columns
+        }
+
+        self.correlation.clear()
+        self.association.clear(columns)
+        self.describe = {}
+        self.summaries = None
+        self.column_counts = None
+        self.duplicates = None
+        self._drop_samples()
+        self.appended_samples = {}
+        self.fingerprint = None
+        self.notify()
+
+    def memory_usage(self, columns=None, exact=False, max_workers=None):
+        """
+        Get the deep memory of the columns. Object columns are estimated
+        from a sample of their values unless `exact` is set.
+
+        Args:
+            columns --> list: column headers, None for all the columns
+            exact --> bool: measure every object of object columns
+            max_workers --> int: upper limit of the worker threads
+        Returns:
+            memory --> pandas series: bytes of each column
+        """
+
+        if columns is None:
+            columns = list(self.df.columns)
+
+        cache = self.exact_column_memory if exact else self.column_memory
+        memory = parallel_map(cache.get, columns, max_workers)
+
+        return pd.Series(memory, index=columns, dtype=np.int64)
+
+    def packed_nulls(self, columns=None, max_workers=None):
+        """
+        Get the bit-packed null masks of the columns, built in parallel on
+        the first request.
+
+        Args:
+            columns --> list: column headers, None for all the columns
+            max_workers --> int: upper limit of the worker threads
+        Returns:
+            masks --> list: packed null mask of each column (see `pack_nulls`)
+        """
+
+        if columns is None:
+            columns = list(self.df.columns)
+
+        return parallel_map(self.null_masks.get, columns, max_workers)
+
+    def index_memory(self, exact=False):
+        """Deep memory of the index of the data, in bytes"""
+
+        memory = self._index_memory.get(exact)
+        if memory is None:
+            version = self.version
+            memory = index_memory(self.df.index, exact=exact)
+            if version == self.version:
+                self._index_memory[exact] = memory
+
+        return memory
+
+    def cache_memory(self):
+        """
+        Get the memory of the computed artifacts.
+
+        Returns:
+            memory --> pandas series: bytes of each kind of artifact
+        """
+
+        return pd.Series(
+            {
+                "Histograms": artifact_memory(self.histograms.items()),
+                "Value counts": artifact_memory(self.frequencies.items()),
+                "Distinct sketches": artifact_memory(self.distincts.items()),
+                "Time indexes": artifact_memory(self.time_indexes.items()),
+                "Null masks": artifact_memory(self.null_masks.items()),
+                "Sorted samples": artifact_memory(self.sorted_samples.items()),
+                "Crosstabs": artifact_memory(
+                    [self.category_codes.items(), self.crosstabs]
+                ),
+                "Correlations": artifact_memory(self.correlation.export_states(self.df)),
+                "Associations": artifact_memory(self.association),
+                "Statistics": artifact_memory(
+                    [self.describe, self.summaries, self.column_counts, self.duplicates]
+                ),
+                # The sampled rows and what the panels computed from them
+                "Samples": sum(
+                    artifact_memory(sampled)
+                    + int(get_profile(sampled).cache_memory().sum())
+                    for sampled in self.samples.values() if sampled is not self.df
+                ),
+            },
+            dtype=np.int64,
+        )
+
+    def artifacts(self):
+        """
+        Get all the computed artifacts, for persisting.
+
+        Returns:
+            artifacts --> dict: artifact name -> computed values
+        """
+
+        return {
+            "histograms": self.histograms.items(),
+            "frequencies": self.frequencies.items(),
+            "correlation": self.correlation.export_states(self.df),
+            "describe": dict(self.describe),
+            "summaries": self.summaries,
+            "column_counts": self.column_counts,
+        }
+
+    def restore(self, artifacts):
+        """
+        Restore artifacts computed earlier for the same data.
+
+        Args:
+            artifacts --> dict: output of `artifacts()`
+        Returns: None
+        """
+
+        for column, index in artifacts.get("histograms", {}).items():
+            self.histograms.put(column, index)
+        for column, summary in artifacts.get("frequencies", {}).items():
+            self.frequencies.put(column, summary)
+        self.correlation.import_states(self.df, artifacts.get("correlation", {}))
+        self.describe.update(artifacts.get("describe", {}))
+        if artifacts.get("summaries") is not None:
+            self.summaries = artifacts["summaries"]
+        if artifacts.get("column_counts") is not None:
+            self.column_counts = artifacts["column_counts"]
+
+    def get_column_counts(self):
+        """
+        Get the null and distinct counts of every column.
+
+        Returns:
+            counts --> dict: "rows": number of rows, "null": null count of
+                each column, "distinct": distinct count of each column,
+                "approximate": whether each distinct count is estimated
+        """
+
+        column_counts = self.column_counts
+        if column_counts is None:
+            version, df = self.version, self.df
+            column_counts = {
+                "rows": df.shape[0],
+                "null": np.array(
+                    [null_count(df.iloc[:, num]) for num in range(df.shape[1])],
+                    dtype=np.int64,
+                ),
+                "distinct": np.array(
+                    [df.iloc[:, num].nunique() for num in range(df.shape[1])]
+                ),
+                "approximate": np.zeros(df.shape[1], dtype=bool),
+            }
+            if version == self.version:
+                # Not kept when rows were appended meanwhile
+                self.column_counts = column_counts
+
+        return column_counts
+
+    def get_duplicates(self, max_workers=None):
+        """
+        Get the duplicated rows and columns of the data, the rows are hashed
+        in parallel chunks and the candidates compared exactly.
+
+        Args:
+            max_workers --> int: upper limit of the worker threads
+        Returns:
+            summary --> DuplicateSummary: the duplicated rows and columns
+        """
+
+        duplicates = self.duplicates
+        if duplicates is None:
+            version = self.version
+            duplicates = find_duplicates(self.df, max_workers=max_workers)
+            if version == self.version:
+                # Not kept when rows were appended meanwhile
+                self.duplicates = duplicates
+
+        return duplicates
+
+    def get_association(self, columns=None):
+        """
+        Get the association matrix (Cramér's V, correlation ratio and
+        Pearson correlation) of the columns, the numeric pairs come from the
+        correlation engine of the profile.
+
+        Args:
+            columns --> list: column headers, None for all the columns
+        Returns:
+            matrix --> pandas dataframe: associations of the usable columns
+        """
+
+        return self.association.compute(self.df, columns, correlation=self.correlation)
+
+    def get_crosstab(self, column_x, column_y):
+        """
+        Get the exact crosstab of two categorical columns, each truncated to
+        its most frequent categories.
+
+        Args:
+            column_x --> string: header of the first column
+            column_y --> string: header of the second column
+        Returns:
+            counts --> numpy array: row count of each pair of categories
+            codes_x --> CategoryCodes: categories of the first column
+            codes_y --> CategoryCodes: categories of the second column
+        """
+
+        version = self.version
+        codes_x = self.category_codes.get(column_x)
+        codes_y = self.category_codes.get(column_y)
+
+        key = (column_x, column_y)
+        counts = self.crosstabs.get(key)
+        if counts is None:
+            counts = crosstab(codes_x, codes_y)
+            if version == self.version:
+                self.crosstabs[key] = counts
+                self.notify()
+
+        return counts, codes_x, codes_y
+
+    def get_sample(self, kind, size=DEFAULT_SAMPLE_SIZE, seed=0, max_workers=None):
+        """
+        Get a sample of the rows of the data, drawn on the first request (or
+        extended from the sample before rows were appended). The same rows
+        are returned to every panel asking for the same sample.
+
+        Args:
+            kind --> string: "reservoir" or "stratified"
+            size --> int: number of rows of the reservoir
+            seed --> int: seed of the row keys
+            max_workers --> int: upper limit of the worker threads
+        Returns:
+            sampled --> pandas dataframe: the sampled rows, the data itself
+                when it has no more than `size` rows
+        """
+
+        key = (kind, size, seed)
+        sampled = self.samples.get(key)
+        if sampled is not None:
+            return sampled
+
+        version, df = self.version, self.df
+        appended = self.appended_samples.pop(key, None)
+        if appended is not None:
+            sample = extend_sample(appended, df, size, max_workers=max_workers)
+        else:
+            sample = draw_sample(df, kind, size, seed, max_workers=max_workers)
+
+        if version != self.version:
+            # Rows were appended meanwhile, the sample is not kept (nor
+            # registered) and the next request extends the previous one
+            if appended is not None:
+                self.appended_samples.setdefault(key, appended)
+            return df if sample is None else df.iloc[sample.positions]
+
+        if sample is None:
+            sampled = df
+        else:
+            sampled = df.iloc[sample.positions]
+            profile = get_profile(sampled)
+            profile.sample = sample
+            # Artifacts of the sample count in the memory of the data
+            profile.listeners.append(self.notify)
+        self.samples[key] = sampled
+        self.notify()
+
+        return sampled
+
+    def _drop_samples(self):
+        for sampled in self.samples.values():
+            if sampled is not self.df:
+                release_profile(sampled)
+        self.samples = {}
+
+    def bounded_distinct(self, columns, limit, max_workers=None):
+        """
+        Get the distinct counts of columns up to a limit (e.g. to pick the
+        icon of a column or the hue columns). The columns are scanned in
+        parallel and each scan stops once the limit is exceeded.
+
+        Args:
+            columns --> list: column headers
+            limit --> int: the largest count of interest
+            max_workers --> int: upper limit of the worker threads
+        Returns:
+            counts --> dict: column -> distinct count, `limit + 1` for the
+                columns with more than `limit` distinct values
+        """
+
+        def _cached(column):
+            if column not in self.cardinalities:
+                return None
+            count, scanned_limit = self.cardinalities[column]
+            if count <= scanned_limit:
+                # Exact count
+                return min(count, limit + 1)
+            if limit <= scanned_limit:
+                return limit + 1
+            return None
+
+        counts = {column: _cached(column) for column in columns}
+
+        if self.column_counts is not None and not self.column_counts["approximate"].any():
+            positions = {column: num for num, column in enumerate(self.df.columns)}
+            for column in columns:
+                if counts[column] is None:
+                    count = int(self.column_counts["distinct"][positions[column]])
+                    counts[column] = min(count, limit + 1)
+
+        missing = [column for column, count in counts.items() if count is None]
+        version, df = self.version, self.df
+        results = parallel_map(
+            lambda column: bounded_nunique(df[column], limit), missing, max_workers
+        )
+        for column, count in zip(missing, results):
+            if version == self.version:
+                self.cardinalities[column] = (count, limit)
+            counts[column] = count
+
+        return counts
+
+    def get_describe(self, exact):
+        """
+        Get the describe() statistics of the data.
+
+        Args:
+            exact --> bool: exact statistics, or approximated with the
+                mergeable column summaries (updated when rows are appended)
+        Returns:
+            describe --> pandas dataframe: same layout as df.describe()
+        """
+
+        if exact in self.describe:
+            return self.describe[exact]
+
+        # Nothing computed from the data is kept when rows were appended
+        # meanwhile, the appended rows would be missing from it
+        version, df = self.version, self.df
+        if exact:
+            describe_df = describe(df, exact=True)
+        else:
+            summaries = self.summaries
+            if summaries is None:
+                summaries = summarize_columns(df)
+                if version == self.version:
+                    self.summaries = summaries
+            if summaries:
+                describe_df = summaries_to_describe(summaries)
+            else:
+                # No numeric columns, pandas describes the object columns
+                describe_df = describe(df, exact=True)
+
+        if version == self.version:
+            self.describe[exact] = describe_df
+            self.notify()
+
+        return describe_df
+
+    def append(self, chunk, df, max_workers=None):
+        """
+        Update the profile for rows appended to the data, only the new rows
+        are read. Artifacts that can not be updated (exact describe(),
+        correlations, histograms of values out of the indexed range) are
+        dropped and recomputed from the full data on the next request.
+
+        Args:
+            chunk --> pandas dataframe: the new rows, same columns as the data
+            df --> pandas dataframe: the data with the new rows appended
+            max_workers --> int: upper limit of the worker threads
+        Returns: None
+        """
+
+        old_df = self.df
+        columns = list(df.columns)
+
+        # The new data is used from here on: the artifacts being built from
+        # the old rows by other threads are not kept (they check the version
+        # or the data of their cache), those already kept are updated below
+        self.df = df
+        self.version += 1
+        for cache in (
+            self.histograms,
+            self.frequencies,
+            self.distincts,
+            self.time_indexes,
+            self.null_masks,
+            self.category_codes,
+            self.sorted_samples,
+            self.column_memory,
+            self.exact_column_memory,
+        ):
+            cache.df = df
+        _rekey_profile(old_df, self)
+
+        if self.column_counts is not None:
+            counts = self.column_counts
+            # The distinct sketches are built once, from the first append on
+            # only the new rows are hashed
+            built = self.distincts.items()
+            parallel_map(
+                lambda column: built[column].update(chunk[column]),
+                [column for column in columns if column in built],
+                max_workers,
+            )
+            missing = [column for column in columns if column not in built]
+            built.update(
+                zip(missing, parallel_map(self.distincts.get, missing, max_workers))
+            )
+            sketches = [built[column] for column in columns]
+            counts["rows"] += chunk.shape[0]
+            counts["null"] = counts["null"] + np.array(
+                [null_count(chunk.iloc[:, num]) for num in range(chunk.shape[1])],
+                dtype=np.int64,
+            )
+            counts["distinct"] = np.array([sketch.estimate() for sketch in sketches])
+            counts["approximate"] = np.array([not sketch.exact for sketch in sketches])
+
+        for column, index in self.histograms.items().items():
+            if not index.update(chunk[column]):
+                self.histograms.pop(column)
+
+        for column, summary in self.frequencies.items().items():
+            summary.merge(top_frequencies(chunk[column], max_workers=max_workers))
+
+        self.describe.pop(True, None)
+        self.describe.pop(False, None)
+        if self.summaries:
+            new_summaries = summarize_columns(
+                chunk[list(self.summaries)], max_workers=max_workers, seed=old_df.shape[0]
+            )
+            for column, summary in new_summaries.items():
+                self.summaries[column].merge(summary)
+
+        for cache, exact in ((self.column_memory, False), (self.exact_column_memory, True)):
+            for column, memory in cache.items().items():
+                cache.put(column, memory + column_memory(chunk[column], exact=exact))
+        self._index_memory.clear()
+
+        # Columns over a limit stay over it, the small counts are re-scanned
+        self.cardinalities = {
+            column: (count, limit)
+            for column, (count, limit) in self.cardinalities.items()
+            if count > limit
+        }
+        self.correlation.clear()
+        self.association.clear()
+        self.time_indexes.clear()
+        self.null_masks.clear()
+        self.category_codes.clear()
+        self.crosstabs = {}
+        self.sorted_samples.clear()
+        self.duplicates = None
+        # The samples are extended from their rows and the new rows only
+        self.appended_samples.update(
+            (key, get_profile(sampled).sample)
+            for key, sampled in self.samples.items()
+            if sampled is not old_df
+        )
+        self._drop_samples()
+        self.fingerprint = None
+        self.notify()
+
+
+_PROFILES = {}
+_PROFILES_LOCK = threading.Lock()
+
+
+def get_profile(df):
+    """
+    Get the shared profile of a dataframe, created on the first request.
+
+    Args:
+        df --> pandas dataframe: the data being examined
+    Returns:
+        profile --> DataProfile: the profile of the dataframe
+    """
+
+    with _PROFILES_LOCK:
+        profile = _PROFILES.get(id(df))
+        if profile is None or profile.df is not df:
+            profile = DataProfile(df)
+            _PROFILES[id(df)] = profile
+
+    return profile
+
+
+def _rekey_profile(old_df, profile):
+    """Register a profile under its new dataframe (after rows are appended)"""
+
+    with _PROFILES_LOCK:
+        if _PROFILES.get(id(old_df)) is profile:
+            del _PROFILES[id(old_df)]
+        _PROFILES[id(profile.df)] = profile
+
+
+def release_profile(df):
+    """
+    Drop the profile of a dataframe (e.g. when its window is closed).
+
+    Args:
+        df --> pandas dataframe: the data being examined
+    Returns: None
+    """
+
+    with _PROFILES_LOCK:
+        profile = _PROFILES.get(id(df))
+        if profile is not None and profile.df is df:
+            del _PROFILES[id(df)]
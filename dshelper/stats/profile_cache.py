@@ -0,0 +1,268 @@
+"""
+Persistent on-disk cache of dataframe profiles.
+
+A dataset is identified by a fingerprint of its shape, column headers,
+dtypes and the hashes of a few sampled row blocks of every column, which is
+cheap even on very large frames. Reopening an unchanged dataset (e.g. the
+same nightly extract) restores every computed artifact instead of
+recomputing it.
+
+The sampled blocks are the first, the last and evenly spaced blocks in
+between, so a change to rows outside the sampled blocks that keeps the
+shape and dtypes is not detected. Clear the cache (or pass a new cache
+directory) when that matters.
+
+Each profile is one file: the pickled artifacts compressed with zlib, written
+atomically. The total size of the cache directory is capped, the least
+recently used profiles are evicted first.
+
+Only load cache directories you created yourself: the files are pickles.
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+import zlib
+
+import numpy as np
+import pandas as pd
+
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".dshelper", "cache")
+
+DEFAULT_MAX_BYTES = 512 * 1024 ** 2
+
+# Number of row blocks hashed per column, and rows in each block
+FINGERPRINT_BLOCKS = 8
+FINGERPRINT_BLOCK_ROWS = 1024
+
+# Bump when the layout of the stored artifacts changes
+FORMAT_VERSION = 4
+
+FILE_SUFFIX = ".profile"
+
+
+def _sample_rows(n_rows, n_blocks=FINGERPRINT_BLOCKS, block_rows=FINGERPRINT_BLOCK_ROWS):
+    """Row positions of the sampled blocks (all rows for small frames)"""
+
+    if n_rows <= n_blocks * block_rows:
+        return np.arange(n_rows)
+
+    starts = np.linspace(0, n_rows - block_rows, n_blocks).astype(np.int64)
+
+    return np.unique((starts[:, None] + np.arange(block_rows)).ravel())
+
+
+def fingerprint(df, n_blocks=FINGERPRINT_BLOCKS, block_rows=FINGERPRINT_BLOCK_ROWS):
+    """
+    Fingerprint a dataframe from its shape, headers, dtypes and sampled values.
+
+    Args:
+        df --> pandas dataframe: the data to be identified
+        n_blocks --> int: number of row blocks hashed per column
+        block_rows --> int: number of rows in each block
+    Returns:
+        fingerprint --> string: hex digest identifying the data
+    """
+
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(repr((FORMAT_VERSION, df.shape)).encode())
+
+    rows = _sample_rows(df.shape[0], n_blocks, block_rows)
+    digest.update(rows.tobytes())
+    digest.update(pd.util.hash_pandas_object(df.index[rows], index=False).to_numpy().tobytes())
+
+    for position in range(df.shape[1]):
+        column = df.iloc[:, position]
+        digest.update(repr((df.columns[position], str(column.dtype))).encode())
+        try:
+            hashes = pd.util.hash_pandas_object(column.iloc[rows], index=False)
+        except TypeError:
+            # Unhashable values (e.g. lists), fall back to their text
+            hashes = pd.util.hash_pandas_object(column.iloc[rows].astype(str), index=False)
+        digest.update(hashes.to_numpy().tobytes())
+
+    return digest.hexdigest()
+
+
+class ProfileCache:
+    """
+    Directory of stored dataframe profiles, with a size cap.
+
+    Args:
+        directory --> string: the cache directory, created when needed
+        max_bytes --> int: maximum total size of the cache directory
+    Returns: None
+    """
+
+    def __init__(self, directory=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory or DEFAULT_CACHE_DIR
+        self.max_bytes = max_bytes
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + FILE_SUFFIX)
+
+    def _entries(self):
+        """Stored profiles as (last use time, size, path), oldest first"""
+
+        entries = []
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return entries
+
+        for name in names:
+            if not name.endswith(FILE_SUFFIX):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        return sorted(entries)
+
+    def load(self, key):
+        """
+        Load the artifacts stored for a fingerprint.
+
+        Args:
+            key --> string: dataset fingerprint
+        Returns:
+            artifacts --> dict: stored artifacts, None when not cached or unreadable
+        """
+
+        path = self._path(key)
+        try:
+            with open(path, "rb") as cache_file:
+                artifacts = pickle.loads(zlib.decompress(cache_file.read()))
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # Truncated or written by an incompatible version
+            self.remove(key)
+            return None
+
+        # The modification time keeps the order of use for the eviction
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        return artifacts
+
+    def save(self, key, artifacts):
+        """
+        Store the artifacts of a fingerprint and evict old profiles over the cap.
+
+        Args:
+            key --> string: dataset fingerprint
+            artifacts --> dict: the artifacts to be stored
+        Returns:
+            size --> int: size of the stored file in bytes, 0 when it is larger
+                than the whole cache and not stored
+        """
+
+        data = zlib.compress(pickle.dumps(artifacts, protocol=pickle.HIGHEST_PROTOCOL), 3)
+        if len(data) > self.max_bytes:
+            return 0
+
+        os.makedirs(self.directory, exist_ok=True)
+        handle, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(handle, "wb") as cache_file:
+                cache_file.write(data)
+            os.replace(temp_path, self._path(key))
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        self.evict()
+
+        return len(data)
+
+    def remove(self, key):
+        """Remove the stored profile of a fingerprint"""
+
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def evict(self):
+        """
+        Remove the least recently used profiles until the cache fits the cap.
+
+        Returns:
+            removed --> int: number of removed profiles
+        """
+
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+
+        removed = 0
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+
+        return removed
+
+    @property
+    def size(self):
+        """Total size of the stored profiles in bytes"""
+
+        return sum(size for _, size, _ in self._entries())
+
+    def clear(self):
+        """Remove all the stored profiles"""
+
+        for _, _, path in self._entries():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def restore(self, profile):
+        """
+        Fingerprint the data of a profile and restore its stored artifacts.
+
+        Args:
+            profile --> DataProfile: the profile to be filled
+        Returns:
+            restored --> bool: whether stored artifacts were found
+        """
+
+        if profile.fingerprint is None:
+            profile.fingerprint = fingerprint(profile.df)
+
+        artifacts = self.load(profile.fingerprint)
+        if artifacts is None:
+            return False
+
+        profile.restore(artifacts)
+
+        return True
+
+    def store(self, profile):
+        """
+        Store the computed artifacts of a profile.
+
+        Args:
+            profile --> DataProfile: the profile to be stored
+        Returns:
+            size --> int: size of the stored file in bytes
+        """
+
+        if profile.fingerprint is None:
+            profile.fingerprint = fingerprint(profile.df)
+
+        return self.save(profile.fingerprint, profile.artifacts())
@@ -0,0 +1,296 @@
+"""
+Row samples of a dataframe, shared by the plots.
+
+Every row gets a pseudo-random key, a hash (splitmix64) of its position and
+a seed. The reservoir sample keeps the `size` rows with the smallest keys:
+it is a uniform sample without replacement, the same seed always picks the
+same rows, and rows appended to the data only enter the sample by having a
+smaller key than a sampled row, so the sample of the grown data keeps most
+of the rows of the previous sample.
+
+The stratified sample adds to the reservoir the rows with the smallest keys
+of every category of the categorical columns (`STRATUM_ROWS` rows per
+category), so a rare category is never sampled away.
+
+Both samples are extended from their rows and the appended rows only (see
+`extend_sample`): the rows with the smallest keys of the grown data are
+either in the previous sample or appended.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .association import is_categorical_column
+from .cardinality import bounded_nunique
+from .utils import iter_chunks, parallel_map
+
+
+SAMPLING_KINDS = ("reservoir", "stratified")
+
+# Rows of the reservoir, data with fewer rows is not sampled
+DEFAULT_SAMPLE_SIZE = 100_000
+
+# Rows kept for every category of a stratified column
+STRATUM_ROWS = 50
+
+# Categorical columns with more distinct values are not stratified
+MAX_STRATA = 1000
+
+DEFAULT_CHUNK_SIZE = 1_000_000
+
+_MASK = (1 << 64) - 1
+_GAMMA = 0x9E3779B97F4A7C15
+
+
+def row_keys(start, stop, seed=0):
+    """
+    Pseudo-random keys of a range of row positions.
+
+    Args:
+        start --> int: first row position
+        stop --> int: row position after the last one
+        seed --> int: seed of the keys
+    Returns:
+        keys --> numpy array: uint64 key of each row
+    """
+
+    return position_keys(np.arange(start, stop, dtype=np.uint64), seed)
+
+
+def position_keys(positions, seed=0):
+    """
+    Pseudo-random keys of row positions, the keys of `row_keys`.
+
+    Args:
+        positions --> numpy array: row positions
+        seed --> int: seed of the keys
+    Returns:
+        keys --> numpy array: uint64 key of each row
+    """
+
+    # splitmix64 of the positions, uint64 arrays wrap around on overflow
+    offset = np.uint64((seed * _GAMMA + _GAMMA) & _MASK)
+    z = np.asarray(positions).astype(np.uint64) * np.uint64(_GAMMA) + offset
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+
+    return z ^ (z >> np.uint64(31))
+
+
+def _smallest(keys, positions, size):
+    if len(keys) <= size:
+        return keys, positions
+
+    keep = np.argpartition(keys, size - 1)[:size]
+
+    return keys[keep], positions[keep]
+
+
+def reservoir_positions(
+    n_rows,
+    size=DEFAULT_SAMPLE_SIZE,
+    seed=0,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    max_workers=None,
+):
+    """
+    Positions of the rows of a reservoir sample.
+
+    Args:
+        n_rows --> int: number of rows of the data
+        size --> int: number of rows sampled
+        seed --> int: seed of the row keys
+        chunk_size --> int: number of rows keyed at a time
+        max_workers --> int: upper limit of the worker threads
+    Returns:
+        positions --> numpy array: sorted positions of the sampled rows
+    """
+
+    def _sample_chunk(bounds):
+        start, stop = bounds
+        return _smallest(
+            row_keys(start, stop, seed), np.arange(start, stop, dtype=np.int64), size
+        )
+
+    chunks = parallel_map(_sample_chunk, iter_chunks(n_rows, chunk_size), max_workers)
+    if not chunks:
+        return np.zeros(0, dtype=np.int64)
+
+    keys = np.concatenate([keys for keys, _ in chunks])
+    positions = np.concatenate([positions for _, positions in chunks])
+
+    return np.sort(_smallest(keys, positions, size)[1])
+
+
+def stratum_positions(series, keys, stratum_rows=STRATUM_ROWS):
+    """
+    Positions of the rows with the smallest keys of every category.
+
+    Args:
+        series --> pandas series: categorical column
+        keys --> numpy array: key of each row (see `row_keys`)
+        stratum_rows --> int: number of rows kept for each category
+    Returns:
+        positions --> numpy array: positions of the kept rows (unsorted)
+    """
+
+    codes = pd.factorize(series)[0]
+    order = np.lexsort((keys, codes))
+    codes = codes[order]
+
+    # Rank of each row in its category, by key
+    first = np.ones(len(codes), dtype=bool)
+    first[1:] = codes[1:] != codes[:-1]
+    starts = np.maximum.accumulate(np.where(first, np.arange(len(codes)), 0))
+    rank = np.arange(len(codes)) - starts
+
+    return order[(rank < stratum_rows) & (codes >= 0)]
+
+
+class Sample:
+    """
+    Rows sampled from a dataframe.
+
+    Args:
+        kind --> string: "reservoir" or "stratified"
+        positions --> numpy array: sorted positions of the sampled rows
+        n_population --> int: number of rows of the sampled data
+        seed --> int: seed of the row keys
+        strata --> tuple: stratified columns (stratified)
+    Returns: None
+    """
+
+    def __init__(self, kind, positions, n_population, seed=0, strata=()):
+        self.kind = kind
+        self.positions = positions
+        self.n_population = n_population
+        self.seed = seed
+        self.strata = tuple(strata)
+
+    def __len__(self):
+        return len(self.positions)
+
+    @property
+    def fraction(self):
+        """Share of the rows of the data in the sample"""
+
+        return len(self.positions) / max(self.n_population, 1)
+
+    def label(self):
+        """Short description, e.g. "1.0% reservoir sample" """
+
+        return "{:.1%} {} sample".format(self.fraction, self.kind)
+
+
+def draw_sample(
+    df,
+    kind="reservoir",
+    size=DEFAULT_SAMPLE_SIZE,
+    seed=0,
+    stratum_rows=STRATUM_ROWS,
+    max_strata=MAX_STRATA,
+    max_workers=None,
+):
+    """
+    Sample the rows of a dataframe.
+
+    Args:
+        df --> pandas dataframe: the data
+        kind --> string: "reservoir" (uniform) or "stratified" (the rare
+            categories of the categorical columns are kept)
+        size --> int: number of rows of the reservoir
+        seed --> int: seed of the row keys
+        stratum_rows --> int: rows kept for each category (stratified)
+        max_strata --> int: categorical columns with more distinct values
+            are not stratified
+        max_workers --> int: upper limit of the worker threads
+    Returns:
+        sample --> Sample: the sampled rows, None when the data has no more
+            than `size` rows
+    """
+
+    if kind not in SAMPLING_KINDS:
+        raise ValueError("kind must be one of {}, got '{}'".format(SAMPLING_KINDS, kind))
+
+    n_rows = df.shape[0]
+    if n_rows <= size:
+        return None
+
+    positions = reservoir_positions(n_rows, size, seed, max_workers=max_workers)
+
+    strata = []
+    if kind == "stratified":
+        categorical = [
+            column for column in df.columns if is_categorical_column(df[column])
+        ]
+        keys = row_keys(0, n_rows, seed) if categorical else None
+
+        def _stratify(column):
+            if bounded_nunique(df[column], max_strata) > max_strata:
+                return None
+            return stratum_positions(df[column], keys, stratum_rows)
+
+        kept = parallel_map(_stratify, categorical, max_workers)
+        strata = [
+            column for column, found in zip(categorical, kept) if found is not None
+        ]
+        positions = np.unique(
+            np.concatenate([positions] + [found for found in kept if found is not None])
+        )
+
+    return Sample(kind, positions, n_rows, seed, strata)
+
+
+def extend_sample(
+    sample,
+    df,
+    size=DEFAULT_SAMPLE_SIZE,
+    stratum_rows=STRATUM_ROWS,
+    max_strata=MAX_STRATA,
+    max_workers=None,
+):
+    """
+    Sample of data grown by appended rows, from the previous sample and the
+    new rows only. It has the same rows as `draw_sample` of the grown data.
+
+    A stratified column has all its categories in the previous sample, so
+    its distinct count is read from the sampled and new rows. The other
+    columns had too many categories (or are not categorical) and are not
+    stratified.
+
+    Args:
+        sample --> Sample: sample of the first `sample.n_population` rows
+        df --> pandas dataframe: the data with the new rows appended
+        size --> int: number of rows of the reservoir, as drawn
+        stratum_rows --> int: rows kept for each category, as drawn
+        max_strata --> int: limit of the stratified columns, as drawn
+        max_workers --> int: upper limit of the worker threads
+    Returns:
+        sample --> Sample: the sampled rows of the grown data
+    """
+
+    n_rows = df.shape[0]
+    candidates = np.concatenate(
+        [sample.positions, np.arange(sample.n_population, n_rows, dtype=np.int64)]
+    )
+    keys = position_keys(candidates, sample.seed)
+    positions = _smallest(keys, candidates, size)[1]
+
+    strata = []
+    if sample.kind == "stratified":
+        sampled = df.iloc[candidates]
+
+        def _stratify(column):
+            if bounded_nunique(sampled[column], max_strata) > max_strata:
+                return None
+            return candidates[stratum_positions(sampled[column], keys, stratum_rows)]
+
+        kept = parallel_map(_stratify, list(sample.strata), max_workers)
+        strata = [
+            column for column, found in zip(sample.strata, kept) if found is not None
+        ]
+        positions = np.concatenate(
+            [positions] + [found for found in kept if found is not None]
+        )
+
+    return Sample(sample.kind, np.unique(positions), n_rows, sample.seed, strata)
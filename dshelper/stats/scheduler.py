@@ -0,0 +1,264 @@
+"""
+Background precomputation of the profile while the user is idle.
+
+After the data is loaded, a pool of worker threads fills the caches of the
+profile (value counts, histogram indexes, describe() and correlations) so
+the panels find them ready when a column is first picked.
+
+Every task is small (one column, or one block of columns of the
+correlation matrix) and is taken from a priority queue, so:
+
+- the columns visible in the grid go first, then the shown columns, then
+  the hidden ones (`prioritize` moves columns to the front at any time)
+- the workers yield to the user: after any interaction (`touch`), the
+  running tasks stop at their next chunk (see `set_yield_check`) and are
+  queued again, and no task starts until the user has been idle for
+  `idle_delay` seconds
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from functools import partial
+
+from .correlation import correlation_dtype
+from .describe import EXACT_ROW_THRESHOLD
+from .histogram import supports_histogram_index
+from .utils import TaskYielded, get_worker_count, set_yield_check
+
+# Seconds without interaction before the workers resume
+IDLE_DELAY = 0.5
+
+# Columns added to the correlation matrix by one task
+CORRELATION_BLOCK = 16
+
+# Task priorities, lower first
+VISIBLE, SHOWN, HIDDEN = 0, 1, 2
+
+
+class PrecomputeScheduler:
+    """
+    Precomputes the artifacts of a profile in worker threads, by priority.
+
+    Args:
+        profile --> DataProfile: the profile to fill
+        max_workers --> int: number of worker threads, None for all cores
+        idle_delay --> float: seconds without interaction before resuming
+        on_progress --> callable: called (from a worker thread) with the
+            number of finished tasks and the number of tasks
+        on_error --> callable: called (from a worker thread) with the log
+            message of a failed task
+    Returns: None
+    """
+
+    def __init__(
+        self,
+        profile,
+        max_workers=None,
+        idle_delay=IDLE_DELAY,
+        on_progress=None,
+        on_error=None,
+    ):
+        self.profile = profile
+        self.max_workers = get_worker_count(max_workers)
+        self.idle_delay = idle_delay
+        self.on_progress = on_progress
+        self.on_error = on_error
+
+        self._condition = threading.Condition()
+        self._queue = []  # (priority, sequence, task), stale entries are skipped
+        self._pending = {}  # task -> current priority
+        self._sequence = itertools.count()
+        self._generation = 0  # incremented when the tasks are replaced
+        self._last_activity = 0.0
+        self._done = 0
+        self._total = 0
+        self._stopped = False
+        self._threads = []
+
+    def schedule(self, shown, hidden=(), visible=()):
+        """
+        Queue the artifacts of the columns, replacing the queued tasks.
+
+        Args:
+            shown --> list: headers of the shown columns
+            hidden --> list: headers of the hidden columns
+            visible --> list: headers of the columns visible in the grid
+        Returns: None
+        """
+
+        df = self.profile.df
+        priorities = {column: HIDDEN for column in hidden}
+        priorities.update((column, SHOWN) for column in shown)
+        priorities.update((column, VISIBLE) for column in visible)
+
+        tasks = []
+        for column, priority in priorities.items():
+            if df[column].dtype == "object":
+                tasks.append((priority, ("frequencies", column)))
+            elif supports_histogram_index(df[column]):
+                tasks.append((priority, ("histograms", column)))
+
+        # describe() and the correlation of the shown columns come after the
+        # column artifacts of the shown columns, the matrix grows one block
+        # of columns at a time (each block only computes its own rows)
+        tasks.append((SHOWN, ("describe", df.shape[0] <= EXACT_ROW_THRESHOLD)))
+        shown = list(shown)
+        for start in range(0, len(shown), CORRELATION_BLOCK):
+            columns = tuple(shown[:start + CORRELATION_BLOCK])
+            tasks.append((SHOWN, ("correlation", columns, len(shown))))
+
+        with self._condition:
+            self._queue = []
+            self._pending = {}
+            self._generation += 1
+            for priority, task in tasks:
+                self._push(task, priority)
+            self._done = 0
+            self._total = len(tasks)
+            self._condition.notify_all()
+
+        self._start()
+        self._progress()
+
+    def prioritize(self, columns, priority=VISIBLE):
+        """
+        Move the queued tasks of columns to the front (e.g. the columns
+        scrolled into view).
+
+        Args:
+            columns --> list: column headers
+            priority --> int: the new priority of their tasks
+        Returns: None
+        """
+
+        columns = set(columns)
+        with self._condition:
+            for task, current in list(self._pending.items()):
+                if task[0] in ("frequencies", "histograms") and task[1] in columns:
+                    if priority < current:
+                        self._push(task, priority)
+
+    def touch(self):
+        """
+        The user interacted, the running tasks stop at their next chunk and
+        the workers pause until the user is idle
+        """
+
+        self._last_activity = time.monotonic()
+
+    def stop(self):
+        """Stop the workers, the running tasks stop at their next chunk"""
+
+        with self._condition:
+            self._stopped = True
+            self._queue = []
+            self._pending = {}
+            self._condition.notify_all()
+
+    @property
+    def progress(self):
+        """Finished and total number of tasks"""
+
+        return self._done, self._total
+
+    def _push(self, task, priority):
+        self._pending[task] = priority
+        heapq.heappush(self._queue, (priority, next(self._sequence), task))
+
+    def _start(self):
+        self._threads = [thread for thread in self._threads if thread.is_alive()]
+        while len(self._threads) < self.max_workers and not self._stopped:
+            thread = threading.Thread(target=self._work, daemon=True)
+            self._threads.append(thread)
+            thread.start()
+
+    def _next_task(self):
+        """
+        Wait for the user to be idle and pop the next task.
+
+        Returns:
+            generation --> int: generation of the task
+            priority --> int: priority of the task
+            task --> tuple: the task, None to stop the worker
+        """
+
+        with self._condition:
+            while not self._stopped:
+                idle = time.monotonic() - self._last_activity
+                if idle < self.idle_delay:
+                    self._condition.wait(self.idle_delay - idle)
+                    continue
+                if not self._queue:
+                    self._condition.wait()
+                    continue
+
+                priority, _, task = heapq.heappop(self._queue)
+                if self._pending.get(task) == priority:
+                    del self._pending[task]
+                    return self._generation, priority, task
+
+        return self._generation, None, None
+
+    def _check_yield(self, generation):
+        """Stop the running task for the user, or when the tasks changed"""
+
+        idle = time.monotonic() - self._last_activity
+        if self._stopped or generation != self._generation or idle < self.idle_delay:
+            raise TaskYielded()
+
+    def _work(self):
+        while True:
+            generation, priority, task = self._next_task()
+            if task is None:
+                return
+
+            set_yield_check(partial(self._check_yield, generation))
+            try:
+                self._run(task)
+            except TaskYielded:
+                # Run again once the user is idle, unless it was replaced
+                with self._condition:
+                    current = generation == self._generation and not self._stopped
+                    if current and task not in self._pending:
+                        self._push(task, priority)
+                continue
+            except Exception as e:
+                if self.on_error is not None:
+                    self.on_error(
+                        "\nPrecomputing the {} failed due to error:\n--> {}".format(
+                            task[0], e
+                        )
+                    )
+            finally:
+                set_yield_check(None)
+
+            with self._condition:
+                if generation != self._generation:
+                    # Tasks were replaced while running
+                    continue
+                self._done += 1
+            self._progress()
+
+    def _run(self, task):
+        profile = self.profile
+        kind = task[0]
+
+        if kind == "frequencies":
+            profile.frequencies.get(task[1])
+        elif kind == "histograms":
+            profile.histograms.get(task[1])
+        elif kind == "describe":
+            profile.get_describe(task[1])
+        elif kind == "correlation":
+            _, columns, n_shown = task
+            profile.correlation.compute(
+                profile.df,
+                columns=list(columns),
+                dtype=correlation_dtype(profile.df.shape[0], n_shown),
+            )
+
+    def _progress(self):
+        if self.on_progress is not None:
+            self.on_progress(self._done, self._total)
@@ -0,0 +1,218 @@
+"""
+Time series helpers: sorted time index, resampling and downsampling.
+
+A datetime column is sorted once into a `TimeIndex` (the argsort permutation
+and the sorted times). Any time window is then two binary searches away, so
+zooming re-reads the full resolution points of the window only. The points
+of a window are resampled with vectorized bucket reductions and downsampled
+with Largest-Triangle-Three-Buckets (LTTB) to about one point per pixel.
+"""
+
+import datetime
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_datetime64_any_dtype
+
+
+RESAMPLE_FUNCTIONS = ("mean", "sum", "min", "max", "count")
+
+# Rows inspected to decide whether an object column holds dates
+DETECTION_ROWS = 1000
+
+
+def is_datetime_column(series):
+    """
+    Whether a column holds dates (datetime dtype, or python date/datetime
+    objects like the "Random Date" column of the demo data).
+
+    Args:
+        series --> pandas series: the column to be examined
+    Returns:
+        bool
+    """
+
+    if is_datetime64_any_dtype(series):
+        return True
+
+    if series.dtype != object:
+        return False
+
+    sample = series.iloc[:DETECTION_ROWS].dropna()
+
+    return len(sample) > 0 and all(
+        isinstance(value, (datetime.date, np.datetime64)) for value in sample
+    )
+
+
+def to_nanoseconds(series):
+    """
+    Convert a date column to int64 nanoseconds since the epoch (UTC for
+    timezone aware columns).
+
+    Args:
+        series --> pandas series: the date column
+    Returns:
+        times --> numpy array: int64 nanoseconds
+        valid --> numpy array: boolean mask of the non-null dates
+    """
+
+    times = pd.to_datetime(series, errors="coerce")
+    if getattr(times.dt, "tz", None) is not None:
+        times = times.dt.tz_convert(None)
+
+    valid = times.notnull().to_numpy()
+    times = times.to_numpy(dtype="datetime64[ns]").view(np.int64)
+
+    return times, valid
+
+
+class TimeIndex:
+    """
+    Sorted index of a date column.
+
+    Args:
+        order --> numpy array: row positions of the non-null dates, in time order
+        times --> numpy array: int64 nanoseconds of those rows, sorted
+    Returns: None
+    """
+
+    def __init__(self, order, times):
+        self.order = order
+        self.times = times
+
+    @classmethod
+    def from_series(cls, series):
+        """
+        Sort a date column into an index.
+
+        Args:
+            series --> pandas series: the date column
+        Returns:
+            index --> TimeIndex: the index
+        """
+
+        times, valid = to_nanoseconds(series)
+        positions = np.flatnonzero(valid)
+        times = times[positions]
+
+        if len(times) > 1 and not (np.diff(times) >= 0).all():
+            permutation = np.argsort(times, kind="stable")
+            positions = positions[permutation]
+            times = times[permutation]
+
+        return cls(positions, times)
+
+    def __len__(self):
+        return len(self.times)
+
+    def window(self, start, stop):
+        """
+        Get the positions (in the index) of the dates in a time window, with
+        one extra point on each side so lines run to the window edges.
+
+        Args:
+            start --> int: first nanosecond of the window
+            stop --> int: last nanosecond of the window
+        Returns:
+            lower, upper --> int: slice of the index
+        """
+
+        lower = int(np.searchsorted(self.times, start, side="left"))
+        upper = int(np.searchsorted(self.times, stop, side="right"))
+
+        return max(lower - 1, 0), min(upper + 1, len(self.times))
+
+
+def resample(times, values, step, how="mean"):
+    """
+    Resample sorted points into fixed time buckets.
+
+    Args:
+        times --> numpy array: sorted int64 nanoseconds
+        values --> numpy array: float values (NaN are ignored)
+        step --> int: bucket width in nanoseconds
+        how --> string: one of RESAMPLE_FUNCTIONS
+    Returns:
+        times --> numpy array: start of each non-empty bucket
+        values --> numpy array: aggregated value of each bucket
+    """
+
+    if how not in RESAMPLE_FUNCTIONS:
+        raise ValueError(
+            "how must be one of {}, got '{}'".format(RESAMPLE_FUNCTIONS, how)
+        )
+
+    valid = ~np.isnan(values)
+    times, values = times[valid], values[valid]
+    if not len(times):
+        return times, values
+
+    buckets = times // step
+    # The times are sorted, so every bucket is a contiguous run of points
+    starts = np.concatenate([[0], np.flatnonzero(np.diff(buckets)) + 1])
+    counts = np.diff(np.append(starts, len(values)))
+
+    if how == "count":
+        result = counts.astype(np.float64)
+    elif how == "min":
+        result = np.minimum.reduceat(values, starts)
+    elif how == "max":
+        result = np.maximum.reduceat(values, starts)
+    else:
+        result = np.add.reduceat(values, starts)
+        if how == "mean":
+            result = result / counts
+
+    return buckets[starts] * step, result
+
+
+def lttb(x, y, n_out):
+    """
+    Downsample a line with Largest-Triangle-Three-Buckets.
+
+    The first and last points are kept, the others are split into n_out - 2
+    buckets and the point of each bucket forming the largest triangle with
+    the previous kept point and the average of the next bucket is kept. The
+    shape (peaks and dips) of the line is preserved.
+
+    Args:
+        x --> numpy array: sorted x values
+        y --> numpy array: y values, without NaN
+        n_out --> int: number of points to keep
+    Returns:
+        keep --> numpy array: positions of the kept points
+    """
+
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    # Bucket i covers [edges[i], edges[i + 1])
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    counts = np.diff(edges)
+    average_x = np.add.reduceat(x[:n - 1], edges[:-1]) / counts
+    average_y = np.add.reduceat(y[:n - 1], edges[:-1]) / counts
+    # The "next bucket" of the last bucket is the last point
+    average_x = np.append(average_x[1:], x[-1])
+    average_y = np.append(average_y[1:], y[-1])
+
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0] = 0
+    keep[-1] = n - 1
+
+    selected = 0
+    for bucket in range(n_out - 2):
+        lower, upper = edges[bucket], edges[bucket + 1]
+        ax, ay = x[selected], y[selected]
+        area = np.abs(
+            (ax - average_x[bucket]) * (y[lower:upper] - ay)
+            - (ax - x[lower:upper]) * (average_y[bucket] - ay)
+        )
+        selected = lower + int(np.argmax(area))
+        keep[bucket + 1] = selected
+
+    return keep
@@ -0,0 +1,200 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Yield check of the thread, see `set_yield_check`
+_local = threading.local()
+
+
+class TaskYielded(Exception):
+    """A background task stopped by its yield check, it is run again later"""
+
+
+def set_yield_check(check):
+    """
+    Set the yield check of the calling thread: `parallel_map` calls it before
+    each item (in the pool threads too), and it raises `TaskYielded` to stop
+    the computation between two chunks, e.g. when the user interacts.
+
+    Args:
+        check --> callable: raises `TaskYielded`, None to remove the check
+    Returns: None
+    """
+
+    _local.check = check
+
+
+def _checked(func, check):
+    """The function calling the yield check first, nested maps check too"""
+
+    def _run(item):
+        check()
+        previous = getattr(_local, "check", None)
+        _local.check = check
+        try:
+            return func(item)
+        finally:
+            _local.check = previous
+
+    return _run
+
+
+def get_worker_count(max_workers=None):
+    """
+    Get the number of worker threads used for the statistics computation.
+
+    Args:
+        max_workers --> int: upper limit of the workers, None for all cores
+    Returns:
+        workers --> int: number of workers (at least 1)
+    """
+
+    workers = os.cpu_count() or 1
+    if max_workers is not None:
+        workers = min(workers, max_workers)
+
+    return max(workers, 1)
+
+
+def iter_chunks(length, chunk_size):
+    """
+    Split a range of rows (or columns) into consecutive chunks.
+
+    Args:
+        length --> int: total number of items
+        chunk_size --> int: number of items in each chunk
+    Returns:
+        generator of (start, stop) tuples
+    """
+
+    chunk_size = max(int(chunk_size), 1)
+    for start in range(0, length, chunk_size):
+        yield start, min(start + chunk_size, length)
+
+
+def parallel_map(func, items, max_workers=None):
+    """
+    Apply a function to every item using a pool of threads.
+
+    Most of the work in this package is done by numpy/pandas, which release
+    the GIL, so threads are enough to use all the cores without copying data
+    into other processes. The yield check of the calling thread (see
+    `set_yield_check`) is called before each item.
+
+    Args:
+        func --> callable: the function applied to each item
+        items --> iterable: the items to be processed
+        max_workers --> int: upper limit of the workers, None for all cores
+    Returns:
+        results --> list: results in the same order as the items
+    """
+
+    items = list(items)
+    workers = min(get_worker_count(max_workers), len(items))
+
+    check = getattr(_local, "check", None)
+    if check is not None:
+        func = _checked(func, check)
+
+    if workers <= 1:
+        return [func(item) for item in items]
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(func, items))
+
+
+class ColumnCache:
+    """
+    Artifacts (histograms, value counts, ...) computed per column of one
+    dataframe. An artifact is built on the first request and kept after.
+
+    Args:
+        df --> pandas dataframe: the data the artifacts are computed from
+        build --> callable: function building the artifact from a column
+            (pandas series)
+        on_add --> callable: called with the column header when an artifact
+            is built (e.g. to account the memory of the cache)
+    Returns: None
+    """
+
+    def __init__(self, df, build, on_add=None):
+        self.build = build
+        self.on_add = on_add
+
+        self._artifacts = {}
+        self._lock = threading.Lock()
+        # Incremented when the data or the artifacts change, an artifact
+        # built across a change is not kept
+        self._generation = 0
+        self._df = df
+
+    @property
+    def df(self):
+        """The data the artifacts are computed from"""
+
+        return self._df
+
+    @df.setter
+    def df(self, df):
+        with self._lock:
+            self._df = df
+            self._generation += 1
+
+    def __contains__(self, column):
+        return column in self._artifacts
+
+    def get(self, column):
+        """
+        Get the artifact of a column, building it on the first request. An
+        artifact built while the data changed (e.g. rows appended) is
+        returned but not kept.
+
+        Args:
+            column --> string: column header
+        Returns:
+            the artifact of the column
+        """
+
+        with self._lock:
+            if column in self._artifacts:
+                return self._artifacts[column]
+            df, generation = self._df, self._generation
+
+        artifact = self.build(df[column])
+
+        with self._lock:
+            if generation != self._generation:
+                return artifact
+            added = column not in self._artifacts
+            artifact = self._artifacts.setdefault(column, artifact)
+
+        if added and self.on_add is not None:
+            self.on_add(column)
+
+        return artifact
+
+    def put(self, column, artifact):
+        """Store an artifact computed elsewhere"""
+
+        with self._lock:
+            self._artifacts[column] = artifact
+
+    def pop(self, column):
+        """Drop the artifact of a column, it is rebuilt on the next request"""
+
+        with self._lock:
+            self._generation += 1
+            return self._artifacts.pop(column, None)
+
+    def items(self):
+        """Get a copy of all the artifacts built so far (column -> artifact)"""
+
+        with self._lock:
+            return dict(self._artifacts)
+
+    def clear(self):
+        """Drop all the artifacts"""
+
+        with self._lock:
+            self._generation += 1
+            self._artifacts.clear()
@@ -0,0 +1,461 @@
+"""
+Run the dshelper GUI in a child process.
+
+`dshelp()` runs the wx main loop in the calling process, which blocks a
+Jupyter kernel until the window is closed. `DataViewer` starts the GUI in a
+child process instead, so the notebook stays responsive:
+
+    viewer = dshelper.DataViewer(df)
+    ...
+    viewer.update(new_df)  # show another (or a modified) frame
+    viewer.append(new_rows)  # add rows to the frame being shown
+    viewer.close()
+
+The numeric, boolean and datetime columns (and index) are copied once into
+shared memory blocks and mapped by the child without any serialization.
+Other columns (object, category and the other extension dtypes) are pickled
+through the pipe. On `update()`, columns still backed by the same arrays keep
+their shared memory block, so pushing a frame with a few new or replaced
+columns only transfers those columns. The columns are matched by identity,
+not content: after editing values in place, push a copy of the frame.
+"""
+
+import gc
+import multiprocessing
+import threading
+import weakref
+
+import numpy as np
+import pandas as pd
+
+
+# Dtype kinds shared through shared memory blocks
+SHARED_KINDS = "biufcmM"
+
+INDEX_KEY = "__index__"
+
+
+def _shared_memory():
+    """The shared_memory module, only available from Python 3.8"""
+
+    try:
+        from multiprocessing import shared_memory
+    except ImportError:
+        raise ImportError("Running dshelper in the background requires Python 3.8+")
+
+    return shared_memory
+
+
+def _shareable(values):
+    """Whether the values are a plain numpy array that can be shared"""
+
+    return isinstance(values, np.ndarray) and values.dtype.kind in SHARED_KINDS
+
+
+def _source_key(values):
+    """
+    Identity of the memory behind an array: the array owning the memory
+    (weakly referenced, so a freed and reused address does not match), the
+    data pointer and the layout. None when the owner cannot be referenced.
+    """
+
+    owner = values
+    while isinstance(owner.base, np.ndarray):
+        owner = owner.base
+    try:
+        owner_ref = weakref.ref(owner)
+    except TypeError:
+        return None
+
+    pointer = values.__array_interface__["data"][0]
+
+    return (owner_ref, pointer, values.strides, values.dtype.str, len(values))
+
+
+class _SharedArray:
+    """A 1-D numpy array copied into a shared memory block"""
+
+    def __init__(self, values):
+        self.source = _source_key(values)
+        values = np.ascontiguousarray(values)
+
+        self.dtype = values.dtype.str
+        self.length = len(values)
+        self.block = _shared_memory().SharedMemory(
+            create=True, size=max(values.nbytes, 1)
+        )
+        self.array = np.ndarray(values.shape, dtype=values.dtype, buffer=self.block.buf)
+        self.array[:] = values
+
+    @property
+    def name(self):
+        return self.block.name
+
+    def same_as(self, values):
+        """Whether the block was copied from these very values (not read)"""
+
+        key = _source_key(values)
+        if self.source is None or key is None:
+            return False
+
+        owner = self.source[0]()
+
+        return owner is not None and owner is key[0]() and self.source[1:] == key[1:]
+
+    def describe(self):
+        return ("shared", self.name, self.dtype, self.length)
+
+    def release(self):
+        self.array = None
+        self.source = None
+        try:
+            self.block.close()
+        except BufferError:
+            # A view of the block is still alive, the mapping goes with it
+            pass
+        try:
+            self.block.unlink()
+        except FileNotFoundError:
+            # Already unlinked by the viewer process on exit
+            pass
+
+
+def _release_blocks(blocks):
+    """Unlink all the shared blocks (also called when the viewer is collected)"""
+
+    for array in blocks.values():
+        array.release()
+    blocks.clear()
+
+
+def attach_frame(descriptor):
+    """
+    Rebuild a dataframe from the shared memory blocks of a descriptor.
+
+    Args:
+        descriptor --> dict: frame descriptor built by `DataViewer`
+    Returns:
+        df --> pandas dataframe: frame backed by the shared memory
+        handles --> list: shared memory handles, keep them while df is used
+    """
+
+    handles = []
+    shared_memory = _shared_memory()
+
+    def _load(entry):
+        if entry[0] == "pickled":
+            return entry[1]
+
+        _, name, dtype, length = entry
+        block = shared_memory.SharedMemory(name=name)
+        handles.append(block)
+
+        return np.ndarray((length,), dtype=np.dtype(dtype), buffer=block.buf)
+
+    index = _load(descriptor["index"])
+    if not isinstance(index, pd.Index):
+        index = pd.Index(index, name=descriptor["index_name"])
+
+    data = {
+        position: _load(entry) for position, entry in enumerate(descriptor["columns"])
+    }
+    df = pd.DataFrame(data, index=index, copy=False)
+    df.columns = descriptor["names"]
+
+    return df, handles
+
+
+def _close_handles(handles, unlink=False):
+    for block in handles:
+        try:
+            block.close()
+        except BufferError:
+            # Still referenced by a frame being collected, closed on exit
+            pass
+        if unlink:
+            try:
+                block.unlink()
+            except FileNotFoundError:
+                # Already released by the parent
+                pass
+
+
+def _run_viewer(conn, descriptor, options):
+    """
+    Entry point of the child process: show the frame and follow the updates
+    sent by the parent until the window is closed.
+    """
+
+    import wx
+
+    try:
+        # Local import
+        from main_gui import MainFrame
+        from components import show_splash
+    except (ModuleNotFoundError, ImportError):
+        # Package import
+        from dshelper.main_gui import MainFrame
+        from dshelper.components import show_splash
+
+    state = {"handles": []}
+
+    def _open(descriptor):
+        df = None
+        handles = []
+        if descriptor is not None:
+            df, handles = attach_frame(descriptor)
+
+        frame = MainFrame(
+            df,
+            options["with_demo"],
+            options["reduce_mem"],
+            app,
+            options["cache"],
+            options["plot_cache_mb"],
+        )
+        state.update(frame=frame, handles=handles)
+
+        if descriptor is not None:
+            conn.send(("shown", descriptor["frame_id"]))
+
+    def _replace(descriptor):
+        old_frame = state["frame"]
+        old_handles = state["handles"]
+
+        # Destroy the old window without exiting the main loop
+        old_frame.release_data()
+        old_frame.Destroy()
+        wx.CallAfter(_open_after_destroy, descriptor, old_handles)
+
+    def _open_after_destroy(descriptor, old_handles):
+        gc.collect()
+        _close_handles(old_handles)
+        _open(descriptor)
+
+    def _listen():
+        while True:
+            try:
+                command, payload = conn.recv()
+            except (EOFError, OSError):
+                # The parent is gone
+                command = "close"
+
+            if command == "update":
+                wx.CallAfter(_replace, payload)
+            elif command == "append":
+                wx.CallAfter(_append, payload)
+            elif command == "close":
+                wx.CallAfter(_close)
+                return
+
+    def _append(rows):
+        state["frame"].append(rows)
+
+    def _close():
+        frame = state.get("frame")
+        if frame:
+            frame.Close()
+
+    app = wx.App(0)
+    splash = show_splash()
+    _open(descriptor)
+    splash.Destroy()
+
+    threading.Thread(target=_listen, daemon=True).start()
+    app.MainLoop()
+
+    # The window is gone and the blocks with it: the parent finds them unlinked
+    _close_handles(state["handles"], unlink=True)
+    try:
+        conn.send(("closed", None))
+    except (BrokenPipeError, OSError):
+        pass
+
+
+class DataViewer:
+    """
+    The dshelper GUI running in a child process.
+
+    Args:
+        df --> pandas dataframe: the df that you would like to inspect
+        with_demo --> bool: show the demo data when df is None
+        reduce_mem --> bool: downcast the columns to save memory
+        cache --> bool or string: on-disk profile cache, see `dshelp()`
+        plot_cache_mb --> float: memory budget of the rendered plots, see
+            `dshelp()`
+    Returns: None
+    """
+
+    def __init__(
+        self, df=None, with_demo=False, reduce_mem=False, cache=None, plot_cache_mb=None
+    ):
+        _shared_memory()  # fail before starting the child on old Pythons
+
+        self._blocks = {}  # block name -> _SharedArray
+        self._columns = {}  # column header -> _SharedArray of the last frame
+        self._frames = {}  # frame id -> block names used by the frame
+        self._frame_id = 0
+        self._shown_id = None
+        self._finalizer = weakref.finalize(self, _release_blocks, self._blocks)
+
+        descriptor = self._share(df) if df is not None else None
+
+        context = multiprocessing.get_context("spawn")
+        self._conn, child_conn = context.Pipe()
+        options = {
+            "with_demo": with_demo,
+            "reduce_mem": reduce_mem,
+            "cache": cache,
+            "plot_cache_mb": plot_cache_mb,
+        }
+        self.process = context.Process(
+            target=_run_viewer, args=(child_conn, descriptor, options), daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+
+    @property
+    def is_alive(self):
+        return self.process.is_alive()
+
+    def _share_array(self, key, values):
+        """Reuse the block of a column when its content did not change"""
+
+        previous = self._columns.get(key)
+        if previous is not None and previous.same_as(values):
+            return previous
+
+        array = _SharedArray(values)
+        self._blocks[array.name] = array
+
+        return array
+
+    def _entry(self, key, values, used, columns):
+        if not _shareable(values):
+            return ("pickled", values)
+
+        array = self._share_array(key, values)
+        columns[key] = array
+        used.add(array.name)
+
+        return array.describe()
+
+    def _share(self, df):
+        """Put the frame into shared memory and build its descriptor"""
+
+        self._frame_id += 1
+        used = set()
+        columns = {}
+
+        index = df.index
+        if isinstance(index, pd.RangeIndex) or not _shareable(index.values):
+            index_entry = ("pickled", index)
+        else:
+            index_entry = self._entry(INDEX_KEY, index.values, used, columns)
+
+        entries = []
+        for position in range(df.shape[1]):
+            column = df.iloc[:, position]
+            key = (position, df.columns[position])
+            entries.append(self._entry(key, column.values, used, columns))
+
+        self._columns = columns
+        self._frames[self._frame_id] = used
+
+        return {
+            "frame_id": self._frame_id,
+            "names": list(df.columns),
+            "columns": entries,
+            "index": index_entry,
+            "index_name": index.name,
+        }
+
+    def _collect(self):
+        """Read the messages of the child and free the blocks no longer shown"""
+
+        while self._conn.poll():
+            try:
+                message, frame_id = self._conn.recv()
+            except (EOFError, OSError):
+                break
+            if message == "shown":
+                self._shown_id = frame_id
+            elif message == "closed":
+                self._shown_id = None
+
+        keep = set()
+        for frame_id, names in list(self._frames.items()):
+            if self._shown_id is not None and frame_id < self._shown_id:
+                del self._frames[frame_id]
+            else:
+                keep |= names
+
+        if not self.is_alive:
+            self._frames.clear()
+            keep = set()
+
+        # Blocks of the last pushed frame are still needed for the next update
+        keep |= {array.name for array in self._columns.values()}
+
+        for name in list(self._blocks):
+            if name not in keep:
+                self._blocks.pop(name).release()
+
+    def update(self, df):
+        """
+        Show another frame in the viewer window.
+
+        Args:
+            df --> pandas dataframe: the df that you would like to inspect
+        Returns: None
+        Raises:
+            RuntimeError when the viewer window has been closed
+        """
+
+        self._collect()
+        if not self.is_alive:
+            raise RuntimeError("The viewer window has been closed")
+
+        self._conn.send(("update", self._share(df)))
+
+    def append(self, rows):
+        """
+        Append rows to the frame shown in the viewer window. The new rows are
+        pickled through the pipe, the rows already shown are not sent again.
+
+        Args:
+            rows --> pandas dataframe, dict of columns or list of records:
+                the new rows, with (a subset of) the columns of the frame
+        Returns: None
+        Raises:
+            RuntimeError when the viewer window has been closed
+        """
+
+        self._collect()
+        if not self.is_alive:
+            raise RuntimeError("The viewer window has been closed")
+
+        self._conn.send(("append", rows))
+
+    def close(self, timeout=5):
+        """
+        Close the viewer window and free the shared memory.
+
+        Args:
+            timeout --> float: seconds to wait for the child process
+        Returns: None
+        """
+
+        if self.is_alive:
+            try:
+                self._conn.send(("close", None))
+            except (BrokenPipeError, OSError):
+                pass
+            self.process.join(timeout)
+            if self.is_alive:
+                self.process.terminate()
+
+        self._columns.clear()
+        self._frames.clear()
+        self._finalizer()
+        self._conn.close()
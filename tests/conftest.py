@@ -0,0 +1,9 @@
+"""
+The modules of dshelper import each other as top level packages (e.g.
+`from stats import ...`) when run from the source tree, the tests do the same.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "dshelper"))
@@ -0,0 +1,49 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from stats.cardinality import FIRST_CHUNK_ROWS, bounded_nunique
+
+
+@pytest.mark.parametrize(
+    "series",
+    [
+        pd.Series([1, 2, 2, 3, np.nan] * 1000),
+        pd.Series(["a", None, "b", "a"] * 1000),
+        pd.Series(pd.Categorical(["x", "y", None] * 1000)),
+        pd.Series([True, False] * 1000),
+        pd.Series(pd.to_datetime(["2020-01-01", None, "2021-01-01"] * 1000)),
+        pd.Series([1, 2, None] * 1000, dtype="Int64"),
+        pd.Series([np.nan] * 10),
+        pd.Series([], dtype=float),
+    ],
+)
+def test_low_cardinality_matches_nunique(series):
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        assert bounded_nunique(series, 9) == series.nunique()
+
+
+def test_stops_above_the_limit():
+    series = pd.Series(np.arange(100_000))
+
+    assert bounded_nunique(series, 9) == 10
+    assert bounded_nunique(series, 10 ** 6) == 100_000
+
+
+def test_values_spread_over_chunks():
+    # The distinct values only appear after the first chunks
+    values = np.zeros(FIRST_CHUNK_ROWS * 8)
+    values[-5:] = np.arange(1, 6)
+    series = pd.Series(values)
+
+    assert bounded_nunique(series, 9) == 6
+    assert bounded_nunique(series, 5) == 6
+
+
+def test_non_default_index():
+    series = pd.Series([3, 1, 3, 2], index=[10, 5, 7, 1])
+
+    assert bounded_nunique(series, 9) == 3
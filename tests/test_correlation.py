@@ -0,0 +1,148 @@
+import gc
+import pickle
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from stats.correlation import CorrelationEngine
+
+
+def make_frame(rows=500, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(
+        {
+            "a": rng.normal(size=rows),
+            "b": rng.normal(size=rows),
+            "n": rng.integers(0, 10, size=rows),
+        }
+    )
+    df["c"] = df["a"] * 2 + rng.normal(size=rows)
+    df.loc[rng.random(rows) < 0.1, "b"] = np.nan
+    df["cat"] = pd.Series(rng.choice(["x", "y", "z"], size=rows))
+
+    return df
+
+
+@pytest.mark.parametrize("method", ["pearson", "spearman"])
+def test_matches_pandas(method):
+    df = make_frame()
+    numeric = ["a", "b", "n", "c"]
+
+    corr = CorrelationEngine().compute(df, numeric, method=method)
+
+    expected = df[numeric].corr(method=method)
+    # Spearman ranks each column once over its own nulls, pandas per pair
+    tolerance = 1e-12 if method == "pearson" else 1e-2
+    np.testing.assert_allclose(corr.to_numpy(), expected.to_numpy(), atol=tolerance)
+
+
+def test_categorical_columns_are_encoded():
+    df = make_frame()
+
+    corr = CorrelationEngine().compute(df, ["a", "cat"])
+
+    assert list(corr.columns) == ["a", "cat_code"]
+    codes = pd.Series(pd.factorize(df["cat"], sort=True)[0])
+    assert corr.iloc[0, 1] == pytest.approx(df["a"].corr(codes))
+
+
+def test_added_columns_match_a_full_computation():
+    df = make_frame()
+    engine = CorrelationEngine()
+
+    engine.compute(df, ["a", "b"])
+    corr = engine.compute(df, ["a", "b", "n", "c"])
+
+    expected = CorrelationEngine().compute(df, ["a", "b", "n", "c"])
+    np.testing.assert_allclose(corr.to_numpy(), expected.to_numpy(), atol=1e-12)
+
+
+def test_state_is_not_shared_with_a_new_frame_at_the_same_address():
+    engine = CorrelationEngine()
+    df = make_frame(seed=0)
+    engine.compute(df, ["a", "c"])
+    stale = engine.get_state(df)
+    del df
+    gc.collect()
+
+    # A new frame with the same shape may reuse the id() of the collected one
+    df = make_frame(seed=1)
+    state = engine.get_state(df)
+    assert state is not stale
+    assert len(state) == 0
+    assert list(engine.export_states(df).values()) == [state]
+
+
+@pytest.mark.parametrize("method", ["pearson", "spearman"])
+def test_added_columns_keep_the_computed_cells(method):
+    df = make_frame()
+    engine = CorrelationEngine(block_size=2)
+    engine.compute(df, ["a", "b", "n"], method=method)
+    state = engine.get_state(df, method)
+    computed = state.matrix[:3, :3].copy()
+
+    corr = engine.compute(df, ["a", "b", "n", "c", "cat"], method=method)
+
+    np.testing.assert_array_equal(state.matrix[:3, :3], computed)
+    expected = CorrelationEngine().compute(
+        df, ["a", "b", "n", "c", "cat"], method=method
+    )
+    np.testing.assert_allclose(corr.to_numpy(), expected.to_numpy(), atol=1e-12)
+
+
+def test_state_memory_does_not_grow_with_the_rows():
+    df = make_frame(rows=20_000)
+    engine = CorrelationEngine(block_size=1)
+    engine.compute(df, ["a", "b", "n", "c", "cat"])
+
+    state = engine.get_state(df)
+    arrays = [value for value in vars(state).values() if isinstance(value, np.ndarray)]
+    assert sum(array.nbytes for array in arrays) < 1000
+
+
+def test_restored_state_adds_columns():
+    df = make_frame()
+    engine = CorrelationEngine()
+    engine.compute(df, ["a", "b"])
+
+    states = pickle.loads(pickle.dumps(engine.export_states(df)))
+    restored = CorrelationEngine()
+    restored.import_states(df, states)
+    corr = restored.compute(df, ["a", "b", "c"])
+
+    expected = df[["a", "b", "c"]].corr()
+    np.testing.assert_allclose(corr.to_numpy(), expected.to_numpy(), atol=1e-12)
+
+
+def test_float32_matches_pandas():
+    df = make_frame()
+    columns = ["a", "b", "n", "c"]
+
+    corr = CorrelationEngine().compute(df, columns, dtype=np.float32)
+
+    assert corr.to_numpy().dtype == np.float32
+    expected = df[columns].corr()
+    np.testing.assert_allclose(corr.to_numpy(), expected.to_numpy(), atol=1e-5)
+
+
+def test_concurrent_computes_match_pandas():
+    df = make_frame(rows=2000)
+    engine = CorrelationEngine(block_size=1, max_workers=2)
+    subsets = [["a", "b"], ["b", "c", "n"], ["a", "n", "c"], ["c", "a", "b", "n"]] * 4
+    results = [None] * len(subsets)
+
+    def _compute(num):
+        results[num] = engine.compute(df, subsets[num])
+
+    threads = [
+        threading.Thread(target=_compute, args=(num,)) for num in range(len(subsets))
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for columns, corr in zip(subsets, results):
+        pd.testing.assert_frame_equal(corr, df[columns].corr(), check_exact=False)
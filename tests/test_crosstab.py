@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+
+from stats.crosstab import CategoryCodes, crosstab, tick_label
+
+
+def make_frame(rows=5_000, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(
+        {
+            "x": rng.choice(["a", "b", "c", "d"], size=rows),
+            "y": rng.choice(["u", "v", "w"], size=rows, p=[0.6, 0.3, 0.1]),
+        }
+    )
+    df.loc[rng.random(rows) < 0.05, "x"] = None
+
+    return df
+
+
+def expected_crosstab(df, codes_x, codes_y):
+    expected = pd.crosstab(df["x"], df["y"])
+    return expected.reindex(index=codes_x.labels, columns=codes_y.labels, fill_value=0)
+
+
+def test_matches_pandas_crosstab():
+    df = make_frame()
+    codes_x = CategoryCodes.from_series(df["x"])
+    codes_y = CategoryCodes.from_series(df["y"])
+
+    counts = crosstab(codes_x, codes_y)
+
+    expected = expected_crosstab(df, codes_x, codes_y)
+    np.testing.assert_array_equal(counts, expected.to_numpy())
+    assert counts.sum() == df.dropna().shape[0]
+
+
+def test_category_counts_match_value_counts():
+    series = make_frame()["x"]
+
+    codes = CategoryCodes.from_series(series)
+
+    expected = series.value_counts()
+    assert dict(zip(codes.labels, codes.counts)) == expected.to_dict()
+    assert (codes.codes == -1).sum() == series.isna().sum()
+
+
+def test_truncated_to_the_most_frequent_categories():
+    series = pd.Series(["a"] * 50 + ["b"] * 30 + ["c"] * 10 + ["d"] * 5 + ["e"] * 2)
+
+    codes = CategoryCodes.from_series(series, top_k=2)
+
+    assert list(codes.labels) == ["a", "b", "Other (3)"]
+    assert list(codes.counts) == [50, 30, 17]
+    assert np.bincount(codes.codes).tolist() == [50, 30, 17]
+
+
+def test_tick_labels():
+    codes = CategoryCodes.from_series(pd.Series(["a", "b", "a"]))
+
+    assert [codes.label(position) for position in (0, 1)] == ["a", "b"]
+    assert codes.label(0.5) == ""
+    assert codes.label(-1) == ""
+    assert codes.label(2) == ""
+    assert tick_label(["(0, 1]", "(1, 2]"], 1.0) == "(1, 2]"
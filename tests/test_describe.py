@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from stats.describe import KLLSketch, approximate_describe, describe
+
+
+def make_frame(rows=20_000, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(
+        {
+            "normal": rng.normal(10, 3, size=rows),
+            "exponential": rng.exponential(size=rows),
+            "integer": rng.integers(0, 1000, size=rows),
+            "text": rng.choice(["a", "b"], size=rows),
+        }
+    )
+    df.loc[rng.random(rows) < 0.1, "normal"] = np.nan
+
+    return df
+
+
+def test_moments_match_pandas():
+    df = make_frame()
+
+    result = approximate_describe(df, chunk_size=3_000)
+
+    expected = df.describe()
+    assert list(result.columns) == list(expected.columns)
+    assert list(result.index) == list(expected.index)
+    for statistic in ("count", "mean", "std", "min", "max"):
+        np.testing.assert_allclose(
+            result.loc[statistic], expected.loc[statistic], rtol=1e-9
+        )
+
+
+def test_percentiles_are_within_the_rank_error():
+    df = make_frame()
+
+    result = approximate_describe(df, chunk_size=3_000)
+
+    error = KLLSketch().rank_error()
+    for column in result.columns:
+        values = df[column].dropna().to_numpy()
+        for label, fraction in (("25%", 0.25), ("50%", 0.5), ("75%", 0.75)):
+            rank = np.mean(values <= result.loc[label, column])
+            assert abs(rank - fraction) < error, (column, label)
+
+
+def test_sketch_merge_matches_a_single_sketch():
+    values = np.random.default_rng(1).normal(size=50_000)
+    merged = KLLSketch(seed=0)
+    for chunk in np.array_split(values, 7):
+        sketch = KLLSketch(seed=1)
+        sketch.update(chunk)
+        merged.merge(sketch)
+
+    assert merged.n == len(values)
+    # The retained items stay bounded, far below the number of values
+    assert sum(len(items) for items in merged.levels) < 1_000
+    quantiles = merged.quantiles([0.1, 0.5, 0.9])
+    ranks = [np.mean(values <= quantile) for quantile in quantiles]
+    np.testing.assert_allclose(ranks, [0.1, 0.5, 0.9], atol=merged.rank_error())
+
+
+def test_empty_and_all_null_columns():
+    df = pd.DataFrame({"empty": np.full(10, np.nan), "value": np.arange(10.0)})
+
+    result = approximate_describe(df, chunk_size=4)
+
+    assert result.loc["count", "empty"] == 0
+    assert result.loc[["mean", "std", "min", "50%", "max"], "empty"].isna().all()
+    assert result.loc["50%", "value"] == pytest.approx(df["value"].median(), abs=1)
+
+
+def test_exact_for_small_frames():
+    df = make_frame(rows=100)
+
+    pd.testing.assert_frame_equal(describe(df), df.describe())
+
+
+@pytest.mark.parametrize("order", ["random", "sorted"])
+def test_large_batches_are_sampled_within_the_rank_error(order):
+    values = np.random.default_rng(2).exponential(size=1_000_003)
+    if order == "sorted":
+        values = np.sort(values)
+    sketch = KLLSketch(seed=0)
+
+    sketch.update(values)
+
+    assert sketch.n == len(values)
+    assert sum(len(items) for items in sketch.levels) < 1_000
+    quantiles = sketch.quantiles([0.1, 0.5, 0.9])
+    ranks = np.searchsorted(np.sort(values), quantiles) / len(values)
+    np.testing.assert_allclose(ranks, [0.1, 0.5, 0.9], atol=sketch.rank_error() + 0.01)
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from stats.distinct import EXACT_LIMIT, DistinctSketch
+
+
+def test_exact_for_low_cardinality():
+    series = pd.Series(np.random.default_rng(0).integers(0, 500, size=10_000))
+    series[::7] = np.nan
+
+    sketch = DistinctSketch.from_series(series)
+
+    assert sketch.exact
+    assert sketch.estimate() == series.nunique()
+
+
+def test_object_and_unhashable_values():
+    series = pd.Series(["a", "b", None, "a", "c"])
+    assert DistinctSketch.from_series(series).estimate() == series.nunique()
+
+    lists = pd.Series([[1, 2], [1, 2], [3]])
+    assert DistinctSketch.from_series(lists).estimate() == 2
+
+
+@pytest.mark.parametrize("distinct", [10_000, 200_000])
+def test_estimate_within_the_error(distinct):
+    values = np.random.default_rng(1).permutation(distinct * 2)[:distinct]
+    series = pd.Series(np.repeat(values, 2))
+
+    sketch = DistinctSketch.from_series(series)
+
+    assert not sketch.exact
+    # 1.04 / sqrt(2 ** 14) is 0.8%, allow about 4 standard errors
+    assert sketch.estimate() == pytest.approx(series.nunique(), rel=0.035)
+
+
+def test_merged_chunks_match_a_single_sketch():
+    series = pd.Series(np.random.default_rng(2).integers(0, 50_000, size=100_000))
+    merged = DistinctSketch()
+    for start in range(0, len(series), 20_000):
+        merged.merge(DistinctSketch.from_series(series.iloc[start:start + 20_000]))
+
+    whole = DistinctSketch.from_series(series)
+    np.testing.assert_array_equal(merged.registers, whole.registers)
+    assert merged.estimate() == whole.estimate()
+
+
+def test_merge_exact_into_estimate():
+    large = DistinctSketch.from_series(pd.Series(np.arange(EXACT_LIMIT * 2)))
+    small = DistinctSketch.from_series(pd.Series(np.arange(-10, 0)))
+
+    assert small.merge(large).estimate() == large.merge(small).estimate()
+    assert not small.exact
+
+
+def test_updates_with_the_same_dtype_count_each_value_once():
+    sketch = DistinctSketch.from_series(pd.Series([1, 2, 3]))
+    sketch.update(pd.Series([1.0, 4.0]).astype(np.int64))
+
+    assert sketch.estimate() == 4
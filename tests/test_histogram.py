@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from stats.histogram import DEFAULT_BINS, FINE_BINS, HistogramIndex
+
+
+def make_series(rows=10_000, seed=0):
+    values = np.random.default_rng(seed).normal(size=rows)
+    values[::17] = np.nan
+
+    return pd.Series(values)
+
+
+def test_default_bin_count_is_an_exact_level():
+    series = make_series()
+    index = HistogramIndex.from_series(series)
+
+    assert len(index.counts) == FINE_BINS
+    assert any(len(level) == DEFAULT_BINS for level in index.levels)
+
+    counts, edges = index.histogram()
+    expected, expected_edges = np.histogram(series.dropna(), bins=DEFAULT_BINS)
+    np.testing.assert_array_equal(counts, expected)
+    np.testing.assert_allclose(edges, expected_edges)
+    assert index.n_null == series.isna().sum()
+
+
+def test_rebinned_counts_match_numpy():
+    series = make_series()
+    index = HistogramIndex.from_series(series)
+
+    counts, edges = index.histogram(bins=7, value_range=(-1.0, 1.0))
+
+    expected, _ = np.histogram(series.dropna(), bins=edges)
+    # Rebinning assumes uniform values inside each fine bin
+    np.testing.assert_allclose(counts, expected, atol=0.02 * expected.max())
+
+
+def test_infinite_values_do_not_stretch_the_range():
+    values = np.array([np.inf, 1.0, 2.0, 3.0, -np.inf, np.nan, 2.5])
+    index = HistogramIndex.from_series(pd.Series(values))
+
+    assert (index.minimum, index.maximum) == (1.0, 3.0)
+    assert index.n_null == 1
+    assert np.isfinite(index.resolution)
+    # The infinite values are counted in the outer bins
+    assert index.counts.sum() == 6
+    assert index.counts[0] == 2 and index.counts[-1] == 2
+
+
+def test_only_infinite_and_null_values():
+    index = HistogramIndex.from_series(pd.Series([np.inf, np.nan, -np.inf]))
+
+    assert index.n_null == 1
+    assert index.counts.sum() == 2
+    assert np.isfinite(index.edges).all()
+
+
+def test_all_null_and_empty_columns():
+    for series in (pd.Series([np.nan, np.nan]), pd.Series([], dtype=float)):
+        index = HistogramIndex.from_series(series)
+        assert index.counts.sum() == 0
+        assert index.n_null == len(series)
+
+
+def test_update_in_range_matches_a_rebuild():
+    series = make_series()
+    index = HistogramIndex.from_series(series[:5_000])
+    new_rows = series[5_000:].clip(index.minimum, index.maximum)
+
+    assert index.update(new_rows)
+    expected = HistogramIndex.from_series(pd.concat([series[:5_000], new_rows]))
+    np.testing.assert_array_equal(index.counts, expected.counts)
+    assert index.n_null == expected.n_null
+
+
+@pytest.mark.parametrize("value", [10.0, -10.0])
+def test_update_out_of_range_is_refused(value):
+    index = HistogramIndex.from_series(make_series(rows=100))
+    counts = index.counts.copy()
+
+    assert not index.update(pd.Series([value]))
+    np.testing.assert_array_equal(index.counts, counts)
+
+
+def test_update_with_infinite_values_is_accepted():
+    index = HistogramIndex.from_series(make_series(rows=100))
+    total = index.counts.sum()
+
+    assert index.update(pd.Series([np.inf, -np.inf, 0.0]))
+    assert index.counts.sum() == total + 3
@@ -0,0 +1,185 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from stats import kernels
+from stats.kernels import (
+    binned_kde,
+    grid_counts,
+    histogram_1d,
+    kernel_values,
+    null_count,
+    value_range,
+)
+
+BACKENDS = [
+    False,
+    pytest.param(
+        True, marks=pytest.mark.skipif(not kernels.HAS_NUMBA, reason="needs numba")
+    ),
+]
+
+VALUES = {
+    "normal": np.random.default_rng(0).normal(size=10_000),
+    "nulls": np.where(np.arange(1000) % 7 == 0, np.nan, np.arange(1000.0)),
+    "all null": np.full(100, np.nan),
+    "empty": np.zeros(0),
+    "infinite": np.array([np.inf, -np.inf, 1.5, np.nan, -2.0, np.inf]),
+    "only infinite": np.array([np.inf, -np.inf, np.nan]),
+    "integers": np.arange(-500, 1500, 3),
+    "float32": np.linspace(-1, 1, 999, dtype=np.float32),
+}
+
+
+def reference_range(values):
+    values = np.asarray(values, dtype=np.float64)
+    finite = values[np.isfinite(values)]
+    n_null = int(np.isnan(values).sum())
+    if not len(finite):
+        return np.nan, np.nan, n_null
+
+    return finite.min(), finite.max(), n_null
+
+
+def reference_histogram(values, bins, minimum, maximum):
+    values = np.asarray(values, dtype=np.float64)
+    valid = values[~np.isnan(values)]
+    # Out of range and infinite values go in the outer bins
+    positions = np.clip((valid - minimum) * (bins / (maximum - minimum)), 0, bins - 1)
+
+    return np.bincount(positions.astype(np.int64), minlength=bins)
+
+
+@pytest.mark.parametrize("use_numba", BACKENDS)
+@pytest.mark.parametrize("name", list(VALUES))
+def test_value_range(name, use_numba):
+    values = VALUES[name]
+
+    result = value_range(values, use_numba=use_numba, chunk_size=64)
+
+    np.testing.assert_equal(result, reference_range(values))
+
+
+@pytest.mark.parametrize("use_numba", BACKENDS)
+@pytest.mark.parametrize("name", list(VALUES))
+@pytest.mark.parametrize("bounds", [(-1.0, 1.0), (-3.0, 100.0), (0.25, 0.5)])
+def test_histogram(name, bounds, use_numba):
+    values = VALUES[name]
+    minimum, maximum = bounds
+
+    counts, n_null, low, high = histogram_1d(
+        values, 50, minimum, maximum, use_numba=use_numba, chunk_size=64
+    )
+
+    np.testing.assert_array_equal(
+        counts, reference_histogram(values, 50, minimum, maximum)
+    )
+    np.testing.assert_equal((low, high, n_null), reference_range(values))
+
+
+@pytest.mark.parametrize("use_numba", BACKENDS)
+def test_histogram_matches_numpy_in_range(use_numba):
+    values = np.random.default_rng(1).integers(0, 100, size=5000)
+
+    counts = histogram_1d(values, 100, 0, 100, use_numba=use_numba)[0]
+
+    np.testing.assert_array_equal(counts, np.histogram(values, 100, (0, 100))[0])
+
+
+@pytest.mark.parametrize("use_numba", BACKENDS)
+@pytest.mark.parametrize("weighted", [False, True])
+@pytest.mark.parametrize("rows", [0, 1, 5000])
+def test_grid_counts(rows, weighted, use_numba):
+    rng = np.random.default_rng(2)
+    codes_x = rng.integers(-1, 4, size=rows)
+    codes_y = rng.integers(-1, 3, size=rows)
+    weights = rng.normal(size=rows) if weighted else None
+    if weighted:
+        weights[::5] = np.nan
+
+    counts, sums = grid_counts(codes_x, codes_y, 4, 3, weights, use_numba=use_numba)
+
+    frame = pd.DataFrame({"x": codes_x, "y": codes_y, "w": weights})
+    frame = frame[(frame["x"] >= 0) & (frame["y"] >= 0)]
+    if weighted:
+        frame = frame.dropna()
+    keys = frame["x"] * 3 + frame["y"]
+    expected = keys.value_counts().reindex(range(12), fill_value=0)
+    np.testing.assert_array_equal(counts, expected.to_numpy())
+    if weighted:
+        expected_sums = frame.groupby(keys)["w"].sum().reindex(range(12), fill_value=0)
+        np.testing.assert_allclose(sums, expected_sums.to_numpy(), atol=1e-9)
+    else:
+        assert sums is None
+
+
+@pytest.mark.parametrize("use_numba", BACKENDS)
+def test_binned_kde_matches_the_exact_density(use_numba):
+    values = np.random.default_rng(3).normal(size=2000)
+    values[::10] = np.nan
+    valid = values[~np.isnan(values)]
+
+    grid, density = binned_kde(values, use_numba=use_numba)
+
+    bandwidth = kernels.kde_bandwidth(valid)
+    exact = np.exp(-0.5 * ((grid[:, None] - valid) / bandwidth) ** 2).sum(axis=1)
+    exact /= len(valid) * bandwidth * np.sqrt(2 * np.pi)
+    assert len(grid) == kernels.KDE_GRID_SIZE
+    np.testing.assert_allclose(density, exact, atol=1e-3 * exact.max())
+
+
+@pytest.mark.parametrize("use_numba", BACKENDS)
+@pytest.mark.parametrize(
+    "values", [np.zeros(0), np.full(10, np.nan), np.array([2.0, np.nan, 2.0])]
+)
+def test_binned_kde_without_density(values, use_numba):
+    grid, density = binned_kde(values, use_numba=use_numba)
+
+    assert len(grid) == len(density) == 0
+
+
+@pytest.mark.parametrize("use_numba", BACKENDS)
+def test_backends_agree_on_integers(use_numba):
+    values = np.arange(10_000, dtype=np.int64) % 97
+
+    grid, density = binned_kde(values, use_numba=use_numba)
+    expected_grid, expected = binned_kde(values.astype(np.float64), use_numba=False)
+
+    np.testing.assert_allclose(grid, expected_grid)
+    np.testing.assert_allclose(density, expected, rtol=1e-9)
+
+
+def test_kernel_values_do_not_copy_numeric_columns():
+    series = pd.Series(np.arange(1000, dtype=np.int32))
+
+    assert np.shares_memory(kernel_values(series), series.to_numpy())
+    assert kernel_values(series).dtype == np.int32
+
+
+@pytest.mark.parametrize(
+    "series",
+    [
+        pd.Series([True, False, True]),
+        pd.Series([1, None, 3], dtype="Int64"),
+        pd.Series([0.5, None, 1.5], dtype="Float64"),
+    ],
+)
+def test_kernel_values_of_other_columns(series):
+    values = kernel_values(series)
+
+    assert values.dtype == np.float64
+    np.testing.assert_array_equal(np.isnan(values), series.isna().to_numpy())
+
+
+@pytest.mark.parametrize("use_numba", BACKENDS)
+@pytest.mark.parametrize(
+    "series",
+    [
+        pd.Series([1.0, np.nan, np.inf, np.nan]),
+        pd.Series([1, 2, 3]),
+        pd.Series(["a", None, "b"]),
+        pd.Series([], dtype=float),
+    ],
+)
+def test_null_count(series, use_numba):
+    assert null_count(series, use_numba=use_numba) == series.isna().sum()
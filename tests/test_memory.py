@@ -0,0 +1,32 @@
+import sys
+
+import numpy as np
+import pandas as pd
+
+from stats.memory import artifact_memory
+
+
+def test_arrays_and_frames():
+    values = np.zeros(1000)
+    series = pd.Series(np.zeros(100))
+
+    assert artifact_memory(values) == values.nbytes
+    assert artifact_memory(series) == series.memory_usage(index=True)
+
+
+def test_views_count_their_base_once():
+    base = np.zeros((4, 1000))
+    views = [base[0], base[1], base[2:]]
+
+    assert artifact_memory(base[0]) == base.nbytes
+    assert artifact_memory(views) == sys.getsizeof(views) + base.nbytes
+
+    with_base = (base, base[0])
+    assert artifact_memory(with_base) == sys.getsizeof(with_base) + base.nbytes
+
+
+def test_shared_objects_count_once():
+    values = np.zeros(1000)
+    artifacts = [values, values]
+
+    assert artifact_memory(artifacts) == sys.getsizeof(artifacts) + values.nbytes
@@ -0,0 +1,61 @@
+import threading
+
+import pandas as pd
+import pytest
+
+# The plots package is imported with its panels
+pytest.importorskip("wx")
+
+from plots.prefetch import Prefetcher, prefetch_key  # noqa: E402
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({"a": [1, 2, 3]})
+
+
+def test_failed_prepare_is_a_miss(df):
+    prefetcher = Prefetcher()
+    key = prefetch_key("hist", ("a",), df)
+
+    def _prepare():
+        raise RuntimeError("broken")
+
+    prefetcher.prefetch(key, _prepare)
+    prefetcher._entries[key].done.wait(5)
+
+    assert prefetcher.take(key) is None
+    # The worker survived the error
+    other = prefetch_key("hist", ("b",), df)
+    prefetcher.prefetch(other, lambda: "ready")
+    prefetcher._entries[other].done.wait(5)
+    assert prefetcher.take(other) == "ready"
+
+
+def test_take_does_not_wait_for_a_slow_prepare(df):
+    prefetcher = Prefetcher(take_timeout=0.01)
+    key = prefetch_key("hist", ("a",), df)
+    started, release = threading.Event(), threading.Event()
+
+    def _prepare():
+        started.set()
+        release.wait(5)
+        return "late"
+
+    prefetcher.prefetch(key, _prepare)
+    started.wait(5)
+    try:
+        assert prefetcher.take(key) is None
+        assert prefetcher.misses["hist"] == 1
+    finally:
+        release.set()
+
+
+def test_put_is_not_a_hit(df):
+    prefetcher = Prefetcher()
+    key = prefetch_key("scatter", ("a", "a"), df)
+
+    prefetcher.put(key, "full")
+
+    assert prefetcher.take(key) == "full"
+    assert prefetcher.hit_rate("scatter") is None
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+from stats import get_profile, release_profile
+from stats import profile as profile_module
+from stats.utils import ColumnCache
+
+
+def make_df(rows, start=0):
+    return pd.DataFrame({"a": np.arange(start, start + rows, dtype=float)})
+
+
+def test_artifact_built_across_a_data_change_is_not_kept():
+    df, grown = make_df(10), make_df(20)
+    cache = None
+
+    def _build(series):
+        cache.df = grown  # rows appended while building
+        return len(series)
+
+    cache = ColumnCache(df, _build)
+
+    assert cache.get("a") == 10
+    assert "a" not in cache
+    cache.build = len
+    assert cache.get("a") == 20
+
+
+def test_describe_computed_during_an_append_is_not_kept(monkeypatch):
+    df = make_df(100)
+    profile = get_profile(df)
+    chunk = make_df(50, start=100)
+    grown = pd.concat([df, chunk], ignore_index=True)
+    summarize = profile_module.summarize_columns
+
+    def _summarize(data, **kwargs):
+        summaries = summarize(data, **kwargs)
+        if data is df:
+            profile.append(chunk, grown)
+        return summaries
+
+    monkeypatch.setattr(profile_module, "summarize_columns", _summarize)
+    try:
+        profile.get_describe(exact=False)
+        assert profile.summaries is None
+        assert not profile.describe
+
+        described = profile.get_describe(exact=False)
+        assert described.loc["count", "a"] == 150
+    finally:
+        release_profile(grown)
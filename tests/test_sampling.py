@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from stats import get_profile, release_profile
+from stats.sampling import draw_sample, extend_sample, position_keys, row_keys
+
+
+def make_df(n_rows, rng):
+    return pd.DataFrame(
+        {
+            "value": rng.normal(size=n_rows),
+            # A rare category, kept by the stratified sample
+            "group": np.where(rng.random(n_rows) < 0.001, "rare", "common"),
+        }
+    )
+
+
+def test_position_keys_match_row_keys():
+    positions = np.array([7, 0, 123456, 3])
+
+    expected = row_keys(0, 123457, 5)[positions]
+
+    assert np.array_equal(position_keys(positions, 5), expected)
+
+
+@pytest.mark.parametrize("kind", ["reservoir", "stratified"])
+def test_extended_sample_matches_a_new_draw(kind):
+    rng = np.random.default_rng(0)
+    df = make_df(5000, rng)
+    grown = pd.concat([df, make_df(3000, rng)], ignore_index=True)
+    # The new rows bring a category, the column stays stratified
+    grown.loc[7000, "group"] = "new"
+
+    sample = draw_sample(df, kind, size=500, seed=3, stratum_rows=5, max_strata=10)
+    extended = extend_sample(sample, grown, size=500, stratum_rows=5, max_strata=10)
+    expected = draw_sample(grown, kind, size=500, seed=3, stratum_rows=5, max_strata=10)
+
+    assert np.array_equal(extended.positions, expected.positions)
+    assert extended.strata == expected.strata
+    assert extended.n_population == 8000
+
+
+def test_extended_column_over_the_strata_limit():
+    rng = np.random.default_rng(1)
+    df = make_df(2000, rng)
+    chunk = make_df(2000, rng)
+    chunk["group"] = ["g{}".format(num % 20) for num in range(2000)]
+    grown = pd.concat([df, chunk], ignore_index=True)
+
+    sample = draw_sample(df, "stratified", size=100, stratum_rows=5, max_strata=10)
+    extended = extend_sample(sample, grown, size=100, stratum_rows=5, max_strata=10)
+    expected = draw_sample(grown, "stratified", size=100, stratum_rows=5, max_strata=10)
+
+    assert sample.strata == ("group",)
+    assert extended.strata == expected.strata == ()
+    assert np.array_equal(extended.positions, expected.positions)
+
+
+def test_profile_extends_its_samples_after_appends():
+    rng = np.random.default_rng(2)
+    df = make_df(4000, rng)
+    profile = get_profile(df)
+    try:
+        profile.get_sample("stratified", size=300)
+        for _ in range(2):
+            chunk = make_df(1000, rng)
+            grown = pd.concat([profile.df, chunk], ignore_index=True)
+            profile.append(chunk, grown)
+        sampled = profile.get_sample("stratified", size=300)
+
+        expected = draw_sample(profile.df, "stratified", size=300)
+        assert get_profile(sampled).sample.n_population == 6000
+        assert np.array_equal(get_profile(sampled).sample.positions, expected.positions)
+        pd.testing.assert_frame_equal(sampled, profile.df.iloc[expected.positions])
+    finally:
+        release_profile(profile.df)
@@ -0,0 +1,107 @@
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from stats import get_profile, release_profile
+from stats.scheduler import PrecomputeScheduler
+from stats.utils import TaskYielded, parallel_map, set_yield_check
+
+
+@pytest.fixture
+def profile():
+    df = pd.DataFrame({"a": np.arange(100.0), "b": ["x", "y"] * 50})
+    yield get_profile(df)
+    release_profile(df)
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+@pytest.mark.parametrize("max_workers", [1, 4])
+def test_yield_check_stops_parallel_map(max_workers):
+    calls = []
+
+    def _check():
+        if len(calls) >= 2:
+            raise TaskYielded()
+
+    set_yield_check(_check)
+    try:
+        with pytest.raises(TaskYielded):
+            parallel_map(calls.append, range(100), max_workers)
+    finally:
+        set_yield_check(None)
+
+    assert len(calls) < 100
+    assert parallel_map(lambda item: item, range(3), max_workers) == [0, 1, 2]
+
+
+def test_nested_maps_check_in_the_pool_threads():
+    def _check():
+        raise TaskYielded()
+
+    set_yield_check(_check)
+    try:
+        with pytest.raises(TaskYielded):
+            parallel_map(
+                lambda item: parallel_map(abs, [item, -item], 2), range(4), 1
+            )
+    finally:
+        set_yield_check(None)
+
+
+class ChunkedScheduler(PrecomputeScheduler):
+    """Runs tasks of chunks, the user interacts during the first run"""
+
+    def __init__(self, profile):
+        super().__init__(profile, max_workers=1, idle_delay=0.05)
+        self.runs = 0
+        self.chunks = 0
+
+    def _run(self, task):
+        self.runs += 1
+
+        def _chunk(num):
+            if self.runs == 1 and num == 1:
+                self.touch()
+            self.chunks += 1
+
+        parallel_map(_chunk, range(10), max_workers=1)
+
+
+def test_touch_stops_the_running_task(profile):
+    scheduler = ChunkedScheduler(profile)
+    scheduler.schedule(shown=["a"])
+    try:
+        wait_for(lambda: scheduler.progress[0] == scheduler.progress[1])
+    finally:
+        scheduler.stop()
+
+    # The interrupted run stopped at the next chunk and was run again
+    _, total = scheduler.progress
+    assert scheduler.runs == total + 1
+    assert scheduler.chunks == 10 * total + 2
+
+
+def test_failed_tasks_are_reported(profile):
+    errors = []
+
+    class FailingScheduler(PrecomputeScheduler):
+        def _run(self, task):
+            raise RuntimeError("broken")
+
+    scheduler = FailingScheduler(profile, idle_delay=0, on_error=errors.append)
+    scheduler.schedule(shown=["a", "b"])
+    try:
+        wait_for(lambda: scheduler.progress[0] == scheduler.progress[1])
+    finally:
+        scheduler.stop()
+
+    assert len(errors) == scheduler.progress[1]
+    assert all("broken" in error for error in errors)
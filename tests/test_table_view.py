@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+# The data package is imported with its panels
+pytest.importorskip("wx")
+
+from data.table_view import TableView, argsort_column  # noqa: E402
+
+
+def make_df(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(
+        {
+            "number": rng.integers(0, 20, size=rows).astype(float),
+            "text": rng.choice(["a", "b", "c"], size=rows).astype(object),
+        }
+    )
+    df.loc[rng.random(rows) < 0.1, "number"] = np.nan
+    df.loc[rng.random(rows) < 0.1, "text"] = None
+
+    return df
+
+
+@pytest.mark.parametrize("column", ["number", "text"])
+@pytest.mark.parametrize("ascending", [True, False])
+def test_sort_matches_a_stable_pandas_sort(column, ascending):
+    df = make_df(500)
+
+    rows = TableView(df).sort(column, ascending)
+
+    expected = df[column].sort_values(
+        ascending=ascending, kind="stable", na_position="last"
+    )
+    np.testing.assert_array_equal(rows, expected.index.to_numpy())
+
+
+@pytest.mark.parametrize("column", ["number", "text"])
+@pytest.mark.parametrize("ascending", [True, False])
+def test_appended_rows_are_merged_into_the_order(column, ascending):
+    df = make_df(500)
+    view = TableView(df)
+    view.sort(column, ascending)
+
+    grown = pd.concat([df, make_df(200, seed=1)], ignore_index=True)
+    # A new category
+    grown.loc[600, "text"] = "0"
+    rows = view.append(grown, 200)
+
+    expected, _ = argsort_column(grown[column], ascending)
+    np.testing.assert_array_equal(rows, expected)
+    assert (column, ascending) in view._permutations
+
+
+def test_appended_rows_making_mixed_types_are_sorted_again():
+    df = pd.DataFrame({"mixed": [3, 1, 2]}, dtype=object)
+    view = TableView(df)
+    view.sort("mixed")
+
+    grown = pd.concat([df, pd.DataFrame({"mixed": ["x", 10]})], ignore_index=True)
+    rows = view.append(grown, 2)
+
+    expected, _ = argsort_column(grown["mixed"])
+    np.testing.assert_array_equal(rows, expected)
@@ -0,0 +1,75 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from viewer import _SharedArray, _close_handles, attach_frame
+
+
+@pytest.fixture
+def blocks():
+    """Shared arrays of a test, released (and unlinked) on teardown"""
+
+    arrays = []
+    yield arrays
+    for array in arrays:
+        array.release()
+
+
+def share(blocks, values):
+    array = _SharedArray(values)
+    blocks.append(array)
+
+    return array
+
+
+def test_columns_are_matched_by_identity(blocks):
+    df = pd.DataFrame({"a": np.arange(1000.0), "b": np.arange(1000.0)})
+    array = share(blocks, df.iloc[:, 0].values)
+
+    assert array.same_as(df.iloc[:, 0].values)
+    assert not array.same_as(df.iloc[:, 1].values)
+    # Same content in another array
+    assert not array.same_as(df.iloc[:, 0].values.copy())
+
+    df["a"] = df["a"] * 2
+    assert not array.same_as(df.iloc[:, 0].values)
+
+
+def test_freed_source_does_not_match(blocks):
+    values = np.arange(100)
+    array = share(blocks, values)
+    del values
+
+    assert not array.same_as(np.arange(100))
+
+
+def test_attached_frame_reads_the_blocks(blocks):
+    df = pd.DataFrame({"x": np.arange(5), "y": np.linspace(0, 1, 5)})
+    names = ["x", "y"]
+    descriptor = {
+        "names": names,
+        "columns": [share(blocks, df[name].values).describe() for name in names],
+        "index": ("pickled", df.index),
+        "index_name": None,
+    }
+
+    attached, handles = attach_frame(descriptor)
+    try:
+        pd.testing.assert_frame_equal(attached, df)
+    finally:
+        del attached
+        _close_handles(handles)
+
+
+@pytest.mark.skipif(not os.path.isdir("/dev/shm"), reason="needs /dev/shm")
+def test_release_unlinks_the_block():
+    array = _SharedArray(np.arange(10))
+    path = os.path.join("/dev/shm", array.name.lstrip("/"))
+    assert os.path.exists(path)
+
+    array.release()
+
+    assert not os.path.exists(path)
+    array.release()  # already released